@@ -3,20 +3,20 @@ Comparateur de remplacements 3x8
 
 Logiciel pour comparer des scénarios de remplacement en horaires 3x8
 et calculer précisément les heures travaillées avec leurs majorations.
+
+Les sous-modules sont importés à la demande: `import shift_comparator`
+ne charge que ce qui est effectivement utilisé.
 """
+from ._lazy import lazy_exports
 
 __version__ = "1.0.0"
 __author__ = "Worth Shift Team"
 
-from .main import ShiftComparatorApp
-from .models import ShiftType, WorkDay, Scenario
-from .core import ShiftCalculator, ScenarioComparator
+# Sous-module -> attributs publics qu'il définit
+_SUBMODULES = {
+    '.main': ['ShiftComparatorApp'],
+    '.models': ['ShiftType', 'WorkDay', 'Scenario'],
+    '.core': ['ShiftCalculator', 'ScenarioComparator'],
+}
 
-__all__ = [
-    'ShiftComparatorApp',
-    'ShiftType',
-    'WorkDay',
-    'Scenario',
-    'ShiftCalculator',
-    'ScenarioComparator',
-]
\ No newline at end of file
+__all__, __getattr__, __dir__ = lazy_exports(__name__, globals(), _SUBMODULES)
@@ -0,0 +1,40 @@
+"""
+Attributs publics d'un paquet importés à la demande (PEP 562).
+
+Chaque paquet déclare quels attributs publics définit chacun de ses
+sous-modules; le sous-module n'est importé qu'au premier accès à l'un d'eux.
+"""
+import importlib
+from typing import Callable, Dict, List, Tuple
+
+
+def lazy_exports(package: str, namespace: Dict,
+                 submodules: Dict[str, List[str]]) -> Tuple[List[str], Callable, Callable]:
+    """
+    Construit __all__, __getattr__ et __dir__ d'un paquet.
+
+    Args:
+        package: __name__ du paquet
+        namespace: globals() du paquet (les attributs importés y sont gardés)
+        submodules: Sous-module relatif (ex: '.calculator') -> attributs publics qu'il définit
+
+    Returns:
+        Tuple (__all__, __getattr__, __dir__)
+    """
+    # Attribut public -> sous-module qui le définit
+    attributes = {name: module for module, names in submodules.items() for name in names}
+    exports = [name for names in submodules.values() for name in names]
+
+    def __getattr__(name):
+        module_name = attributes.get(name)
+        if module_name is None:
+            raise AttributeError(f"module {package!r} has no attribute {name!r}")
+
+        value = getattr(importlib.import_module(module_name, package), name)
+        namespace[name] = value  # Les accès suivants ne repassent plus par __getattr__
+        return value
+
+    def __dir__():
+        return sorted(set(namespace) | set(exports))
+
+    return exports, __getattr__, __dir__
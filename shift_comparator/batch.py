@@ -0,0 +1,255 @@
+"""
+Traitements par lots sur des plannings de plusieurs salariés.
+
+Format d'entrée (CSV avec en-tête):
+    employee_id,team,date,shift_type,hourly_rate
+    E001,Équipe A,2026-01-13,MATIN,13.50
+
+Une colonne optionnelle length donne un nombre de jours consécutifs du même
+shift à partir de date (une ligne par séquence au lieu d'une ligne par jour):
+    employee_id,team,date,shift_type,hourly_rate,length
+    E001,Équipe A,2026-01-12,NUIT,13.50,5
+
+Exemples:
+    python -m shift_comparator.batch payroll planning.csv
+    python -m shift_comparator.batch payroll planning.csv --group-by team,month --format json
+    python -m shift_comparator.batch payroll planning.csv --rules regles.toml
+    python -m shift_comparator.batch payroll planning.csv --no-overtime
+    python -m shift_comparator.batch validate planning.csv --rules regles.toml
+    python -m shift_comparator.batch coverage planning.csv --minimum 4 --maximum 12
+"""
+import argparse
+import csv
+import json
+import sys
+from itertools import groupby
+from typing import Iterator, List, TextIO
+
+from .models import ShiftType, ShiftRun, RunScenario, EmployeeRoster, RateSchedule, merge_runs
+from .core import ShiftCalculator, PayrollAggregator, ScheduleValidator, CoverageTimeline, PremiumRules
+from .core.payroll import METRICS, DEFAULT_GROUPINGS
+from .main import parse_date
+
+
+REQUIRED_COLUMNS = ['employee_id', 'team', 'date', 'shift_type', 'hourly_rate']
+
+
+def read_roster_runs(stream: TextIO) -> Iterator[tuple]:
+    """
+    Lit un planning CSV ligne par ligne, une ligne pouvant couvrir plusieurs jours.
+
+    Args:
+        stream: Fichier CSV ouvert (avec en-tête, colonne length optionnelle)
+
+    Yields:
+        Tuples (employee_id, team, datetime, ShiftType, hourly_rate, length)
+    """
+    reader = csv.reader(stream)
+    header = [column.strip() for column in next(reader)]
+
+    missing = [c for c in REQUIRED_COLUMNS if c not in header]
+    if missing:
+        raise ValueError(f"Colonnes manquantes dans le planning: {', '.join(missing)}")
+
+    i_employee, i_team, i_date, i_shift, i_rate = (header.index(c) for c in REQUIRED_COLUMNS)
+    i_length = header.index('length') if 'length' in header else None
+    shift_types = {shift_type.name: shift_type for shift_type in ShiftType}
+
+    for line_number, row in enumerate(reader, start=2):
+        if not row:
+            continue
+        try:
+            length = int(row[i_length]) if i_length is not None and row[i_length].strip() else 1
+            if length < 1:
+                raise ValueError(f"longueur {length}")
+            yield (row[i_employee], row[i_team], parse_date(row[i_date].strip()),
+                   shift_types[row[i_shift].strip().upper()], float(row[i_rate]), length)
+        except (KeyError, ValueError, IndexError) as e:
+            raise ValueError(f"Ligne {line_number} invalide: {row} ({e})")
+
+
+def read_rosters(stream: TextIO) -> List[EmployeeRoster]:
+    """
+    Lit un planning CSV et construit un EmployeeRoster par salarié.
+
+    Les jours consécutifs de même shift sont regroupés en séquences
+    (RunScenario): le planning n'est pas développé jour par jour.
+    Si le taux horaire d'un salarié change d'une ligne à l'autre, chaque
+    changement devient une période de son historique de taux (RateSchedule),
+    applicable à partir de la date de la ligne.
+
+    Args:
+        stream: Fichier CSV ouvert (avec en-tête)
+
+    Returns:
+        Liste d'EmployeeRoster
+    """
+    records = sorted(read_roster_runs(stream), key=lambda r: (r[0], r[2]))
+    rosters = []
+
+    for employee_id, rows in groupby(records, key=lambda r: r[0]):
+        rows = list(rows)
+        team, rate = rows[0][1], rows[0][4]
+        runs = merge_runs(ShiftRun(day, shift_type, length) for _, _, day, shift_type, _, length in rows)
+        changes = {}  # Date d'effet -> taux (un seul changement retenu par jour)
+        current = None
+        for _, _, day, _, row_rate, _ in rows:
+            if row_rate != current:
+                changes[day] = current = row_rate
+        rates = RateSchedule.from_changes(changes.items()) if len(changes) > 1 else None
+        rosters.append(EmployeeRoster(employee_id, team, RunScenario(employee_id, runs, rate, rates)))
+
+    return rosters
+
+
+def write_payroll_csv(report, stream: TextIO):
+    """Écrit un rapport de paie agrégée en CSV (une ligne par clé de regroupement)"""
+    writer = csv.writer(stream)
+    writer.writerow(['grouping', 'key'] + METRICS)
+    for dims in report.groups:
+        name = '+'.join(dims)
+        for row in report.rows(dims):
+            writer.writerow([name, '|'.join(row[:len(dims)])] +
+                            [f"{value:.4f}" for value in row[len(dims):]])
+
+
+def load_rules(args):
+    """Règles de --rules (None: règles intégrées)"""
+    return PremiumRules.load(args.rules) if args.rules else None
+
+
+def run_payroll(args) -> int:
+    """Sous-commande payroll"""
+    groupings = ([tuple(g.split(',')) for g in args.group_by]
+                 if args.group_by else DEFAULT_GROUPINGS)
+    aggregator = PayrollAggregator(ShiftCalculator(not args.no_overtime, rules=load_rules(args)),
+                                   groupings=groupings)
+
+    with open(args.planning, newline='', encoding='utf-8') as f:
+        report = aggregator.aggregate_runs(read_roster_runs(f))
+
+    output = open(args.output, 'w', newline='', encoding='utf-8') if args.output else sys.stdout
+    try:
+        if args.format == 'json':
+            json.dump(report.to_dict(), output, ensure_ascii=False, indent=2)
+            output.write("\n")
+        else:
+            write_payroll_csv(report, output)
+    finally:
+        if args.output:
+            output.close()
+
+    return 0
+
+
+def run_validate(args) -> int:
+    """Sous-commande validate: une ligne CSV par violation, code retour 1 s'il y en a"""
+    validator = ScheduleValidator(args.min_daily_rest, args.min_weekly_rest, args.max_consecutive_days,
+                                  rules=load_rules(args))
+
+    with open(args.planning, newline='', encoding='utf-8') as f:
+        rosters = read_rosters(f)
+
+    writer = csv.writer(sys.stdout)
+    writer.writerow(['employee_id', 'team', 'rule', 'dates', 'message'])
+    count = 0
+    for roster in rosters:
+        for violation in validator.validate(roster.scenario):
+            count += 1
+            writer.writerow([roster.employee_id, roster.team, violation.rule,
+                             ' '.join(violation.to_dict()['dates']), violation.message])
+
+    print(f"{count} violation(s) sur {len(rosters)} salarié(s)", file=sys.stderr)
+    return 1 if count else 0
+
+
+def parse_target(value: str):
+    """Effectif cible: '4', ou 24 (par heure du jour) ou 168 (par heure de la semaine) valeurs séparées par des virgules"""
+    values = [int(v) for v in value.split(',')]
+    if len(values) == 1:
+        return values[0]
+    if len(values) not in (24, 168):
+        raise argparse.ArgumentTypeError(f"{len(values)} valeurs: 1, 24 ou 168 attendues")
+    return values
+
+
+def run_coverage(args) -> int:
+    """Sous-commande coverage: une ligne CSV par période hors cible, code retour 1 en cas de sous-effectif"""
+    with open(args.planning, newline='', encoding='utf-8') as f:
+        rosters = read_rosters(f)
+
+    timeline = CoverageTimeline.from_scenarios(
+        rosters,
+        parse_date(args.date_from) if args.date_from else None,
+        parse_date(args.date_to) if args.date_to else None,
+        args.step,
+        rules=load_rules(args),
+    )
+    windows = timeline.windows(args.minimum, args.maximum)
+
+    writer = csv.writer(sys.stdout)
+    writer.writerow(['kind', 'start', 'end', 'headcount', 'target', 'gap'])
+    for window in windows:
+        row = window.to_dict()
+        writer.writerow([row['kind'], row['start'], row['end'], row['headcount'], row['target'], row['gap']])
+
+    under = sum(1 for window in windows if window.kind == 'under')
+    print(f"{under} période(s) de sous-effectif, {len(windows) - under} de sureffectif "
+          f"({timeline.shifts} shifts, {len(rosters)} salarié(s))", file=sys.stderr)
+    return 1 if under else 0
+
+
+def main(argv=None) -> int:
+    """Point d'entrée en ligne de commande"""
+    parser = argparse.ArgumentParser(description="Traitements par lots du comparateur de shifts")
+    subparsers = parser.add_subparsers(dest='command', required=True)
+
+    payroll = subparsers.add_parser('payroll', help="Totaux de paie par salarié, équipe, "
+                                                    "semaine, mois et type de shift")
+    payroll.add_argument('planning', help="Fichier CSV du planning")
+    payroll.add_argument('--group-by', action='append', default=None,
+                         help="Regroupement, ex: 'team' ou 'team,month' (répétable)")
+    payroll.add_argument('--format', choices=['csv', 'json'], default='csv')
+    payroll.add_argument('--output', default=None, help="Fichier de sortie (stdout par défaut)")
+    payroll.add_argument('--rules', default=None,
+                         help="Fichier de règles de majoration, JSON ou TOML (règles intégrées par défaut)")
+    payroll.add_argument('--no-overtime', action='store_true',
+                         help="Totaux sans heures supplémentaires hebdomadaires (incluses par défaut)")
+    payroll.set_defaults(handler=run_payroll)
+
+    validate = subparsers.add_parser('validate', help="Repos quotidien et hebdomadaire, "
+                                                      "jours consécutifs et chevauchements")
+    validate.add_argument('planning', help="Fichier CSV du planning")
+    validate.add_argument('--min-daily-rest', type=float, default=None,
+                          help="Repos minimum entre deux shifts, en heures (11 par défaut)")
+    validate.add_argument('--min-weekly-rest', type=float, default=None,
+                          help="Repos hebdomadaire minimum, en heures (35 par défaut)")
+    validate.add_argument('--max-consecutive-days', type=int, default=None,
+                          help="Jours travaillés consécutifs maximum (6 par défaut)")
+    validate.add_argument('--rules', default=None,
+                          help="Fichier de règles dont les horaires des shifts s'appliquent")
+    validate.set_defaults(handler=run_validate)
+
+    coverage = subparsers.add_parser('coverage', help="Effectif présent par créneau, "
+                                                      "périodes de sous-effectif et de sureffectif")
+    coverage.add_argument('planning', help="Fichier CSV du planning")
+    coverage.add_argument('--minimum', type=parse_target, default=1,
+                          help="Effectif minimum: '4', ou 24 / 168 valeurs séparées par des virgules")
+    coverage.add_argument('--maximum', type=parse_target, default=None,
+                          help="Effectif maximum (même format, pas de limite par défaut)")
+    coverage.add_argument('--step', type=int, default=60,
+                          help="Durée d'un créneau en minutes, diviseur de 1440 (60 par défaut)")
+    coverage.add_argument('--from', dest='date_from', default=None,
+                          help="Premier jour (par défaut: premier jour travaillé)")
+    coverage.add_argument('--to', dest='date_to', default=None,
+                          help="Dernier jour (par défaut: dernier jour travaillé)")
+    coverage.add_argument('--rules', default=None,
+                          help="Fichier de règles dont les horaires des shifts s'appliquent")
+    coverage.set_defaults(handler=run_coverage)
+
+    args = parser.parse_args(argv)
+    return args.handler(args)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
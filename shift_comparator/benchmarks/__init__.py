@@ -0,0 +1,11 @@
+"""
+Benchmarks du comparateur de shifts.
+
+Usage:
+    python -m shift_comparator.benchmarks --save baseline.json
+    python -m shift_comparator.benchmarks --compare baseline.json --threshold 0.10
+"""
+from .runner import BenchmarkResult, BenchmarkRunner, save_results, load_results, find_regressions
+
+__all__ = ['BenchmarkResult', 'BenchmarkRunner', 'save_results', 'load_results',
+           'find_regressions']
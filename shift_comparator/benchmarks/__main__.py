@@ -0,0 +1,62 @@
+"""
+Lanceur des benchmarks.
+
+Exemples:
+    python -m shift_comparator.benchmarks --quick
+    python -m shift_comparator.benchmarks --save baseline.json
+    python -m shift_comparator.benchmarks --compare baseline.json --threshold 0.15
+"""
+import argparse
+import sys
+
+from .runner import BenchmarkRunner, save_results, load_results, find_regressions
+from .suite import build_cases
+
+
+def main(argv=None) -> int:
+    """Exécute la suite et retourne 1 si une régression est détectée"""
+    parser = argparse.ArgumentParser(description="Benchmarks du comparateur de shifts")
+    parser.add_argument('--quick', action='store_true',
+                        help="Rosters réduits (1k et 10k jours)")
+    parser.add_argument('--filter', default=None,
+                        help="N'exécute que les benchmarks dont le nom contient ce texte")
+    parser.add_argument('--save', metavar='FICHIER', default=None,
+                        help="Enregistre les résultats comme référence JSON")
+    parser.add_argument('--compare', metavar='FICHIER', default=None,
+                        help="Compare les résultats à une référence JSON")
+    parser.add_argument('--threshold', type=float, default=0.10,
+                        help="Dégradation tolérée avant de signaler une régression")
+    args = parser.parse_args(argv)
+
+    runner = BenchmarkRunner()
+
+    print("=" * 80)
+    print(f"{'Benchmark':<42} {'Meilleur':>12} {'Médiane':>12} {'Pic mémoire':>12}")
+    print("-" * 80)
+
+    for name, func, repeat in build_cases(quick=args.quick, name_filter=args.filter):
+        result = runner.run(name, func, repeat=repeat)
+        print(f"{name:<42} {result.best * 1000:>10.3f}ms {result.median * 1000:>10.3f}ms "
+              f"{result.peak_memory / 1024:>9.1f}KiB")
+
+    print("=" * 80)
+
+    if args.save:
+        save_results(runner.results, args.save)
+        print(f"\n✓ Référence enregistrée dans {args.save}")
+
+    if args.compare:
+        regressions = find_regressions(runner.results, load_results(args.compare),
+                                       threshold=args.threshold)
+        if regressions:
+            print(f"\n✗ {len(regressions)} régression(s) au-delà de {args.threshold:.0%}:")
+            for name, metric, before, after, ratio in regressions:
+                print(f"  {name:<42} {metric:<12} {before:.6g} → {after:.6g} (x{ratio:.2f})")
+            return 1
+        print(f"\n✓ Aucune régression au-delà de {args.threshold:.0%}")
+
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
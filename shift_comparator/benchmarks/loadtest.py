@@ -0,0 +1,336 @@
+"""
+Générateur de charge pour l'application WSGI.
+
+Trois modes:
+    - inprocess: appelle directement wsgi_app.application depuis des threads
+    - socket: sert l'application via wsgiref sur un port local et l'interroge en HTTP
+    - url: interroge un serveur déjà lancé (ex: gunicorn avec N workers)
+
+Exemples:
+    python -m shift_comparator.benchmarks.loadtest --mode inprocess --concurrency 8
+    python -m shift_comparator.benchmarks.loadtest --mode socket --requests 5000 --report load.json
+    python -m shift_comparator.benchmarks.loadtest --url http://127.0.0.1:8000 --concurrency 16
+"""
+import argparse
+import http.client
+import io
+import json
+import random
+import sys
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timedelta
+from socketserver import ThreadingMixIn
+from typing import Dict, List
+from urllib.parse import urlparse
+from wsgiref.simple_server import WSGIServer, WSGIRequestHandler, make_server
+
+
+# Répartition réaliste du trafic: (poids, nom de route)
+DEFAULT_MIX = [
+    (40, 'calculate'),
+    (5, 'save'),
+    (25, 'compare'),
+    (10, 'scenarios'),
+    (20, 'static'),
+]
+
+STATIC_PATHS = ['/', '/style.css', '/app.js']
+SHIFT_TYPES = ['MATIN', 'MATIN', 'APRES_MIDI', 'APRES_MIDI', 'NUIT', 'NUIT']
+
+
+def percentile(sorted_values: List[float], pct: float) -> float:
+    """Percentile par rang le plus proche sur une liste triée"""
+    if not sorted_values:
+        return 0.0
+    index = max(0, min(len(sorted_values) - 1, int(round(pct / 100 * len(sorted_values))) - 1))
+    return sorted_values[index]
+
+
+def build_shifts(count: int, start: datetime) -> List[Dict]:
+    """Génère une liste de shifts consécutifs au format de l'API"""
+    return [
+        {'date': (start + timedelta(days=i)).strftime('%Y-%m-%d'),
+         'type': SHIFT_TYPES[i % len(SHIFT_TYPES)]}
+        for i in range(count)
+    ]
+
+
+class InProcessClient:
+    """Client qui appelle l'application WSGI sans passer par le réseau"""
+
+    def __init__(self, app):
+        self.app = app
+
+    def request(self, method: str, path: str, payload=None) -> tuple:
+        """Retourne (code HTTP, corps)"""
+        body = json.dumps(payload).encode('utf-8') if payload is not None else b''
+        environ = {
+            'REQUEST_METHOD': method,
+            'PATH_INFO': path,
+            'CONTENT_LENGTH': str(len(body)),
+            'wsgi.input': io.BytesIO(body),
+        }
+        status_holder = []
+
+        def start_response(status, headers):
+            status_holder.append(status)
+
+        content = b''.join(self.app(environ, start_response))
+        return int(status_holder[0].split(' ', 1)[0]), content
+
+
+class HTTPClient:
+    """Client HTTP minimal (une connexion par requête, comme wsgiref en HTTP/1.0)"""
+
+    def __init__(self, host: str, port: int):
+        self.host = host
+        self.port = port
+
+    def request(self, method: str, path: str, payload=None) -> tuple:
+        """Retourne (code HTTP, corps)"""
+        body = json.dumps(payload).encode('utf-8') if payload is not None else None
+        headers = {'Content-Type': 'application/json'} if body is not None else {}
+        connection = http.client.HTTPConnection(self.host, self.port, timeout=60)
+        try:
+            connection.request(method, path, body=body, headers=headers)
+            response = connection.getresponse()
+            return response.status, response.read()
+        finally:
+            connection.close()
+
+
+class _ThreadingWSGIServer(ThreadingMixIn, WSGIServer):
+    daemon_threads = True
+
+
+class _QuietHandler(WSGIRequestHandler):
+    def log_message(self, format, *args):
+        pass
+
+
+def start_local_server(app, host: str = '127.0.0.1') -> tuple:
+    """
+    Sert l'application via wsgiref sur un port libre.
+
+    Returns:
+        Tuple (serveur, port)
+    """
+    server = make_server(host, 0, app, server_class=_ThreadingWSGIServer,
+                         handler_class=_QuietHandler)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    return server, server.server_address[1]
+
+
+class LoadGenerator:
+    """Envoie un mélange de requêtes avec une concurrence donnée"""
+
+    def __init__(self, client, concurrency: int = 4, shifts_per_request: int = 14,
+                 mix: List[tuple] = None, seed: int = 0):
+        """
+        Args:
+            client: Client exposant request(method, path, payload)
+            concurrency: Nombre de requêtes simultanées
+            shifts_per_request: Taille des scénarios envoyés
+            mix: Liste de tuples (poids, route)
+            seed: Graine du générateur aléatoire
+        """
+        self.client = client
+        self.concurrency = concurrency
+        self.shifts_per_request = shifts_per_request
+        self.mix = mix or DEFAULT_MIX
+        self.random = random.Random(seed)
+        self.scenario_count = 0
+        self._lock = threading.Lock()
+
+    def prepare(self, saved_scenarios: int = 10):
+        """Sauvegarde quelques scénarios pour que /api/compare ait des cibles"""
+        status, body = self.client.request('GET', '/api/scenarios')
+        self.scenario_count = json.loads(body)['total'] if status == 200 else 0
+
+        for i in range(saved_scenarios):
+            status, _ = self.client.request('POST', '/api/save', self._scenario_payload(f"Charge {i}", i))
+            if status == 200:
+                self.scenario_count += 1
+
+    def _scenario_payload(self, name: str, offset: int) -> Dict:
+        start = datetime(2026, 1, 5) + timedelta(days=offset % 28)
+        return {'name': name, 'hourly_rate': 20.0,
+                'shifts': build_shifts(self.shifts_per_request, start)}
+
+    def _next_request(self) -> tuple:
+        """Tire la prochaine requête selon la répartition"""
+        with self._lock:
+            route = self.random.choices([r for _, r in self.mix],
+                                        weights=[w for w, _ in self.mix])[0]
+            offset = self.random.randrange(1000)
+            ids = self.random.sample(range(self.scenario_count), min(3, self.scenario_count))
+            static_path = self.random.choice(STATIC_PATHS)
+
+        if route == 'calculate':
+            return route, 'POST', '/api/calculate', self._scenario_payload('Charge', offset)
+        if route == 'save':
+            return route, 'POST', '/api/save', self._scenario_payload(f"Charge {offset}", offset)
+        if route == 'compare':
+            return route, 'POST', '/api/compare', {'scenario_ids': ids}
+        if route == 'scenarios':
+            return route, 'GET', '/api/scenarios', None
+        return route, 'GET', static_path, None
+
+    def _send_one(self) -> tuple:
+        route, method, path, payload = self._next_request()
+        start = time.perf_counter()
+        try:
+            status, _ = self.client.request(method, path, payload)
+        except Exception:
+            status = 0
+        elapsed = time.perf_counter() - start
+
+        if route == 'save' and status == 200:
+            with self._lock:
+                self.scenario_count += 1
+
+        return route, status, elapsed
+
+    def run(self, total_requests: int = 1000, duration: float = None) -> Dict:
+        """
+        Exécute la charge.
+
+        Args:
+            total_requests: Nombre de requêtes à envoyer
+            duration: Durée maximale en secondes (optionnelle)
+
+        Returns:
+            Rapport sous forme de dictionnaire
+        """
+        samples = []
+        samples_lock = threading.Lock()
+        counter = iter(range(total_requests))
+        counter_lock = threading.Lock()
+        deadline = time.perf_counter() + duration if duration else None
+
+        def worker():
+            while True:
+                with counter_lock:
+                    if next(counter, None) is None:
+                        return
+                if deadline and time.perf_counter() > deadline:
+                    return
+                sample = self._send_one()
+                with samples_lock:
+                    samples.append(sample)
+
+        start = time.perf_counter()
+        with ThreadPoolExecutor(max_workers=self.concurrency) as pool:
+            for _ in range(self.concurrency):
+                pool.submit(worker)
+        wall_time = time.perf_counter() - start
+
+        return self.build_report(samples, wall_time)
+
+    def build_report(self, samples: List[tuple], wall_time: float) -> Dict:
+        """Calcule débit et latences (globales et par route)"""
+        def summarize(items):
+            latencies = sorted(elapsed for _, _, elapsed in items)
+            # Requête invalide (4xx) ou échec serveur (5xx, 0 si pas de réponse)
+            errors = sum(1 for _, status, _ in items if status == 0 or status >= 400)
+            return {
+                'requests': len(items),
+                'errors': errors,
+                'throughput': len(items) / wall_time if wall_time > 0 else 0.0,
+                'p50_ms': percentile(latencies, 50) * 1000,
+                'p95_ms': percentile(latencies, 95) * 1000,
+                'p99_ms': percentile(latencies, 99) * 1000,
+                'max_ms': (latencies[-1] if latencies else 0.0) * 1000,
+            }
+
+        by_route = {}
+        for sample in samples:
+            by_route.setdefault(sample[0], []).append(sample)
+
+        return {
+            'concurrency': self.concurrency,
+            'shifts_per_request': self.shifts_per_request,
+            'wall_time': wall_time,
+            'overall': summarize(samples),
+            'routes': {route: summarize(items) for route, items in sorted(by_route.items())},
+        }
+
+
+def format_report(report: Dict) -> str:
+    """Formate le rapport de charge pour la console"""
+    lines = []
+    lines.append("=" * 80)
+    lines.append(f"CHARGE: concurrence={report['concurrency']}, "
+                 f"{report['shifts_per_request']} shifts/requête, "
+                 f"durée {report['wall_time']:.2f}s")
+    lines.append("=" * 80)
+    lines.append(f"{'Route':<12} {'Requêtes':>9} {'Erreurs':>8} {'Req/s':>9} "
+                 f"{'p50':>9} {'p95':>9} {'p99':>9}")
+    lines.append("-" * 80)
+
+    rows = list(report['routes'].items()) + [('TOTAL', report['overall'])]
+    for route, stats in rows:
+        lines.append(f"{route:<12} {stats['requests']:>9} {stats['errors']:>8} "
+                     f"{stats['throughput']:>9.1f} {stats['p50_ms']:>7.2f}ms "
+                     f"{stats['p95_ms']:>7.2f}ms {stats['p99_ms']:>7.2f}ms")
+
+    lines.append("=" * 80)
+    return "\n".join(lines)
+
+
+def main(argv=None) -> int:
+    """Point d'entrée en ligne de commande"""
+    parser = argparse.ArgumentParser(description="Test de charge de l'application WSGI")
+    parser.add_argument('--mode', choices=['inprocess', 'socket'], default='inprocess')
+    parser.add_argument('--url', default=None,
+                        help="Cible un serveur existant au lieu de l'application locale")
+    parser.add_argument('--concurrency', type=int, default=4)
+    parser.add_argument('--requests', type=int, default=1000)
+    parser.add_argument('--duration', type=float, default=None)
+    parser.add_argument('--shifts', type=int, default=14,
+                        help="Nombre de shifts par scénario envoyé")
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--report', metavar='FICHIER', default=None,
+                        help="Écrit le rapport JSON dans ce fichier")
+    args = parser.parse_args(argv)
+
+    server = None
+    if args.url:
+        target = urlparse(args.url)
+        client = HTTPClient(target.hostname, target.port or 80)
+        mode = 'url'
+    else:
+        from ..web.wsgi_app import application
+
+        if args.mode == 'socket':
+            server, port = start_local_server(application)
+            client = HTTPClient('127.0.0.1', port)
+        else:
+            client = InProcessClient(application)
+        mode = args.mode
+
+    try:
+        generator = LoadGenerator(client, concurrency=args.concurrency,
+                                  shifts_per_request=args.shifts, seed=args.seed)
+        generator.prepare()
+        report = generator.run(total_requests=args.requests, duration=args.duration)
+    finally:
+        if server is not None:
+            server.shutdown()
+
+    report['mode'] = mode
+    print(format_report(report))
+
+    if args.report:
+        with open(args.report, 'w', encoding='utf-8') as f:
+            json.dump(report, f, indent=2)
+        print(f"\n✓ Rapport écrit dans {args.report}")
+
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,166 @@
+"""
+Exécution des benchmarks: mesure du temps, de la mémoire et comparaison aux références.
+"""
+import gc
+import json
+import platform
+import statistics
+import time
+import tracemalloc
+from datetime import datetime
+from typing import Callable, Dict, List
+
+
+class BenchmarkResult:
+    """Résultat de mesure d'un benchmark"""
+
+    def __init__(self, name: str, timings: List[float], peak_memory: int):
+        """
+        Args:
+            name: Nom du benchmark
+            timings: Durées de chaque répétition (secondes)
+            peak_memory: Pic de mémoire allouée pendant une exécution (octets)
+        """
+        self.name = name
+        self.timings = timings
+        self.peak_memory = peak_memory
+
+    @property
+    def best(self) -> float:
+        """Meilleure durée mesurée"""
+        return min(self.timings)
+
+    @property
+    def median(self) -> float:
+        """Durée médiane"""
+        return statistics.median(self.timings)
+
+    def to_dict(self) -> Dict:
+        """Sérialise le résultat pour le fichier de référence"""
+        return {
+            'name': self.name,
+            'best': self.best,
+            'median': self.median,
+            'repeat': len(self.timings),
+            'peak_memory': self.peak_memory,
+        }
+
+    def __repr__(self):
+        return (f"BenchmarkResult({self.name}, best={self.best * 1000:.3f}ms, "
+                f"peak={self.peak_memory / 1024:.1f}KiB)")
+
+
+class BenchmarkRunner:
+    """Exécute des benchmarks et collecte leurs résultats"""
+
+    def __init__(self, repeat: int = 5):
+        """
+        Args:
+            repeat: Nombre de répétitions chronométrées par benchmark
+        """
+        self.repeat = repeat
+        self.results = []
+
+    def run(self, name: str, func: Callable, repeat: int = None) -> BenchmarkResult:
+        """
+        Mesure une fonction sans argument.
+
+        Le temps est mesuré sans tracemalloc (qui ralentit l'exécution),
+        puis une exécution séparée mesure le pic mémoire.
+
+        Args:
+            name: Nom du benchmark
+            func: Fonction à mesurer
+            repeat: Nombre de répétitions (celui du runner par défaut)
+
+        Returns:
+            BenchmarkResult
+        """
+        repeat = repeat or self.repeat
+        timings = []
+
+        gc_was_enabled = gc.isenabled()
+        gc.collect()
+        gc.disable()
+        try:
+            for _ in range(repeat):
+                start = time.perf_counter()
+                func()
+                timings.append(time.perf_counter() - start)
+        finally:
+            if gc_was_enabled:
+                gc.enable()
+
+        gc.collect()
+        tracemalloc.start()
+        try:
+            func()
+            _, peak_memory = tracemalloc.get_traced_memory()
+        finally:
+            tracemalloc.stop()
+
+        result = BenchmarkResult(name, timings, peak_memory)
+        self.results.append(result)
+        return result
+
+
+def save_results(results: List[BenchmarkResult], path: str):
+    """
+    Enregistre des résultats comme référence JSON.
+
+    Args:
+        results: Résultats à enregistrer
+        path: Chemin du fichier JSON
+    """
+    data = {
+        'created': datetime.now().isoformat(timespec='seconds'),
+        'python': platform.python_version(),
+        'machine': platform.machine(),
+        'results': {r.name: r.to_dict() for r in results},
+    }
+    with open(path, 'w', encoding='utf-8') as f:
+        json.dump(data, f, indent=2)
+
+
+def load_results(path: str) -> Dict[str, Dict]:
+    """
+    Charge une référence JSON.
+
+    Args:
+        path: Chemin du fichier JSON
+
+    Returns:
+        Dictionnaire nom -> résultat sérialisé
+    """
+    with open(path, encoding='utf-8') as f:
+        return json.load(f)['results']
+
+
+def find_regressions(results: List[BenchmarkResult], baseline: Dict[str, Dict],
+                     threshold: float = 0.10) -> List[tuple]:
+    """
+    Compare des résultats à une référence.
+
+    Args:
+        results: Résultats de l'exécution courante
+        baseline: Référence chargée avec load_results()
+        threshold: Dégradation relative tolérée (0.10 = +10%)
+
+    Returns:
+        Liste de tuples (nom, métrique, valeur de référence, valeur courante, ratio)
+    """
+    regressions = []
+
+    for result in results:
+        reference = baseline.get(result.name)
+        if reference is None:
+            continue
+
+        current = result.to_dict()
+        for metric in ('best', 'peak_memory'):
+            before = reference[metric]
+            after = current[metric]
+            if before > 0 and after > before * (1 + threshold):
+                regressions.append((result.name, metric, before, after, after / before))
+
+    return regressions
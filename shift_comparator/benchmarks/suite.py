@@ -0,0 +1,166 @@
+"""
+Définition des benchmarks du comparateur.
+"""
+import io
+import json
+from datetime import datetime, timedelta
+from typing import List
+
+from ..models import ShiftType, WorkDay, Scenario, PATTERNS
+from ..core import ShiftCalculator, ScenarioComparator, RotationPricer, PremiumProfileTable
+from ..utils import ResultFormatter
+
+
+# Cycle 2-2-2 utilisé pour générer des rosters réalistes
+CYCLE = [ShiftType.MATIN, ShiftType.MATIN, ShiftType.APRES_MIDI,
+         ShiftType.APRES_MIDI, ShiftType.NUIT, ShiftType.NUIT]
+
+FULL_ROSTER_SIZES = (1_000, 100_000, 1_000_000)
+QUICK_ROSTER_SIZES = (1_000, 10_000)
+
+
+def build_roster(days: int, start: datetime = datetime(2026, 1, 5)) -> List[WorkDay]:
+    """
+    Génère un roster de jours consécutifs suivant le cycle 2-2-2.
+
+    Args:
+        days: Nombre de jours travaillés
+        start: Date du premier jour
+
+    Returns:
+        Liste de WorkDay
+    """
+    return [WorkDay(start + timedelta(days=i), CYCLE[i % len(CYCLE)]) for i in range(days)]
+
+
+def build_wsgi_environ(method: str, path: str, payload=None) -> dict:
+    """Construit un environ WSGI minimal pour une requête"""
+    body = json.dumps(payload).encode('utf-8') if payload is not None else b''
+    return {
+        'REQUEST_METHOD': method,
+        'PATH_INFO': path,
+        'CONTENT_LENGTH': str(len(body)),
+        'wsgi.input': io.BytesIO(body),
+    }
+
+
+def build_cases(quick: bool = False, name_filter: str = None) -> List[tuple]:
+    """
+    Construit la liste des benchmarks.
+
+    Les données sont préparées ici, en dehors des mesures, et seulement pour
+    les benchmarks retenus par le filtre (le roster d'un million de jours
+    n'est pas construit pour mesurer un seul work_day).
+
+    Args:
+        quick: Si True, utilise des rosters réduits
+        name_filter: Ne garde que les benchmarks dont le nom contient ce texte
+
+    Returns:
+        Liste de tuples (nom, fonction, répétitions)
+    """
+    calculator = ShiftCalculator()
+    comparator = ScenarioComparator(calculator)
+    setups = []  # (nom, préparation -> fonction mesurée, répétitions)
+
+    # calculate_work_day par type de shift (semaine et dimanche)
+    for shift_type in ShiftType:
+        for label, date in (('semaine', datetime(2026, 1, 13)),
+                            ('dimanche', datetime(2026, 1, 18))):
+            def setup_day(date=date, shift_type=shift_type):
+                # Un WorkDay neuf par appel (construction comprise): le mémo par identité
+                # du calculateur ne répond jamais à la place du calcul mesuré, même répété
+                def bench_day():
+                    for _ in range(1000):
+                        calculator.calculate_work_day(WorkDay(date, shift_type), 20.0)
+                return bench_day
+
+            setups.append((f"work_day.{shift_type.value}.{label}.x1000", setup_day, 5))
+
+    # calculate_scenario sur des rosters de taille croissante
+    for size in (QUICK_ROSTER_SIZES if quick else FULL_ROSTER_SIZES):
+        def setup_scenario(size=size):
+            scenario = Scenario(f"Roster {size}", build_roster(size), 20.0)
+
+            def bench_scenario():
+                calculator.calculate_scenario(scenario)
+            return bench_scenario
+
+        setups.append((f"scenario.{size}", setup_scenario, 5 if size <= 10_000 else 1))
+
+    # Même calcul avec la table précalculée (construite hors mesure)
+    table_size = QUICK_ROSTER_SIZES[0]  # Roster entièrement couvert par la table
+
+    def setup_table():
+        table_calculator = ShiftCalculator(profile_table=PremiumProfileTable.build(calculator, 2026, 2028))
+        table_scenario = Scenario(f"Roster {table_size}", build_roster(table_size), 20.0)
+
+        def bench_table():
+            table_calculator.calculate_scenario(table_scenario)
+        return bench_table
+
+    setups.append((f"scenario.table.{table_size}", setup_table, 5))
+
+    # compare_scenarios avec de nombreux scénarios
+    scenario_count = 50 if quick else 500
+
+    def build_variants(count):
+        return [
+            Scenario(f"Variante {i}", build_roster(30, datetime(2026, 1, 5) + timedelta(days=i)), 20.0)
+            for i in range(count)
+        ]
+
+    def setup_compare():
+        scenarios = build_variants(scenario_count)
+
+        def bench_compare():
+            comparator.compare_scenarios(scenarios)
+        return bench_compare
+
+    setups.append((f"compare.{scenario_count}x30", setup_compare, 3))
+
+    # Rotations: motifs × dates de début sur un an, cycles mis en cache
+    start_dates = [datetime(2026, 1, 5) + timedelta(days=i) for i in range(7 if quick else 28)]
+
+    def setup_rotations():
+        pricer = RotationPricer(calculator)
+
+        def bench_rotations():
+            pricer.compare(PATTERNS.values(), start_dates, [365], 20.0)
+        return bench_rotations
+
+    setups.append((f"rotation.{len(PATTERNS)}x{len(start_dates)}x365", setup_rotations, 3))
+
+    # Rendu texte avec ResultFormatter
+    def setup_format():
+        comparison = comparator.compare_scenarios(build_variants(20))
+
+        def bench_format():
+            ResultFormatter.format_comparison(comparison, detailed=True)
+        return bench_format
+
+    setups.append(("formatter.comparison.20x30.detailed", setup_format, 5))
+
+    # Aller-retour WSGI complet
+    def setup_wsgi():
+        from ..web.wsgi_app import WSGIApplication
+
+        app = WSGIApplication()
+        shifts = [{'date': wd.date.strftime('%Y-%m-%d'), 'type': wd.shift_type.name}
+                  for wd in build_roster(30)]
+
+        def start_response(status, headers):
+            pass
+
+        def bench_wsgi():
+            for _ in range(50):
+                environ = build_wsgi_environ('POST', '/api/calculate',
+                                             {'name': 'Bench', 'hourly_rate': 20.0,
+                                              'shifts': shifts})
+                b''.join(app(environ, start_response))
+        return bench_wsgi
+
+    setups.append(("wsgi.calculate.30.x50", setup_wsgi, 5))
+
+    return [(name, setup(), repeat) for name, setup, repeat in setups
+            if not name_filter or name_filter in name]
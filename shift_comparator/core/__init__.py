@@ -1,6 +1,24 @@
-"""Moteur de calcul"""
-from .calculator import ShiftCalculator, ScenarioResult, DayResult, HoursBreakdown
-from .comparator import ScenarioComparator, ComparisonResult
+"""
+Moteur de calcul
 
-__all__ = ['ShiftCalculator', 'ScenarioResult', 'DayResult', 'HoursBreakdown',
-           'ScenarioComparator', 'ComparisonResult']
+Les moteurs sont importés à la demande: `from shift_comparator.core import
+ShiftCalculator` ne charge pas la paie, les rotations ou la couverture.
+"""
+from .._lazy import lazy_exports
+
+# Sous-module -> attributs publics qu'il définit
+_SUBMODULES = {
+    '.assignment': ['AssignmentSolver', 'AssignmentResult', 'Replacement', 'assign_replacements'],
+    '.calculator': ['ShiftCalculator', 'ScenarioResult', 'DayResult', 'RunResult', 'HoursBreakdown'],
+    '.comparator': ['ScenarioComparator', 'ComparisonResult'],
+    '.coverage': ['CoverageTimeline', 'CoverageWindow'],
+    '.payroll': ['PayrollAggregator', 'PayrollReport'],
+    '.profile_table': ['PremiumProfileTable'],
+    '.range_index': ['RangeIndex', 'FenwickTree', 'range_totals'],
+    '.rotation': ['RotationPricer'],
+    '.rules': ['PremiumRules', 'RulesFile', 'RulesValidationError'],
+    '.singleflight': ['SingleFlight', 'SingleFlightTimeout'],
+    '.validator': ['ScheduleValidator', 'ScheduleValidationError', 'Violation'],
+}
+
+__all__, __getattr__, __dir__ = lazy_exports(__name__, globals(), _SUBMODULES)
@@ -0,0 +1,374 @@
+"""
+Affectation de shifts à pourvoir à des remplaçants volontaires.
+
+Pour chaque couple (remplaçant, shift), le coût est la rémunération que le
+calculateur donnerait au remplaçant pour ce shift à son taux horaire, heures
+supplémentaires comprises compte tenu de ses engagements existants. Un couple
+est exclu si le remplaçant n'est pas disponible ce jour-là, ou si le shift
+enfreindrait les règles de repos de son planning (ScheduleValidator.can_add).
+
+L'affectation se fait par tours. À chaque tour, chaque remplaçant occupe
+autant de colonnes de la matrice de coûts qu'il peut encore prendre de
+shifts, et la méthode hongroise (chemins augmentants les plus courts,
+O(n² m)) donne l'affectation de coût minimal. Avec l'objectif 'fairness',
+chaque colonne d'un même remplaçant coûte plus cher que la précédente
+(pénalité croissante avec sa charge): les shifts vont d'abord aux moins
+chargés, et la rémunération ne départage que les affectations de même
+équilibre.
+
+Deux shifts attribués à la même personne peuvent être compatibles un à un
+avec son planning, mais pas entre eux (repos de 11h entre deux nuits, par
+exemple): ses shifts sont acceptés dans l'ordre chronologique et un shift
+incompatible retourne au tour suivant, où son coût est recalculé sur le
+planning complété. Chaque tour attribue au moins un shift.
+"""
+from typing import Dict, Iterable, List, Optional, Sequence, Tuple
+
+from ..models import WorkDay, Scenario
+from .calculator import ShiftCalculator
+from .overtime import WeeklyOvertime, week_key
+from .validator import ScheduleValidator
+
+
+# Coût d'un couple exclu: toute affectation réalisable est préférée
+FORBIDDEN = 1e12
+
+# Pénalité par shift déjà pris, pour l'objectif 'fairness' (domine la rémunération)
+FAIRNESS_STEP = 1e6
+
+OBJECTIVES = ('cost', 'fairness')
+
+
+def solve_assignment(cost: Sequence[Sequence[float]]) -> List[int]:
+    """
+    Affectation de coût total minimal (méthode hongroise, chemins augmentants les plus courts).
+
+    Args:
+        cost: Matrice n × m des coûts, n <= m
+
+    Returns:
+        Colonne (0..m-1) affectée à chaque ligne
+
+    Raises:
+        ValueError: Si la matrice a plus de lignes que de colonnes
+    """
+    n = len(cost)
+    if not n:
+        return []
+    m = len(cost[0])
+    if n > m:
+        raise ValueError(f"Plus de lignes ({n}) que de colonnes ({m})")
+
+    inf = float('inf')
+    u = [0.0] * (n + 1)
+    v = [0.0] * (m + 1)
+    owner = [0] * (m + 1)  # Ligne (1..n) affectée à chaque colonne, 0 si libre
+    column = [0] * (n + 1)
+
+    # Départ glouton: potentiel de ligne = coût minimal, arête serrée libre
+    for row in range(1, n + 1):
+        costs = cost[row - 1]
+        u[row] = low = min(costs)
+        for j, c in enumerate(costs, start=1):
+            if c == low and not owner[j]:
+                owner[j] = row
+                column[row] = j
+                break
+
+    for row in range(1, n + 1):
+        if column[row]:
+            continue
+        minv = [inf] * (m + 1)
+        way = [0] * (m + 1)
+        free = list(range(1, m + 1))  # Colonnes pas encore atteintes
+        used = [0]
+        owner[0] = row
+        j0 = 0
+        while True:
+            i0 = owner[j0]
+            costs = cost[i0 - 1]
+            ui0 = u[i0]
+            delta = inf
+            j1 = 0
+            for j in free:
+                current = costs[j - 1] - ui0 - v[j]
+                if current < minv[j]:
+                    minv[j] = current
+                    way[j] = j0
+                if minv[j] < delta:
+                    delta = minv[j]
+                    j1 = j
+            for j in used:
+                u[owner[j]] += delta
+                v[j] -= delta
+            for j in free:
+                minv[j] -= delta
+            j0 = j1
+            free.remove(j0)
+            used.append(j0)
+            if owner[j0] == 0:
+                break
+        # Inverser le chemin augmentant
+        while j0:
+            j1 = way[j0]
+            owner[j0] = owner[j1]
+            column[owner[j0]] = j0
+            j0 = j1
+        owner[0] = 0
+
+    return [column[row] - 1 for row in range(1, n + 1)]
+
+
+class Replacement:
+    """Remplaçant volontaire"""
+
+    def __init__(self, person_id: str, hourly_rate: float, scenario: Scenario = None,
+                 available_dates: Iterable = None, max_shifts: int = None):
+        """
+        Args:
+            person_id: Identifiant de la personne
+            hourly_rate: Taux horaire de base
+            scenario: Engagements existants (planning déjà prévu)
+            available_dates: Jours où la personne est disponible (None: tous)
+            max_shifts: Shifts à pourvoir acceptés au maximum (défaut du solveur si None)
+        """
+        self.person_id = person_id
+        self.hourly_rate = hourly_rate
+        self.scenario = scenario
+        self.available = ({d.date() if hasattr(d, 'date') else d for d in available_dates}
+                          if available_dates is not None else None)
+        self.max_shifts = max_shifts
+
+    def is_available(self, day) -> bool:
+        """Indique si la personne est disponible ce jour-là"""
+        return self.available is None or day.date() in self.available
+
+    def __repr__(self):
+        return f"Replacement('{self.person_id}', {self.hourly_rate}€/h)"
+
+
+class AssignmentResult:
+    """Affectation des shifts à pourvoir"""
+
+    def __init__(self, open_shifts: List[WorkDay], people: List[Replacement],
+                 assignments: List[Tuple[int, int, float]], objective: str):
+        """
+        Args:
+            open_shifts: Shifts à pourvoir
+            people: Remplaçants
+            assignments: Tuples (indice du shift, indice du remplaçant, rémunération)
+            objective: Objectif utilisé ('cost' ou 'fairness')
+        """
+        self.open_shifts = open_shifts
+        self.people = people
+        self.assignments = sorted(assignments)
+        self.objective = objective
+        assigned = {shift for shift, _, _ in assignments}
+        self.unassigned = [i for i in range(len(open_shifts)) if i not in assigned]
+        self.total_pay = sum(pay for _, _, pay in assignments)
+
+    def loads(self) -> Dict[str, int]:
+        """Nombre de shifts attribués à chaque remplaçant"""
+        counts = {person.person_id: 0 for person in self.people}
+        for _, person, _ in self.assignments:
+            counts[self.people[person].person_id] += 1
+        return counts
+
+    def to_dict(self) -> Dict:
+        """Sérialise l'affectation (ex: pour JSON)"""
+        return {
+            'objective': self.objective,
+            'total_pay': self.total_pay,
+            'assignments': [
+                {
+                    'date': self.open_shifts[shift].date.strftime('%Y-%m-%d'),
+                    'shift_type': self.open_shifts[shift].shift_type.value,
+                    'person_id': self.people[person].person_id,
+                    'pay': pay,
+                }
+                for shift, person, pay in self.assignments
+            ],
+            'unassigned': [
+                {
+                    'date': self.open_shifts[shift].date.strftime('%Y-%m-%d'),
+                    'shift_type': self.open_shifts[shift].shift_type.value,
+                }
+                for shift in self.unassigned
+            ],
+            'loads': self.loads(),
+        }
+
+    def __repr__(self):
+        return (f"AssignmentResult({len(self.assignments)} affectés, {len(self.unassigned)} non pourvus, "
+                f"{self.total_pay:.2f}€)")
+
+
+class _Commitments:
+    """Planning d'un remplaçant en cours d'affectation (shifts existants + attribués)"""
+
+    def __init__(self, person: Replacement, validator: ScheduleValidator, calculator: ShiftCalculator):
+        self.validator = validator
+        self.calculator = calculator
+        self.work_days = list(person.scenario.work_days) if person.scenario is not None else []
+        self.index = validator.index(self.work_days)
+        self.week_hours: Dict[tuple, float] = {}
+        self.taken = 0  # Shifts à pourvoir attribués
+        for work_day in self.work_days:
+            self._count(work_day)
+
+    def _count(self, work_day: WorkDay):
+        key = week_key(work_day.date)
+        self.week_hours[key] = (self.week_hours.get(key, 0.0) +
+                                self.calculator.compute_breakdown(work_day).get_total_hours())
+
+    def add(self, work_day: WorkDay):
+        """Ajoute un shift attribué"""
+        self.work_days.append(work_day)
+        self.index = self.validator.index(self.work_days)
+        self.taken += 1
+        self._count(work_day)
+
+
+class AssignmentSolver:
+    """Attribue des shifts à pourvoir à des remplaçants"""
+
+    MAX_SHIFTS = 3  # Shifts acceptés au maximum par remplaçant (par défaut)
+
+    def __init__(self, calculator: ShiftCalculator = None, validator: ScheduleValidator = None,
+                 max_shifts: int = None):
+        """
+        Args:
+            calculator: Calculateur des rémunérations
+            validator: Règles de repos à respecter
+            max_shifts: Shifts acceptés au maximum par remplaçant (MAX_SHIFTS par défaut)
+        """
+        self.calculator = calculator or ShiftCalculator()
+        self.validator = validator or ScheduleValidator(rules=self.calculator.rules)
+        self.max_shifts = self.MAX_SHIFTS if max_shifts is None else max_shifts
+
+    def _pay(self, person: Replacement, commitments: _Commitments, work_day: WorkDay,
+             breakdown) -> Optional[float]:
+        """Rémunération marginale d'un shift pour un remplaçant (None si exclu)"""
+        if not person.is_available(work_day.date) or not self.validator.can_add(commitments.index, work_day):
+            return None
+        pay = self.calculator.price_breakdown(breakdown, person.hourly_rate)[2]
+        if self.calculator.weekly_overtime:
+            # Majoration des heures supplémentaires que ce shift ajoute à sa semaine
+            before = commitments.week_hours.get(week_key(work_day.date), 0.0)
+            pay += (WeeklyOvertime.premium(before + breakdown.get_total_hours(), person.hourly_rate)[2]
+                    - WeeklyOvertime.premium(before, person.hourly_rate)[2])
+        return pay
+
+    def pay_matrix(self, open_shifts: Sequence[WorkDay],
+                   people: Sequence[Replacement]) -> List[List[Optional[float]]]:
+        """
+        Rémunération de chaque remplaçant pour chaque shift (None si exclu).
+
+        Args:
+            open_shifts: Shifts à pourvoir
+            people: Remplaçants
+
+        Returns:
+            Matrice [shift][remplaçant]
+        """
+        breakdowns = [self.calculator.compute_breakdown(wd) for wd in open_shifts]
+        matrix = [[None] * len(people) for _ in open_shifts]
+        for p, person in enumerate(people):
+            commitments = _Commitments(person, self.validator, self.calculator)
+            for s, work_day in enumerate(open_shifts):
+                matrix[s][p] = self._pay(person, commitments, work_day, breakdowns[s])
+        return matrix
+
+    def solve(self, open_shifts: Sequence[WorkDay], people: Sequence[Replacement],
+              objective: str = 'cost') -> AssignmentResult:
+        """
+        Calcule l'affectation, tour par tour.
+
+        Args:
+            open_shifts: Shifts à pourvoir
+            people: Remplaçants volontaires
+            objective: 'cost' (rémunération totale minimale) ou 'fairness'
+                       (remplaçants les moins chargés d'abord, puis coût minimal)
+
+        Returns:
+            AssignmentResult (les shifts sans remplaçant possible sont dans unassigned)
+
+        Raises:
+            ValueError: Si l'objectif est inconnu
+        """
+        if objective not in OBJECTIVES:
+            raise ValueError(f"Objectif inconnu: {objective} (possibles: {', '.join(OBJECTIVES)})")
+        open_shifts = list(open_shifts)
+        people = list(people)
+        breakdowns = [self.calculator.compute_breakdown(wd) for wd in open_shifts]
+        commitments = [_Commitments(person, self.validator, self.calculator) for person in people]
+        capacity = [self.max_shifts if person.max_shifts is None else person.max_shifts for person in people]
+        pay = self.pay_matrix(open_shifts, people)
+
+        assignments = []
+        remaining = list(range(len(open_shifts)))
+        while remaining:
+            # Shifts encore réalisables, et remplaçants qui peuvent en prendre un
+            rows = [s for s in remaining
+                    if any(pay[s][p] is not None and commitments[p].taken < capacity[p]
+                           for p in range(len(people)))]
+            if not rows:
+                break
+
+            # Colonnes: une par (remplaçant, k-ième shift du tour), au plus autant que de shifts possibles
+            columns = []
+            for p, person_commitments in enumerate(commitments):
+                feasible = sum(1 for s in rows if pay[s][p] is not None)
+                load = len(person_commitments.work_days)
+                for k in range(min(capacity[p] - person_commitments.taken, feasible)):
+                    columns.append((p, FAIRNESS_STEP * (load + k) if objective == 'fairness' else 0.0))
+            padding = [FORBIDDEN] * max(len(rows) - len(columns), 0)  # Colonnes « non pourvu »
+            matrix = [[FORBIDDEN if pay[s][p] is None else pay[s][p] + penalty for p, penalty in columns] +
+                      padding for s in rows]
+
+            by_person: Dict[int, List[int]] = {}
+            for s, c in zip(rows, solve_assignment(matrix)):
+                if c < len(columns) and pay[s][columns[c][0]] is not None:
+                    by_person.setdefault(columns[c][0], []).append(s)
+            if not by_person:
+                break
+
+            # Shifts d'une même personne acceptés dans l'ordre chronologique; un shift
+            # incompatible avec les précédents retourne au tour suivant
+            assigned = set()
+            for p, shifts in by_person.items():
+                shifts.sort(key=lambda s: self.validator.span(open_shifts[s]))
+                for s in shifts:
+                    # Rémunération recalculée: les shifts déjà acceptés comptent dans sa semaine
+                    pay[s][p] = self._pay(people[p], commitments[p], open_shifts[s], breakdowns[s])
+                    if pay[s][p] is None:
+                        continue
+                    assignments.append((s, p, pay[s][p]))
+                    commitments[p].add(open_shifts[s])
+                    assigned.add(s)
+            remaining = [s for s in rows if s not in assigned]
+
+            # Le planning des gagnants a changé: repos et heures supplémentaires à recalculer
+            for p in by_person:
+                for s in remaining:
+                    if pay[s][p] is not None:
+                        pay[s][p] = self._pay(people[p], commitments[p], open_shifts[s], breakdowns[s])
+
+        return AssignmentResult(open_shifts, people, assignments, objective)
+
+
+def assign_replacements(open_shifts: Sequence[WorkDay], people: Sequence[Replacement],
+                        objective: str = 'cost', calculator: ShiftCalculator = None) -> AssignmentResult:
+    """
+    Raccourci: affecte des shifts à pourvoir avec les règles de repos par défaut.
+
+    Args:
+        open_shifts: Shifts à pourvoir
+        people: Remplaçants volontaires
+        objective: 'cost' ou 'fairness'
+        calculator: Calculateur des rémunérations
+
+    Returns:
+        AssignmentResult
+    """
+    return AssignmentSolver(calculator).solve(open_shifts, people, objective)
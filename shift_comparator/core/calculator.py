@@ -2,8 +2,18 @@
 Moteur de calcul des heures et majorations.
 """
 from datetime import datetime, time, timedelta
-from typing import Dict, Tuple
-from ..models import WorkDay
+from typing import Dict, List, Tuple
+from ..models import WorkDay, ShiftRun, RunScenario, intern_work_day
+from ..models.dst import transitions_between
+from .overtime import WeeklyOvertime
+from .rules import PremiumRules
+
+
+# Lundi de référence sans changement d'heure, pour les profils par jour de la semaine
+REFERENCE_MONDAY = datetime(2001, 1, 1)
+
+# Attributs de HoursBreakdown par catégorie (voir PremiumRules.category)
+_CATEGORY_ATTRIBUTES = ('normal_hours', 'night_hours', 'sunday_hours', 'night_sunday_hours')
 
 
 class HoursBreakdown:
@@ -14,6 +24,9 @@ class HoursBreakdown:
         self.night_hours = 0.0  # Heures de nuit (21h-6h)
         self.sunday_hours = 0.0  # Heures du dimanche
         self.night_sunday_hours = 0.0  # Heures de nuit ET dimanche
+        # Heures supplémentaires hebdomadaires (déjà comptées ci-dessus)
+        self.overtime_25_hours = 0.0
+        self.overtime_50_hours = 0.0
 
     def get_total_hours(self) -> float:
         """Retourne le total d'heures travaillées"""
@@ -23,31 +36,82 @@ class HoursBreakdown:
         return (f"HoursBreakdown(normal={self.normal_hours:.2f}h, "
                 f"night={self.night_hours:.2f}h, "
                 f"sunday={self.sunday_hours:.2f}h, "
-                f"night+sunday={self.night_sunday_hours:.2f}h)")
+                f"night+sunday={self.night_sunday_hours:.2f}h" +
+                (f", overtime={self.overtime_25_hours:.2f}h+{self.overtime_50_hours:.2f}h)"
+                 if self.overtime_25_hours or self.overtime_50_hours else ")"))
 
 
 class ScenarioResult:
     """Résultat du calcul pour un scénario"""
 
-    def __init__(self, scenario_name: str, hourly_rate: float):
+    def __init__(self, scenario_name: str, hourly_rate: float,
+                 overtime: WeeklyOvertime = None):
+        """
+        Args:
+            scenario_name: Nom du scénario
+            hourly_rate: Taux horaire de base
+            overtime: Cumuls hebdomadaires pour les heures supplémentaires
+                      (None pour ne pas les calculer)
+        """
         self.scenario_name = scenario_name
         self.hourly_rate = hourly_rate
         self.day_results = []  # Liste de DayResult
+        self.run_results = []  # Liste de RunResult (scénarios en séquences)
         self.total_breakdown = HoursBreakdown()
         self.total_pay = 0.0
         self.total_bonus = 0.0
+        self.overtime = overtime
+        self.total_overtime_pay = 0.0
 
     def add_day_result(self, day_result: 'DayResult'):
         """Ajoute le résultat d'un jour et met à jour les totaux"""
         self.day_results.append(day_result)
+        self._update_totals(day_result, 1)
+
+    def remove_day_result(self, day_result: 'DayResult'):
+        """Retire le résultat d'un jour et met à jour les totaux"""
+        self.day_results.remove(day_result)
+        self._update_totals(day_result, -1)
+
+    def add_run_result(self, run_result: 'RunResult'):
+        """Ajoute le résultat d'une séquence et met à jour les totaux"""
+        self.run_results.append(run_result)
+        self._add_totals(run_result, run_result.week_hours, 1)
+
+    def _update_totals(self, day_result: 'DayResult', sign: int):
+        """Ajoute (sign=1) ou retire (sign=-1) un jour des totaux"""
+        week_hours = ((day_result.work_day.date, day_result.breakdown.get_total_hours()),)
+        self._add_totals(day_result, week_hours, sign)
+
+    def _add_totals(self, item, week_hours, sign: int):
+        """
+        Ajoute (sign=1) ou retire (sign=-1) un jour ou une séquence des totaux.
+
+        Args:
+            item: DayResult ou RunResult
+            week_hours: Tuples (jour, heures) à cumuler par semaine
+            sign: 1 ou -1
+        """
+        bd = item.breakdown
 
         # Mise à jour des totaux
-        self.total_breakdown.normal_hours += day_result.breakdown.normal_hours
-        self.total_breakdown.night_hours += day_result.breakdown.night_hours
-        self.total_breakdown.sunday_hours += day_result.breakdown.sunday_hours
-        self.total_breakdown.night_sunday_hours += day_result.breakdown.night_sunday_hours
-        self.total_pay += day_result.total_pay
-        self.total_bonus += day_result.bonus_pay
+        self.total_breakdown.normal_hours += sign * bd.normal_hours
+        self.total_breakdown.night_hours += sign * bd.night_hours
+        self.total_breakdown.sunday_hours += sign * bd.sunday_hours
+        self.total_breakdown.night_sunday_hours += sign * bd.night_sunday_hours
+        self.total_pay += sign * item.total_pay
+        self.total_bonus += sign * item.bonus_pay
+
+        # Heures supplémentaires: seules les semaines touchées sont recalculées
+        if self.overtime is not None:
+            update = self.overtime.add if sign > 0 else self.overtime.remove
+            for day, hours in week_hours:
+                delta = update(day, hours, item.hourly_rate or self.hourly_rate)
+                self.total_pay += delta
+                self.total_bonus += delta
+            self.total_overtime_pay = self.overtime.overtime_pay
+            self.total_breakdown.overtime_25_hours = self.overtime.overtime_25_hours
+            self.total_breakdown.overtime_50_hours = self.overtime.overtime_50_hours
 
     def get_total_hours(self) -> float:
         """Retourne le total d'heures travaillées"""
@@ -58,17 +122,33 @@ class DayResult:
     """Résultat du calcul pour un jour de travail"""
 
     def __init__(self, work_day: WorkDay, breakdown: HoursBreakdown,
-                 base_pay: float, bonus_pay: float, total_pay: float):
+                 base_pay: float, bonus_pay: float, total_pay: float, hourly_rate: float = None):
         self.work_day = work_day
         self.breakdown = breakdown
         self.base_pay = base_pay
         self.bonus_pay = bonus_pay
         self.total_pay = total_pay
+        self.hourly_rate = hourly_rate  # Taux appliqué (heures supplémentaires de la semaine)
+
+
+class RunResult:
+    """Résultat du calcul pour une séquence de jours de même shift"""
+
+    def __init__(self, run: ShiftRun, breakdown: HoursBreakdown, week_hours: List[Tuple[datetime, float]],
+                 base_pay: float, bonus_pay: float, total_pay: float, hourly_rate: float = None):
+        self.run = run
+        self.breakdown = breakdown
+        self.week_hours = week_hours  # (premier jour, heures) par semaine ISO touchée
+        self.base_pay = base_pay
+        self.bonus_pay = bonus_pay
+        self.total_pay = total_pay
+        self.hourly_rate = hourly_rate  # Taux appliqué (heures supplémentaires de la semaine)
 
 
 class ShiftCalculator:
     """Calcule les heures et rémunérations pour les shifts"""
 
+    # Règles intégrées, utilisées sans fichier de règles (voir PremiumRules)
     # Plages horaires pour les majorations
     NIGHT_START = time(21, 0)  # 21:00
     NIGHT_END = time(6, 0)  # 06:00
@@ -77,52 +157,157 @@ class ShiftCalculator:
     NIGHT_BONUS = 0.15  # +15%
     SUNDAY_BONUS = 0.25  # +25%
 
-    def calculate_work_day(self, work_day: WorkDay, hourly_rate: float) -> DayResult:
+    # Heures supplémentaires hebdomadaires (+25% au-delà de 35h, +50% au-delà de 43h).
+    # Activées par défaut: total_pay les inclut. ShiftCalculator(weekly_overtime=False),
+    # calculate_scenario(..., weekly_overtime=False) ou SHIFT_WEEKLY_OVERTIME=0 (web)
+    # redonnent les totaux sans heures supplémentaires.
+    WEEKLY_OVERTIME = True
+
+    # Décompositions mémorisées par identité de WorkDay (instances partagées, voir WorkDayPool)
+    DAY_MEMO_SIZE = 4096
+
+    def __init__(self, weekly_overtime: bool = None, profile_table=None, rules: PremiumRules = None):
+        """
+        Args:
+            weekly_overtime: Calculer les heures supplémentaires hebdomadaires
+                             (WEEKLY_OVERTIME par défaut)
+            profile_table: PremiumProfileTable précalculée (None pour toujours calculer)
+            rules: Règles de majoration (par défaut celles des constantes de la classe);
+                   fixes pour la vie du calculateur: changer de règles, c'est créer un
+                   nouveau calculateur. Leurs horaires des shifts font foi, même si
+                   ceux des WorkDay diffèrent
+        """
+        self.weekly_overtime = self.WEEKLY_OVERTIME if weekly_overtime is None else weekly_overtime
+        self.profile_table = profile_table
+        self.rules = rules if rules is not None else PremiumRules.from_calculator(type(self))
+        # Type de shift -> heures par jour de la semaine (lundi..dimanche) hors changement d'heure
+        self._weekday_profiles: Dict[object, Tuple[HoursBreakdown, ...]] = {}
+        # id(WorkDay) -> (WorkDay, décomposition); garder l'instance empêche la réutilisation de l'id
+        self._day_memo: Dict[int, Tuple[WorkDay, HoursBreakdown]] = {}
+
+    def calculate_work_day(self, work_day: WorkDay, hourly_rate: float,
+                           night_bonus: float = None, sunday_bonus: float = None) -> DayResult:
         """
         Calcule la décomposition des heures et la rémunération pour un jour de travail.
 
         Args:
             work_day: Le jour de travail à calculer
             hourly_rate: Taux horaire de base
+            night_bonus: Majoration de nuit (celle des règles si None)
+            sunday_bonus: Majoration du dimanche (celle des règles si None)
 
         Returns:
             DayResult avec tous les détails du calcul
         """
-        breakdown = HoursBreakdown()
+        breakdown = self.compute_breakdown(work_day)
+        base_pay, bonus_pay, total_pay = self.price_breakdown(breakdown, hourly_rate, night_bonus, sunday_bonus)
 
-        # Parcourir chaque heure du shift
-        current_dt = work_day.start_datetime
-        end_dt = work_day.end_datetime
+        return DayResult(work_day, breakdown, base_pay, bonus_pay, total_pay, hourly_rate)
 
-        while current_dt < end_dt:
-            next_dt = min(current_dt + timedelta(hours=1), end_dt)
-            hour_fraction = (next_dt - current_dt).total_seconds() / 3600
+    def compute_breakdown(self, work_day: WorkDay) -> HoursBreakdown:
+        """
+        Décompose les heures d'un jour de travail par catégorie de majoration.
 
-            is_night = self._is_night_hour(current_dt.time())
-            is_sunday = current_dt.weekday() == 6  # Dimanche = 6
+        Un WorkDay déjà décomposé (même instance) est retrouvé par identité;
+        sinon, utilise la table précalculée si la date est couverte, et enfin
+        le calcul complet. Le résultat est partagé: ne pas le modifier.
 
-            # Catégoriser l'heure
-            if is_night and is_sunday:
-                breakdown.night_sunday_hours += hour_fraction
-            elif is_night:
-                breakdown.night_hours += hour_fraction
-            elif is_sunday:
-                breakdown.sunday_hours += hour_fraction
-            else:
-                breakdown.normal_hours += hour_fraction
+        Args:
+            work_day: Le jour de travail à décomposer
 
-            current_dt = next_dt
+        Returns:
+            HoursBreakdown du shift (indépendant du taux horaire)
+        """
+        memo = self._day_memo
+        entry = memo.get(id(work_day))
+        if entry is not None and entry[0] is work_day:
+            return entry[1]
+
+        breakdown = None
+        if self.profile_table is not None:
+            breakdown = self.profile_table.lookup(work_day.date, work_day.shift_type)
+        if breakdown is None:
+            breakdown = self.decompose(work_day)
+
+        if len(memo) >= self.DAY_MEMO_SIZE:
+            # Éviction de la plus ancienne entrée (ordre d'insertion)
+            memo.pop(next(iter(memo), None), None)
+        memo[id(work_day)] = (work_day, breakdown)
+        return breakdown
+
+    def decompose(self, work_day: WorkDay) -> HoursBreakdown:
+        """
+        Calcul complet: heures lues dans les tables compilées des règles.
+
+        Les bornes du shift sont celles des horaires des règles (work_day_span),
+        pas celles du WorkDay: un changement d'heure est repéré sur ces bornes.
+
+        Args:
+            work_day: Le jour de travail à décomposer
+
+        Returns:
+            HoursBreakdown du shift (indépendant du taux horaire)
+        """
+        breakdown = HoursBreakdown()
+        (breakdown.normal_hours, breakdown.night_hours,
+         breakdown.sunday_hours, breakdown.night_sunday_hours) = self.rules.shift_hours_by_category(
+            work_day.shift_type, work_day.date)
+        start_dt, end_dt = self.rules.work_day_span(work_day)
+        transitions = work_day.dst_transitions
+        if start_dt != work_day.start_datetime or end_dt != work_day.end_datetime:
+            transitions = transitions_between(start_dt, end_dt)
+
+        # Shift qui croise un changement d'heure: corriger l'heure sautée ou doublée
+        for transition in transitions:
+            overlap_start = max(transition.start, start_dt)
+            overlap_end = min(transition.end, end_dt)
+            if overlap_end > overlap_start:
+                self._add_span(breakdown, overlap_start, overlap_end, -1 if transition.delta_hours > 0 else 1)
+
+        return breakdown
+
+    def _add_span(self, breakdown: HoursBreakdown, start: datetime, end: datetime, sign: int):
+        """
+        Ajoute (ou retire) les heures d'une tranche locale, chacune dans sa catégorie.
+
+        Args:
+            breakdown: Décomposition à compléter
+            start: Heure locale de début de la tranche
+            end: Heure locale de fin (même jour)
+            sign: 1 pour une heure doublée, -1 pour retirer une heure sautée
+        """
+        for attribute, hours in zip(_CATEGORY_ATTRIBUTES, self.rules.span_hours(start, end)):
+            if hours:
+                setattr(breakdown, attribute, getattr(breakdown, attribute) + sign * hours)
+
+    def price_breakdown(self, breakdown: HoursBreakdown, hourly_rate: float,
+                        night_bonus: float = None, sunday_bonus: float = None) -> Tuple[float, float, float]:
+        """
+        Calcule la rémunération correspondant à une décomposition d'heures.
+
+        Args:
+            breakdown: Heures par catégorie
+            hourly_rate: Taux horaire de base
+            night_bonus: Majoration de nuit (celle des règles si None)
+            sunday_bonus: Majoration du dimanche (celle des règles si None)
+
+        Returns:
+            Tuple (rémunération de base, majorations, total)
+        """
+        rules = self.rules
+        if night_bonus is None:
+            night_bonus = rules.night_bonus
+        if sunday_bonus is None:
+            sunday_bonus = rules.sunday_bonus
 
-        # Calcul de la rémunération
         base_pay = breakdown.normal_hours * hourly_rate
 
-        night_bonus = breakdown.night_hours * hourly_rate * self.NIGHT_BONUS
-        sunday_bonus = breakdown.sunday_hours * hourly_rate * self.SUNDAY_BONUS
-        night_sunday_bonus = breakdown.night_sunday_hours * hourly_rate * (
-            self.NIGHT_BONUS + self.SUNDAY_BONUS
-        )
+        night_pay = breakdown.night_hours * hourly_rate * night_bonus
+        sunday_pay = breakdown.sunday_hours * hourly_rate * sunday_bonus
+        night_sunday_pay = breakdown.night_sunday_hours * hourly_rate * sum(
+            rules.stacked_bonus(night_bonus, sunday_bonus))
 
-        bonus_pay = night_bonus + sunday_bonus + night_sunday_bonus
+        bonus_pay = night_pay + sunday_pay + night_sunday_pay
 
         # Paiement pour les heures normalement majorées (au taux de base)
         base_pay += (breakdown.night_hours + breakdown.sunday_hours +
@@ -130,35 +315,145 @@ class ShiftCalculator:
 
         total_pay = base_pay + bonus_pay
 
-        return DayResult(work_day, breakdown, base_pay, bonus_pay, total_pay)
+        return base_pay, bonus_pay, total_pay
 
-    def calculate_scenario(self, scenario) -> ScenarioResult:
+    def calculate_scenario(self, scenario, rates=None, weekly_overtime: bool = None) -> ScenarioResult:
         """
         Calcule le résultat complet pour un scénario.
 
+        Avec un historique de taux (RateSchedule), chaque jour est tarifé avec la
+        période en vigueur à sa date; une séquence est découpée aux dates de changement.
+
         Args:
             scenario: Le scénario à calculer
+            rates: RateSchedule à appliquer (par défaut celui du scénario, s'il en a un)
+            weekly_overtime: Calculer les heures supplémentaires (réglage du calculateur si None)
 
         Returns:
             ScenarioResult avec tous les détails
         """
-        result = ScenarioResult(scenario.name, scenario.hourly_rate)
-
+        if rates is None:
+            rates = getattr(scenario, 'rates', None)
+        if weekly_overtime is None:
+            weekly_overtime = self.weekly_overtime
+        overtime = WeeklyOvertime() if weekly_overtime else None
+        result = ScenarioResult(scenario.name, scenario.hourly_rate, overtime)
+
+        # Scénario en séquences: chaque séquence est tarifée sans développer ses jours
+        if isinstance(scenario, RunScenario):
+            for run in scenario.runs:
+                if rates is None:
+                    result.add_run_result(self.calculate_run(run, scenario.hourly_rate))
+                    continue
+                for piece, period in rates.split_run(run):
+                    result.add_run_result(self.calculate_run(piece, period.hourly_rate,
+                                                             period.night_bonus, period.sunday_bonus))
+            return result
+
+        if rates is None:
+            for work_day in scenario.work_days:
+                day_result = self.calculate_work_day(work_day, scenario.hourly_rate)
+                result.add_day_result(day_result)
+            return result
+
+        # Période courante gardée tant que les jours restent dans ses bornes
+        start = end = 0
         for work_day in scenario.work_days:
-            day_result = self.calculate_work_day(work_day, scenario.hourly_rate)
-            result.add_day_result(day_result)
-
+            ordinal = work_day.date.toordinal()
+            if not start <= ordinal < end:
+                period, start, end = rates.span(work_day.date)
+            result.add_day_result(self.calculate_work_day(work_day, period.hourly_rate,
+                                                          period.night_bonus, period.sunday_bonus))
         return result
 
-    def _is_night_hour(self, t: time) -> bool:
+    def weekday_profiles(self, shift_type) -> Tuple[HoursBreakdown, ...]:
+        """
+        Heures d'un type de shift selon le jour de la semaine, hors changement d'heure
+        et hors jours fériés.
+
+        Args:
+            shift_type: Type de shift
+
+        Returns:
+            Tuple de 7 HoursBreakdown (lundi à dimanche)
+        """
+        profiles = self._weekday_profiles.get(shift_type)
+        if profiles is None:
+            profiles = []
+            for weekday in range(7):
+                profile = HoursBreakdown()
+                (profile.normal_hours, profile.night_hours, profile.sunday_hours,
+                 profile.night_sunday_hours) = self.rules.weekday_hours(shift_type, weekday)
+                profiles.append(profile)
+            profiles = self._weekday_profiles[shift_type] = tuple(profiles)
+        return profiles
+
+    def calculate_run(self, run: ShiftRun, hourly_rate: float,
+                      night_bonus: float = None, sunday_bonus: float = None) -> RunResult:
         """
-        Détermine si une heure est dans la plage de nuit (21:00-06:00).
+        Calcule une séquence de jours de même shift sans la développer.
+
+        Les heures d'un shift ne dépendent que du jour de la semaine: la séquence
+        est comptée par jour de la semaine (combien de dimanches, de samedis...),
+        puis les rares jours qui croisent un changement d'heure ou touchent un jour
+        férié sont corrigés.
 
         Args:
-            t: Heure à vérifier
+            run: Séquence à calculer
+            hourly_rate: Taux horaire de base
+            night_bonus: Majoration de nuit (celle des règles si None)
+            sunday_bonus: Majoration du dimanche (celle des règles si None)
 
         Returns:
-            True si c'est une heure de nuit
+            RunResult avec les heures par catégorie et par semaine ISO
         """
-        # La nuit va de 21:00 à 06:00, donc elle traverse minuit
-        return t >= self.NIGHT_START or t < self.NIGHT_END
+        profiles = self.weekday_profiles(run.shift_type)
+        first_weekday = run.start.weekday()
+        full_weeks, remainder = divmod(run.length, 7)
+
+        breakdown = HoursBreakdown()
+        for weekday, profile in enumerate(profiles):
+            count = full_weeks + (1 if (weekday - first_weekday) % 7 < remainder else 0)
+            breakdown.normal_hours += count * profile.normal_hours
+            breakdown.night_hours += count * profile.night_hours
+            breakdown.sunday_hours += count * profile.sunday_hours
+            breakdown.night_sunday_hours += count * profile.night_sunday_hours
+
+        # Heures par semaine ISO: sommes cumulées des jours lundi..dimanche
+        cumulated = [0.0]
+        for profile in profiles:
+            cumulated.append(cumulated[-1] + profile.get_total_hours())
+        week_hours = []
+        day, remaining = run.start, run.length
+        while remaining:
+            weekday = day.weekday()
+            n_days = min(7 - weekday, remaining)
+            week_hours.append((day, cumulated[weekday + n_days] - cumulated[weekday]))
+            day += timedelta(days=n_days)
+            remaining -= n_days
+
+        # Jours qui croisent un changement d'heure (un shift de nuit peut commencer la veille)
+        days = set()
+        for transition in transitions_between(run.start, run.end + timedelta(days=2)):
+            for day in (transition.start - timedelta(days=1), transition.start):
+                offset = (day.date() - run.start.date()).days
+                if 0 <= offset < run.length:
+                    days.add(offset)
+        # Jours fériés: le shift du jour et celui de la veille (qui peut finir le lendemain)
+        first = run.start.toordinal()
+        for holiday in self.rules.holidays_between(first, first + run.length):
+            days.update(offset for offset in (holiday - first - 1, holiday - first) if 0 <= offset < run.length)
+        for offset in sorted(days):
+            work_day = intern_work_day(run.start + timedelta(days=offset), run.shift_type)
+            actual = self.compute_breakdown(work_day)
+            reference = profiles[work_day.date.weekday()]
+            breakdown.normal_hours += actual.normal_hours - reference.normal_hours
+            breakdown.night_hours += actual.night_hours - reference.night_hours
+            breakdown.sunday_hours += actual.sunday_hours - reference.sunday_hours
+            breakdown.night_sunday_hours += actual.night_sunday_hours - reference.night_sunday_hours
+            delta = actual.get_total_hours() - reference.get_total_hours()
+            if delta:  # Changement d'heure: la durée du shift change
+                week_hours.append((work_day.date, delta))
+
+        base_pay, bonus_pay, total_pay = self.price_breakdown(breakdown, hourly_rate, night_bonus, sunday_bonus)
+        return RunResult(run, breakdown, week_hours, base_pay, bonus_pay, total_pay, hourly_rate)
@@ -0,0 +1,302 @@
+"""
+Effectifs présents heure par heure (ou à la minute) sur une équipe entière.
+
+Chaque shift ajoute +1 au créneau de son début et -1 au créneau qui suit sa
+fin dans un tableau de différences; une somme cumulée donne ensuite
+l'effectif de chaque créneau. Le coût est d'une opération par shift plus
+une par créneau, quel que soit le nombre de salariés présents en même temps.
+
+Les effectifs sont ensuite comparés à un effectif cible (minimum et, si
+besoin, maximum) pour signaler les périodes de sous-effectif et de
+sureffectif.
+
+Les créneaux sont en heure locale (heure "murale"): la nuit d'un changement
+d'heure, l'heure sautée ou doublée compte comme un créneau ordinaire.
+"""
+from array import array
+from datetime import datetime, time, timedelta
+from itertools import accumulate
+from typing import Dict, Iterable, List, Optional, Sequence, Union
+
+from ..models import ShiftType, ShiftDefinition, RunScenario
+
+
+def _shift_minutes(shift_hours: Dict[ShiftType, tuple]) -> Dict[ShiftType, tuple]:
+    """Début et fin de chaque shift, en minutes depuis minuit du jour du shift"""
+    return {
+        shift_type: (start.hour * 60 + start.minute,
+                     end.hour * 60 + end.minute + (1440 if end <= start else 0))
+        for shift_type, (start, end) in shift_hours.items()
+    }
+
+
+# Effectif cible: constant, par heure du jour (24 valeurs) ou par heure de la semaine
+# (168 valeurs, du lundi 0h au dimanche 23h)
+Target = Union[int, Sequence[int]]
+
+
+class CoverageWindow:
+    """Période continue de sous-effectif ou de sureffectif"""
+
+    __slots__ = ('kind', 'start', 'end', 'headcount', 'target')
+
+    def __init__(self, kind: str, start: datetime, end: datetime, headcount: int, target: int):
+        """
+        Args:
+            kind: 'under' (sous l'effectif minimum) ou 'over' (au-dessus du maximum)
+            start: Début de la période
+            end: Fin de la période (exclue)
+            headcount: Effectif le plus éloigné de la cible sur la période
+            target: Cible du créneau correspondant
+        """
+        self.kind = kind
+        self.start = start
+        self.end = end
+        self.headcount = headcount
+        self.target = target
+
+    @property
+    def gap(self) -> int:
+        """Écart maximal à la cible (personnes manquantes ou en trop)"""
+        return abs(self.target - self.headcount)
+
+    def to_dict(self) -> Dict:
+        """Sérialise la période (ex: pour JSON)"""
+        return {
+            'kind': self.kind,
+            'start': self.start.strftime('%Y-%m-%d %H:%M'),
+            'end': self.end.strftime('%Y-%m-%d %H:%M'),
+            'headcount': self.headcount,
+            'target': self.target,
+            'gap': self.gap,
+        }
+
+    def __repr__(self):
+        return (f"CoverageWindow({self.kind}, {self.start:%d/%m %H:%M} → {self.end:%d/%m %H:%M}, "
+                f"{self.headcount}/{self.target})")
+
+
+class CoverageTimeline:
+    """Effectif présent par créneau sur une plage de dates"""
+
+    def __init__(self, first_day: datetime, last_day: datetime, step_minutes: int = 60, rules=None):
+        """
+        Args:
+            first_day: Premier jour couvert
+            last_day: Dernier jour couvert (inclus)
+            step_minutes: Durée d'un créneau, diviseur de 1440 (60: horaire, 1: à la minute)
+            rules: PremiumRules dont les horaires des shifts font foi (horaires des WorkDay si None)
+
+        Raises:
+            ValueError: Si la plage est vide ou si le pas ne divise pas la journée
+        """
+        if step_minutes < 1 or 1440 % step_minutes:
+            raise ValueError(f"Pas invalide: {step_minutes} minutes (doit diviser 1440)")
+        days = (last_day.date() - first_day.date()).days + 1
+        if days < 1:
+            raise ValueError("Plage de dates vide")
+
+        self.start = datetime.combine(first_day.date(), time())
+        self.days = days
+        self.step_minutes = step_minutes
+        self.slots_per_day = 1440 // step_minutes
+        self.size = days * self.slots_per_day
+        self.shifts = 0  # Shifts ajoutés (même partiellement hors de la plage)
+        self._shift_minutes = _shift_minutes(rules.shift_hours if rules is not None
+                                             else ShiftDefinition.SHIFT_HOURS)
+        self._diff = array('i', [0]) * (self.size + 1)
+        self._headcount: Optional[array] = None
+
+    @classmethod
+    def from_scenarios(cls, scenarios: Iterable, first_day: datetime = None, last_day: datetime = None,
+                       step_minutes: int = 60, rules=None) -> 'CoverageTimeline':
+        """
+        Construit la chronologie de plusieurs plannings.
+
+        Args:
+            scenarios: Scenario ou EmployeeRoster (un par salarié)
+            first_day: Premier jour couvert (par défaut: premier jour travaillé)
+            last_day: Dernier jour couvert (par défaut: dernier jour travaillé)
+            step_minutes: Durée d'un créneau en minutes
+            rules: PremiumRules dont les horaires des shifts font foi (horaires des WorkDay si None)
+
+        Returns:
+            CoverageTimeline remplie
+        """
+        scenarios = [getattr(s, 'scenario', s) for s in scenarios]
+        if first_day is None or last_day is None:
+            days = [day for scenario in scenarios for day in _bounds(scenario)]
+            if not days:
+                raise ValueError("Aucun jour travaillé")
+            first_day = first_day or min(days)
+            last_day = last_day or max(days)
+
+        timeline = cls(first_day, last_day, step_minutes, rules)
+        for scenario in scenarios:
+            timeline.add_scenario(scenario)
+        return timeline
+
+    def add_interval(self, start_minute: int, end_minute: int, count: int = 1):
+        """
+        Ajoute une présence, en minutes depuis le début de la plage.
+
+        Un créneau partiellement couvert compte comme couvert; la partie hors
+        de la plage est ignorée.
+
+        Args:
+            start_minute: Début de la présence
+            end_minute: Fin de la présence (exclue)
+            count: Nombre de personnes
+        """
+        step = self.step_minutes
+        lo = max(start_minute // step, 0)
+        hi = min(-(-end_minute // step), self.size)
+        if lo < hi:
+            self._diff[lo] += count
+            self._diff[hi] -= count
+            self._headcount = None
+
+    def add_shift(self, day: datetime, shift_type: ShiftType, count: int = 1):
+        """
+        Ajoute un shift.
+
+        Args:
+            day: Jour du shift
+            shift_type: Type de shift
+            count: Nombre de personnes
+        """
+        start, end = self._shift_minutes[shift_type]
+        origin = (day.date() - self.start.date()).days * 1440
+        self.add_interval(origin + start, origin + end, count)
+        self.shifts += 1
+
+    def add_scenario(self, scenario, count: int = 1):
+        """
+        Ajoute tous les shifts d'un planning (les séquences ne sont pas développées en WorkDay).
+
+        Args:
+            scenario: Scenario ou RunScenario
+            count: Nombre de personnes ayant ce planning
+        """
+        if isinstance(scenario, RunScenario):
+            for run in scenario.runs:
+                start, end = self._shift_minutes[run.shift_type]
+                origin = (run.start.date() - self.start.date()).days * 1440
+                for offset in range(0, run.length * 1440, 1440):
+                    self.add_interval(origin + offset + start, origin + offset + end, count)
+                self.shifts += run.length
+        else:
+            for work_day in scenario.work_days:
+                self.add_shift(work_day.date, work_day.shift_type, count)
+
+    def headcount(self) -> array:
+        """
+        Effectif de chaque créneau (somme cumulée du tableau de différences).
+
+        Returns:
+            array('i') de self.size valeurs
+        """
+        if self._headcount is None:
+            self._headcount = array('i', accumulate(self._diff[:self.size]))
+        return self._headcount
+
+    def slot_start(self, slot: int) -> datetime:
+        """Début d'un créneau"""
+        return self.start + timedelta(minutes=slot * self.step_minutes)
+
+    def at(self, moment: datetime) -> int:
+        """
+        Effectif présent à un instant.
+
+        Args:
+            moment: Instant dans la plage
+
+        Returns:
+            Nombre de personnes présentes
+        """
+        slot = int((moment - self.start).total_seconds() // 60) // self.step_minutes
+        if not 0 <= slot < self.size:
+            raise ValueError(f"Instant hors de la plage: {moment}")
+        return self.headcount()[slot]
+
+    def expand_target(self, target: Target) -> Sequence[int]:
+        """
+        Développe un effectif cible en une valeur par créneau.
+
+        Args:
+            target: Entier, 24 valeurs (par heure du jour) ou 168 (par heure de la semaine)
+
+        Returns:
+            Séquence de self.size valeurs
+        """
+        if isinstance(target, int):
+            return [target] * self.size
+
+        slot_hours = [slot * self.step_minutes // 60 for slot in range(self.slots_per_day)]
+        if len(target) == 24:
+            return [target[hour] for hour in slot_hours] * self.days
+        if len(target) == 168:
+            weekday = self.start.weekday()
+            values = []
+            for day in range(self.days):
+                base = (weekday + day) % 7 * 24
+                values.extend(target[base + hour] for hour in slot_hours)
+            return values
+        raise ValueError(f"Effectif cible invalide: {len(target)} valeurs (1, 24 ou 168 attendues)")
+
+    def windows(self, minimum: Target = 0, maximum: Target = None) -> List[CoverageWindow]:
+        """
+        Périodes où l'effectif sort de la cible.
+
+        Args:
+            minimum: Effectif minimum (voir expand_target)
+            maximum: Effectif maximum (None: pas de limite)
+
+        Returns:
+            CoverageWindow dans l'ordre chronologique (sous-effectif et sureffectif mêlés)
+        """
+        found = self._scan('under', self.expand_target(minimum), 1)
+        if maximum is not None:
+            found += self._scan('over', self.expand_target(maximum), -1)
+        found.sort(key=lambda window: window.start)
+        return found
+
+    def _scan(self, kind: str, targets: Sequence[int], sign: int) -> List[CoverageWindow]:
+        """
+        Regroupe les créneaux consécutifs hors cible en périodes.
+
+        Args:
+            kind: Type de période ('under' ou 'over')
+            targets: Cible de chaque créneau
+            sign: 1 pour un manque (cible - effectif > 0), -1 pour un excès
+        """
+        found = []
+        first = None
+        worst_gap = worst = None
+        for slot, (h, t) in enumerate(zip(self.headcount(), targets)):
+            gap = sign * (t - h)
+            if gap > 0:
+                if first is None:
+                    first, worst_gap, worst = slot, gap, (h, t)
+                elif gap > worst_gap:
+                    worst_gap, worst = gap, (h, t)
+            elif first is not None:
+                found.append(CoverageWindow(kind, self.slot_start(first), self.slot_start(slot), *worst))
+                first = None
+        if first is not None:
+            found.append(CoverageWindow(kind, self.slot_start(first), self.slot_start(self.size), *worst))
+        return found
+
+    def __repr__(self):
+        return (f"CoverageTimeline({self.start:%d/%m/%Y}, {self.days} jours, "
+                f"pas de {self.step_minutes} min, {self.shifts} shifts)")
+
+
+def _bounds(scenario) -> List[datetime]:
+    """Premier et dernier jour travaillés d'un planning (vide s'il n'y en a pas)"""
+    if isinstance(scenario, RunScenario):
+        if not scenario.runs:
+            return []
+        return [min(run.start for run in scenario.runs), max(run.end for run in scenario.runs)]
+    days = [work_day.date for work_day in scenario.work_days]
+    return [min(days), max(days)] if days else []
@@ -0,0 +1,148 @@
+"""
+Heures supplémentaires hebdomadaires (semaines ISO, du lundi au dimanche).
+
+Au-delà de 35h dans la semaine, les heures sont majorées de 25%; au-delà de
+43h, de 50%. Les heures elles-mêmes restent payées au taux de base dans la
+rémunération du jour: seule la majoration s'ajoute ici.
+
+Les cumuls sont tenus par semaine: ajouter ou retirer un jour ne touche que
+la semaine concernée, sans reparcourir le reste du scénario.
+"""
+from typing import Dict, Iterable, List, Tuple
+
+
+def week_key(day) -> Tuple[int, int]:
+    """Semaine ISO (année, numéro) d'une date"""
+    iso_year, iso_week, _ = day.isocalendar()
+    return iso_year, iso_week
+
+
+class WeeklyOvertime:
+    """Cumuls hebdomadaires et heures supplémentaires d'un scénario"""
+
+    FIRST_THRESHOLD = 35.0  # Heures supplémentaires à +25% au-delà de 35h
+    SECOND_THRESHOLD = 43.0  # Heures supplémentaires à +50% au-delà de 43h
+    FIRST_BONUS = 0.25
+    SECOND_BONUS = 0.50
+
+    def __init__(self):
+        # Semaine -> [heures, heures × taux horaire]
+        self.weeks: Dict[Tuple[int, int], List[float]] = {}
+        self.overtime_25_hours = 0.0
+        self.overtime_50_hours = 0.0
+        self.overtime_pay = 0.0
+
+    @classmethod
+    def split(cls, hours: float) -> Tuple[float, float]:
+        """
+        Répartit un total hebdomadaire en heures supplémentaires.
+
+        Args:
+            hours: Heures travaillées dans la semaine
+
+        Returns:
+            Tuple (heures à +25%, heures à +50%)
+        """
+        first = min(max(hours - cls.FIRST_THRESHOLD, 0.0),
+                    cls.SECOND_THRESHOLD - cls.FIRST_THRESHOLD)
+        second = max(hours - cls.SECOND_THRESHOLD, 0.0)
+        return first, second
+
+    @classmethod
+    def allocate(cls, hours: Iterable[float]) -> List[Tuple[float, float]]:
+        """
+        Attribue les heures supplémentaires d'une semaine à ses shifts.
+
+        Les heures supplémentaires sont les dernières travaillées: les shifts
+        doivent être fournis dans l'ordre chronologique.
+
+        Args:
+            hours: Heures de chaque shift de la semaine, dans l'ordre chronologique
+
+        Returns:
+            Liste de tuples (heures à +25%, heures à +50%) par shift
+        """
+        allocation = []
+        cumulated = 0.0
+        for h in hours:
+            before_25, before_50 = cls.split(cumulated)
+            cumulated += h
+            after_25, after_50 = cls.split(cumulated)
+            allocation.append((after_25 - before_25, after_50 - before_50))
+        return allocation
+
+    @classmethod
+    def premium(cls, hours: float, hourly_rate: float) -> Tuple[float, float, float]:
+        """
+        Heures supplémentaires et majoration d'une semaine complète.
+
+        Args:
+            hours: Heures travaillées dans la semaine
+            hourly_rate: Taux horaire (moyen) de la semaine
+
+        Returns:
+            Tuple (heures à +25%, heures à +50%, majoration)
+        """
+        first, second = cls.split(hours)
+        return first, second, hourly_rate * (first * cls.FIRST_BONUS + second * cls.SECOND_BONUS)
+
+    def _week_pay(self, week: List[float]) -> float:
+        """Majoration des heures supplémentaires d'une semaine"""
+        hours, rate_hours = week
+        if hours <= self.FIRST_THRESHOLD:
+            return 0.0
+        return self.premium(hours, rate_hours / hours)[2]  # Taux moyen de la semaine
+
+    def _update(self, key: Tuple[int, int], hours: float, hourly_rate: float) -> float:
+        week = self.weeks.get(key)
+        if week is None:
+            week = self.weeks[key] = [0.0, 0.0]
+
+        before_first, before_second = self.split(week[0])
+        before_pay = self._week_pay(week)
+
+        week[0] += hours
+        week[1] += hours * hourly_rate
+        if week[0] <= 1e-9:
+            del self.weeks[key]
+            week = [0.0, 0.0]
+
+        after_first, after_second = self.split(week[0])
+        delta_pay = self._week_pay(week) - before_pay
+
+        self.overtime_25_hours += after_first - before_first
+        self.overtime_50_hours += after_second - before_second
+        self.overtime_pay += delta_pay
+        return delta_pay
+
+    def add(self, day, hours: float, hourly_rate: float) -> float:
+        """
+        Ajoute les heures d'un jour à sa semaine.
+
+        Args:
+            day: Date du shift (date ou datetime)
+            hours: Heures travaillées
+            hourly_rate: Taux horaire de base du jour
+
+        Returns:
+            Variation de la majoration totale des heures supplémentaires
+        """
+        return self._update(week_key(day), hours, hourly_rate)
+
+    def remove(self, day, hours: float, hourly_rate: float) -> float:
+        """
+        Retire les heures d'un jour de sa semaine.
+
+        Args:
+            day: Date du shift (date ou datetime)
+            hours: Heures travaillées
+            hourly_rate: Taux horaire de base du jour
+
+        Returns:
+            Variation de la majoration totale des heures supplémentaires
+        """
+        return self._update(week_key(day), -hours, hourly_rate)
+
+    def __repr__(self):
+        return (f"WeeklyOvertime(+25%={self.overtime_25_hours:.2f}h, "
+                f"+50%={self.overtime_50_hours:.2f}h, {self.overtime_pay:.2f}€)")
@@ -0,0 +1,476 @@
+"""
+Agrégation de la paie de plusieurs salariés (équipe, semaine ISO, mois, type de shift).
+
+Les heures d'un shift ne dépendent que du couple (date, type de shift): elles
+sont calculées une seule fois par couple distinct, puis multipliées par le nombre
+d'occurrences et par la somme des taux horaires concernés. Aucun ScenarioResult
+n'est construit par salarié; les totaux sont cumulés dans des array.array.
+
+Les séquences (ShiftRun) ne sont pas développées: elles sont découpées aux
+limites de semaine ISO et de mois, et chaque morceau est tarifé d'un bloc par
+ShiftCalculator.calculate_run.
+
+Les heures supplémentaires hebdomadaires dépendent du salarié: elles sont
+réparties sur ses shifts (les dernières heures de la semaine) avant le cumul.
+"""
+from array import array
+from calendar import monthrange
+from collections import Counter
+from datetime import date, datetime
+from typing import Dict, Iterable, Iterator, List, Tuple
+
+from ..models import ShiftType, ShiftRun, RunScenario, intern_work_day, effective_rates
+from .overtime import WeeklyOvertime
+
+
+# Métriques cumulées, dans l'ordre des accumulateurs
+HOUR_METRICS = ['days', 'normal_hours', 'night_hours', 'sunday_hours',
+                'night_sunday_hours', 'total_hours', 'overtime_25_hours', 'overtime_50_hours']
+PAY_METRICS = ['base_pay', 'bonus_pay', 'total_pay', 'night_premium', 'sunday_premium',
+               'overtime_pay']
+METRICS = HOUR_METRICS + PAY_METRICS
+
+# Positions utilisées pour ajouter les heures supplémentaires
+_OT25 = METRICS.index('overtime_25_hours')
+_OT50 = METRICS.index('overtime_50_hours')
+_BONUS = METRICS.index('bonus_pay')
+_TOTAL = METRICS.index('total_pay')
+_OT_PAY = METRICS.index('overtime_pay')
+_PAY_OFFSET = len(HOUR_METRICS)
+
+# Ordre chronologique des shifts d'une même journée
+_SHIFT_ORDER = {shift_type: i for i, shift_type in enumerate(ShiftType)}
+
+# Dimensions de regroupement
+ROSTER_DIMENSIONS = ('employee', 'team')
+DAY_DIMENSIONS = ('week', 'month', 'shift_type')
+
+DEFAULT_GROUPINGS = (('employee',), ('team',), ('week',), ('month',), ('shift_type',))
+
+
+def _day_labels(ordinal: int, shift_type: ShiftType) -> Dict[str, str]:
+    """Libellés des dimensions journalières d'un morceau de séquence (même semaine, même mois)"""
+    day = date.fromordinal(ordinal)
+    iso_year, iso_week, _ = day.isocalendar()
+    return {
+        'week': f"{iso_year}-W{iso_week:02d}",
+        'month': f"{day.year}-{day.month:02d}",
+        'shift_type': shift_type.value,
+    }
+
+
+def _segments(ordinal: int, length: int) -> Iterator[Tuple[int, int]]:
+    """
+    Découpe une séquence aux limites de semaine ISO et de mois.
+
+    Args:
+        ordinal: Premier jour (ordinal)
+        length: Nombre de jours
+
+    Yields:
+        Tuples (premier ordinal, longueur) dont les jours partagent semaine et mois
+    """
+    last = ordinal + length
+    while ordinal < last:
+        day = date.fromordinal(ordinal)
+        end = min(last, ordinal + 7 - day.weekday(),
+                  ordinal + monthrange(day.year, day.month)[1] - day.day + 1)
+        yield ordinal, end - ordinal
+        ordinal = end
+
+
+class PayrollReport:
+    """Totaux agrégés par regroupement"""
+
+    def __init__(self, groups: Dict[tuple, Dict[tuple, array]]):
+        """
+        Args:
+            groups: Regroupement (tuple de dimensions) -> clé -> accumulateur
+        """
+        self.groups = groups
+
+    def get(self, *dims: str) -> Dict[tuple, Dict[str, float]]:
+        """
+        Retourne les totaux d'un regroupement.
+
+        Args:
+            dims: Dimensions du regroupement (ex: 'team', 'month')
+
+        Returns:
+            Dictionnaire clé -> métrique -> valeur
+        """
+        return {
+            key: dict(zip(METRICS, values))
+            for key, values in sorted(self.groups[tuple(dims)].items())
+        }
+
+    def rows(self, dims: Tuple[str, ...]) -> List[tuple]:
+        """
+        Retourne les totaux d'un regroupement sous forme de lignes.
+
+        Args:
+            dims: Dimensions du regroupement
+
+        Returns:
+            Liste de tuples (valeurs de la clé..., métriques...) triée par clé
+        """
+        return [key + tuple(values) for key, values in sorted(self.groups[tuple(dims)].items())]
+
+    def to_dict(self) -> Dict[str, List[Dict]]:
+        """Sérialise le rapport (ex: pour JSON)"""
+        return {
+            '+'.join(dims): [
+                dict(zip(dims + tuple(METRICS), row)) for row in self.rows(dims)
+            ]
+            for dims in self.groups
+        }
+
+
+def _add_entry(slot: array, profile: tuple, entry: list):
+    """Ajoute les occurrences d'un morceau de séquence dans un accumulateur"""
+    hours, (base_units, night_units, sunday_units, night_sunday_units) = profile
+    (count, rate_sum, overtime_25, overtime_50, overtime_pay,
+     night_sum, sunday_sum, stacked_night_sum, stacked_sunday_sum) = entry
+
+    for i, value in enumerate(hours):
+        slot[i] += count * value
+
+    # Majorations linéaires en taux × majoration: un historique de taux ne change que les sommes
+    base_pay = rate_sum * base_units
+    night_premium = night_sum * night_units + stacked_night_sum * night_sunday_units
+    sunday_premium = sunday_sum * sunday_units + stacked_sunday_sum * night_sunday_units
+    bonus_pay = night_premium + sunday_premium
+    for i, value in enumerate((base_pay, bonus_pay, base_pay + bonus_pay, night_premium, sunday_premium)):
+        slot[_PAY_OFFSET + i] += value
+
+    if overtime_pay or overtime_25 or overtime_50:
+        slot[_OT25] += overtime_25
+        slot[_OT50] += overtime_50
+        slot[_BONUS] += overtime_pay
+        slot[_TOTAL] += overtime_pay
+        slot[_OT_PAY] += overtime_pay
+
+
+class _GroupAccumulator:
+    """Accumulateur d'un regroupement"""
+
+    def __init__(self, dims: Tuple[str, ...]):
+        for dim in dims:
+            if dim not in ROSTER_DIMENSIONS and dim not in DAY_DIMENSIONS:
+                raise ValueError(f"Dimension inconnue: {dim}. "
+                                 f"Utilisez {ROSTER_DIMENSIONS + DAY_DIMENSIONS}")
+        self.dims = dims
+        self.roster_dims = [d for d in dims if d in ROSTER_DIMENSIONS]
+        self.has_day_dims = any(d in DAY_DIMENSIONS for d in dims)
+        # Partie salarié de la clé -> (ordinal, shift, longueur) -> entrée cumulée
+        self.pending = {}
+        self.totals = {}
+
+    def _slot(self, key: tuple) -> array:
+        slot = self.totals.get(key)
+        if slot is None:
+            slot = self.totals[key] = array('d', bytes(8 * len(METRICS)))
+        return slot
+
+    def add(self, roster_values: Dict[str, str], entries: Dict[tuple, list],
+            roster_vector: array):
+        """
+        Ajoute les jours d'un salarié.
+
+        Args:
+            roster_values: Valeurs des dimensions salarié ('employee', 'team')
+            entries: (ordinal, shift, longueur) -> [occurrences, somme des taux,
+                     heures sup. +25%, heures sup. +50%, majoration des heures sup.,
+                     somme des taux × majoration de nuit, somme des taux × majoration du dimanche,
+                     et les mêmes sommes pour les heures de nuit du dimanche (cumul des règles)]
+            roster_vector: Totaux du salarié (regroupements sans dimension journalière)
+        """
+        roster_part = tuple(roster_values[d] for d in self.roster_dims)
+
+        if not self.has_day_dims:
+            slot = self._slot(roster_part)
+            for i, value in enumerate(roster_vector):
+                slot[i] += value
+            return
+
+        pending = self.pending.get(roster_part)
+        if pending is None:
+            pending = self.pending[roster_part] = {}
+
+        for key, entry in entries.items():
+            cumulated = pending.get(key)
+            if cumulated is None:
+                pending[key] = list(entry)
+            else:
+                for i, value in enumerate(entry):
+                    cumulated[i] += value
+
+    def finish(self, profiles: Dict[tuple, tuple], labels: Dict[tuple, Dict[str, str]]):
+        """Replie les occurrences en attente dans les totaux"""
+        roster_positions = [self.dims.index(d) for d in self.roster_dims]
+
+        for roster_part, pending in self.pending.items():
+            for key, entry in pending.items():
+                day_labels = labels[key]
+
+                group_key = [None] * len(self.dims)
+                for position, value in zip(roster_positions, roster_part):
+                    group_key[position] = value
+                for position, dim in enumerate(self.dims):
+                    if dim in DAY_DIMENSIONS:
+                        group_key[position] = day_labels[dim]
+
+                _add_entry(self._slot(tuple(group_key)), profiles[key], entry)
+
+        self.pending = {}
+
+
+class PayrollAggregator:
+    """Agrège la paie de nombreux salariés en un seul passage"""
+
+    def __init__(self, calculator, groupings: Iterable[Tuple[str, ...]] = DEFAULT_GROUPINGS):
+        """
+        Args:
+            calculator: Instance de ShiftCalculator
+            groupings: Regroupements à calculer, chacun étant un tuple de dimensions
+                       parmi 'employee', 'team', 'week', 'month', 'shift_type'
+        """
+        self.calculator = calculator
+        self.groupings = [tuple(g) for g in groupings]
+        # (ordinal, shift, longueur) -> (heures, heures de base / de nuit / du dimanche / des deux)
+        self._profiles = {}
+        self._labels = {}  # (ordinal, shift, longueur) -> libellés des dimensions journalières
+
+    def _profile(self, key: tuple) -> tuple:
+        """Heures d'un morceau de séquence, et heures payées au taux de base / majorées nuit / dimanche / les deux"""
+        profile = self._profiles.get(key)
+        if profile is None:
+            ordinal, shift_type, length = key
+            if length == 1:
+                bd = self.calculator.compute_breakdown(intern_work_day(datetime.fromordinal(ordinal), shift_type))
+            else:
+                run = ShiftRun(datetime.fromordinal(ordinal), shift_type, length)
+                bd = self.calculator.calculate_run(run, 0.0).breakdown
+
+            hours = (float(length), bd.normal_hours, bd.night_hours, bd.sunday_hours,
+                     bd.night_sunday_hours, bd.get_total_hours())
+            pay_units = (bd.get_total_hours(), bd.night_hours, bd.sunday_hours, bd.night_sunday_hours)
+
+            profile = self._profiles[key] = (hours, pay_units)
+            self._labels[key] = _day_labels(ordinal, shift_type)
+        return profile
+
+    def _entry(self, count: int, rate: float, period=None) -> list:
+        """
+        Entrée d'un morceau de séquence pour un salarié (voir _GroupAccumulator.add).
+
+        Args:
+            count: Occurrences du morceau
+            rate: Taux horaire de base
+            period: RatePeriod en vigueur (prioritaire sur rate et sur les majorations par défaut)
+        """
+        rules = self.calculator.rules
+        night_bonus = rules.night_bonus
+        sunday_bonus = rules.sunday_bonus
+        if period is not None:
+            rate = period.hourly_rate
+            if period.night_bonus is not None:
+                night_bonus = period.night_bonus
+            if period.sunday_bonus is not None:
+                sunday_bonus = period.sunday_bonus
+        stacked_night, stacked_sunday = rules.stacked_bonus(night_bonus, sunday_bonus)
+        weight = count * rate
+        return [count, weight, 0.0, 0.0, 0.0, weight * night_bonus, weight * sunday_bonus,
+                weight * stacked_night, weight * stacked_sunday]
+
+    def _apply_overtime(self, entries: Dict[tuple, list]):
+        """Répartit les heures supplémentaires de chaque semaine sur ses shifts"""
+        keys = sorted(entries, key=lambda k: (k[0], _SHIFT_ORDER[k[1]]))
+
+        week_keys = []
+        week = None
+        for key in keys + [None]:
+            current = self._labels[key]['week'] if key is not None else None
+            if current != week and week_keys:
+                hours = [entries[k][0] * self._profiles[k][0][5] for k in week_keys]
+                # Taux moyen de la semaine (historique daté: plusieurs taux possibles)
+                week_hours = sum(hours)
+                rate = (sum(entries[k][1] * self._profiles[k][0][5] for k in week_keys) / week_hours
+                        if week_hours else 0.0)
+                for k, (overtime_25, overtime_50) in zip(week_keys,
+                                                         WeeklyOvertime.allocate(hours)):
+                    entry = entries[k]
+                    entry[2] += overtime_25
+                    entry[3] += overtime_50
+                    entry[4] += rate * (overtime_25 * WeeklyOvertime.FIRST_BONUS +
+                                        overtime_50 * WeeklyOvertime.SECOND_BONUS)
+                week_keys = []
+            week = current
+            week_keys.append(key)
+
+    def _add_runs(self, entries: Dict[tuple, list], runs: Iterable[tuple]):
+        """
+        Ajoute les séquences d'un salarié à ses entrées, sans développer leurs jours.
+
+        Les séquences qui se chevauchent (deux shifts le même jour) sont
+        découpées par jour: les heures supplémentaires restent attribuées
+        aux derniers shifts dans l'ordre chronologique.
+
+        Args:
+            entries: Entrées du salarié, complétées sur place
+            runs: Itérable de tuples (ShiftRun, taux horaire, RatePeriod ou None)
+        """
+        runs = sorted(runs, key=lambda r: r[0].start)
+        # Groupes de séquences qui se chevauchent, de proche en proche
+        overlapping = set()
+        group, group_end = [], None
+        for i, (run, _, _) in enumerate(runs + [(None, None, None)]):
+            if run is not None and group and run.start.toordinal() < group_end:
+                group.append(i)
+                group_end = max(group_end, run.start.toordinal() + run.length)
+                continue
+            if len(group) > 1:
+                overlapping.update(group)
+            if run is not None:
+                group, group_end = [i], run.start.toordinal() + run.length
+
+        for i, (run, rate, period) in enumerate(runs):
+            ordinal = run.start.toordinal()
+            pieces = (((day, 1) for day in range(ordinal, ordinal + run.length)) if i in overlapping
+                      else _segments(ordinal, run.length))
+            for first, length in pieces:
+                key = (first, run.shift_type, length)
+                entry = self._entry(1, rate, period)
+                cumulated = entries.get(key)
+                if cumulated is None:
+                    entries[key] = entry
+                else:
+                    for j, value in enumerate(entry):
+                        cumulated[j] += value
+
+    def _add_employee(self, accumulators: List[_GroupAccumulator], employee_id: str,
+                      team: str, entries: Dict[tuple, list]):
+        """Ajoute tous les jours d'un salarié aux regroupements"""
+        for key in entries:
+            self._profile(key)
+
+        if self.calculator.weekly_overtime:
+            self._apply_overtime(entries)
+
+        vector = array('d', bytes(8 * len(METRICS)))
+        for key, entry in entries.items():
+            _add_entry(vector, self._profiles[key], entry)
+
+        roster_values = {'employee': employee_id, 'team': team}
+        for accumulator in accumulators:
+            accumulator.add(roster_values, entries, vector)
+
+    def _finish(self, accumulators: List[_GroupAccumulator]) -> PayrollReport:
+        for accumulator in accumulators:
+            accumulator.finish(self._profiles, self._labels)
+        return PayrollReport({acc.dims: acc.totals for acc in accumulators})
+
+    def aggregate(self, rosters: Iterable) -> PayrollReport:
+        """
+        Agrège les plannings de plusieurs salariés.
+
+        Args:
+            rosters: Itérable d'EmployeeRoster
+
+        Returns:
+            PayrollReport avec un total par clé de chaque regroupement
+        """
+        accumulators = [_GroupAccumulator(dims) for dims in self.groupings]
+
+        for roster in rosters:
+            rates = effective_rates(roster)
+            scenario = roster.scenario
+            if isinstance(scenario, RunScenario):
+                entries = {}
+                if rates is None:
+                    self._add_runs(entries, ((run, scenario.hourly_rate, None) for run in scenario.runs))
+                else:
+                    self._add_runs(entries, ((piece, period.hourly_rate, period)
+                                             for run in scenario.runs for piece, period in rates.split_run(run)))
+                self._add_employee(accumulators, roster.employee_id, roster.team, entries)
+                continue
+
+            counts = Counter((wd.date.toordinal(), wd.shift_type, 1)
+                             for wd in roster.scenario.work_days)
+            table = None
+            if rates is not None and counts:
+                # Taux datés: une période par ordinal de jour, en accès direct
+                first = min(ordinal for ordinal, _, _ in counts)
+                table = rates.ordinal_table(first, max(ordinal for ordinal, _, _ in counts))
+            entries = {key: self._entry(count, roster.scenario.hourly_rate,
+                                        table[key[0] - first] if table is not None else None)
+                       for key, count in counts.items()}
+            self._add_employee(accumulators, roster.employee_id, roster.team, entries)
+
+        return self._finish(accumulators)
+
+    def aggregate_records(self, records: Iterable[tuple]) -> PayrollReport:
+        """
+        Agrège des enregistrements à plat, sans construire de WorkDay.
+
+        Les enregistrements d'un même salarié peuvent arriver dans n'importe
+        quel ordre; l'équipe retenue est celle de son premier enregistrement.
+
+        Args:
+            records: Itérable de tuples (employee_id, team, date, shift_type, hourly_rate)
+                     où date est un date/datetime et shift_type un ShiftType
+
+        Returns:
+            PayrollReport avec un total par clé de chaque regroupement
+        """
+        accumulators = [_GroupAccumulator(dims) for dims in self.groupings]
+        employees = {}  # employee_id -> (équipe, entrées)
+
+        for employee_id, team, day, shift_type, rate in records:
+            employee = employees.get(employee_id)
+            if employee is None:
+                employee = employees[employee_id] = (team, {})
+
+            key = (day.toordinal(), shift_type, 1)
+            entry = employee[1].get(key)
+            if entry is None:
+                employee[1][key] = self._entry(1, rate)
+            else:
+                for i, value in enumerate(self._entry(1, rate)):
+                    entry[i] += value
+
+        for employee_id, (team, entries) in employees.items():
+            self._add_employee(accumulators, employee_id, team, entries)
+
+        return self._finish(accumulators)
+
+    def aggregate_runs(self, records: Iterable[tuple]) -> PayrollReport:
+        """
+        Agrège des séquences à plat, sans développer leurs jours.
+
+        Chaque séquence est découpée aux limites de semaine ISO et de mois,
+        puis chaque morceau est tarifé d'un bloc (ShiftCalculator.calculate_run).
+        Les totaux sont ceux d'aggregate_records sur les jours développés.
+
+        Args:
+            records: Itérable de tuples (employee_id, team, date, shift_type, hourly_rate, length)
+                     où date est le premier jour (datetime) et length le nombre de jours
+
+        Returns:
+            PayrollReport avec un total par clé de chaque regroupement
+        """
+        accumulators = [_GroupAccumulator(dims) for dims in self.groupings]
+        employees = {}  # employee_id -> (équipe, séquences)
+
+        for employee_id, team, start, shift_type, rate, length in records:
+            employee = employees.get(employee_id)
+            if employee is None:
+                employee = employees[employee_id] = (team, [])
+            employee[1].append((ShiftRun(start, shift_type, length), rate, None))
+
+        for employee_id, (team, runs) in employees.items():
+            entries = {}
+            self._add_runs(entries, runs)
+            self._add_employee(accumulators, employee_id, team, entries)
+
+        return self._finish(accumulators)
@@ -0,0 +1,236 @@
+"""
+Table précalculée des heures par catégorie pour chaque (date, type de shift).
+
+Les heures d'un shift ne dépendent que de sa date, de son type et des règles
+de majoration (nuit, dimanche, jours fériés, changements d'heure): pour une
+plage d'années donnée, elles sont calculées une seule fois et rangées dans un
+array('d') indexé par ordinal de date et type de shift. Une recherche remplace
+alors le calcul du calculateur; hors de la plage, le calculateur retombe sur
+le calcul complet.
+
+La table peut être enregistrée sur disque pour éviter de la reconstruire au
+démarrage. L'en-tête du fichier contient la politique de majoration: une
+table construite avec d'autres règles (version ou contenu) est refusée au
+chargement.
+"""
+import json
+import os
+import sys
+import tempfile
+from array import array
+from datetime import date, datetime
+from typing import Optional
+
+from ..models import ShiftType, WorkDay
+from ..models.dst import LOCAL_TIMEZONE
+from .calculator import HoursBreakdown
+
+
+# Catégories d'heures stockées, dans l'ordre des colonnes de la table
+CATEGORIES = ('normal_hours', 'night_hours', 'sunday_hours', 'night_sunday_hours')
+
+_SHIFT_TYPES = tuple(ShiftType)
+_SHIFT_INDEX = {shift_type: i for i, shift_type in enumerate(_SHIFT_TYPES)}
+_STRIDE = len(CATEGORIES)
+_ROW = len(_SHIFT_TYPES) * _STRIDE
+
+FORMAT_VERSION = 1
+
+
+def policy_signature(calculator) -> str:
+    """
+    Décrit tout ce dont dépendent les heures par catégorie.
+
+    Args:
+        calculator: ShiftCalculator dont on lit les règles de majoration
+
+    Returns:
+        Chaîne comparée au chargement d'une table enregistrée
+    """
+    return f"rules={calculator.rules.signature};tz={LOCAL_TIMEZONE or 'EU'}"
+
+
+class PremiumProfileTable:
+    """Heures par catégorie de chaque (date, type de shift) sur une plage d'années"""
+
+    def __init__(self, first_year: int, last_year: int, data: array, signature: str):
+        """
+        Args:
+            first_year: Première année couverte
+            last_year: Dernière année couverte (incluse)
+            data: Heures, CATEGORIES consécutives par (jour, type de shift)
+            signature: Politique de majoration utilisée (voir policy_signature)
+        """
+        self.first_year = first_year
+        self.last_year = last_year
+        self.first_ordinal = date(first_year, 1, 1).toordinal()
+        self.end_ordinal = date(last_year + 1, 1, 1).toordinal()
+        self.data = data
+        self.signature = signature
+
+        expected = (self.end_ordinal - self.first_ordinal) * _ROW
+        if len(data) != expected:
+            raise ValueError(f"Table de profils incomplète: {len(data)} valeurs au lieu de {expected}")
+
+    @classmethod
+    def build(cls, calculator, first_year: int, last_year: int) -> 'PremiumProfileTable':
+        """
+        Calcule la table avec le calcul complet du calculateur.
+
+        Args:
+            calculator: ShiftCalculator (sa table éventuelle n'est pas utilisée)
+            first_year: Première année couverte
+            last_year: Dernière année couverte (incluse)
+
+        Returns:
+            PremiumProfileTable
+        """
+        data = array('d')
+        for ordinal in range(date(first_year, 1, 1).toordinal(), date(last_year + 1, 1, 1).toordinal()):
+            day = datetime.fromordinal(ordinal)
+            for shift_type in _SHIFT_TYPES:
+                bd = calculator.decompose(WorkDay(day, shift_type))
+                data.extend((bd.normal_hours, bd.night_hours, bd.sunday_hours, bd.night_sunday_hours))
+        return cls(first_year, last_year, data, policy_signature(calculator))
+
+    def lookup(self, day, shift_type: ShiftType) -> Optional[HoursBreakdown]:
+        """
+        Retourne les heures d'un shift si sa date est couverte.
+
+        Args:
+            day: Date du shift (date ou datetime)
+            shift_type: Type de shift
+
+        Returns:
+            Nouveau HoursBreakdown, ou None hors de la plage d'années
+        """
+        ordinal = day.toordinal()
+        if not self.first_ordinal <= ordinal < self.end_ordinal:
+            return None
+        i = (ordinal - self.first_ordinal) * _ROW + _SHIFT_INDEX[shift_type] * _STRIDE
+        data = self.data
+        bd = HoursBreakdown()
+        bd.normal_hours = data[i]
+        bd.night_hours = data[i + 1]
+        bd.sunday_hours = data[i + 2]
+        bd.night_sunday_hours = data[i + 3]
+        return bd
+
+    def covers(self, day) -> bool:
+        """Indique si une date est dans la plage de la table"""
+        return self.first_ordinal <= day.toordinal() < self.end_ordinal
+
+    def save(self, path: str):
+        """
+        Enregistre la table (en-tête JSON sur une ligne, puis les valeurs brutes).
+
+        Args:
+            path: Chemin du fichier
+        """
+        header = {
+            'version': FORMAT_VERSION,
+            'first_year': self.first_year,
+            'last_year': self.last_year,
+            'byteorder': sys.byteorder,
+            'signature': self.signature,
+        }
+        # Fichier temporaire unique dans le même dossier: des workers qui enregistrent
+        # en même temps n'écrivent jamais dans le même fichier, et os.replace reste atomique
+        fd, tmp_path = tempfile.mkstemp(prefix=os.path.basename(path) + '.', suffix='.tmp',
+                                        dir=os.path.dirname(os.path.abspath(path)))
+        try:
+            with os.fdopen(fd, 'wb') as f:
+                f.write(json.dumps(header).encode('utf-8') + b'\n')
+                self.data.tofile(f)
+            os.chmod(tmp_path, 0o644)  # mkstemp crée le fichier en 0600
+            os.replace(tmp_path, path)
+        except BaseException:
+            os.unlink(tmp_path)
+            raise
+
+    @classmethod
+    def load(cls, path: str, calculator=None) -> 'PremiumProfileTable':
+        """
+        Charge une table enregistrée.
+
+        Args:
+            path: Chemin du fichier
+            calculator: Si fourni, vérifie que la politique de majoration est la même
+
+        Returns:
+            PremiumProfileTable
+
+        Raises:
+            ValueError: Si le fichier est d'une autre version ou d'une autre politique
+        """
+        with open(path, 'rb') as f:
+            header = json.loads(f.readline().decode('utf-8'))
+            if header.get('version') != FORMAT_VERSION:
+                raise ValueError(f"Version de table de profils non supportée: {header.get('version')}")
+            if calculator is not None and header['signature'] != policy_signature(calculator):
+                raise ValueError("Table de profils construite avec une autre politique de majoration")
+            data = array('d')
+            data.frombytes(f.read())
+
+        if header['byteorder'] != sys.byteorder:
+            data.byteswap()
+        return cls(header['first_year'], header['last_year'], data, header['signature'])
+
+    @classmethod
+    def load_or_build(cls, calculator, first_year: int, last_year: int,
+                      path: str = None) -> 'PremiumProfileTable':
+        """
+        Charge la table depuis path si elle correspond, sinon la construit (et l'enregistre).
+
+        Args:
+            calculator: ShiftCalculator
+            first_year: Première année couverte
+            last_year: Dernière année couverte (incluse)
+            path: Fichier de cache (None pour ne rien lire ni écrire)
+
+        Returns:
+            PremiumProfileTable
+        """
+        if path and os.path.exists(path):
+            try:
+                table = cls.load(path, calculator)
+                if table.first_year == first_year and table.last_year == last_year:
+                    return table
+            except (OSError, ValueError, KeyError):
+                pass  # Fichier obsolète ou illisible: reconstruire
+
+        table = cls.build(calculator, first_year, last_year)
+        if path:
+            table.save(path)
+        return table
+
+    @classmethod
+    def from_env(cls, calculator, environ=None) -> 'PremiumProfileTable':
+        """
+        Construit la table selon les variables d'environnement.
+
+        - SHIFT_TABLE_YEARS: plage d'années, ex: '2025-2030'
+          (par défaut: de l'année précédente à quatre ans après l'année en cours)
+        - SHIFT_TABLE_PATH: fichier où charger/enregistrer la table (optionnel)
+
+        Args:
+            calculator: ShiftCalculator
+            environ: Dictionnaire d'environnement (os.environ par défaut)
+
+        Returns:
+            PremiumProfileTable
+        """
+        environ = os.environ if environ is None else environ
+        years = environ.get('SHIFT_TABLE_YEARS')
+        if years:
+            first, _, last = years.partition('-')
+            first_year, last_year = int(first), int(last or first)
+        else:
+            current = date.today().year
+            first_year, last_year = current - 1, current + 4
+        return cls.load_or_build(calculator, first_year, last_year,
+                                 environ.get('SHIFT_TABLE_PATH') or None)
+
+    def __repr__(self):
+        return (f"PremiumProfileTable({self.first_year}-{self.last_year}, "
+                f"{len(self.data) // _ROW} jours)")
@@ -0,0 +1,253 @@
+"""
+Totaux d'un scénario sur une plage de dates quelconque (« combien entre le 5 et le 20 »).
+
+Chaque jour de la période du scénario a ses valeurs (heures par catégorie,
+rémunération de base, majorations, heures supplémentaires); chaque colonne
+est cumulée dans un arbre de Fenwick sur les ordinaux des jours. Le total
+d'une plage se lit en O(log n) par colonne, et modifier un jour coûte
+O(log n) par colonne, sans recalculer le scénario.
+
+Les heures supplémentaires sont rattachées aux jours qui les génèrent
+(les dernières heures de la semaine, WeeklyOvertime.allocate): modifier un
+jour recalcule donc les jours de sa semaine ISO, au plus sept.
+"""
+from array import array
+from datetime import datetime
+from typing import Dict, Iterable, List, Sequence
+
+from ..models import WorkDay
+from .overtime import WeeklyOvertime
+
+
+# Colonnes cumulées (une valeur par jour)
+COLUMNS = ('shifts', 'normal_hours', 'night_hours', 'sunday_hours', 'night_sunday_hours', 'total_hours',
+           'overtime_25_hours', 'overtime_50_hours', 'base_pay', 'bonus_pay', 'overtime_pay', 'total_pay')
+
+
+class FenwickTree:
+    """Arbre de Fenwick (sommes préfixes avec mise à jour ponctuelle)"""
+
+    def __init__(self, size: int, values: Iterable[float] = None):
+        """
+        Args:
+            size: Nombre de positions
+            values: Valeurs initiales (construction en O(n)), zéros par défaut
+        """
+        self.size = size
+        tree = array('d', [0.0]) * (size + 1)
+        if values is not None:
+            for i, value in enumerate(values, start=1):
+                tree[i] += value
+                parent = i + (i & -i)
+                if parent <= size:
+                    tree[parent] += tree[i]
+        self._tree = tree
+
+    def add(self, position: int, delta: float):
+        """Ajoute delta à une position (0..size-1)"""
+        tree = self._tree
+        i = position + 1
+        while i <= self.size:
+            tree[i] += delta
+            i += i & -i
+
+    def prefix(self, end: int) -> float:
+        """Somme des positions 0..end-1"""
+        tree = self._tree
+        total = 0.0
+        i = min(end, self.size)
+        while i > 0:
+            total += tree[i]
+            i -= i & -i
+        return total
+
+    def range_sum(self, start: int, end: int) -> float:
+        """Somme des positions start..end-1"""
+        if end <= start:
+            return 0.0
+        return self.prefix(end) - self.prefix(max(start, 0))
+
+
+class RangeIndex:
+    """Totaux par plage de dates d'un scénario, modifiable jour par jour"""
+
+    def __init__(self, calculator, hourly_rate: float, first_day: datetime, last_day: datetime,
+                 work_days: Iterable[WorkDay] = (), rates=None):
+        """
+        Args:
+            calculator: ShiftCalculator (décomposition, tarif, heures supplémentaires)
+            hourly_rate: Taux horaire de base
+            first_day: Premier jour couvert par l'index
+            last_day: Dernier jour couvert (inclus)
+            work_days: Jours de travail initiaux
+            rates: RateSchedule (taux et majorations datés), prioritaire sur hourly_rate
+
+        Raises:
+            ValueError: Si la plage est vide ou si un jour est hors de la plage
+        """
+        self.calculator = calculator
+        self.hourly_rate = hourly_rate
+        self.rates = rates
+        self.origin = first_day.toordinal()
+        self.size = last_day.toordinal() - self.origin + 1
+        if self.size < 1:
+            raise ValueError("Plage de dates vide")
+
+        self._shifts: Dict[int, List[WorkDay]] = {}  # Position -> shifts du jour
+        for work_day in work_days:
+            self._shifts.setdefault(self._position(work_day.date), []).append(work_day)
+
+        # Valeurs de chaque jour, calculées semaine par semaine
+        self._values: List[Sequence[float]] = [(0.0,) * len(COLUMNS)] * self.size
+        for monday in sorted({self._monday(position) for position in self._shifts}):
+            for position, values in self._week_values(monday):
+                self._values[position] = values
+        self._trees = [FenwickTree(self.size, (values[c] for values in self._values))
+                       for c in range(len(COLUMNS))]
+
+    @classmethod
+    def from_scenario(cls, scenario, calculator, first_day: datetime = None,
+                      last_day: datetime = None) -> 'RangeIndex':
+        """
+        Indexe un scénario.
+
+        Args:
+            scenario: Scenario ou RunScenario
+            calculator: ShiftCalculator
+            first_day: Premier jour couvert (par défaut: premier jour travaillé)
+            last_day: Dernier jour couvert (par défaut: dernier jour travaillé)
+
+        Returns:
+            RangeIndex du scénario
+        """
+        work_days = scenario.work_days
+        if first_day is None or last_day is None:
+            if not work_days:
+                raise ValueError("Aucun jour travaillé")
+            first_day = first_day or min(wd.date for wd in work_days)
+            last_day = last_day or max(wd.date for wd in work_days)
+        return cls(calculator, scenario.hourly_rate, first_day, last_day, work_days,
+                   getattr(scenario, 'rates', None))
+
+    def _position(self, day: datetime) -> int:
+        position = day.toordinal() - self.origin
+        if not 0 <= position < self.size:
+            raise ValueError(f"Jour hors de l'index: {day:%Y-%m-%d}")
+        return position
+
+    def _monday(self, position: int) -> int:
+        """Position du lundi de la semaine (éventuellement avant le début de l'index)"""
+        return position - (self.origin + position - 1) % 7  # Ordinal 1 (01/01/0001) est un lundi
+
+    def _week_values(self, monday: int) -> List[tuple]:
+        """Valeurs de chaque jour indexé d'une semaine ISO (position du lundi)"""
+        calculator = self.calculator
+        positions = [p for p in range(monday, monday + 7) if 0 <= p < self.size]
+        shifts = sorted(((p, wd) for p in positions for wd in self._shifts.get(p, ())),
+                        key=lambda item: calculator.rules.work_day_span(item[1]))
+
+        breakdowns = [calculator.compute_breakdown(wd) for _, wd in shifts]
+        if calculator.weekly_overtime:
+            allocation = WeeklyOvertime.allocate(bd.get_total_hours() for bd in breakdowns)
+        else:
+            allocation = [(0.0, 0.0)] * len(shifts)
+
+        # Taux de chaque shift (historique daté éventuel); heures sup. au taux moyen de la semaine
+        periods = [self.rates.at(wd.date) if self.rates is not None else None for _, wd in shifts]
+        rates = [period.hourly_rate if period is not None else self.hourly_rate for period in periods]
+        week_hours = sum(bd.get_total_hours() for bd in breakdowns)
+        week_rate = (sum(bd.get_total_hours() * rate for bd, rate in zip(breakdowns, rates)) / week_hours
+                     if week_hours else 0.0)
+
+        totals = {p: [0.0] * len(COLUMNS) for p in positions}
+        for (p, _), bd, (h25, h50), period, rate in zip(shifts, breakdowns, allocation, periods, rates):
+            bonuses = (period.night_bonus, period.sunday_bonus) if period is not None else ()
+            base_pay, bonus_pay, total_pay = calculator.price_breakdown(bd, rate, *bonuses)
+            overtime_pay = week_rate * (h25 * WeeklyOvertime.FIRST_BONUS + h50 * WeeklyOvertime.SECOND_BONUS)
+            for c, value in enumerate((1.0, bd.normal_hours, bd.night_hours, bd.sunday_hours,
+                                       bd.night_sunday_hours, bd.get_total_hours(), h25, h50,
+                                       base_pay, bonus_pay, overtime_pay, total_pay + overtime_pay)):
+                totals[p][c] += value
+        return [(p, tuple(values)) for p, values in totals.items()]
+
+    def _refresh_week(self, position: int):
+        """Recalcule les jours de la semaine d'une position et met à jour les arbres"""
+        for p, values in self._week_values(self._monday(position)):
+            old = self._values[p]
+            for c, tree in enumerate(self._trees):
+                if values[c] != old[c]:
+                    tree.add(p, values[c] - old[c])
+            self._values[p] = values
+
+    def add(self, work_day: WorkDay):
+        """
+        Ajoute un shift.
+
+        Raises:
+            ValueError: Si le jour est hors de l'index
+        """
+        position = self._position(work_day.date)
+        self._shifts.setdefault(position, []).append(work_day)
+        self._refresh_week(position)
+
+    def remove(self, work_day: WorkDay):
+        """
+        Retire un shift (même date et même type).
+
+        Raises:
+            ValueError: Si le shift n'est pas indexé
+        """
+        position = self._position(work_day.date)
+        shifts = self._shifts.get(position, [])
+        for i, existing in enumerate(shifts):
+            if existing.shift_type == work_day.shift_type:
+                del shifts[i]
+                break
+        else:
+            raise ValueError(f"Shift absent de l'index: {work_day}")
+        if not shifts:
+            del self._shifts[position]
+        self._refresh_week(position)
+
+    def replace(self, old: WorkDay, new: WorkDay):
+        """Remplace un shift par un autre (ex: changement de type ou de date)"""
+        self.remove(old)
+        self.add(new)
+
+    def totals(self, date_from: datetime = None, date_to: datetime = None) -> Dict[str, float]:
+        """
+        Totaux sur une plage de dates.
+
+        Args:
+            date_from: Premier jour (inclus, début de l'index par défaut)
+            date_to: Dernier jour (inclus, fin de l'index par défaut)
+
+        Returns:
+            Dictionnaire colonne -> total (voir COLUMNS)
+        """
+        start = 0 if date_from is None else max(date_from.toordinal() - self.origin, 0)
+        end = self.size if date_to is None else min(date_to.toordinal() - self.origin + 1, self.size)
+        return {column: tree.range_sum(start, end) for column, tree in zip(COLUMNS, self._trees)}
+
+    @property
+    def first_day(self) -> datetime:
+        """Premier jour couvert"""
+        return datetime.fromordinal(self.origin)
+
+    @property
+    def last_day(self) -> datetime:
+        """Dernier jour couvert"""
+        return datetime.fromordinal(self.origin + self.size - 1)
+
+    def __repr__(self):
+        return f"RangeIndex({self.first_day:%d/%m/%Y} → {self.last_day:%d/%m/%Y}, {self.hourly_rate}€/h)"
+
+
+def range_totals(scenario, calculator, date_from: datetime = None,
+                 date_to: datetime = None) -> Dict[str, float]:
+    """
+    Raccourci: totaux d'un scénario sur une plage (index construit puis jeté).
+
+    Pour plusieurs questions sur le même scénario, garder le RangeIndex.
+    """
+    return RangeIndex.from_scenario(scenario, calculator).totals(date_from, date_to)
@@ -0,0 +1,283 @@
+"""
+Tarification des rotations par cycles mis en cache.
+
+Les heures d'un cycle ne dépendent que du motif, du jour du cycle par lequel
+il commence (phase) et du jour de la semaine de son premier jour: elles sont
+décomposées une seule fois par triplet, puis réutilisées pour chaque cycle
+de l'horizon. Un cycle qui croise un changement d'heure ou un jour férié est
+décomposé à part, avec la position du changement ou du jour férié dans la clé
+du cache. La rémunération est
+linéaire en heures à taux constant: elle est calculée une fois sur le total.
+
+La projection (project) va plus loin: découpé en semaines du lundi au
+dimanche, le motif se répète toutes les L / pgcd(L, 7) semaines. Chaque
+semaine type est décomposée une fois et multipliée par son nombre
+d'occurrences; seules les semaines incomplètes aux bords et les semaines
+d'un changement d'heure ou d'un jour férié sont traitées explicitement. Le coût ne dépend
+presque plus de l'horizon.
+"""
+from datetime import datetime, timedelta
+from itertools import product
+from math import gcd
+from typing import Dict, Iterable, List, Tuple
+
+from ..models import WorkDay
+from ..models.dst import transitions_between
+from ..models.rotation import RotationPattern
+from .calculator import ShiftCalculator, ScenarioResult, HoursBreakdown, REFERENCE_MONDAY
+from .comparator import ComparisonResult
+from .overtime import WeeklyOvertime
+
+
+class CycleProfile:
+    """Heures d'une portion de cycle, indépendantes de la date et du taux horaire"""
+
+    __slots__ = ('breakdown', 'week_hours', 'days_worked')
+
+    def __init__(self, breakdown: HoursBreakdown, week_hours: Tuple[Tuple[int, float], ...],
+                 days_worked: int):
+        """
+        Args:
+            breakdown: Heures cumulées par catégorie
+            week_hours: Tuples (décalage du premier jour, heures) par semaine touchée
+            days_worked: Nombre de jours travaillés
+        """
+        self.breakdown = breakdown
+        self.week_hours = week_hours
+        self.days_worked = days_worked
+
+
+class RotationPricer:
+    """Calcule le total d'une rotation sur un horizon en réutilisant les cycles déjà décomposés"""
+
+    def __init__(self, calculator: ShiftCalculator = None):
+        """
+        Args:
+            calculator: Calculateur utilisé pour décomposer les heures
+        """
+        self.calculator = calculator or ShiftCalculator()
+        # (jours du motif, phase, jour de la semaine, nombre de jours, changements d'heure,
+        # jours fériés) -> CycleProfile
+        self._cycles: Dict[tuple, CycleProfile] = {}
+        self.hits = 0
+        self.misses = 0
+
+    def _build_profile(self, pattern: RotationPattern, start: datetime, phase: int,
+                       n_days: int) -> CycleProfile:
+        """Décompose jour par jour une portion de cycle commençant à start"""
+        breakdown = HoursBreakdown()
+        week_hours: List[List] = []
+        days_worked = 0
+        first_week_day = start.weekday()
+
+        for offset in range(n_days):
+            shift_type = pattern.shift_at(offset, phase)
+            if shift_type is None:
+                continue
+            day = self.calculator.compute_breakdown(WorkDay(start + timedelta(days=offset), shift_type))
+            breakdown.normal_hours += day.normal_hours
+            breakdown.night_hours += day.night_hours
+            breakdown.sunday_hours += day.sunday_hours
+            breakdown.night_sunday_hours += day.night_sunday_hours
+            days_worked += 1
+
+            # Regrouper les heures par semaine ISO (relative au premier jour)
+            week = (first_week_day + offset) // 7
+            if week_hours and week_hours[-1][0] == week:
+                week_hours[-1][2] += day.get_total_hours()
+            else:
+                week_hours.append([week, offset, day.get_total_hours()])
+
+        return CycleProfile(breakdown, tuple((offset, hours) for _, offset, hours in week_hours),
+                            days_worked)
+
+    def _profile(self, pattern: RotationPattern, start: datetime, phase: int,
+                 n_days: int) -> CycleProfile:
+        """Profil d'une portion de cycle, depuis le cache"""
+        end = start + timedelta(days=n_days + 1)  # Un shift de nuit déborde sur le lendemain
+        # Position relative des changements d'heure (vide dans le cas courant)
+        dst = tuple((t.start - start, t.delta_hours) for t in transitions_between(start, end))
+        first = start.toordinal()
+        holidays = tuple(h - first for h in self.calculator.rules.holidays_between(first, end.toordinal()))
+
+        key = (pattern.days, phase, start.weekday(), n_days, dst, holidays)
+        profile = self._cycles.get(key)
+        if profile is None:
+            self.misses += 1
+            profile = self._cycles[key] = self._build_profile(pattern, start, phase, n_days)
+        else:
+            self.hits += 1
+        return profile
+
+    def price(self, pattern: RotationPattern, start: datetime, horizon_days: int,
+              hourly_rate: float, phase: int = 0, name: str = None) -> ScenarioResult:
+        """
+        Calcule les totaux d'une rotation sans construire ses jours un par un.
+
+        Args:
+            pattern: Motif de rotation
+            start: Premier jour de la période
+            horizon_days: Nombre de jours calendaires couverts
+            hourly_rate: Taux horaire de base
+            phase: Jour du cycle par lequel la rotation commence
+            name: Nom du résultat (celui de pattern.to_scenario par défaut)
+
+        Returns:
+            ScenarioResult avec les totaux (day_results reste vide)
+        """
+        phase %= pattern.length
+        if name is None:
+            name = pattern.to_scenario(start, 0, hourly_rate, phase).name
+        start = datetime.combine(start.date(), datetime.min.time())
+
+        overtime = WeeklyOvertime() if self.calculator.weekly_overtime else None
+        result = ScenarioResult(name, hourly_rate, overtime)
+        total = result.total_breakdown
+
+        offset = 0
+        while offset < horizon_days:
+            n_days = min(pattern.length, horizon_days - offset)
+            cycle_start = start + timedelta(days=offset)
+            profile = self._profile(pattern, cycle_start, phase, n_days)
+
+            total.normal_hours += profile.breakdown.normal_hours
+            total.night_hours += profile.breakdown.night_hours
+            total.sunday_hours += profile.breakdown.sunday_hours
+            total.night_sunday_hours += profile.breakdown.night_sunday_hours
+            if overtime is not None:
+                for day_offset, hours in profile.week_hours:
+                    overtime.add(cycle_start + timedelta(days=day_offset), hours, hourly_rate)
+
+            offset += n_days
+
+        _, result.total_bonus, result.total_pay = self.calculator.price_breakdown(total, hourly_rate)
+        if overtime is not None:
+            result.total_pay += overtime.overtime_pay
+            result.total_bonus += overtime.overtime_pay
+            result.total_overtime_pay = overtime.overtime_pay
+            total.overtime_25_hours = overtime.overtime_25_hours
+            total.overtime_50_hours = overtime.overtime_50_hours
+
+        return result
+
+    def project(self, pattern: RotationPattern, start: datetime, horizon_days: int,
+                hourly_rate: float, phase: int = 0, name: str = None) -> ScenarioResult:
+        """
+        Projette les totaux d'une rotation par semaines types (forme fermée).
+
+        Donne les mêmes totaux que price() ou calculate_scenario, pour un coût
+        quasi indépendant de l'horizon (plusieurs années comme quelques semaines).
+
+        Args:
+            pattern: Motif de rotation
+            start: Premier jour de la période
+            horizon_days: Nombre de jours calendaires couverts
+            hourly_rate: Taux horaire de base
+            phase: Jour du cycle par lequel la rotation commence
+            name: Nom du résultat (celui de pattern.to_scenario par défaut)
+
+        Returns:
+            ScenarioResult avec les totaux (day_results reste vide)
+        """
+        length = pattern.length
+        phase %= length
+        if name is None:
+            name = pattern.to_scenario(start, 0, hourly_rate, phase).name
+        start = datetime.combine(start.date(), datetime.min.time())
+
+        # Découpage: début de semaine incomplet, semaines complètes, fin incomplète
+        head = min((7 - start.weekday()) % 7, horizon_days)
+        full_weeks = (horizon_days - head) // 7
+        tail = horizon_days - head - 7 * full_weeks
+        monday = start + timedelta(days=head)
+        monday_phase = (phase + head) % length
+
+        # Segments (nombre d'occurrences, profil), chacun contenu dans une seule semaine ISO
+        segments: List[Tuple[int, CycleProfile]] = []
+        if head:
+            segments.append((1, self._profile(pattern, start, phase, head)))
+        if tail:
+            tail_start = monday + timedelta(weeks=full_weeks)
+            segments.append((1, self._profile(pattern, tail_start, (monday_phase + 7 * full_weeks) % length,
+                                              tail)))
+
+        # Semaines touchées par un changement d'heure (un shift de nuit peut commencer la veille)
+        exceptions = set()
+        if full_weeks:
+            body_end = monday + timedelta(weeks=full_weeks)
+            for transition in transitions_between(monday, body_end):
+                for day in (transition.start - timedelta(days=1), transition.start):
+                    week = (day - monday).days // 7
+                    if 0 <= week < full_weeks:
+                        exceptions.add(week)
+            # Jours fériés: la semaine du jour et celle de la veille (shift de nuit)
+            for holiday in self.calculator.rules.holidays_between(monday.toordinal(), body_end.toordinal()):
+                for ordinal in (holiday - 1, holiday):
+                    week = (ordinal - monday.toordinal()) // 7
+                    if 0 <= week < full_weeks:
+                        exceptions.add(week)
+        for week in sorted(exceptions):
+            segments.append((1, self._profile(pattern, monday + timedelta(weeks=week),
+                                              (monday_phase + 7 * week) % length, 7)))
+
+        # Semaines types: la phase du lundi revient toutes les `period` semaines
+        period = length // gcd(length, 7)
+        repeats, extra = divmod(full_weeks, period)
+        skipped = [0] * period
+        for week in exceptions:
+            skipped[week % period] += 1
+        for j in range(min(period, full_weeks)):
+            count = repeats + (1 if j < extra else 0) - skipped[j]
+            if count:
+                segments.append((count, self._profile(pattern, REFERENCE_MONDAY,
+                                                      (monday_phase + 7 * j) % length, 7)))
+
+        result = ScenarioResult(name, hourly_rate)
+        total = result.total_breakdown
+        overtime_pay = 0.0
+        for count, profile in segments:
+            bd = profile.breakdown
+            total.normal_hours += count * bd.normal_hours
+            total.night_hours += count * bd.night_hours
+            total.sunday_hours += count * bd.sunday_hours
+            total.night_sunday_hours += count * bd.night_sunday_hours
+            if self.calculator.weekly_overtime:
+                first, second, pay = WeeklyOvertime.premium(
+                    sum(hours for _, hours in profile.week_hours), hourly_rate)
+                total.overtime_25_hours += count * first
+                total.overtime_50_hours += count * second
+                overtime_pay += count * pay
+
+        _, result.total_bonus, result.total_pay = self.calculator.price_breakdown(total, hourly_rate)
+        result.total_pay += overtime_pay
+        result.total_bonus += overtime_pay
+        result.total_overtime_pay = overtime_pay
+
+        return result
+
+    def compare(self, patterns: Iterable[RotationPattern], start_dates: Iterable[datetime],
+                horizons: Iterable[int], hourly_rate: float,
+                phases: Iterable[int] = (0,)) -> ComparisonResult:
+        """
+        Classe toutes les combinaisons motif × date de début × horizon × phase.
+
+        Args:
+            patterns: Motifs de rotation
+            start_dates: Dates de début
+            horizons: Nombres de jours calendaires
+            hourly_rate: Taux horaire de base
+            phases: Jours du cycle par lesquels commencer
+
+        Returns:
+            ComparisonResult (à formater avec detailed=False)
+        """
+        results = [
+            self.project(pattern, start, horizon_days, hourly_rate, phase)
+            for pattern, start, horizon_days, phase in product(patterns, start_dates, horizons, phases)
+        ]
+        return ComparisonResult(results)
+
+    def clear(self):
+        """Vide le cache des cycles"""
+        self._cycles.clear()
+        self.hits = self.misses = 0
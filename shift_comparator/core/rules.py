@@ -0,0 +1,464 @@
+"""
+Règles de majoration déclaratives (fichier JSON ou TOML versionné).
+
+Un fichier de règles décrit les horaires des shifts, les plages de nuit, les
+jours majorés (dimanche par défaut, jours fériés), les taux de majoration et
+leur cumul quand une heure est à la fois de nuit et du dimanche. Il est
+validé puis compilé au chargement:
+
+- les plages de nuit deviennent un tableau par minute de la journée et ses
+  sommes cumulées;
+- pour chaque type de shift, les heures par catégorie sont précalculées selon
+  que le jour du shift et le lendemain sont majorés ou non (4 cas).
+
+Décomposer un shift revient alors à lire une entrée de table; seule
+l'éventuelle heure sautée ou doublée d'un changement d'heure est corrigée à
+part. Un PremiumRules est immuable: recharger un fichier en crée un nouveau,
+substitué d'un bloc à l'ancien (voir RulesFile).
+
+Les horaires des shifts d'un fichier ne modifient aucun état global: les
+WorkDay gardent les horaires livrés avec le code, et le calculateur, le
+validateur et la chronologie d'effectifs qui reçoivent ces règles en lisent
+les horaires (work_day_span).
+
+Exemple (TOML):
+
+    version = "2026-10"
+    stacking = "additive"
+    night_bonus = 0.15
+    sunday_bonus = 0.25
+    premium_weekdays = [6]
+    holidays = ["2026-11-01", "2026-12-25"]
+    night_windows = [["21:00", "06:00"]]
+
+    [shifts]
+    MATIN = ["06:00", "15:00"]
+    APRES_MIDI = ["14:00", "23:00"]
+    NUIT = ["22:00", "07:00"]
+"""
+import hashlib
+import json
+import os
+import threading
+from array import array
+from bisect import bisect_left, bisect_right
+from datetime import datetime, time, timedelta
+from typing import Dict, Iterable, List, Optional, Sequence, Tuple
+
+from ..models import ShiftType, ShiftDefinition
+
+
+# Horaires livrés avec le code (avant tout fichier de règles)
+DEFAULT_SHIFT_HOURS = dict(ShiftDefinition.SHIFT_HOURS)
+
+# Clés acceptées dans un fichier de règles
+RULE_KEYS = ('version', 'shifts', 'night_windows', 'night_bonus', 'sunday_bonus',
+             'premium_weekdays', 'holidays', 'stacking')
+
+
+class RulesValidationError(ValueError):
+    """Fichier ou dictionnaire de règles invalide"""
+
+
+def _parse_time(value, field: str) -> time:
+    """Heure 'HH:MM' d'un fichier de règles"""
+    try:
+        return datetime.strptime(str(value), '%H:%M').time()
+    except ValueError:
+        raise RulesValidationError(f"{field}: heure invalide {value!r} (attendu HH:MM)")
+
+
+def _minutes(t: time) -> int:
+    return t.hour * 60 + t.minute
+
+
+def _list(data: Dict, field: str, default) -> list:
+    """Valeur d'une clé de liste d'un fichier de règles"""
+    value = data.get(field, default)
+    if not isinstance(value, (list, tuple)):
+        raise RulesValidationError(f"{field}: liste attendue, {type(value).__name__} reçu")
+    return value
+
+
+def _window(value, field: str) -> Tuple[time, time]:
+    """Plage [début, fin] d'un fichier de règles"""
+    if not isinstance(value, (list, tuple)) or len(value) != 2:
+        raise RulesValidationError(f"{field}: [début, fin] attendu, {value!r} reçu")
+    return _parse_time(value[0], field), _parse_time(value[1], field)
+
+
+def _bonus(value, field: str) -> float:
+    if isinstance(value, bool) or not isinstance(value, (int, float)) or not 0 <= value <= 10:
+        raise RulesValidationError(f"{field}: majoration invalide {value!r}")
+    return float(value)
+
+
+class PremiumRules:
+    """Règles de majoration validées et compilées en tables de consultation"""
+
+    # Cumul des majorations de nuit et du dimanche sur une même heure
+    STACKING = ('additive', 'max')
+
+    def __init__(self, version: str, shift_hours: Dict[ShiftType, Tuple[time, time]] = None,
+                 night_windows: Sequence[Tuple[time, time]] = ((time(21, 0), time(6, 0)),),
+                 night_bonus: float = 0.15, sunday_bonus: float = 0.25,
+                 premium_weekdays: Iterable[int] = (6,), holidays: Iterable = (),
+                 stacking: str = 'additive'):
+        """
+        Args:
+            version: Version des règles (reprise dans les clés de cache)
+            shift_hours: Type de shift -> (début, fin), DEFAULT_SHIFT_HOURS si None;
+                         une fin avant le début se termine le lendemain
+            night_windows: Plages de nuit (début, fin), pouvant traverser minuit
+            night_bonus: Majoration de nuit (ex: 0.15)
+            sunday_bonus: Majoration du dimanche et des jours fériés (ex: 0.25)
+            premium_weekdays: Jours majorés comme le dimanche (0 = lundi ... 6 = dimanche)
+            holidays: Jours fériés (date ou datetime), payés comme le dimanche
+            stacking: 'additive' (nuit + dimanche) ou 'max' (la plus forte des deux)
+
+        Raises:
+            RulesValidationError: Si une règle est invalide
+        """
+        if not isinstance(version, str) or not version:
+            raise RulesValidationError("version: chaîne non vide attendue")
+        if stacking not in self.STACKING:
+            raise RulesValidationError(f"stacking: {stacking!r} (attendu: {', '.join(self.STACKING)})")
+        shift_hours = dict(DEFAULT_SHIFT_HOURS if shift_hours is None else shift_hours)
+        missing = [s.name for s in ShiftType if s not in shift_hours]
+        if missing:
+            raise RulesValidationError(f"shifts: horaires manquants pour {', '.join(missing)}")
+        for shift_type, (start, end) in shift_hours.items():
+            if start == end:
+                raise RulesValidationError(f"shifts: {shift_type.name} de durée nulle")
+        night_windows = tuple(night_windows)
+        if any(start == end for start, end in night_windows):
+            raise RulesValidationError("night_windows: plage de nuit de durée nulle")
+        premium_weekdays = frozenset(premium_weekdays)
+        if not premium_weekdays <= set(range(7)):
+            raise RulesValidationError(f"premium_weekdays: jours entre 0 et 6 attendus, {sorted(premium_weekdays)}")
+
+        self.version = version
+        self.shift_hours = shift_hours
+        self._default_hours = shift_hours == DEFAULT_SHIFT_HOURS  # Horaires des WorkDay
+        self.night_windows = night_windows
+        self.night_bonus = _bonus(night_bonus, 'night_bonus')
+        self.sunday_bonus = _bonus(sunday_bonus, 'sunday_bonus')
+        self.premium_weekdays = premium_weekdays
+        self.holidays = frozenset(day.toordinal() for day in holidays)
+        self._sorted_holidays = sorted(self.holidays)
+        self.stacking = stacking
+
+        self._compile()
+        canonical = json.dumps(self.to_dict(), sort_keys=True)
+        self.fingerprint = hashlib.sha256(canonical.encode('utf-8')).hexdigest()[:16]
+
+    def _compile(self):
+        """Précalcule les minutes de nuit et les heures par catégorie de chaque shift"""
+        night = bytearray(1440)
+        for start, end in self.night_windows:
+            a, b = _minutes(start), _minutes(end)
+            for minute in (range(a, b) if a < b else list(range(a, 1440)) + list(range(b))):
+                night[minute] = 1
+        self._night_minute = bytes(night)
+        cumulated = array('l', [0])
+        for flag in night:
+            cumulated.append(cumulated[-1] + flag)
+
+        # Jour de la semaine (0 = lundi) -> majoré comme le dimanche
+        self._premium_weekday = tuple(weekday in self.premium_weekdays for weekday in range(7))
+
+        # (type, jour majoré, lendemain majoré) -> (normales, nuit, dimanche, nuit et dimanche)
+        self._table: Dict[Tuple[ShiftType, bool, bool], Tuple[float, float, float, float]] = {}
+        for shift_type, (start, end) in self.shift_hours.items():
+            a, b = _minutes(start), _minutes(end)
+            if b <= a:
+                b += 1440
+            # (minutes travaillées, minutes de nuit) le jour du shift puis le lendemain
+            parts = []
+            for lo, hi in ((a, min(b, 1440)), (max(a, 1440) - 1440, b - 1440)):
+                hi = max(hi, lo)
+                parts.append((hi - lo, cumulated[hi] - cumulated[lo]))
+            for today in (False, True):
+                for tomorrow in (False, True):
+                    hours = [0.0, 0.0, 0.0, 0.0]
+                    for (worked, nights), premium in zip(parts, (today, tomorrow)):
+                        hours[2 if premium else 0] += (worked - nights) / 60
+                        hours[3 if premium else 1] += nights / 60
+                    self._table[shift_type, today, tomorrow] = tuple(hours)
+
+    def is_premium_day(self, ordinal: int) -> bool:
+        """Indique si un jour (ordinal) est majoré comme le dimanche"""
+        return self._premium_weekday[(ordinal - 1) % 7] or ordinal in self.holidays
+
+    def shift_hours_by_category(self, shift_type: ShiftType, day) -> Tuple[float, float, float, float]:
+        """
+        Heures d'un shift par catégorie, hors changement d'heure (lecture de table).
+
+        Args:
+            shift_type: Type de shift
+            day: Jour du shift (date ou datetime)
+
+        Returns:
+            Tuple (normales, nuit, dimanche, nuit et dimanche)
+        """
+        ordinal = day.toordinal()
+        return self._table[shift_type, self.is_premium_day(ordinal), self.is_premium_day(ordinal + 1)]
+
+    def weekday_hours(self, shift_type: ShiftType, weekday: int) -> Tuple[float, float, float, float]:
+        """Heures par catégorie d'un shift selon le jour de la semaine (0 = lundi), hors jours fériés"""
+        premium = self._premium_weekday
+        return self._table[shift_type, premium[weekday], premium[(weekday + 1) % 7]]
+
+    def holidays_between(self, first_ordinal: int, last_ordinal: int) -> list:
+        """Jours fériés (ordinaux triés) entre deux jours inclus"""
+        holidays = self._sorted_holidays
+        return holidays[bisect_left(holidays, first_ordinal):bisect_right(holidays, last_ordinal)]
+
+    def category(self, dt: datetime) -> int:
+        """
+        Catégorie d'une heure locale.
+
+        Returns:
+            0 (normale), 1 (nuit), 2 (dimanche) ou 3 (nuit et dimanche)
+        """
+        night = self._night_minute[dt.hour * 60 + dt.minute]
+        return night + (2 if self.is_premium_day(dt.toordinal()) else 0)
+
+    def span_hours(self, start: datetime, end: datetime) -> List[float]:
+        """
+        Heures par catégorie entre deux heures locales d'un même jour, à la minute.
+
+        Sert à l'heure sautée ou doublée d'un changement d'heure, qu'une borne
+        de nuit à la demi-heure peut couper en deux.
+
+        Returns:
+            Liste de 4 durées en heures (normales, nuit, dimanche, nuit et dimanche)
+        """
+        minutes = [0] * 4
+        premium = 2 if self.is_premium_day(start.toordinal()) else 0
+        first = start.hour * 60 + start.minute
+        for minute in range(first, first + int((end - start).total_seconds() // 60)):
+            minutes[self._night_minute[minute] + premium] += 1
+        return [m / 60 for m in minutes]
+
+    def stacked_bonus(self, night_bonus: float, sunday_bonus: float) -> Tuple[float, float]:
+        """
+        Majoration d'une heure de nuit du dimanche, répartie entre nuit et dimanche.
+
+        Args:
+            night_bonus: Majoration de nuit applicable
+            sunday_bonus: Majoration du dimanche applicable
+
+        Returns:
+            Tuple (part de nuit, part du dimanche); leur somme est la majoration payée
+        """
+        if self.stacking == 'additive':
+            return night_bonus, sunday_bonus
+        return (night_bonus, 0.0) if night_bonus >= sunday_bonus else (0.0, sunday_bonus)
+
+    def key(self) -> Tuple[str, str]:
+        """Tuple hachable (version, empreinte du contenu) pour les clés de cache"""
+        return self.version, self.fingerprint
+
+    @property
+    def signature(self) -> str:
+        """Version et empreinte en une chaîne (en-têtes de fichiers, réponses de l'API)"""
+        return f"{self.version}#{self.fingerprint}"
+
+    def work_day_span(self, work_day) -> Tuple[datetime, datetime]:
+        """
+        Début et fin d'un shift selon les horaires de ces règles.
+
+        Args:
+            work_day: WorkDay (seuls sa date et son type de shift sont lus)
+
+        Returns:
+            Tuple (début, fin) en heure locale; la fin est le lendemain si le shift traverse minuit
+        """
+        if self._default_hours:
+            return work_day.start_datetime, work_day.end_datetime
+        start, end = self.shift_hours[work_day.shift_type]
+        day = work_day.date.date()
+        return (datetime.combine(day, start),
+                datetime.combine(day + timedelta(days=1) if end <= start else day, end))
+
+    @classmethod
+    def from_calculator(cls, calculator_class) -> 'PremiumRules':
+        """Règles intégrées, reprises des constantes d'une classe de calculateur"""
+        return cls('builtin', DEFAULT_SHIFT_HOURS,
+                   ((calculator_class.NIGHT_START, calculator_class.NIGHT_END),),
+                   calculator_class.NIGHT_BONUS, calculator_class.SUNDAY_BONUS)
+
+    @classmethod
+    def from_dict(cls, data: Dict) -> 'PremiumRules':
+        """
+        Valide et compile des règles lues d'un fichier.
+
+        Args:
+            data: Dictionnaire (voir l'exemple du module); seule 'version' est obligatoire
+
+        Returns:
+            PremiumRules
+
+        Raises:
+            RulesValidationError: Si une clé est inconnue ou une valeur invalide
+        """
+        if not isinstance(data, dict):
+            raise RulesValidationError("Les règles doivent être un objet")
+        unknown = sorted(set(data) - set(RULE_KEYS))
+        if unknown:
+            raise RulesValidationError(f"Clés inconnues: {', '.join(unknown)}")
+
+        shift_hours = None
+        if 'shifts' in data:
+            if not isinstance(data['shifts'], dict):
+                raise RulesValidationError(f"shifts: objet attendu, {type(data['shifts']).__name__} reçu")
+            shift_hours = {}
+            for name, hours in data['shifts'].items():
+                if name not in ShiftType.__members__:
+                    raise RulesValidationError(f"shifts: type de shift inconnu {name!r}")
+                shift_hours[ShiftType[name]] = _window(hours, f"shifts.{name}")
+
+        windows = [_window(window, 'night_windows')
+                   for window in _list(data, 'night_windows', [["21:00", "06:00"]])]
+
+        holidays = []
+        for value in _list(data, 'holidays', []):
+            try:
+                holidays.append(datetime.strptime(str(value), '%Y-%m-%d'))
+            except ValueError:
+                raise RulesValidationError(f"holidays: date invalide {value!r} (attendu AAAA-MM-JJ)")
+
+        weekdays = _list(data, 'premium_weekdays', [6])
+        if not all(isinstance(day, int) and not isinstance(day, bool) for day in weekdays):
+            raise RulesValidationError("premium_weekdays: entiers attendus")
+
+        return cls(data.get('version'), shift_hours, windows,
+                   data.get('night_bonus', 0.15), data.get('sunday_bonus', 0.25),
+                   weekdays, holidays, data.get('stacking', 'additive'))
+
+    @classmethod
+    def load(cls, path: str) -> 'PremiumRules':
+        """
+        Charge un fichier de règles (.toml, sinon JSON).
+
+        Raises:
+            OSError: Si le fichier est illisible
+            RulesValidationError: Si le fichier est mal formé ou les règles invalides
+        """
+        with open(path, 'rb') as f:
+            content = f.read()
+        try:
+            if path.endswith('.toml'):
+                import tomllib
+                data = tomllib.loads(content.decode('utf-8'))
+            else:
+                data = json.loads(content)
+        except ValueError as e:  # json.JSONDecodeError, tomllib.TOMLDecodeError, UnicodeDecodeError
+            raise RulesValidationError(f"{path}: {e}")
+        return cls.from_dict(data)
+
+    def to_dict(self) -> Dict:
+        """Sérialise les règles (format du fichier)"""
+        return {
+            'version': self.version,
+            'shifts': {s.name: [f"{start:%H:%M}", f"{end:%H:%M}"] for s, (start, end) in self.shift_hours.items()},
+            'night_windows': [[f"{start:%H:%M}", f"{end:%H:%M}"] for start, end in self.night_windows],
+            'night_bonus': self.night_bonus,
+            'sunday_bonus': self.sunday_bonus,
+            'premium_weekdays': sorted(self.premium_weekdays),
+            'holidays': [datetime.fromordinal(o).strftime('%Y-%m-%d') for o in sorted(self.holidays)],
+            'stacking': self.stacking,
+        }
+
+    def __repr__(self):
+        return f"PremiumRules({self.signature}, {self.stacking}, {len(self.holidays)} jours fériés)"
+
+
+class RulesFile:
+    """
+    Fichier de règles surveillé: rechargé quand sa date de modification change.
+
+    Un fichier invalide est refusé et les règles en cours restent en place.
+    """
+
+    # Intervalle minimal entre deux vérifications de la date de modification (secondes)
+    CHECK_INTERVAL = 5.0
+
+    def __init__(self, path: str, check_interval: float = None):
+        """
+        Args:
+            path: Chemin du fichier (.json ou .toml)
+            check_interval: Secondes entre deux vérifications (CHECK_INTERVAL par défaut)
+        """
+        self.path = path
+        self.check_interval = self.CHECK_INTERVAL if check_interval is None else check_interval
+        self.error: Optional[str] = None  # Dernière erreur de chargement
+        self._mtime = None
+        self._checked = 0.0
+        self._lock = threading.Lock()
+
+    @classmethod
+    def from_env(cls, environ=None) -> Optional['RulesFile']:
+        """
+        Fichier de règles selon les variables d'environnement.
+
+        - SHIFT_RULES_FILE: chemin du fichier (aucun: règles intégrées)
+        - SHIFT_RULES_CHECK: secondes entre deux vérifications (5 par défaut)
+
+        Returns:
+            RulesFile, ou None sans SHIFT_RULES_FILE
+        """
+        environ = os.environ if environ is None else environ
+        path = environ.get('SHIFT_RULES_FILE')
+        if not path:
+            return None
+        return cls(path, float(environ.get('SHIFT_RULES_CHECK', cls.CHECK_INTERVAL)))
+
+    def load(self) -> PremiumRules:
+        """
+        Charge le fichier sans condition.
+
+        Raises:
+            OSError, RulesValidationError: Si le fichier est illisible ou invalide
+        """
+        with self._lock:
+            return self._load()
+
+    def _load(self) -> PremiumRules:
+        try:
+            mtime = os.stat(self.path).st_mtime_ns
+            rules = PremiumRules.load(self.path)
+        except (OSError, RulesValidationError) as e:
+            self.error = str(e)
+            raise
+        self._mtime, self.error = mtime, None
+        return rules
+
+    def poll(self, now: float) -> Optional[PremiumRules]:
+        """
+        Recharge le fichier s'il a changé depuis le dernier chargement.
+
+        Un seul appelant vérifie à la fois; les autres repartent aussitôt.
+
+        Args:
+            now: Horloge monotone (time.monotonic()), pour espacer les vérifications
+
+        Returns:
+            Nouvelles règles, ou None si le fichier est inchangé, invalide ou pas encore à vérifier
+        """
+        if now - self._checked < self.check_interval or not self._lock.acquire(blocking=False):
+            return None
+        try:
+            self._checked = now
+            if os.stat(self.path).st_mtime_ns == self._mtime:
+                return None
+            return self._load()
+        except (OSError, RulesValidationError) as e:
+            self.error = str(e)  # Règles en cours conservées
+            return None
+        finally:
+            self._lock.release()
+
+    def __repr__(self):
+        return f"RulesFile({self.path})"
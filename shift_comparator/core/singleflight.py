@@ -0,0 +1,133 @@
+"""
+Regroupement des calculs identiques simultanés (single-flight).
+
+Quand plusieurs requêtes demandent en même temps le même calcul (même clé
+canonique), une seule l'exécute; les autres attendent son résultat et le
+partagent. Une erreur du calcul est propagée à toutes les requêtes en
+attente. Rien n'est mis en cache: dès que le calcul est terminé, la requête
+suivante recalcule.
+"""
+import threading
+from typing import Callable, Dict, Hashable, Tuple
+
+
+class SingleFlightTimeout(Exception):
+    """Le calcul partagé n'a pas répondu à temps"""
+
+
+class _Call:
+    """Calcul en cours, partagé par les requêtes de même clé"""
+
+    __slots__ = ('event', 'result', 'error', 'waiters')
+
+    def __init__(self):
+        self.event = threading.Event()
+        self.result = None
+        self.error = None
+        self.waiters = 0
+
+
+def scenario_key(scenario, rules=None) -> Tuple:
+    """
+    Clé canonique d'un scénario: tout ce dont dépend son calcul.
+
+    Args:
+        scenario: Scenario
+        rules: PremiumRules du calculateur (leur version et leur empreinte entrent dans la clé)
+
+    Returns:
+        Tuple hachable (nom, taux horaire, (ordinal, shift)...), ou (ordinal, shift, longueur)
+        par séquence pour un scénario en séquences (son résultat est détaillé par séquence);
+        le taux est complété par l'historique de taux du scénario s'il en a un,
+        et la clé par celle des règles si elles sont fournies
+    """
+    rates = getattr(scenario, 'rates', None)
+    rate = float(scenario.hourly_rate) if rates is None else (float(scenario.hourly_rate), rates.key())
+    rules_key = rules.key() if rules is not None else None
+    runs = getattr(scenario, 'runs', None)
+    if runs is not None:
+        return (scenario.name, rate, rules_key, 'runs',
+                tuple((run.start.toordinal(), run.shift_type.name, run.length) for run in runs))
+    return (scenario.name, rate, rules_key,
+            tuple((wd.date.toordinal(), wd.shift_type.name) for wd in scenario.work_days))
+
+
+class SingleFlight:
+    """Exécute une seule fois les calculs identiques simultanés"""
+
+    def __init__(self, timeout: float = 30.0):
+        """
+        Args:
+            timeout: Attente maximale du résultat d'un calcul partagé, en secondes
+                     (None pour attendre sans limite)
+        """
+        self.timeout = timeout
+        self._lock = threading.Lock()
+        self._calls: Dict[Hashable, _Call] = {}
+
+        # Compteurs
+        self.computed = 0  # Calculs réellement exécutés
+        self.shared = 0  # Requêtes servies par un calcul déjà en cours
+        self.errors = 0  # Calculs terminés en erreur
+        self.timeouts = 0  # Requêtes abandonnées après timeout
+
+    def do(self, key: Hashable, func: Callable, timeout: float = None):
+        """
+        Exécute func, ou attend le résultat du même calcul déjà en cours.
+
+        Args:
+            key: Clé canonique des entrées du calcul
+            func: Fonction sans argument qui réalise le calcul
+            timeout: Attente maximale (self.timeout par défaut)
+
+        Returns:
+            Résultat de func (partagé entre les requêtes de même clé)
+
+        Raises:
+            SingleFlightTimeout: Si le calcul partagé dépasse le délai
+            Exception: L'erreur levée par func, pour toutes les requêtes en attente
+        """
+        with self._lock:
+            call = self._calls.get(key)
+            leader = call is None
+            if leader:
+                call = self._calls[key] = _Call()
+                self.computed += 1
+            else:
+                call.waiters += 1
+                self.shared += 1
+
+        if leader:
+            try:
+                call.result = func()
+            except Exception as e:
+                call.error = e
+                with self._lock:
+                    self.errors += 1
+            finally:
+                with self._lock:
+                    del self._calls[key]
+                call.event.set()
+        else:
+            if not call.event.wait(self.timeout if timeout is None else timeout):
+                with self._lock:
+                    self.timeouts += 1
+                raise SingleFlightTimeout("Le calcul partagé n'a pas répondu à temps")
+
+        if call.error is not None:
+            raise call.error
+        return call.result
+
+    def in_flight(self) -> int:
+        """Nombre de calculs en cours"""
+        return len(self._calls)
+
+    def stats(self) -> Dict[str, int]:
+        """Compteurs (ex: pour JSON)"""
+        return {
+            'computed': self.computed,
+            'shared': self.shared,
+            'errors': self.errors,
+            'timeouts': self.timeouts,
+            'in_flight': self.in_flight(),
+        }
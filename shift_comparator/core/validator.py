@@ -0,0 +1,287 @@
+"""
+Validation des plannings: repos quotidien et hebdomadaire, jours consécutifs, chevauchements.
+
+Les shifts sont triés une fois par heure de début (index d'intervalles),
+puis toutes les règles sont vérifiées en un seul parcours: O(n log n) pour
+l'ensemble du planning.
+
+Pour savoir si un shift peut être ajouté à un planning (can_add), seuls ses
+voisins sont examinés: shifts précédent et suivant par bisect, jours
+travaillés autour de sa date, et les semaines qu'il touche.
+"""
+from bisect import bisect_left, bisect_right
+from datetime import datetime, timedelta
+from typing import Callable, Dict, List, Sequence
+
+from .overtime import week_key
+
+
+def _work_day_span(work_day) -> tuple:
+    """Début et fin d'un shift selon les horaires du WorkDay"""
+    return work_day.start_datetime, work_day.end_datetime
+
+
+def _label(work_day) -> str:
+    """Libellé court d'un shift ('APRES_MIDI du 13/01/2026')"""
+    return f"{work_day.shift_type.value} du {work_day.date.strftime('%d/%m/%Y')}"
+
+
+class Violation:
+    """Règle non respectée, avec sa localisation dans le planning"""
+
+    def __init__(self, rule: str, message: str, positions: List[int], dates: List[datetime]):
+        """
+        Args:
+            rule: Code de la règle ('overlap', 'daily_rest', 'weekly_rest', 'consecutive_days')
+            message: Description lisible
+            positions: Indices des shifts concernés dans scenario.work_days
+            dates: Dates des shifts concernés
+        """
+        self.rule = rule
+        self.message = message
+        self.positions = positions
+        self.dates = dates
+
+    def to_dict(self) -> Dict:
+        """Sérialise la violation (ex: pour JSON)"""
+        return {
+            'rule': self.rule,
+            'message': self.message,
+            'positions': self.positions,
+            'dates': [d.strftime('%Y-%m-%d') for d in self.dates],
+        }
+
+    def __repr__(self):
+        return f"Violation({self.rule}, {self.message})"
+
+
+class ScheduleValidationError(ValueError):
+    """Planning qui ne respecte pas les règles de repos"""
+
+    def __init__(self, violations: List[Violation]):
+        self.violations = violations
+        details = "; ".join(v.message for v in violations[:5])
+        more = f" (+{len(violations) - 5} autres)" if len(violations) > 5 else ""
+        super().__init__(f"Planning invalide: {details}{more}")
+
+
+class IntervalIndex:
+    """Shifts d'un planning triés par heure de début"""
+
+    def __init__(self, work_days: Sequence, span: Callable = _work_day_span):
+        """
+        Args:
+            work_days: Liste de WorkDay (dans n'importe quel ordre)
+            span: Fonction WorkDay -> (début, fin) (horaires du WorkDay par défaut)
+        """
+        self.work_days = work_days
+        self.spans = [span(wd) for wd in work_days]
+        self.order = sorted(range(len(work_days)), key=self.spans.__getitem__)
+
+    def __iter__(self):
+        """Itère sur (position, début, fin) dans l'ordre chronologique"""
+        for position in self.order:
+            start, end = self.spans[position]
+            yield position, start, end
+
+
+class ScheduleIndex:
+    """Planning existant indexé pour tester rapidement l'ajout d'un shift"""
+
+    def __init__(self, work_days: Sequence, span: Callable = _work_day_span):
+        """
+        Args:
+            work_days: Liste de WorkDay (dans n'importe quel ordre)
+            span: Fonction WorkDay -> (début, fin) (horaires du WorkDay par défaut)
+        """
+        index = IntervalIndex(work_days, span)
+        self.work_days = [work_days[position] for position in index.order]
+        self.starts = [index.spans[position][0] for position in index.order]
+        self.ends = [index.spans[position][1] for position in index.order]
+        self.ordinals = {wd.date.toordinal() for wd in self.work_days}
+
+    def around(self, start: datetime, end: datetime) -> List:
+        """Shifts qui commencent entre start et end"""
+        return self.work_days[bisect_left(self.starts, start):bisect_right(self.starts, end)]
+
+
+class ScheduleValidator:
+    """Vérifie les règles de repos d'un planning"""
+
+    MIN_DAILY_REST_HOURS = 11.0  # Repos quotidien entre deux shifts
+    MIN_WEEKLY_REST_HOURS = 35.0  # Repos hebdomadaire (24h + 11h)
+    MAX_CONSECUTIVE_DAYS = 6  # Jours travaillés d'affilée
+
+    def __init__(self, min_daily_rest_hours: float = None, min_weekly_rest_hours: float = None,
+                 max_consecutive_days: int = None, rules=None):
+        """
+        Args:
+            min_daily_rest_hours: Repos minimum entre deux shifts (11h par défaut)
+            min_weekly_rest_hours: Repos minimum par semaine ISO (35h par défaut)
+            max_consecutive_days: Jours travaillés consécutifs maximum (6 par défaut)
+            rules: PremiumRules dont les horaires des shifts font foi (horaires des WorkDay si None)
+        """
+        self.min_daily_rest = timedelta(hours=self.MIN_DAILY_REST_HOURS
+                                        if min_daily_rest_hours is None else min_daily_rest_hours)
+        self.min_weekly_rest = timedelta(hours=self.MIN_WEEKLY_REST_HOURS
+                                         if min_weekly_rest_hours is None else min_weekly_rest_hours)
+        self.max_consecutive_days = (self.MAX_CONSECUTIVE_DAYS
+                                     if max_consecutive_days is None else max_consecutive_days)
+        self.span = rules.work_day_span if rules is not None else _work_day_span
+
+    def index(self, work_days: Sequence) -> ScheduleIndex:
+        """Planning indexé pour can_add, avec les horaires de ce validateur"""
+        return ScheduleIndex(work_days, self.span)
+
+    def validate(self, scenario) -> List[Violation]:
+        """
+        Vérifie toutes les règles sur un scénario.
+
+        Args:
+            scenario: Scenario (ou liste de WorkDay)
+
+        Returns:
+            Liste des violations (vide si le planning est valide)
+        """
+        work_days = getattr(scenario, 'work_days', scenario)
+        index = IntervalIndex(work_days, self.span)
+
+        violations = self._check_rests_and_overlaps(index)
+        violations += self._check_consecutive_days(index)
+        return violations
+
+    def can_add(self, schedule: ScheduleIndex, work_day) -> bool:
+        """
+        Indique si un shift peut s'ajouter à un planning sans enfreindre les règles.
+
+        Seuls les voisins du shift sont examinés: le coût ne dépend pas de la
+        longueur du planning. Une semaine déjà en défaut reste refusée.
+
+        Args:
+            schedule: Planning existant (voir index)
+            work_day: Shift à ajouter
+
+        Returns:
+            True si le planning complété reste valide autour du shift
+        """
+        start, end = self.span(work_day)
+
+        # Chevauchement et repos quotidien: shifts précédent et suivant
+        i = bisect_left(schedule.starts, start)
+        if i > 0 and schedule.ends[i - 1] + self.min_daily_rest > start:
+            return False
+        if i < len(schedule.starts) and end + self.min_daily_rest > schedule.starts[i]:
+            return False
+
+        # Jours consécutifs: série de jours travaillés autour de la date
+        ordinal = work_day.date.toordinal()
+        streak = 1
+        for step in (-1, 1):
+            day = ordinal + step
+            while day in schedule.ordinals and streak <= self.max_consecutive_days:
+                streak += 1
+                day += step
+        if streak > self.max_consecutive_days:
+            return False
+
+        # Repos hebdomadaire: les semaines touchées, avec une semaine de marge de chaque côté
+        monday = datetime.combine((start - timedelta(days=start.weekday())).date(), datetime.min.time())
+        neighbours = schedule.around(monday - timedelta(days=8), monday + timedelta(days=15))
+        weeks = {week_key(start), week_key(end)}
+        for violation in self._check_rests_and_overlaps(IntervalIndex(neighbours + [work_day], self.span)):
+            if violation.rule == 'weekly_rest' and week_key(violation.dates[0]) in weeks:
+                return False
+        return True
+
+    def _check_rests_and_overlaps(self, index: IntervalIndex) -> List[Violation]:
+        """Chevauchements, repos quotidien et repos hebdomadaire en un seul parcours"""
+        violations = []
+        work_days = index.work_days
+
+        last_position = None  # Shift qui se termine le plus tard jusqu'ici
+        last_end = None
+        weekly_rest = {}  # Semaine travaillée -> plus long repos qui la touche
+        worked_weeks = []
+
+        for position, start, end in index:
+            week = week_key(start)
+            if week not in weekly_rest:
+                weekly_rest[week] = timedelta(0)
+                worked_weeks.append((week, position))
+
+            if last_end is None:
+                # Pas de shift connu avant le premier: repos considéré suffisant
+                weekly_rest[week] = self.min_weekly_rest
+            elif start < last_end:
+                violations.append(Violation(
+                    'overlap',
+                    f"Chevauchement: {_label(work_days[last_position])} et {_label(work_days[position])}",
+                    [last_position, position],
+                    [work_days[last_position].date, work_days[position].date]))
+            else:
+                rest = start - last_end
+                if rest < self.min_daily_rest:
+                    violations.append(Violation(
+                        'daily_rest',
+                        f"Repos de {rest.total_seconds() / 3600:.1f}h entre "
+                        f"{_label(work_days[last_position])} et {_label(work_days[position])} "
+                        f"(minimum {self.min_daily_rest.total_seconds() / 3600:g}h)",
+                        [last_position, position],
+                        [work_days[last_position].date, work_days[position].date]))
+
+                # Un repos compte pour la semaine où il commence et celle où il finit
+                for rest_week in (week_key(last_end), week):
+                    if rest_week in weekly_rest and rest > weekly_rest[rest_week]:
+                        weekly_rest[rest_week] = rest
+
+            if last_end is None or end > last_end:
+                last_end, last_position = end, position
+
+        # Après le dernier shift: repos considéré suffisant
+        if last_end is not None:
+            weekly_rest[week_key(last_end)] = self.min_weekly_rest
+
+        for week, position in worked_weeks:
+            if weekly_rest[week] < self.min_weekly_rest:
+                iso_year, iso_week = week
+                violations.append(Violation(
+                    'weekly_rest',
+                    f"Semaine {iso_year}-W{iso_week:02d}: plus long repos de "
+                    f"{weekly_rest[week].total_seconds() / 3600:.1f}h "
+                    f"(minimum {self.min_weekly_rest.total_seconds() / 3600:g}h)",
+                    [position],
+                    [work_days[position].date]))
+
+        return violations
+
+    def _check_consecutive_days(self, index: IntervalIndex) -> List[Violation]:
+        """Séries de jours travaillés consécutifs trop longues"""
+        violations = []
+        work_days = index.work_days
+
+        streak_positions = []
+        previous_ordinal = None
+
+        def close_streak():
+            days = len({work_days[p].date.toordinal() for p in streak_positions})
+            if days > self.max_consecutive_days:
+                first, last = work_days[streak_positions[0]], work_days[streak_positions[-1]]
+                violations.append(Violation(
+                    'consecutive_days',
+                    f"{days} jours travaillés d'affilée du {first.date.strftime('%d/%m/%Y')} "
+                    f"au {last.date.strftime('%d/%m/%Y')} (maximum {self.max_consecutive_days})",
+                    list(streak_positions),
+                    [first.date, last.date]))
+
+        for position, _, _ in index:
+            ordinal = work_days[position].date.toordinal()
+            if previous_ordinal is not None and ordinal > previous_ordinal + 1:
+                close_streak()
+                streak_positions = []
+            streak_positions.append(position)
+            previous_ordinal = ordinal
+
+        if streak_positions:
+            close_streak()
+
+        return violations
@@ -0,0 +1,6 @@
+"""Test différentiel aléatoire des moteurs de calcul contre un moteur de référence"""
+from .reference import ReferenceEngine, METRICS
+from .harness import FuzzCase, FuzzReport, ENGINES, generate_case, check_case, minimize, fuzz, replay
+
+__all__ = ['ReferenceEngine', 'METRICS', 'FuzzCase', 'FuzzReport', 'ENGINES', 'generate_case', 'check_case',
+           'minimize', 'fuzz', 'replay']
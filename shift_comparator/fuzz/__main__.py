@@ -0,0 +1,69 @@
+"""
+Lanceur du test différentiel.
+
+Exemples:
+    python -m shift_comparator.fuzz --cases 500
+    python -m shift_comparator.fuzz --seconds 60 --seed 1000 --output desaccords.json
+    python -m shift_comparator.fuzz --replay desaccords.json
+"""
+import argparse
+import json
+import sys
+
+from .harness import ENGINES, TOLERANCE, fuzz, replay
+
+
+def main(argv=None) -> int:
+    """Lance une campagne (ou rejoue des reproducteurs) et retourne 1 en cas de désaccord"""
+    parser = argparse.ArgumentParser(description="Test différentiel des moteurs de calcul")
+    parser.add_argument('--cases', type=int, default=None,
+                        help="Nombre de cas tirés (200 par défaut sans --seconds)")
+    parser.add_argument('--seconds', type=float, default=None, help="Durée maximale en secondes")
+    parser.add_argument('--seed', type=int, default=0, help="Graine du premier cas")
+    parser.add_argument('--engine', action='append', choices=sorted(ENGINES), default=None,
+                        help="Moteur comparé (répétable, tous par défaut)")
+    parser.add_argument('--tolerance', type=float, default=TOLERANCE, help="Écart toléré")
+    parser.add_argument('--output', metavar='FICHIER', default=None,
+                        help="Enregistre les reproducteurs JSON des désaccords")
+    parser.add_argument('--replay', metavar='FICHIER', default=None,
+                        help="Rejoue les reproducteurs d'un fichier JSON")
+    args = parser.parse_args(argv)
+
+    engines = {name: ENGINES[name] for name in args.engine} if args.engine else None
+
+    if args.replay:
+        with open(args.replay, encoding='utf-8') as f:
+            reproducers = json.load(f)
+        remaining = 0
+        for reproducer in reproducers:
+            failures = replay(reproducer, engines, args.tolerance)
+            status = "✗" if failures else "✓"
+            print(f"{status} graine {reproducer.get('seed')}, moteur {reproducer.get('engine')}: "
+                  f"{failures or 'corrigé'}")
+            remaining += bool(failures)
+        return 1 if remaining else 0
+
+    cases = args.cases if args.cases is not None or args.seconds is not None else 200
+    report = fuzz(cases, args.seconds, args.seed, engines, args.tolerance)
+    print(f"{report.cases} cas, {report.shifts} shifts en {report.elapsed:.1f}s "
+          f"({report.shifts / max(report.elapsed, 1e-9):.0f} shifts/s)")
+
+    for failure in report.failures:
+        print(f"\n✗ Graine {failure['seed']}, moteur {failure['engine']} "
+              f"({failure['original_shifts']} → {len(failure['case']['shifts'])} shifts)")
+        for metric, values in failure['mismatches'].items():
+            print(f"  {metric}: {values}")
+        print(f"  {json.dumps(failure['case'], ensure_ascii=False)}")
+
+    if args.output and report.failures:
+        with open(args.output, 'w', encoding='utf-8') as f:
+            json.dump(report.failures, f, ensure_ascii=False, indent=2)
+        print(f"\nReproducteurs enregistrés dans {args.output}")
+
+    if report.ok:
+        print("✓ Aucun désaccord")
+    return 0 if report.ok else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,444 @@
+"""
+Test différentiel aléatoire: moteur de référence contre moteurs optimisés.
+
+Chaque cas tire au hasard des règles de majoration (horaires des shifts,
+plages de nuit, jours majorés, jours fériés, cumul), un planning (séquences
+de shifts, parfois une rotation), un taux ou un historique de taux, avec ou
+sans heures supplémentaires. Le cas est calculé par le moteur de référence
+puis par chaque moteur optimisé:
+
+- day: calculate_scenario jour par jour, sans table ni cache;
+- cached: table de profils et mémoïsation par WorkDay partagé (second calcul);
+- runs: séquences tarifées en forme fermée (calculate_run);
+- batch: PayrollAggregator jour par jour;
+- batch_runs: PayrollAggregator sur des séquences (morceaux tarifés par calculate_run);
+- range: RangeIndex (totaux de toute la période);
+- rotation_price, rotation_project: RotationPricer (cas de rotation sans historique de taux).
+
+Un écart au-delà de la tolérance est réduit à un cas minimal (moins de
+shifts, sans historique de taux, sans heures supplémentaires, règles par
+défaut... tant que l'écart persiste) et rendu sous forme de dictionnaire JSON
+rejouable (replay).
+"""
+import random
+import time
+from datetime import datetime, timedelta, time as dtime
+from typing import Callable, Dict, List, Optional, Tuple
+
+from ..models import (ShiftType, WorkDay, Scenario, RunScenario, EmployeeRoster, RatePeriod,
+                      RateSchedule, PATTERNS, compress_runs, intern_work_day)
+from ..core import ShiftCalculator, PayrollAggregator, RangeIndex, RotationPricer, PremiumProfileTable, PremiumRules
+from .reference import METRICS, ReferenceEngine
+
+
+# Tolérance par défaut (absolue, en heures ou en euros)
+TOLERANCE = 1e-6
+
+# Plage des dates tirées (changements d'heure et années bissextiles compris)
+FIRST_YEAR, LAST_YEAR = 2024, 2030
+
+_BONUSES = (0.0, 0.1, 0.15, 0.2, 0.25, 0.5, 1.0)
+
+
+class FuzzCase:
+    """Cas de test: règles, planning et taux"""
+
+    def __init__(self, rules: PremiumRules, shifts: List[Tuple[datetime, ShiftType]], hourly_rate: float,
+                 rates: RateSchedule = None, weekly_overtime: bool = True, rotation: tuple = None):
+        """
+        Args:
+            rules: Règles de majoration
+            shifts: Couples (jour, type de shift), sans doublon
+            hourly_rate: Taux horaire de base
+            rates: Historique de taux éventuel
+            weekly_overtime: Calculer les heures supplémentaires hebdomadaires
+            rotation: (nom du motif, premier jour, horizon, phase) si le planning est une rotation
+        """
+        self.rules = rules
+        self.shifts = shifts
+        self.hourly_rate = hourly_rate
+        self.rates = rates
+        self.weekly_overtime = weekly_overtime
+        self.rotation = rotation
+
+    def scenario(self, interned: bool = False) -> Scenario:
+        """Scénario du cas (WorkDay partagés si interned)"""
+        make = intern_work_day if interned else WorkDay
+        return Scenario("fuzz", [make(day, shift_type) for day, shift_type in self.shifts],
+                        self.hourly_rate, self.rates)
+
+    def replace(self, **changes) -> 'FuzzCase':
+        """Copie du cas avec certains champs remplacés"""
+        fields = dict(rules=self.rules, shifts=self.shifts, hourly_rate=self.hourly_rate, rates=self.rates,
+                      weekly_overtime=self.weekly_overtime, rotation=self.rotation)
+        fields.update(changes)
+        return FuzzCase(**fields)
+
+    def to_dict(self) -> Dict:
+        """Sérialise le cas (reproducteur JSON)"""
+        return {
+            'rules': self.rules.to_dict(),
+            'shifts': [[day.strftime('%Y-%m-%d'), shift_type.name] for day, shift_type in self.shifts],
+            'hourly_rate': self.hourly_rate,
+            'rates': self.rates.to_dicts() if self.rates is not None else None,
+            'weekly_overtime': self.weekly_overtime,
+            'rotation': ([self.rotation[0], self.rotation[1].strftime('%Y-%m-%d')] + list(self.rotation[2:])
+                         if self.rotation else None),
+        }
+
+    @classmethod
+    def from_dict(cls, data: Dict) -> 'FuzzCase':
+        """Reconstruit un cas sérialisé par to_dict"""
+        rates = None
+        if data.get('rates'):
+            rates = RateSchedule(RatePeriod(datetime.strptime(p['from'], '%Y-%m-%d'), p['hourly_rate'],
+                                            p['night_bonus'], p['sunday_bonus']) for p in data['rates'])
+        rotation = data.get('rotation')
+        if rotation:
+            rotation = (rotation[0], datetime.strptime(rotation[1], '%Y-%m-%d'), rotation[2], rotation[3])
+        return cls(PremiumRules.from_dict(data['rules']),
+                   [(datetime.strptime(day, '%Y-%m-%d'), ShiftType[name]) for day, name in data['shifts']],
+                   data['hourly_rate'], rates, data['weekly_overtime'], rotation)
+
+    def __repr__(self):
+        return (f"FuzzCase({len(self.shifts)} shifts, {self.rules.signature}, "
+                f"{'historique' if self.rates else f'{self.hourly_rate}€/h'})")
+
+
+def _random_rules(rng: random.Random, seed: int) -> PremiumRules:
+    """Règles tirées au hasard (bornes à la demi-heure), ou celles par défaut"""
+    if rng.random() < 0.25:
+        return PremiumRules(f"fuzz-{seed}")
+
+    def half_hour() -> dtime:
+        minutes = rng.randrange(48) * 30
+        return dtime(minutes // 60, minutes % 60)
+
+    shift_hours = {}
+    for shift_type in ShiftType:
+        start = half_hour()
+        duration = rng.randrange(8, 25) * 30  # 4h à 12h
+        minutes = (start.hour * 60 + start.minute + duration) % 1440
+        shift_hours[shift_type] = (start, dtime(minutes // 60, minutes % 60))
+    windows = []
+    for _ in range(rng.choice((1, 1, 2))):
+        start, end = half_hour(), half_hour()
+        if start != end:
+            windows.append((start, end))
+    weekdays = {6} if rng.random() < 0.6 else set(rng.sample(range(7), rng.randrange(0, 3)))
+    return PremiumRules(f"fuzz-{seed}", shift_hours, windows, rng.choice(_BONUSES), rng.choice(_BONUSES),
+                        weekdays, (), rng.choice(PremiumRules.STACKING))
+
+
+def _random_start(rng: random.Random) -> datetime:
+    """Premier jour, souvent juste avant un changement d'heure"""
+    year = rng.randrange(FIRST_YEAR, LAST_YEAR)
+    if rng.random() < 0.4:
+        month = rng.choice((3, 10))
+        return datetime(year, month, rng.randrange(15, 29))
+    return datetime(year, 1, 1) + timedelta(days=rng.randrange(330))
+
+
+def generate_case(rng: random.Random, seed: int = 0) -> FuzzCase:
+    """
+    Tire un cas au hasard.
+
+    Args:
+        rng: Générateur aléatoire
+        seed: Numéro du cas (version des règles générées)
+
+    Returns:
+        FuzzCase
+    """
+    rules = _random_rules(rng, seed)
+    start = _random_start(rng)
+    hourly_rate = round(rng.uniform(10, 40), 2)
+
+    rotation = None
+    if rng.random() < 0.2:
+        name = rng.choice(sorted(PATTERNS))
+        pattern = PATTERNS[name]
+        horizon, phase = rng.randrange(7, 120), rng.randrange(pattern.length)
+        rotation = (name, start, horizon, phase)
+        shifts = [(wd.date, wd.shift_type) for wd in pattern.iter_work_days(start, horizon, phase)]
+        last = start + timedelta(days=horizon)
+    else:
+        # Séquences de shifts identiques séparées de repos
+        taken = set()
+        day = start
+        for _ in range(rng.randrange(1, 8)):
+            shift_type = rng.choice(list(ShiftType))
+            for offset in range(rng.randrange(1, 10)):
+                taken.add((day + timedelta(days=offset), shift_type))
+            day += timedelta(days=rng.randrange(0, 12))
+        shifts = sorted(taken, key=lambda item: (item[0], item[1].name))
+        last = max(day for day, _ in shifts)
+
+    # Jours fériés dans la période (y compris le lendemain du dernier shift)
+    span = (last - start).days + 2
+    holidays = [start + timedelta(days=rng.randrange(span)) for _ in range(rng.choice((0, 0, 1, 3)))]
+    if holidays:
+        data = rules.to_dict()
+        data['holidays'] = [day.strftime('%Y-%m-%d') for day in holidays]
+        rules = PremiumRules.from_dict(data)
+
+    rates = None
+    if rotation is None and rng.random() < 0.35:
+        periods = {}
+        for _ in range(rng.randrange(1, 4)):
+            day = start + timedelta(days=rng.randrange(-3, span))
+            periods[day] = RatePeriod(day, round(rng.uniform(10, 40), 2),
+                                      rng.choice((None, None) + _BONUSES), rng.choice((None, None) + _BONUSES))
+        rates = RateSchedule(periods.values())
+
+    return FuzzCase(rules, shifts, hourly_rate, rates, rng.random() < 0.7, rotation)
+
+
+def _result_metrics(result) -> Dict[str, float]:
+    bd = result.total_breakdown
+    return {name: (result.total_pay if name == 'total_pay' else getattr(bd, name)) for name in METRICS}
+
+
+def _day_engine(case: FuzzCase) -> Dict[str, float]:
+    calculator = ShiftCalculator(case.weekly_overtime, rules=case.rules)
+    return _result_metrics(calculator.calculate_scenario(case.scenario()))
+
+
+def _cached_engine(case: FuzzCase) -> Dict[str, float]:
+    calculator = ShiftCalculator(case.weekly_overtime, rules=case.rules)
+    years = [day.year for day, _ in case.shifts]
+    calculator.profile_table = PremiumProfileTable.build(calculator, min(years), max(years))
+    scenario = case.scenario(interned=True)
+    calculator.calculate_scenario(scenario)  # Remplit la mémoïsation: le second calcul la lit
+    return _result_metrics(calculator.calculate_scenario(scenario))
+
+
+def _runs_engine(case: FuzzCase) -> Dict[str, float]:
+    calculator = ShiftCalculator(case.weekly_overtime, rules=case.rules)
+    scenario = RunScenario("fuzz", compress_runs(case.scenario().work_days), case.hourly_rate, case.rates)
+    return _result_metrics(calculator.calculate_scenario(scenario))
+
+
+def _batch_engine(case: FuzzCase) -> Dict[str, float]:
+    aggregator = PayrollAggregator(ShiftCalculator(case.weekly_overtime, rules=case.rules),
+                                   groupings=(('employee',),))
+    totals = aggregator.aggregate([EmployeeRoster("E", "T", case.scenario(interned=True))]).get('employee')
+    return {name: totals[("E",)][name] for name in METRICS}
+
+
+def _batch_runs_engine(case: FuzzCase) -> Dict[str, float]:
+    aggregator = PayrollAggregator(ShiftCalculator(case.weekly_overtime, rules=case.rules),
+                                   groupings=(('employee',),))
+    scenario = RunScenario("fuzz", compress_runs(case.scenario().work_days), case.hourly_rate, case.rates)
+    totals = aggregator.aggregate([EmployeeRoster("E", "T", scenario)]).get('employee')
+    return {name: totals[("E",)][name] for name in METRICS}
+
+
+def _range_engine(case: FuzzCase) -> Dict[str, float]:
+    index = RangeIndex.from_scenario(case.scenario(), ShiftCalculator(case.weekly_overtime, rules=case.rules))
+    totals = index.totals()
+    return {name: totals[name] for name in METRICS}
+
+
+def _rotation_engine(method: str) -> Callable:
+    def engine(case: FuzzCase) -> Optional[Dict[str, float]]:
+        if case.rotation is None or case.rates is not None:
+            return None  # Non applicable
+        name, start, horizon, phase = case.rotation
+        pricer = RotationPricer(ShiftCalculator(case.weekly_overtime, rules=case.rules))
+        return _result_metrics(getattr(pricer, method)(PATTERNS[name], start, horizon, case.hourly_rate, phase))
+    return engine
+
+
+# Moteurs optimisés comparés à la référence: nom -> fonction(cas) -> métriques (None si non applicable)
+ENGINES: Dict[str, Callable[[FuzzCase], Optional[Dict[str, float]]]] = {
+    'day': _day_engine,
+    'cached': _cached_engine,
+    'runs': _runs_engine,
+    'batch': _batch_engine,
+    'batch_runs': _batch_runs_engine,
+    'range': _range_engine,
+    'rotation_price': _rotation_engine('price'),
+    'rotation_project': _rotation_engine('project'),
+}
+
+
+def reference_metrics(case: FuzzCase) -> Dict[str, float]:
+    """Métriques du cas selon le moteur de référence"""
+    return ReferenceEngine(case.rules, case.weekly_overtime).calculate(case.shifts, case.hourly_rate, case.rates)
+
+
+def compare_metrics(expected: Dict[str, float], actual: Dict[str, float],
+                    tolerance: float = TOLERANCE) -> Dict[str, Tuple[float, float]]:
+    """Métriques dont l'écart dépasse la tolérance (relative au-delà de 1): nom -> (attendu, obtenu)"""
+    return {
+        name: (expected[name], actual[name]) for name in METRICS
+        if abs(expected[name] - actual[name]) > tolerance * max(1.0, abs(expected[name]))
+    }
+
+
+def check_case(case: FuzzCase, engines: Dict[str, Callable] = None,
+               tolerance: float = TOLERANCE) -> Dict[str, Dict]:
+    """
+    Calcule un cas avec la référence et chaque moteur.
+
+    Les horaires des shifts du cas ne sont connus que de ses règles: les
+    WorkDay gardent les horaires par défaut, et chaque moteur doit lire ceux
+    de son calculateur.
+
+    Returns:
+        Moteur -> écarts (seuls les moteurs en désaccord); une exception d'un
+        moteur est rapportée comme un écart 'error'
+    """
+    engines = ENGINES if engines is None else engines
+    expected = reference_metrics(case)
+    failures = {}
+    for name, engine in engines.items():
+        try:
+            actual = engine(case)
+        except Exception as e:  # Un moteur qui plante est un désaccord
+            failures[name] = {'error': f"{type(e).__name__}: {e}"}
+            continue
+        if actual is not None:
+            mismatches = compare_metrics(expected, actual, tolerance)
+            if mismatches:
+                failures[name] = mismatches
+    return failures
+
+
+def minimize(case: FuzzCase, engine: str, engines: Dict[str, Callable] = None,
+             tolerance: float = TOLERANCE) -> FuzzCase:
+    """
+    Réduit un cas en désaccord tant que le même moteur reste en désaccord.
+
+    Simplifie d'abord le contexte (historique de taux, heures supplémentaires,
+    jours fériés, rotation), puis retire des shifts par blocs de plus en plus
+    petits (delta debugging).
+
+    Args:
+        case: Cas en désaccord
+        engine: Moteur concerné
+
+    Returns:
+        Cas réduit (le cas lui-même si rien ne peut être retiré)
+    """
+    engines = ENGINES if engines is None else engines
+    selected = {engine: engines[engine]}
+
+    def fails(candidate: FuzzCase) -> bool:
+        return bool(candidate.shifts) and engine in check_case(candidate, selected, tolerance)
+
+    if case.rotation is not None and not engine.startswith('rotation'):
+        case = case.replace(rotation=None)
+    if case.rotation is not None:
+        # Rotation: raccourcir l'horizon
+        name, start, horizon, phase = case.rotation
+        while horizon > 1:
+            shorter = (name, start, horizon // 2, phase)
+            candidate = case.replace(rotation=shorter, shifts=[
+                (wd.date, wd.shift_type) for wd in PATTERNS[name].iter_work_days(start, horizon // 2, phase)])
+            if not fails(candidate):
+                break
+            case, horizon = candidate, horizon // 2
+        return case
+
+    for changes in ({'rates': None}, {'weekly_overtime': False}):
+        candidate = case.replace(**changes)
+        if fails(candidate):
+            case = candidate
+    if case.rules.holidays:
+        data = case.rules.to_dict()
+        data['holidays'] = []
+        candidate = case.replace(rules=PremiumRules.from_dict(data))
+        if fails(candidate):
+            case = candidate
+
+    chunk = max(len(case.shifts) // 2, 1)
+    while chunk >= 1:
+        i = 0
+        while i < len(case.shifts):
+            candidate = case.replace(shifts=case.shifts[:i] + case.shifts[i + chunk:])
+            if fails(candidate):
+                case = candidate
+            else:
+                i += chunk
+        chunk //= 2
+    return case
+
+
+class FuzzReport:
+    """Résultat d'une campagne: volume couvert et désaccords réduits"""
+
+    def __init__(self):
+        self.cases = 0
+        self.shifts = 0
+        self.elapsed = 0.0
+        self.failures: List[Dict] = []  # Reproducteurs (voir fuzz)
+
+    @property
+    def ok(self) -> bool:
+        return not self.failures
+
+    def __repr__(self):
+        return (f"FuzzReport({self.cases} cas, {self.shifts} shifts, {len(self.failures)} désaccord(s), "
+                f"{self.elapsed:.1f}s)")
+
+
+def fuzz(cases: int = None, seconds: float = None, seed: int = 0, engines: Dict[str, Callable] = None,
+         tolerance: float = TOLERANCE, max_failures: int = 5) -> FuzzReport:
+    """
+    Lance une campagne de test différentiel.
+
+    Le cas numéro n est tiré avec la graine seed + n: un désaccord se rejoue
+    à partir de sa graine seule.
+
+    Args:
+        cases: Nombre de cas (sans limite si None, il faut alors seconds)
+        seconds: Durée maximale en secondes
+        seed: Graine du premier cas
+        engines: Moteurs à comparer (ENGINES par défaut)
+        tolerance: Écart toléré
+        max_failures: Arrêt après ce nombre de désaccords
+
+    Returns:
+        FuzzReport; chaque désaccord est un dictionnaire JSON {seed, engine, mismatches,
+        case (réduit), original_shifts}
+    """
+    if cases is None and seconds is None:
+        raise ValueError("Indiquer un nombre de cas ou une durée")
+    report = FuzzReport()
+    started = time.perf_counter()
+    n = 0
+    while (cases is None or n < cases) and (seconds is None or time.perf_counter() - started < seconds):
+        case = generate_case(random.Random(seed + n), seed + n)
+        report.cases += 1
+        report.shifts += len(case.shifts)
+        for engine, mismatches in check_case(case, engines, tolerance).items():
+            reduced = minimize(case, engine, engines, tolerance)
+            report.failures.append({
+                'seed': seed + n,
+                'engine': engine,
+                'mismatches': check_case(reduced, {engine: (engines or ENGINES)[engine]}, tolerance).get(
+                    engine, mismatches),
+                'case': reduced.to_dict(),
+                'original_shifts': len(case.shifts),
+            })
+        n += 1
+        if len(report.failures) >= max_failures:
+            break
+    report.elapsed = time.perf_counter() - started
+    return report
+
+
+def replay(reproducer: Dict, engines: Dict[str, Callable] = None, tolerance: float = TOLERANCE) -> Dict[str, Dict]:
+    """
+    Rejoue un reproducteur produit par fuzz (ou un cas seul, format FuzzCase.to_dict).
+
+    Returns:
+        Moteur -> écarts restants (vide si le désaccord est corrigé)
+    """
+    engines = ENGINES if engines is None else engines
+    case = FuzzCase.from_dict(reproducer.get('case', reproducer))
+    if 'engine' in reproducer:
+        engines = {reproducer['engine']: engines[reproducer['engine']]}
+    return check_case(case, engines, tolerance)
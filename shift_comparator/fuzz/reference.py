@@ -0,0 +1,169 @@
+"""
+Moteur de référence: la boucle heure par heure d'origine, sans table, cache ni forme fermée.
+
+C'est la boucle de ShiftCalculator.calculate_work_day avant les optimisations:
+chaque shift est parcouru du début à la fin sur l'horloge murale, chaque
+tranche classée d'après son début. Deux généralisations seulement: la tranche
+vaut moins d'une heure si les règles ont des bornes à la demi-heure ou au
+quart d'heure, et elle est comptée 0, 1 ou 2 fois selon que l'heure locale
+n'existe pas, existe une fois ou deux (changement d'heure). Ce compte est lu
+directement dans zoneinfo, indépendamment de models.dst utilisé par les
+moteurs optimisés. Le classement part de la description des règles (plages de
+nuit, jours majorés, jours fériés), jamais de leurs tables compilées. Les
+heures supplémentaires sont recalculées par semaine ISO, au taux moyen de la
+semaine.
+
+Lent par construction: il sert d'oracle aux moteurs optimisés (voir harness).
+"""
+from datetime import datetime, timedelta, timezone
+from functools import lru_cache
+from math import gcd
+from typing import Dict, Iterable, List, Tuple
+from zoneinfo import ZoneInfo
+
+from ..models import ShiftType
+from ..core.overtime import WeeklyOvertime
+
+
+# Fuseau des horaires des shifts
+TIMEZONE = ZoneInfo('Europe/Paris')
+
+# Métriques comparées entre moteurs
+METRICS = ('normal_hours', 'night_hours', 'sunday_hours', 'night_sunday_hours',
+           'overtime_25_hours', 'overtime_50_hours', 'total_pay')
+
+_CATEGORIES = METRICS[:4]
+
+
+@lru_cache(maxsize=65536)
+def wall_multiplicity(wall: datetime) -> int:
+    """
+    Nombre de fois qu'une heure locale est vécue.
+
+    Returns:
+        0 si elle n'existe pas (heure sautée), 2 si elle est vécue deux fois
+        (heure doublée), 1 sinon
+    """
+    first, second = wall.replace(tzinfo=TIMEZONE, fold=0), wall.replace(tzinfo=TIMEZONE, fold=1)
+    if first.utcoffset() == second.utcoffset():
+        return 1
+    # Heure sautée: l'aller-retour par UTC ne retombe pas sur la même heure murale
+    return 2 if first.astimezone(timezone.utc).astimezone(TIMEZONE).replace(tzinfo=None) == wall else 0
+
+
+class ReferenceEngine:
+    """Calcul de référence d'une liste de shifts sous des règles de majoration"""
+
+    def __init__(self, rules, weekly_overtime: bool = True):
+        """
+        Args:
+            rules: PremiumRules (seuls ses champs déclaratifs sont lus)
+            weekly_overtime: Calculer les heures supplémentaires hebdomadaires
+        """
+        self.rules = rules
+        self.weekly_overtime = weekly_overtime
+        self.windows = [(start.hour * 60 + start.minute, end.hour * 60 + end.minute)
+                        for start, end in rules.night_windows]
+        bounds = [m for window in self.windows for m in window]
+        for start, end in rules.shift_hours.values():
+            bounds += [start.hour * 60 + start.minute, end.hour * 60 + end.minute]
+        step = 60
+        for minute in bounds:
+            step = gcd(step, minute)
+        self.step = timedelta(minutes=step)
+
+    def _is_night(self, dt: datetime) -> bool:
+        minute = dt.hour * 60 + dt.minute
+        return any(start <= minute < end if start < end else (minute >= start or minute < end)
+                   for start, end in self.windows)
+
+    def _is_premium(self, dt: datetime) -> bool:
+        return dt.weekday() in self.rules.premium_weekdays or dt.toordinal() in self.rules.holidays
+
+    def _category(self, dt: datetime) -> int:
+        return (1 if self._is_night(dt) else 0) + (2 if self._is_premium(dt) else 0)
+
+    def shift_hours(self, day: datetime, shift_type: ShiftType) -> List[float]:
+        """
+        Heures d'un shift par catégorie (normales, nuit, dimanche, nuit et dimanche).
+
+        Args:
+            day: Jour du shift
+            shift_type: Type de shift
+
+        Returns:
+            Liste de 4 durées en heures
+        """
+        start_time, end_time = self.rules.shift_hours[shift_type]
+        current_dt = datetime.combine(day.date(), start_time)
+        end_dt = datetime.combine(day.date() + timedelta(days=1 if end_time <= start_time else 0), end_time)
+
+        # Parcourir chaque tranche du shift
+        hours = [0.0] * 4
+        while current_dt < end_dt:
+            next_dt = min(current_dt + self.step, end_dt)
+            fraction = (next_dt - current_dt).total_seconds() / 3600
+            hours[self._category(current_dt)] += fraction * wall_multiplicity(current_dt)
+            current_dt = next_dt
+        return hours
+
+    def _period(self, rates, day: datetime):
+        """Période de taux d'un jour: la dernière commencée, la première avant toutes"""
+        current = rates.periods[0]
+        for period in rates.periods:
+            if period.effective_from.toordinal() <= day.toordinal():
+                current = period
+        return current
+
+    def calculate(self, shifts: Iterable[Tuple[datetime, ShiftType]], hourly_rate: float,
+                  rates=None) -> Dict[str, float]:
+        """
+        Totaux d'une liste de shifts.
+
+        Args:
+            shifts: Couples (jour, type de shift)
+            hourly_rate: Taux horaire de base
+            rates: RateSchedule éventuel (taux et majorations datés)
+
+        Returns:
+            Dictionnaire métrique -> valeur (voir METRICS)
+        """
+        rules = self.rules
+        totals = dict.fromkeys(METRICS, 0.0)
+        weeks: Dict[tuple, List[float]] = {}  # Semaine ISO -> [heures, heures × taux]
+
+        for day, shift_type in shifts:
+            rate, night_bonus, sunday_bonus = hourly_rate, rules.night_bonus, rules.sunday_bonus
+            if rates is not None:
+                period = self._period(rates, day)
+                rate = period.hourly_rate
+                if period.night_bonus is not None:
+                    night_bonus = period.night_bonus
+                if period.sunday_bonus is not None:
+                    sunday_bonus = period.sunday_bonus
+            if rules.stacking == 'additive':
+                both = night_bonus + sunday_bonus
+            else:
+                both = max(night_bonus, sunday_bonus)
+
+            hours = self.shift_hours(day, shift_type)
+            for name, value in zip(_CATEGORIES, hours):
+                totals[name] += value
+            totals['total_pay'] += rate * (hours[0] + hours[1] * (1 + night_bonus) +
+                                           hours[2] * (1 + sunday_bonus) + hours[3] * (1 + both))
+
+            week = weeks.setdefault(day.isocalendar()[:2], [0.0, 0.0])
+            week[0] += sum(hours)
+            week[1] += sum(hours) * rate
+
+        if self.weekly_overtime:
+            for week_hours, weighted in weeks.values():
+                first = min(max(week_hours - WeeklyOvertime.FIRST_THRESHOLD, 0.0),
+                            WeeklyOvertime.SECOND_THRESHOLD - WeeklyOvertime.FIRST_THRESHOLD)
+                second = max(week_hours - WeeklyOvertime.SECOND_THRESHOLD, 0.0)
+                average_rate = weighted / week_hours if week_hours else 0.0
+                totals['overtime_25_hours'] += first
+                totals['overtime_50_hours'] += second
+                totals['total_pay'] += average_rate * (first * WeeklyOvertime.FIRST_BONUS +
+                                                       second * WeeklyOvertime.SECOND_BONUS)
+        return totals
@@ -1,38 +1,73 @@
 """
 Interface principale du comparateur de shifts.
 """
+import sys
 from datetime import datetime
-from typing import List
+from functools import lru_cache
+from typing import List, TextIO
 
-from .models import ShiftType, WorkDay, Scenario
-from .core import ShiftCalculator, ScenarioComparator
+from .models import ShiftType, WorkDay, Scenario, ShiftRun, RunScenario, intern_work_day
+from .core import ShiftCalculator, ScenarioComparator, ScheduleValidator, ScheduleValidationError
 from .utils import ResultFormatter
 
 
+@lru_cache(maxsize=65536)
+def parse_date(date_str: str) -> datetime:
+    """
+    Convertit une date texte en datetime.
+
+    Les résultats sont mis en cache: les rosters répètent souvent les mêmes dates.
+
+    Args:
+        date_str: Date au format 'YYYY-MM-DD' ou 'DD/MM/YYYY'
+
+    Returns:
+        datetime à minuit
+    """
+    try:
+        # Essayer format YYYY-MM-DD
+        return datetime.strptime(date_str, '%Y-%m-%d')
+    except ValueError:
+        try:
+            # Essayer format DD/MM/YYYY
+            return datetime.strptime(date_str, '%d/%m/%Y')
+        except ValueError:
+            raise ValueError(f"Format de date invalide: {date_str}. "
+                           "Utilisez 'YYYY-MM-DD' ou 'DD/MM/YYYY'")
+
+
 class ShiftComparatorApp:
     """Application principale de comparaison de shifts"""
 
-    def __init__(self, hourly_rate: float = 20.0):
+    def __init__(self, hourly_rate: float = 20.0, weekly_overtime: bool = None):
         """
         Args:
             hourly_rate: Taux horaire de base (par défaut 20€/h)
+            weekly_overtime: Inclure les heures supplémentaires hebdomadaires dans les totaux
+                             (ShiftCalculator.WEEKLY_OVERTIME par défaut)
         """
         self.hourly_rate = hourly_rate
-        self.calculator = ShiftCalculator()
+        self.calculator = ShiftCalculator(weekly_overtime)
         self.comparator = ScenarioComparator(self.calculator)
 
-    def create_scenario(self, name: str, shifts: List[tuple], hourly_rate: float = None) -> Scenario:
+    def create_scenario(self, name: str, shifts: List[tuple], hourly_rate: float = None,
+                        validate: bool = False) -> Scenario:
         """
         Crée un scénario à partir d'une liste de shifts.
 
         Args:
             name: Nom du scénario
-            shifts: Liste de tuples (date_string, shift_type)
+            shifts: Liste de tuples (date_string, shift_type), ou (date_string, shift_type, n)
+                   pour n jours consécutifs du même shift à partir de date_string
                    date_string format: 'YYYY-MM-DD' ou 'DD/MM/YYYY'
             hourly_rate: Taux horaire (utilise celui par défaut si non spécifié)
+            validate: Si True, vérifie les repos et chevauchements
 
         Returns:
-            Scenario créé
+            Scenario créé (RunScenario, stocké en séquences, si une longueur est fournie)
+
+        Raises:
+            ScheduleValidationError: Si validate est True et que le planning est invalide
 
         Example:
             >>> app.create_scenario("Semaine 1", [
@@ -40,27 +75,25 @@ class ShiftComparatorApp:
             ...     ('2026-01-14', ShiftType.MATIN),
             ...     ('2026-01-15', ShiftType.APRES_MIDI),
             ... ])
+            >>> app.create_scenario("Nuits", [('2026-01-12', ShiftType.NUIT, 5)])
         """
         if hourly_rate is None:
             hourly_rate = self.hourly_rate
 
-        work_days = []
-        for date_str, shift_type in shifts:
-            # Parser la date
-            try:
-                # Essayer format YYYY-MM-DD
-                date = datetime.strptime(date_str, '%Y-%m-%d')
-            except ValueError:
-                try:
-                    # Essayer format DD/MM/YYYY
-                    date = datetime.strptime(date_str, '%d/%m/%Y')
-                except ValueError:
-                    raise ValueError(f"Format de date invalide: {date_str}. "
-                                   "Utilisez 'YYYY-MM-DD' ou 'DD/MM/YYYY'")
+        if any(len(shift) == 3 for shift in shifts):
+            runs = [ShiftRun(parse_date(shift[0]), shift[1], shift[2] if len(shift) == 3 else 1)
+                    for shift in shifts]
+            scenario = RunScenario(name, runs, hourly_rate)
+        else:
+            work_days = [intern_work_day(parse_date(date_str), shift_type) for date_str, shift_type in shifts]
+            scenario = Scenario(name, work_days, hourly_rate)
 
-            work_days.append(WorkDay(date, shift_type))
+        if validate:
+            violations = ScheduleValidator(rules=self.calculator.rules).validate(scenario)
+            if violations:
+                raise ScheduleValidationError(violations)
 
-        return Scenario(name, work_days, hourly_rate)
+        return scenario
 
     def compare_scenarios(self, scenarios: List[Scenario], detailed: bool = True) -> str:
         """
@@ -76,6 +109,19 @@ class ShiftComparatorApp:
         comparison = self.comparator.compare_scenarios(scenarios)
         return ResultFormatter.format_comparison(comparison, detailed=detailed)
 
+    def write_comparison(self, scenarios: List[Scenario], stream: TextIO = None,
+                         detailed: bool = True):
+        """
+        Compare plusieurs scénarios et écrit le rapport au fil de l'eau.
+
+        Args:
+            scenarios: Liste des scénarios à comparer
+            stream: Flux de sortie (sys.stdout par défaut)
+            detailed: Si True, affiche le détail de chaque jour
+        """
+        comparison = self.comparator.compare_scenarios(scenarios)
+        ResultFormatter.write_comparison(comparison, stream or sys.stdout, detailed=detailed)
+
     def calculate_scenario(self, scenario: Scenario, detailed: bool = True) -> str:
         """
         Calcule un seul scénario et retourne un rapport formaté.
@@ -138,7 +184,7 @@ def main():
     )
 
     # Comparer les scénarios
-    print(app.compare_scenarios([scenario1, scenario2, scenario3], detailed=True))
+    app.write_comparison([scenario1, scenario2, scenario3], detailed=True)
 
 
 if __name__ == "__main__":
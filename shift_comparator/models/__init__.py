@@ -1,4 +1,18 @@
-"""Modèles de données"""
-from .shift import ShiftType, ShiftDefinition, WorkDay, Scenario
+"""
+Modèles de données
 
-__all__ = ['ShiftType', 'ShiftDefinition', 'WorkDay', 'Scenario']
+Importés à la demande: les rotations, historiques de taux et plannings de
+salariés ne sont chargés que s'ils sont utilisés.
+"""
+from .._lazy import lazy_exports
+
+# Sous-module -> attributs publics qu'il définit
+_SUBMODULES = {
+    '.shift': ['ShiftType', 'ShiftDefinition', 'WorkDay', 'WorkDayPool', 'intern_work_day',
+               'Scenario', 'ShiftRun', 'RunScenario', 'compress_runs', 'merge_runs'],
+    '.employee': ['EmployeeRoster'],
+    '.rates': ['RatePeriod', 'RateSchedule', 'effective_rates'],
+    '.rotation': ['RotationPattern', 'PATTERNS', 'iter_rotation_scenarios'],
+}
+
+__all__, __getattr__, __dir__ = lazy_exports(__name__, globals(), _SUBMODULES)
@@ -0,0 +1,137 @@
+"""
+Changements d'heure (heure d'été / heure d'hiver) du fuseau Europe/Paris.
+
+Les horaires des shifts sont exprimés en heure locale (heure "murale").
+La nuit du changement d'heure de mars, l'heure 02:00-03:00 n'existe pas;
+celle d'octobre, l'heure 02:00-03:00 est vécue deux fois. Les transitions
+sont précalculées une fois par année: un shift qui n'en croise aucune
+(le cas courant) se calcule comme avant, sans arithmétique de fuseau.
+"""
+from datetime import datetime, timedelta, timezone
+from functools import lru_cache
+from typing import Tuple
+
+try:
+    from zoneinfo import ZoneInfo, ZoneInfoNotFoundError
+except ImportError:  # Python < 3.9
+    ZoneInfo = None
+    ZoneInfoNotFoundError = Exception
+
+
+TIMEZONE_NAME = 'Europe/Paris'
+
+
+def _load_timezone():
+    """Charge le fuseau horaire, ou None si la base tz n'est pas disponible"""
+    if ZoneInfo is None:
+        return None
+    try:
+        return ZoneInfo(TIMEZONE_NAME)
+    except ZoneInfoNotFoundError:
+        return None
+
+
+LOCAL_TIMEZONE = _load_timezone()
+
+
+class DstTransition:
+    """Changement d'heure exprimé en heure locale"""
+
+    __slots__ = ('wall', 'delta_hours', 'start', 'end')
+
+    def __init__(self, wall: datetime, delta_hours: float):
+        """
+        Args:
+            wall: Heure locale (naïve) à laquelle les horloges changent
+            delta_hours: Décalage appliqué (+1 en mars: on avance, -1 en octobre: on recule)
+        """
+        self.wall = wall
+        self.delta_hours = delta_hours
+
+        # Intervalle d'heure locale sauté (delta > 0) ou vécu deux fois (delta < 0)
+        delta = timedelta(hours=delta_hours)
+        if delta_hours > 0:
+            self.start, self.end = wall, wall + delta
+        else:
+            self.start, self.end = wall + delta, wall
+
+    def __repr__(self):
+        return f"DstTransition({self.wall.strftime('%Y-%m-%d %H:%M')}, {self.delta_hours:+g}h)"
+
+
+def _utc_offset_hours(utc_dt: datetime) -> float:
+    """Décalage UTC (en heures) du fuseau local à un instant UTC naïf"""
+    offset = utc_dt.replace(tzinfo=timezone.utc).astimezone(LOCAL_TIMEZONE).utcoffset()
+    return offset.total_seconds() / 3600
+
+
+def _zoneinfo_transitions(year: int) -> Tuple[DstTransition, ...]:
+    """Recherche les transitions de l'année par dichotomie sur les instants UTC"""
+    bounds = [datetime(year, month, 1) for month in range(1, 13)]
+    bounds.append(datetime(year + 1, 1, 1) if year < 9999 else datetime(9999, 12, 31, 23))
+
+    transitions = []
+    for lo, hi in zip(bounds, bounds[1:]):
+        before = _utc_offset_hours(lo)
+        after = _utc_offset_hours(hi)
+        if before == after:
+            continue
+
+        # Dichotomie à l'heure près (les changements d'heure tombent sur une heure pleine)
+        lo_hours, hi_hours = 0, int((hi - lo).total_seconds() // 3600)
+        while hi_hours - lo_hours > 1:
+            mid = (lo_hours + hi_hours) // 2
+            if _utc_offset_hours(lo + timedelta(hours=mid)) == before:
+                lo_hours = mid
+            else:
+                hi_hours = mid
+
+        change_utc = lo + timedelta(hours=hi_hours)
+        transitions.append(DstTransition(change_utc + timedelta(hours=before), after - before))
+
+    return tuple(transitions)
+
+
+def _eu_rule_transitions(year: int) -> Tuple[DstTransition, ...]:
+    """Règle européenne (dernier dimanche de mars et d'octobre, 01:00 UTC), sans base tz"""
+    def last_sunday(month):
+        day = datetime(year, month, 31)
+        return day - timedelta(days=(day.weekday() + 1) % 7)
+
+    return (
+        DstTransition(last_sunday(3).replace(hour=2), 1.0),   # 02:00 → 03:00
+        DstTransition(last_sunday(10).replace(hour=3), -1.0),  # 03:00 → 02:00
+    )
+
+
+@lru_cache(maxsize=None)
+def year_transitions(year: int) -> Tuple[DstTransition, ...]:
+    """
+    Retourne les changements d'heure d'une année (calculés une seule fois).
+
+    Args:
+        year: Année civile
+
+    Returns:
+        Tuple de DstTransition, triés chronologiquement
+    """
+    if LOCAL_TIMEZONE is None:
+        return _eu_rule_transitions(year)
+    return _zoneinfo_transitions(year)
+
+
+def transitions_between(start: datetime, end: datetime) -> Tuple[DstTransition, ...]:
+    """
+    Retourne les changements d'heure qui tombent dans un intervalle d'heure locale.
+
+    Args:
+        start: Début (heure locale naïve, inclus)
+        end: Fin (heure locale naïve, exclue)
+
+    Returns:
+        Tuple de DstTransition (vide dans le cas courant)
+    """
+    found = tuple(t for t in year_transitions(start.year) if start < t.end and t.start < end)
+    for year in range(start.year + 1, end.year + 1):
+        found += tuple(t for t in year_transitions(year) if start < t.end and t.start < end)
+    return found
@@ -0,0 +1,24 @@
+"""
+Modèles pour les plannings de plusieurs salariés.
+"""
+from .shift import Scenario
+
+
+class EmployeeRoster:
+    """Planning d'un salarié rattaché à une équipe"""
+
+    def __init__(self, employee_id: str, team: str, scenario: Scenario, rates=None):
+        """
+        Args:
+            employee_id: Identifiant du salarié (matricule)
+            team: Équipe du salarié
+            scenario: Planning du salarié (jours travaillés et taux horaire)
+            rates: RateSchedule du salarié (prioritaire sur celui du scénario)
+        """
+        self.employee_id = employee_id
+        self.team = team
+        self.scenario = scenario
+        self.rates = rates
+
+    def __repr__(self):
+        return f"EmployeeRoster('{self.employee_id}', équipe '{self.team}', {self.scenario!r})"
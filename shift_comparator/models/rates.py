@@ -0,0 +1,169 @@
+"""
+Taux horaires et majorations datés (augmentations annuelles, nouveaux accords).
+
+Un RateSchedule est une suite de périodes, chacune applicable à partir de sa
+date d'effet jusqu'à la suivante. Le taux d'un jour est trouvé par recherche
+dichotomique sur les dates de changement; pour un traitement par lots, une
+table par ordinal de jour donne la période en accès direct.
+"""
+from bisect import bisect_right
+from datetime import datetime, timedelta
+from typing import Dict, Iterable, List, Optional, Tuple
+
+from .shift import ShiftRun
+
+
+class RatePeriod:
+    """Taux et majorations applicables à partir d'une date"""
+
+    __slots__ = ('effective_from', 'hourly_rate', 'night_bonus', 'sunday_bonus')
+
+    def __init__(self, effective_from: datetime, hourly_rate: float,
+                 night_bonus: float = None, sunday_bonus: float = None):
+        """
+        Args:
+            effective_from: Date d'effet (incluse)
+            hourly_rate: Taux horaire de base (€/h)
+            night_bonus: Majoration de nuit (ex: 0.15), celle du calculateur si None
+            sunday_bonus: Majoration du dimanche (ex: 0.25), celle du calculateur si None
+        """
+        self.effective_from = effective_from
+        self.hourly_rate = hourly_rate
+        self.night_bonus = night_bonus
+        self.sunday_bonus = sunday_bonus
+
+    def key(self) -> tuple:
+        """Tuple hachable de la période (clés de cache)"""
+        return (self.effective_from.toordinal(), float(self.hourly_rate), self.night_bonus, self.sunday_bonus)
+
+    def to_dict(self) -> Dict:
+        """Sérialise la période (ex: pour JSON)"""
+        return {
+            'from': self.effective_from.strftime('%Y-%m-%d'),
+            'hourly_rate': self.hourly_rate,
+            'night_bonus': self.night_bonus,
+            'sunday_bonus': self.sunday_bonus,
+        }
+
+    def __repr__(self):
+        return f"RatePeriod({self.effective_from:%Y-%m-%d}, {self.hourly_rate}€/h)"
+
+
+class RateSchedule:
+    """
+    Historique daté des taux d'un scénario ou d'un salarié.
+
+    Avant la première date d'effet, la première période s'applique.
+    """
+
+    def __init__(self, periods: Iterable[RatePeriod]):
+        """
+        Args:
+            periods: Périodes (dans un ordre quelconque)
+
+        Raises:
+            ValueError: Si aucune période n'est fournie ou si deux périodes ont la même date d'effet
+        """
+        self.periods: List[RatePeriod] = sorted(periods, key=lambda p: p.effective_from)
+        if not self.periods:
+            raise ValueError("Aucune période de taux")
+        self._ordinals = [period.effective_from.toordinal() for period in self.periods]
+        if len(set(self._ordinals)) != len(self._ordinals):
+            raise ValueError("Deux périodes de taux ont la même date d'effet")
+
+    @classmethod
+    def from_changes(cls, changes: Iterable[Tuple[datetime, float]]) -> 'RateSchedule':
+        """Historique à partir de couples (date d'effet, taux horaire), majorations par défaut"""
+        return cls(RatePeriod(day, rate) for day, rate in changes)
+
+    def _index(self, ordinal: int) -> int:
+        return max(bisect_right(self._ordinals, ordinal) - 1, 0)
+
+    def at(self, day: datetime) -> RatePeriod:
+        """
+        Période applicable un jour donné (recherche dichotomique).
+
+        Args:
+            day: Jour (date ou datetime)
+
+        Returns:
+            RatePeriod en vigueur
+        """
+        return self.periods[self._index(day.toordinal())]
+
+    def span(self, day: datetime) -> Tuple[RatePeriod, int, int]:
+        """
+        Période applicable et ordinaux de sa validité.
+
+        Permet de ne refaire la recherche que lorsqu'un jour sort de la période courante.
+
+        Returns:
+            Tuple (période, premier ordinal inclus, dernier ordinal exclu)
+        """
+        i = self._index(day.toordinal())
+        start = self._ordinals[i] if i else -1
+        end = self._ordinals[i + 1] if i + 1 < len(self._ordinals) else 1 << 62
+        return self.periods[i], start, end
+
+    def split_run(self, run: ShiftRun) -> List[Tuple[ShiftRun, RatePeriod]]:
+        """
+        Découpe une séquence aux dates de changement de taux.
+
+        Args:
+            run: Séquence de jours de même shift
+
+        Returns:
+            Liste de (morceau de séquence, période applicable), dans l'ordre
+        """
+        pieces = []
+        day, remaining = run.start, run.length
+        while remaining:
+            period, _, end = self.span(day)
+            length = min(remaining, end - day.toordinal())
+            pieces.append((ShiftRun(day, run.shift_type, length), period))
+            day += timedelta(days=length)
+            remaining -= length
+        return pieces
+
+    def ordinal_table(self, first_ordinal: int, last_ordinal: int) -> List[RatePeriod]:
+        """
+        Période de chaque jour d'une plage, en accès direct (traitements par lots).
+
+        Args:
+            first_ordinal: Premier jour (ordinal)
+            last_ordinal: Dernier jour (ordinal, inclus)
+
+        Returns:
+            Liste indexée par ordinal - first_ordinal
+        """
+        table = []
+        ordinal = first_ordinal
+        while ordinal <= last_ordinal:
+            period, _, end = self.span(datetime.fromordinal(ordinal))
+            count = min(end, last_ordinal + 1) - ordinal
+            table.extend([period] * count)
+            ordinal += count
+        return table
+
+    def key(self) -> tuple:
+        """Tuple hachable de l'historique (clés de cache)"""
+        return tuple(period.key() for period in self.periods)
+
+    def to_dicts(self) -> List[Dict]:
+        """Sérialise l'historique (ex: pour JSON)"""
+        return [period.to_dict() for period in self.periods]
+
+    def __len__(self):
+        return len(self.periods)
+
+    def __repr__(self):
+        return f"RateSchedule({len(self.periods)} périodes, {self.periods[0].hourly_rate}€/h → " \
+               f"{self.periods[-1].hourly_rate}€/h)"
+
+
+def effective_rates(item) -> Optional[RateSchedule]:
+    """Historique de taux d'un salarié (EmployeeRoster) ou d'un scénario, s'il y en a un"""
+    rates = getattr(item, 'rates', None)
+    if rates is None and hasattr(item, 'scenario'):
+        rates = getattr(item.scenario, 'rates', None)
+    return rates
@@ -0,0 +1,144 @@
+"""
+Motifs de rotation (2-2-2-4, 3-3-3-3, 4 jours / 4 repos...) et génération de scénarios.
+"""
+from datetime import datetime, timedelta
+from itertools import product
+from typing import Iterable, Iterator, Optional, Sequence, Tuple
+
+from .shift import ShiftType, WorkDay, Scenario, intern_work_day
+
+
+class RotationPattern:
+    """Cycle de shifts répété indéfiniment (None = jour de repos)"""
+
+    def __init__(self, name: str, days: Sequence[Optional[ShiftType]]):
+        """
+        Args:
+            name: Nom du motif (ex: '2-2-2-4')
+            days: Shift de chaque jour du cycle, None pour un jour de repos
+        """
+        if not days:
+            raise ValueError("Un motif de rotation doit contenir au moins un jour")
+        self.name = name
+        self.days: Tuple[Optional[ShiftType], ...] = tuple(days)
+
+    @classmethod
+    def from_blocks(cls, name: str, blocks: Iterable[Tuple[Optional[ShiftType], int]]) -> 'RotationPattern':
+        """
+        Construit un motif à partir de blocs consécutifs.
+
+        Args:
+            name: Nom du motif
+            blocks: Tuples (shift ou None, nombre de jours)
+
+        Returns:
+            RotationPattern
+
+        Example:
+            >>> RotationPattern.from_blocks('2-2-2-4', [
+            ...     (ShiftType.MATIN, 2), (ShiftType.APRES_MIDI, 2), (ShiftType.NUIT, 2), (None, 4)
+            ... ])
+        """
+        days = []
+        for shift_type, count in blocks:
+            days.extend([shift_type] * count)
+        return cls(name, days)
+
+    @property
+    def length(self) -> int:
+        """Nombre de jours du cycle"""
+        return len(self.days)
+
+    def shift_at(self, offset: int, phase: int = 0) -> Optional[ShiftType]:
+        """
+        Shift du jour situé à offset jours du début.
+
+        Args:
+            offset: Nombre de jours depuis la date de début
+            phase: Jour du cycle par lequel la rotation commence
+
+        Returns:
+            ShiftType, ou None pour un jour de repos
+        """
+        return self.days[(offset + phase) % len(self.days)]
+
+    def iter_work_days(self, start: datetime, horizon_days: int, phase: int = 0) -> Iterator[WorkDay]:
+        """
+        Produit les jours travaillés de la rotation.
+
+        Args:
+            start: Premier jour de la période
+            horizon_days: Nombre de jours calendaires couverts
+            phase: Jour du cycle par lequel la rotation commence
+
+        Yields:
+            WorkDay dans l'ordre chronologique (jours de repos omis)
+        """
+        length = len(self.days)
+        for offset in range(horizon_days):
+            shift_type = self.days[(offset + phase) % length]
+            if shift_type is not None:
+                yield intern_work_day(start + timedelta(days=offset), shift_type)
+
+    def to_scenario(self, start: datetime, horizon_days: int, hourly_rate: float,
+                    phase: int = 0, name: str = None) -> Scenario:
+        """
+        Construit le scénario complet d'une rotation.
+
+        Args:
+            start: Premier jour de la période
+            horizon_days: Nombre de jours calendaires couverts
+            hourly_rate: Taux horaire de base
+            phase: Jour du cycle par lequel la rotation commence
+            name: Nom du scénario (généré si absent)
+
+        Returns:
+            Scenario
+        """
+        if name is None:
+            name = f"{self.name} dès le {start.strftime('%d/%m/%Y')}"
+            if phase:
+                name += f" (jour {phase + 1} du cycle)"
+        return Scenario(name, list(self.iter_work_days(start, horizon_days, phase)), hourly_rate)
+
+    def __eq__(self, other):
+        return isinstance(other, RotationPattern) and self.days == other.days
+
+    def __hash__(self):
+        return hash(self.days)
+
+    def __repr__(self):
+        return f"RotationPattern('{self.name}', {len(self.days)} jours)"
+
+
+# Motifs usuels
+PATTERNS = {
+    '2-2-2-4': RotationPattern.from_blocks('2-2-2-4', [
+        (ShiftType.MATIN, 2), (ShiftType.APRES_MIDI, 2), (ShiftType.NUIT, 2), (None, 4)]),
+    '3-3-3-3': RotationPattern.from_blocks('3-3-3-3', [
+        (ShiftType.MATIN, 3), (ShiftType.APRES_MIDI, 3), (ShiftType.NUIT, 3), (None, 3)]),
+    '4-4 matin': RotationPattern.from_blocks('4-4 matin', [(ShiftType.MATIN, 4), (None, 4)]),
+    '4-4 nuit': RotationPattern.from_blocks('4-4 nuit', [(ShiftType.NUIT, 4), (None, 4)]),
+}
+
+
+def iter_rotation_scenarios(patterns: Iterable[RotationPattern], start_dates: Iterable[datetime],
+                            horizons: Iterable[int], hourly_rate: float,
+                            phases: Iterable[int] = (0,)) -> Iterator[Scenario]:
+    """
+    Produit à la demande un scénario par combinaison motif × date de début × horizon × phase.
+
+    Les scénarios ne sont construits qu'au moment où ils sont consommés.
+
+    Args:
+        patterns: Motifs de rotation
+        start_dates: Dates de début
+        horizons: Nombres de jours calendaires
+        hourly_rate: Taux horaire de base
+        phases: Jours du cycle par lesquels commencer
+
+    Yields:
+        Scenario
+    """
+    for pattern, start, horizon_days, phase in product(patterns, start_dates, horizons, phases):
+        yield pattern.to_scenario(start, horizon_days, hourly_rate, phase % pattern.length)
@@ -1,9 +1,14 @@
 """
 Modèles de données pour les shifts et scénarios.
 """
+import threading
+from collections import OrderedDict
 from datetime import datetime, time, timedelta
 from enum import Enum
-from typing import List, Dict
+from weakref import WeakValueDictionary
+from typing import Iterable, Iterator, List, Dict
+
+from .dst import transitions_between
 
 
 class ShiftType(Enum):
@@ -14,7 +19,12 @@ class ShiftType(Enum):
 
 
 class ShiftDefinition:
-    """Définition des horaires de chaque type de shift"""
+    """
+    Définition des horaires de chaque type de shift.
+
+    Horaires des WorkDay, fixes: un fichier de règles aux horaires différents
+    ne les modifie pas (voir PremiumRules.work_day_span).
+    """
     SHIFT_HOURS = {
         ShiftType.MATIN: (time(6, 0), time(15, 0)),
         ShiftType.APRES_MIDI: (time(14, 0), time(23, 0)),
@@ -23,7 +33,14 @@ class ShiftDefinition:
 
 
 class WorkDay:
-    """Représente un jour de travail avec son shift"""
+    """
+    Représente un jour de travail avec son shift.
+
+    Immuable: une même instance peut être partagée entre scénarios
+    (voir WorkDayPool) et servir de clé de mémoïsation par identité.
+    """
+
+    __slots__ = ('date', 'shift_type', 'start_datetime', 'end_datetime', 'dst_transitions', '__weakref__')
 
     def __init__(self, date: datetime, shift_type: ShiftType):
         """
@@ -31,52 +48,250 @@ class WorkDay:
             date: Date du jour de travail
             shift_type: Type de shift (MATIN, APRES_MIDI, NUIT)
         """
-        self.date = date
-        self.shift_type = shift_type
-        self.start_datetime = None
-        self.end_datetime = None
-        self._calculate_datetimes()
-
-    def _calculate_datetimes(self):
-        """Calcule les datetime de début et fin du shift"""
-        start_time, end_time = ShiftDefinition.SHIFT_HOURS[self.shift_type]
+        start_time, end_time = ShiftDefinition.SHIFT_HOURS[shift_type]
 
         # Début du shift
-        self.start_datetime = datetime.combine(self.date.date(), start_time)
+        start_datetime = datetime.combine(date.date(), start_time)
 
         # Fin du shift
-        if self.shift_type == ShiftType.NUIT:
+        if end_time <= start_time:
             # Le shift de nuit se termine le lendemain
-            self.end_datetime = datetime.combine(
-                self.date.date() + timedelta(days=1),
-                end_time
-            )
+            end_datetime = datetime.combine(date.date() + timedelta(days=1), end_time)
         else:
-            self.end_datetime = datetime.combine(self.date.date(), end_time)
+            end_datetime = datetime.combine(date.date(), end_time)
+
+        set_attribute = object.__setattr__
+        set_attribute(self, 'date', date)
+        set_attribute(self, 'shift_type', shift_type)
+        set_attribute(self, 'start_datetime', start_datetime)
+        set_attribute(self, 'end_datetime', end_datetime)
+        # Les horaires sont en heure locale: repérer un éventuel changement d'heure (rare)
+        set_attribute(self, 'dst_transitions', transitions_between(start_datetime, end_datetime))
+
+    def __setattr__(self, name, value):
+        raise AttributeError(f"WorkDay est immuable (attribut {name})")
+
+    def __delattr__(self, name):
+        raise AttributeError(f"WorkDay est immuable (attribut {name})")
+
+    def __reduce__(self):
+        return WorkDay, (self.date, self.shift_type)
 
     def get_duration_hours(self) -> float:
-        """Retourne la durée totale du shift en heures"""
+        """Retourne la durée réellement travaillée du shift en heures"""
         duration = self.end_datetime - self.start_datetime
-        return duration.total_seconds() / 3600
+        hours = duration.total_seconds() / 3600
+
+        # Mars: une heure sautée (-1h), octobre: une heure vécue deux fois (+1h)
+        for transition in self.dst_transitions:
+            overlap = (min(transition.end, self.end_datetime) -
+                       max(transition.start, self.start_datetime)).total_seconds() / 3600
+            hours -= overlap if transition.delta_hours > 0 else -overlap
+
+        return hours
 
     def __repr__(self):
         return f"WorkDay({self.date.strftime('%Y-%m-%d')}, {self.shift_type.value})"
 
 
+class WorkDayPool:
+    """
+    Fabrique de WorkDay partagés: une seule instance par couple (date, shift).
+
+    Les instances sont retrouvées par un dictionnaire à références faibles:
+    tant qu'un scénario les utilise, elles restent partagées. Les MAX_RECENT
+    dernières demandées sont en plus gardées en vie (LRU), pour qu'un couple
+    fréquent survive entre deux requêtes.
+    """
+
+    MAX_RECENT = 4096
+
+    def __init__(self, max_recent: int = None):
+        """
+        Args:
+            max_recent: Instances gardées en vie au minimum (MAX_RECENT par défaut)
+        """
+        self.max_recent = self.MAX_RECENT if max_recent is None else max_recent
+        self._instances: 'WeakValueDictionary[tuple, WorkDay]' = WeakValueDictionary()
+        self._recent: 'OrderedDict[tuple, WorkDay]' = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, date: datetime, shift_type: ShiftType) -> WorkDay:
+        """
+        Retourne le WorkDay partagé d'un couple (date, shift), créé au besoin.
+
+        Args:
+            date: Date du jour de travail
+            shift_type: Type de shift
+
+        Returns:
+            WorkDay (la même instance pour le même couple)
+        """
+        key = (date, shift_type)
+        with self._lock:
+            work_day = self._instances.get(key)
+            if work_day is None:
+                self.misses += 1
+                work_day = WorkDay(date, shift_type)
+                self._instances[key] = work_day
+            else:
+                self.hits += 1
+            self._recent[key] = work_day
+            self._recent.move_to_end(key)
+            if len(self._recent) > self.max_recent:
+                self._recent.popitem(last=False)
+        return work_day
+
+    def __len__(self):
+        return len(self._instances)
+
+
+_default_pool = WorkDayPool()
+
+
+def intern_work_day(date: datetime, shift_type: ShiftType) -> WorkDay:
+    """WorkDay partagé d'un couple (date, shift), depuis la fabrique commune"""
+    return _default_pool.get(date, shift_type)
+
+
 class Scenario:
     """Représente un scénario de remplacement complet"""
 
-    def __init__(self, name: str, work_days: List[WorkDay], hourly_rate: float):
+    def __init__(self, name: str, work_days: List[WorkDay], hourly_rate: float, rates=None):
         """
         Args:
             name: Nom du scénario
             work_days: Liste des jours de travail
             hourly_rate: Taux horaire de base (€/h)
+            rates: RateSchedule (taux et majorations datés) remplaçant hourly_rate jour par jour
         """
         self.name = name
         self.work_days = work_days
         self.hourly_rate = hourly_rate
+        self.rates = rates
         self.calculation_result = None  # Sera rempli par le calculateur
 
     def __repr__(self):
         return f"Scenario('{self.name}', {len(self.work_days)} jours, {self.hourly_rate}€/h)"
+
+
+class ShiftRun:
+    """Séquence de jours consécutifs travaillés avec le même shift"""
+
+    __slots__ = ('start', 'shift_type', 'length')
+
+    def __init__(self, start: datetime, shift_type: ShiftType, length: int = 1):
+        """
+        Args:
+            start: Premier jour de la séquence
+            shift_type: Type de shift de chaque jour
+            length: Nombre de jours consécutifs
+
+        Raises:
+            ValueError: Si la longueur est inférieure à 1
+        """
+        if length < 1:
+            raise ValueError(f"Longueur de séquence invalide: {length}")
+        self.start = start
+        self.shift_type = shift_type
+        self.length = length
+
+    @property
+    def end(self) -> datetime:
+        """Dernier jour de la séquence"""
+        return self.start + timedelta(days=self.length - 1)
+
+    def iter_work_days(self) -> Iterator[WorkDay]:
+        """Jours de travail de la séquence"""
+        for offset in range(self.length):
+            yield intern_work_day(self.start + timedelta(days=offset), self.shift_type)
+
+    def __eq__(self, other):
+        if not isinstance(other, ShiftRun):
+            return NotImplemented
+        return (self.start, self.shift_type, self.length) == (other.start, other.shift_type, other.length)
+
+    def __hash__(self):
+        return hash((self.start, self.shift_type, self.length))
+
+    def __repr__(self):
+        return f"ShiftRun({self.start.strftime('%Y-%m-%d')}, {self.shift_type.value} x{self.length})"
+
+
+def merge_runs(runs: Iterable[ShiftRun]) -> List[ShiftRun]:
+    """
+    Fusionne les séquences contiguës de même shift.
+
+    Args:
+        runs: Séquences (dans un ordre quelconque)
+
+    Returns:
+        Nouvelles séquences ShiftRun, dans l'ordre chronologique
+    """
+    merged: List[ShiftRun] = []
+    for run in sorted(runs, key=lambda r: r.start):
+        last = merged[-1] if merged else None
+        if (last is not None and last.shift_type == run.shift_type
+                and (run.start - last.start).days == last.length):
+            last.length += run.length
+        else:
+            merged.append(ShiftRun(run.start, run.shift_type, run.length))
+    return merged
+
+
+def compress_runs(work_days: Iterable[WorkDay]) -> List[ShiftRun]:
+    """
+    Regroupe des jours de travail en séquences de même shift.
+
+    Args:
+        work_days: Jours de travail (dans un ordre quelconque)
+
+    Returns:
+        Séquences ShiftRun, dans l'ordre chronologique
+    """
+    return merge_runs(ShiftRun(work_day.date, work_day.shift_type) for work_day in work_days)
+
+
+class RunScenario(Scenario):
+    """
+    Scénario stocké sous forme de séquences (début, shift, longueur).
+
+    Les jours de travail ne sont pas conservés: work_days les reconstruit à la
+    demande, et le calculateur tarife chaque séquence sans les développer.
+    """
+
+    def __init__(self, name: str, runs: List[ShiftRun], hourly_rate: float, rates=None):
+        """
+        Args:
+            name: Nom du scénario
+            runs: Séquences de jours travaillés
+            hourly_rate: Taux horaire de base (€/h)
+            rates: RateSchedule (taux et majorations datés) remplaçant hourly_rate jour par jour
+        """
+        self.name = name
+        self.runs = list(runs)
+        self.hourly_rate = hourly_rate
+        self.rates = rates
+        self.calculation_result = None
+
+    @classmethod
+    def from_work_days(cls, name: str, work_days: Iterable[WorkDay], hourly_rate: float,
+                       rates=None) -> 'RunScenario':
+        """Crée le scénario en regroupant des jours de travail en séquences"""
+        return cls(name, compress_runs(work_days), hourly_rate, rates)
+
+    @property
+    def work_days(self) -> List[WorkDay]:
+        """Jours de travail développés (reconstruits à chaque accès)"""
+        return [work_day for run in self.runs for work_day in run.iter_work_days()]
+
+    @property
+    def day_count(self) -> int:
+        """Nombre de jours travaillés"""
+        return sum(run.length for run in self.runs)
+
+    def __repr__(self):
+        return (f"RunScenario('{self.name}', {len(self.runs)} séquences, {self.day_count} jours, "
+                f"{self.hourly_rate}€/h)")
@@ -0,0 +1,70 @@
+"""
+Tests unitaires pour l'attribution des shifts à pourvoir.
+"""
+from datetime import datetime, timedelta
+from itertools import permutations
+import random
+import sys
+import os
+
+# Ajouter le dossier parent au path pour les imports
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '../..')))
+
+from shift_comparator.models import ShiftType, WorkDay, Scenario
+from shift_comparator.core import AssignmentSolver, Replacement, ScheduleValidator
+from shift_comparator.core.assignment import solve_assignment
+
+
+def test_hungarian_matches_brute_force():
+    """Test: la méthode hongroise trouve le coût minimal sur de petites matrices"""
+    print("\n--- Test: Méthode hongroise ---")
+
+    rng = random.Random(7)
+    for _ in range(200):
+        n = rng.randrange(1, 6)
+        m = rng.randrange(n, 7)
+        cost = [[rng.randrange(20) for _ in range(m)] for _ in range(n)]
+        assignment = solve_assignment(cost)
+        best = min(sum(cost[i][p[i]] for i in range(n)) for p in permutations(range(m), n))
+        assert len(set(assignment)) == n
+        assert sum(cost[i][assignment[i]] for i in range(n)) == best
+    print("✓ Test réussi")
+
+
+def test_assignment_respects_rules():
+    """Test: disponibilités, repos et capacité respectés; 'fairness' répartit mieux"""
+    print("\n--- Test: Attribution des shifts ---")
+
+    monday = datetime(2026, 2, 2)
+    open_shifts = [WorkDay(monday + timedelta(days=d), shift_type)
+                   for d in range(4) for shift_type in (ShiftType.MATIN, ShiftType.NUIT)]
+    people = [
+        Replacement("Junior", 12.0),
+        Replacement("Senior", 16.0, scenario=Scenario("Senior", [WorkDay(monday, ShiftType.APRES_MIDI)], 16.0)),
+        Replacement("Mardi", 14.0, available_dates=[monday + timedelta(days=1)]),
+        Replacement("Renfort", 15.0, max_shifts=1),
+    ]
+    solver = AssignmentSolver(max_shifts=3)
+    validator = ScheduleValidator()
+
+    results = {objective: solver.solve(open_shifts, people, objective) for objective in ('cost', 'fairness')}
+    for objective, result in results.items():
+        print(f"{objective}: {result} {result.loads()}")
+        loads = result.loads()
+        assert loads["Renfort"] <= 1 and all(load <= 3 for load in loads.values())
+        for index, person in enumerate(people):
+            taken = [open_shifts[shift] for shift, p, _ in result.assignments if p == index]
+            assert all(person.is_available(wd.date) for wd in taken)
+            existing = person.scenario.work_days if person.scenario else []
+            assert not validator.validate(Scenario(person.person_id, existing + taken, person.hourly_rate))
+
+    cost, fair = results['cost'], results['fairness']
+    assert len(cost.assignments) == len(fair.assignments)
+    assert cost.total_pay <= fair.total_pay + 1e-9
+    assert max(fair.loads().values()) <= max(cost.loads().values())
+    print("✓ Test réussi")
+
+
+if __name__ == "__main__":
+    test_hungarian_matches_brute_force()
+    test_assignment_respects_rules()
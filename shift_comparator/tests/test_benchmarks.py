@@ -0,0 +1,56 @@
+"""
+Tests unitaires pour la comparaison des benchmarks à une référence.
+"""
+import sys
+import os
+import tempfile
+
+# Ajouter le dossier parent au path pour les imports
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '../..')))
+
+from shift_comparator.benchmarks import suite
+from shift_comparator.benchmarks.runner import BenchmarkResult, save_results, load_results, find_regressions
+
+
+def test_regressions_against_saved_baseline():
+    """Test: dégradation au-delà du seuil signalée, variation tolérée ignorée, via un fichier JSON"""
+    print("\n--- Test: Régressions des benchmarks ---")
+
+    baseline = [BenchmarkResult('scenario.1000', [0.010, 0.012], 4096),
+                BenchmarkResult('compare.50x30', [0.020], 8192)]
+    with tempfile.TemporaryDirectory() as directory:
+        path = os.path.join(directory, 'baseline.json')
+        save_results(baseline, path)
+        reference = load_results(path)
+
+    current = [BenchmarkResult('scenario.1000', [0.0105], 4096),   # +5%: toléré
+               BenchmarkResult('compare.50x30', [0.020], 12288),   # Mémoire +50%
+               BenchmarkResult('nouveau', [1.0], 1)]               # Absent de la référence
+    regressions = find_regressions(current, reference, threshold=0.10)
+    print(regressions)
+    assert [(name, metric) for name, metric, *_ in regressions] == [('compare.50x30', 'peak_memory')]
+    assert abs(regressions[0][4] - 1.5) < 1e-9
+    assert find_regressions(current, reference, threshold=0.60) == []
+    print("✓ Test réussi")
+
+
+def test_filter_builds_only_selected_cases():
+    """Test: le filtre évite de préparer les rosters des autres benchmarks"""
+    print("\n--- Test: Préparation filtrée ---")
+
+    built = []
+    original = suite.build_roster
+    suite.build_roster = lambda days, *args: built.append(days) or original(days, *args)
+    try:
+        cases = suite.build_cases(name_filter='work_day.MATIN')
+    finally:
+        suite.build_roster = original
+    print([name for name, _, _ in cases])
+    assert [name for name, _, _ in cases] == ['work_day.MATIN.semaine.x1000', 'work_day.MATIN.dimanche.x1000']
+    assert built == []
+    print("✓ Test réussi")
+
+
+if __name__ == "__main__":
+    test_regressions_against_saved_baseline()
+    test_filter_builds_only_selected_cases()
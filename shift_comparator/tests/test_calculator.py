@@ -1,7 +1,9 @@
 """
 Tests unitaires pour le calculateur de shifts.
 """
-from datetime import datetime
+from datetime import datetime, timedelta
+import tempfile
+import threading
 import sys
 import os
 
@@ -9,7 +11,7 @@ import os
 sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '../..')))
 
 from shift_comparator.models import ShiftType, WorkDay, Scenario
-from shift_comparator.core import ShiftCalculator
+from shift_comparator.core import ShiftCalculator, PremiumProfileTable
 
 
 def test_morning_shift_weekday():
@@ -126,6 +128,106 @@ def test_night_shift_sunday():
     print("✓ Test réussi")
 
 
+def test_night_shift_dst_changes():
+    """Test des nuits de changement d'heure (Europe/Paris)"""
+    print("\n--- Test: Shift NUIT pendant les changements d'heure ---")
+
+    calculator = ShiftCalculator()
+
+    # Nuit du 28 au 29 mars 2026: 02:00 → 03:00, une heure de moins
+    spring = WorkDay(datetime(2026, 3, 28), ShiftType.NUIT)
+    spring_result = calculator.calculate_work_day(spring, 13.0)
+
+    # Nuit du 24 au 25 octobre 2026: 03:00 → 02:00, une heure de plus
+    autumn = WorkDay(datetime(2026, 10, 24), ShiftType.NUIT)
+    autumn_result = calculator.calculate_work_day(autumn, 13.0)
+
+    print(f"Mars: {spring.get_duration_hours()}h, {spring_result.breakdown}")
+    print(f"Octobre: {autumn.get_duration_hours()}h, {autumn_result.breakdown}")
+
+    # Samedi 22h-00h: 2h nuit, dimanche 00h-06h: nuit+dimanche (5h ou 7h), 06h-07h: dimanche
+    assert spring.get_duration_hours() == 8.0, "8h travaillées en mars"
+    assert spring_result.breakdown.get_total_hours() == 8.0, "8h dans le breakdown"
+    assert spring_result.breakdown.night_sunday_hours == 5.0, "5h nuit+dimanche"
+    assert spring_result.total_pay == 8 * 13 + (2 * 0.15 + 5 * 0.40 + 1 * 0.25) * 13
+
+    assert autumn.get_duration_hours() == 10.0, "10h travaillées en octobre"
+    assert autumn_result.breakdown.get_total_hours() == 10.0, "10h dans le breakdown"
+    assert autumn_result.breakdown.night_sunday_hours == 7.0, "7h nuit+dimanche"
+
+    # La nuit suivante n'est pas concernée
+    assert WorkDay(datetime(2026, 3, 29), ShiftType.NUIT).get_duration_hours() == 9.0
+
+    print("✓ Test réussi")
+
+
+def test_weekly_overtime():
+    """Test des heures supplémentaires hebdomadaires"""
+    print("\n--- Test: Heures supplémentaires (+25% au-delà de 35h, +50% au-delà de 43h) ---")
+
+    calculator = ShiftCalculator()
+
+    # 6 matins du lundi 12 au samedi 17 janvier 2026: 54h dans la même semaine ISO
+    work_days = [WorkDay(datetime(2026, 1, 12 + i), ShiftType.MATIN) for i in range(6)]
+    result = calculator.calculate_scenario(Scenario("6 matins", work_days, 10.0))
+
+    print(f"Heures: {result.get_total_hours()}h, {result.total_breakdown}")
+    print(f"Majoration heures sup.: {result.total_overtime_pay:.2f}€")
+
+    assert result.total_breakdown.overtime_25_hours == 8.0, "8h à +25% (35h → 43h)"
+    assert result.total_breakdown.overtime_50_hours == 11.0, "11h à +50% (au-delà de 43h)"
+    assert abs(result.total_overtime_pay - (8 * 10 * 0.25 + 11 * 10 * 0.50)) < 1e-9
+    assert abs(result.total_pay - (54 * 10 + 75.0)) < 1e-9
+
+    # Mise à jour incrémentale: retirer un jour ne recalcule que sa semaine
+    result.remove_day_result(result.day_results[-1])
+    assert result.total_breakdown.overtime_25_hours == 8.0, "45h: 8h à +25%"
+    assert result.total_breakdown.overtime_50_hours == 2.0, "45h: 2h à +50%"
+    assert abs(result.total_pay - (45 * 10 + 8 * 2.5 + 2 * 5.0)) < 1e-9
+
+    # Sans heures supplémentaires: comportement historique, jour par jour
+    plain = ShiftCalculator(weekly_overtime=False).calculate_scenario(
+        Scenario("6 matins", work_days, 10.0))
+    assert plain.total_pay == 540.0, "54h au taux de base"
+    per_call = calculator.calculate_scenario(Scenario("6 matins", work_days, 10.0), weekly_overtime=False)
+    assert per_call.total_pay == 540.0 and per_call.total_breakdown.overtime_25_hours == 0.0
+
+    print("✓ Test réussi")
+
+
+def test_profile_table():
+    """Test de la table précalculée (y compris changements d'heure et hors plage)"""
+    print("\n--- Test: Table des heures précalculée ---")
+
+    calculator = ShiftCalculator()
+    table = PremiumProfileTable.build(calculator, 2026, 2026)
+
+    # Aller-retour disque
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, 'profils.bin')
+        # Enregistrements simultanés (workers): chacun son fichier temporaire, aucun reste
+        threads = [threading.Thread(target=table.save, args=(path,)) for _ in range(8)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        assert os.listdir(tmp) == ['profils.bin']
+        table = PremiumProfileTable.load(path, calculator)
+
+    fast = ShiftCalculator(profile_table=table)
+    for d in range(-3, 370):  # Quelques jours hors plage de chaque côté
+        for shift_type in ShiftType:
+            work_day = WorkDay(datetime(2026, 1, 1) + timedelta(days=d), shift_type)
+            expected = calculator.decompose(work_day)
+            breakdown = fast.compute_breakdown(work_day)
+            assert abs(breakdown.night_hours - expected.night_hours) < 1e-12
+            assert abs(breakdown.night_sunday_hours - expected.night_sunday_hours) < 1e-12
+            assert abs(breakdown.get_total_hours() - expected.get_total_hours()) < 1e-12
+
+    print(f"{table}: identique au calcul complet")
+    print("✓ Test réussi")
+
+
 def test_scenario_comparison():
     """Test de comparaison de scénarios"""
     print("\n--- Test: Comparaison de scénarios ---")
@@ -174,6 +276,9 @@ def run_all_tests():
         test_night_shift()
         test_sunday_shift()
         test_night_shift_sunday()
+        test_night_shift_dst_changes()
+        test_weekly_overtime()
+        test_profile_table()
         test_scenario_comparison()
 
         print("\n" + "=" * 80)
@@ -0,0 +1,60 @@
+"""
+Tests unitaires pour la chronologie des effectifs.
+"""
+from datetime import datetime, timedelta
+import sys
+import os
+
+# Ajouter le dossier parent au path pour les imports
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '../..')))
+
+from shift_comparator.models import ShiftType, WorkDay, Scenario, ShiftRun, RunScenario, EmployeeRoster
+from shift_comparator.core import CoverageTimeline
+
+
+def test_headcount_and_windows():
+    """Test: effectifs identiques à un comptage direct, périodes hors cible"""
+    print("\n--- Test: Chronologie des effectifs ---")
+
+    shift_types = list(ShiftType)
+    start = datetime(2026, 3, 23)
+    rosters = [
+        EmployeeRoster(f"E{i}", "A", Scenario(f"E{i}", [WorkDay(start + timedelta(days=d), shift_types[(i + d) % 3])
+                                                      for d in range(0, 12, 1 + i % 2)], 13.0))
+        for i in range(6)
+    ]
+    rosters.append(EmployeeRoster("R", "A", RunScenario("R", [ShiftRun(start, ShiftType.NUIT, 5)], 13.0)))
+
+    timeline = CoverageTimeline.from_scenarios(rosters, step_minutes=30)
+    print(timeline)
+
+    # Comptage direct, créneau par créneau
+    work_days = [wd for roster in rosters for wd in roster.scenario.work_days]
+    for slot, headcount in enumerate(timeline.headcount()):
+        slot_start = timeline.slot_start(slot)
+        slot_end = slot_start + timedelta(minutes=30)
+        assert headcount == sum(1 for wd in work_days
+                                if wd.start_datetime < slot_end and wd.end_datetime > slot_start)
+    assert timeline.at(datetime(2026, 3, 23, 23, 0)) == timeline.headcount()[46]
+
+    # Minimum par heure de la semaine: 2 personnes la nuit du lundi au vendredi
+    minimum = [2 if hour < 6 and day < 5 else 1 for day in range(7) for hour in range(24)]
+    windows = timeline.windows(minimum, maximum=3)
+    for window in windows:
+        assert window.gap > 0 and window.start < window.end
+        if window.kind == 'under':
+            assert window.headcount < window.target
+        else:
+            assert window.headcount > 3
+
+    # Chaque créneau hors cible est dans une période, et inversement
+    targets = timeline.expand_target(minimum)
+    outside = sum(1 for h, t in zip(timeline.headcount(), targets) if h < t or h > 3)
+    assert outside == sum((w.end - w.start) // timedelta(minutes=30) for w in windows)
+
+    print(f"{len(windows)} période(s) hors cible, ex: {windows[0]}")
+    print("✓ Test réussi")
+
+
+if __name__ == "__main__":
+    test_headcount_and_windows()
@@ -0,0 +1,156 @@
+"""
+Tests unitaires pour l'export colonnaire des résultats.
+"""
+from datetime import datetime, timedelta
+import csv
+import io
+import sys
+import os
+import tempfile
+
+# Ajouter le dossier parent au path pour les imports
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '../..')))
+
+from shift_comparator.models import ShiftType, WorkDay, Scenario, ShiftRun, RunScenario
+from shift_comparator.core import ShiftCalculator, ScenarioComparator, RangeIndex
+from shift_comparator.utils import ColumnarExporter
+from shift_comparator.utils.export import COLUMNS, EPOCH_ORDINAL
+
+try:
+    import numpy
+except ImportError:
+    numpy = None
+
+try:
+    import pyarrow
+except ImportError:
+    pyarrow = None
+
+
+def build_comparison():
+    shift_types = list(ShiftType)
+    scenarios = [
+        Scenario(name, [WorkDay(datetime(2026, 1, 12) + timedelta(days=d), shift_types[(d + i) % 3])
+                        for d in range(days)], 14.0)
+        for i, (name, days) in enumerate((("A", 5), ("B", 7), ("C", 3)))
+    ]
+    return ScenarioComparator(ShiftCalculator()).compare_scenarios(scenarios)
+
+
+def test_csv_rows_and_columns():
+    """Test: une ligne CSV par jour, colonnes typées de même longueur, lots aux bonnes bornes"""
+    print("\n--- Test: Export colonnaire ---")
+
+    comparison = build_comparison()
+    days = [(r.scenario_name, dr) for r in comparison.scenario_results for dr in r.day_results]
+    names = [r.scenario_name for r in comparison.scenario_results]  # Ordre du classement
+
+    stream = io.StringIO(newline='')
+    ColumnarExporter.write_csv(comparison, stream)
+    rows = list(csv.reader(io.StringIO(stream.getvalue())))
+    assert rows[0] == COLUMNS and len(rows) == len(days) + 1
+    name, dr = days[-1]
+    assert rows[-1][:4] == [name, dr.work_day.date.strftime('%Y-%m-%d'), '1', dr.work_day.shift_type.value]
+    assert abs(float(rows[-1][-1]) - dr.total_pay) < 1e-9
+
+    columns = ColumnarExporter.to_columns(comparison)
+    assert all(len(columns[column]) == len(days) for column in COLUMNS)
+    assert (columns['scenario'].typecode, columns['date'].typecode, columns['shift_type'].typecode,
+            columns['total_pay'].typecode) == ('i', 'i', 'b', 'd')
+    assert columns['scenario_dictionary'] == names
+    assert columns['scenario'].tolist() == [names.index(name) for name, _ in days]
+    assert columns['date'][0] == datetime(2026, 1, 12).toordinal() - EPOCH_ORDINAL
+    assert abs(sum(columns['total_pay']) - sum(r.total_pay for r in comparison.scenario_results)) < 1e-9
+
+    batches = list(ColumnarExporter.iter_batches(comparison, batch_size=4))
+    print(f"{len(days)} jours, lots de {[len(b['date']) for b in batches]}")
+    assert [len(b['date']) for b in batches] == [4, 4, 4, 3]
+    assert sum((b['scenario'].tolist() for b in batches), []) == columns['scenario'].tolist()
+    assert batches[0]['scenario_dictionary'] == names  # Dictionnaires cumulatifs
+    assert list(ColumnarExporter.iter_batches([])) == []
+    print("✓ Test réussi")
+
+
+def test_run_scenario_rows():
+    """Test: un RunScenario donne une ligne par séquence, avec sa longueur, qui totalisent le scénario"""
+    print("\n--- Test: Export d'un scénario en séquences ---")
+
+    runs = [ShiftRun(datetime(2026, 1, 5), ShiftType.NUIT, 6), ShiftRun(datetime(2026, 1, 14), ShiftType.MATIN, 3)]
+    result = ShiftCalculator(weekly_overtime=False).calculate_scenario(RunScenario("N", runs, 15.0))
+
+    rows = list(ColumnarExporter.iter_rows(result))
+    print(rows[0])
+    assert [row[1:4] for row in rows] == [('2026-01-05', 6, 'NUIT'), ('2026-01-14', 3, 'MATIN')]
+    assert abs(sum(row[-1] for row in rows) - result.total_pay) < 1e-9
+
+    columns = ColumnarExporter.to_columns(result)
+    assert columns['days'].tolist() == [6, 3]
+    assert columns['date'][1] == datetime(2026, 1, 14).toordinal() - EPOCH_ORDINAL
+    print("✓ Test réussi")
+
+
+def test_overtime_columns_reconcile():
+    """Test: heures sup. attribuées jour par jour comme RangeIndex, lignes qui totalisent le scénario"""
+    print("\n--- Test: Heures supplémentaires par ligne ---")
+
+    calculator = ShiftCalculator()
+    work_days = [WorkDay(datetime(2026, 1, 5) + timedelta(days=d), ShiftType.NUIT) for d in range(6)]
+    scenario = Scenario("Nuits", work_days, 17.5)
+    result = calculator.calculate_scenario(scenario)
+    rows = [dict(zip(COLUMNS, row)) for row in ColumnarExporter.iter_rows(result)]
+
+    index = RangeIndex.from_scenario(scenario, calculator)
+    for row, wd in zip(rows, work_days):
+        day = index.totals(wd.date, wd.date)
+        assert abs(row['overtime_25_hours'] - day['overtime_25_hours']) < 1e-9
+        assert abs(row['overtime_50_hours'] - day['overtime_50_hours']) < 1e-9
+        assert abs(row['overtime_pay'] - day['overtime_pay']) < 1e-9
+        assert abs(row['total_pay'] - day['total_pay']) < 1e-9 and row['hourly_rate'] == 17.5
+    print(f"Lignes: {sum(row['total_pay'] for row in rows):.2f}€, scénario: {result.total_pay:.2f}€")
+    assert rows[0]['overtime_pay'] == 0.0 and rows[-1]['overtime_50_hours'] > 0
+    assert abs(sum(row['total_pay'] for row in rows) - result.total_pay) < 1e-9
+    assert abs(sum(row['overtime_pay'] for row in rows) - result.total_overtime_pay) < 1e-9
+
+    runs = [ShiftRun(datetime(2026, 1, 3), ShiftType.NUIT, 12), ShiftRun(datetime(2026, 3, 26), ShiftType.NUIT, 6)]
+    run_result = calculator.calculate_scenario(RunScenario("Nuits", runs, 17.5))
+    columns = ColumnarExporter.to_columns(run_result)
+    assert abs(sum(columns['total_pay']) - run_result.total_pay) < 1e-9
+    assert abs(sum(columns['overtime_pay']) - run_result.total_overtime_pay) < 1e-9
+    print("✓ Test réussi")
+
+
+def test_npz_and_arrow_round_trip():
+    """Test: relecture du .npz (numpy) et table Arrow (pyarrow), si ces dépendances sont installées"""
+    print("\n--- Test: Export .npz et Arrow ---")
+
+    comparison = build_comparison()
+    columns = ColumnarExporter.to_columns(comparison)
+
+    with tempfile.TemporaryDirectory() as directory:
+        path = os.path.join(directory, 'export.npz')
+        if numpy is None:
+            try:
+                ColumnarExporter.write_npz(comparison, path)
+                assert False, "numpy absent: ImportError attendue"
+            except ImportError as e:
+                print(f"numpy absent: {e}")
+        else:
+            ColumnarExporter.write_npz(comparison, path)
+            with numpy.load(path) as data:
+                assert data['total_pay'].tolist() == columns['total_pay'].tolist()
+                assert data['scenario_dictionary'].tolist() == columns['scenario_dictionary']
+                assert str(data['date'][0]) == '2026-01-12'
+
+    if pyarrow is None:
+        print("pyarrow absent: export Arrow non testé")
+    else:
+        table = ColumnarExporter.to_arrow(comparison)
+        assert table.column_names == COLUMNS and table.num_rows == len(columns['date'])
+    print("✓ Test réussi")
+
+
+if __name__ == "__main__":
+    test_csv_rows_and_columns()
+    test_run_scenario_rows()
+    test_overtime_columns_reconcile()
+    test_npz_and_arrow_round_trip()
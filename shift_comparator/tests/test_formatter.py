@@ -0,0 +1,103 @@
+"""
+Tests unitaires pour le formatage des rapports.
+"""
+from datetime import datetime, timedelta
+import io
+import sys
+import os
+
+# Ajouter le dossier parent au path pour les imports
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '../..')))
+
+from shift_comparator.models import ShiftType, WorkDay, Scenario, ShiftRun, RunScenario
+from shift_comparator.core import ShiftCalculator, ScenarioComparator, PremiumRules
+from shift_comparator.utils import ResultFormatter
+
+
+def _build_comparison():
+    """Compare trois scénarios de tailles différentes"""
+    comparator = ScenarioComparator(ShiftCalculator())
+    shift_types = list(ShiftType)
+
+    scenarios = []
+    for i in range(3):
+        work_days = [
+            WorkDay(datetime(2026, 1, 12) + timedelta(days=d), shift_types[d % 3])
+            for d in range(10 + i)
+        ]
+        scenarios.append(Scenario(f"Scénario {i}", work_days, 13.0))
+
+    return comparator.compare_scenarios(scenarios)
+
+
+def test_streaming_matches_format():
+    """Test: l'écriture en flux produit le même texte que print(format_*)"""
+    print("\n--- Test: Rapport en flux identique au rapport formaté ---")
+
+    comparison = _build_comparison()
+
+    for detailed in (True, False):
+        stream = io.StringIO()
+        ResultFormatter.write_comparison(comparison, stream, detailed=detailed)
+        expected = ResultFormatter.format_comparison(comparison, detailed=detailed) + "\n"
+        assert stream.getvalue() == expected, "Le flux doit être identique au rapport"
+
+    result = comparison.best_scenario
+    stream = io.StringIO()
+    ResultFormatter.write_scenario_result(result, stream)
+    assert stream.getvalue() == ResultFormatter.format_scenario_result(result) + "\n"
+
+    print("✓ Test réussi")
+
+
+def test_chunks_are_bounded():
+    """Test: les blocs produits ne dépassent pas la taille demandée"""
+    print("\n--- Test: Découpage du rapport en blocs ---")
+
+    comparison = _build_comparison()
+    lines = list(ResultFormatter.iter_comparison(comparison, detailed=True))
+    chunks = list(ResultFormatter.iter_chunks(iter(lines), max_lines=10))
+
+    print(f"{len(lines)} lignes → {len(chunks)} blocs")
+
+    assert len(chunks) == (len(lines) + 9) // 10, "Un bloc par tranche de 10 lignes"
+    assert all(chunk.endswith("\n") for chunk in chunks), "Chaque bloc finit par un saut de ligne"
+
+    print("✓ Test réussi")
+
+
+def test_run_scenario_detail():
+    """Test: le détail d'un RunScenario affiche une section par séquence"""
+    print("\n--- Test: Détail d'un scénario en séquences ---")
+
+    runs = [ShiftRun(datetime(2026, 1, 5), ShiftType.NUIT, 6), ShiftRun(datetime(2026, 1, 12), ShiftType.MATIN, 2)]
+    result = ShiftCalculator().calculate_scenario(RunScenario("Nuits", runs, 15.0))
+    report = ResultFormatter.format_scenario_result(result)
+
+    assert "DÉTAIL PAR SÉQUENCE:" in report and "DÉTAIL PAR JOUR:" not in report
+    assert "Monday 05/01/2026 → Saturday 10/01/2026 - NUIT (6 jours)" in report
+    assert f"TOTAL DE LA SÉQUENCE:   {result.run_results[1].total_pay:8.2f}€" in report
+    assert report.count("TOTAL DE LA SÉQUENCE") == 2
+    print("✓ Test réussi")
+
+
+def test_labels_do_not_hardcode_bonuses():
+    """Test: avec d'autres taux de majoration, le rapport n'affiche pas les pourcentages intégrés"""
+    print("\n--- Test: Libellés sans pourcentages figés ---")
+
+    rules = PremiumRules('test', night_bonus=0.30, sunday_bonus=0.50)
+    work_days = [WorkDay(datetime(2026, 1, 4) + timedelta(days=d), ShiftType.NUIT) for d in range(6)]
+    result = ShiftCalculator(rules=rules).calculate_scenario(Scenario("Nuits", work_days, 15.0))
+    report = ResultFormatter.format_scenario_result(result)
+
+    assert "Heures de nuit:" in report and "Heures nuit+dim:" in report
+    assert "+15%" not in report and "+40%" not in report
+    assert "Dont heures sup. (+25%):" in report and "Dont heures sup. (+50%):" in report
+    print("✓ Test réussi")
+
+
+if __name__ == "__main__":
+    test_streaming_matches_format()
+    test_chunks_are_bounded()
+    test_run_scenario_detail()
+    test_labels_do_not_hardcode_bonuses()
@@ -0,0 +1,51 @@
+"""
+Tests unitaires pour le test différentiel des moteurs de calcul.
+"""
+import json
+import sys
+import os
+
+# Ajouter le dossier parent au path pour les imports
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '../..')))
+
+from shift_comparator.fuzz import ENGINES, FuzzCase, fuzz, replay
+from shift_comparator.fuzz.harness import _day_engine
+
+
+def test_engines_agree_with_reference():
+    """Test: aucun désaccord sur une petite campagne (règles, taux et rotations aléatoires)"""
+    print("\n--- Test: Campagne différentielle ---")
+
+    report = fuzz(cases=150, seed=2026)
+    print(report)
+    assert report.cases == 150 and report.shifts > 1000
+    assert report.ok, json.dumps(report.failures[:1], ensure_ascii=False)
+    print("✓ Test réussi")
+
+
+def test_mismatch_is_minimized_and_replayable():
+    """Test: un moteur faux sur les nuits du dimanche est détecté, réduit à un shift et rejouable"""
+    print("\n--- Test: Réduction d'un désaccord ---")
+
+    def faulty(case):
+        metrics = _day_engine(case)
+        metrics['total_pay'] += metrics['night_sunday_hours'] * 0.01
+        return metrics
+
+    engines = dict(ENGINES, faulty=faulty)
+    report = fuzz(cases=100, seed=7, engines=engines, max_failures=1)
+    assert [failure['engine'] for failure in report.failures] == ['faulty']
+
+    failure = json.loads(json.dumps(report.failures[0]))
+    case = FuzzCase.from_dict(failure['case'])
+    print(f"Graine {failure['seed']}: {failure['original_shifts']} → {len(case.shifts)} shift(s), {case}")
+    assert len(case.shifts) == 1 and case.rates is None and not case.weekly_overtime
+    assert set(failure['mismatches']) == {'total_pay'}
+    assert 'faulty' in replay(failure, engines)
+    assert replay(failure['case']) == {}  # Les vrais moteurs sont d'accord sur le cas réduit
+    print("✓ Test réussi")
+
+
+if __name__ == "__main__":
+    test_engines_agree_with_reference()
+    test_mismatch_is_minimized_and_replayable()
@@ -0,0 +1,51 @@
+"""
+Tests unitaires pour les WorkDay partagés (WorkDayPool).
+"""
+from datetime import datetime
+import gc
+import sys
+import os
+
+# Ajouter le dossier parent au path pour les imports
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '../..')))
+
+from shift_comparator.models import ShiftType, WorkDay, WorkDayPool
+from shift_comparator.core import ShiftCalculator
+from shift_comparator.main import ShiftComparatorApp
+
+
+def test_shared_immutable_work_days():
+    """Test: une instance par couple (date, shift), immuable, mémorisée par le calculateur"""
+    print("\n--- Test: WorkDay partagés ---")
+
+    app = ShiftComparatorApp()
+    first = app.create_scenario("A", [('2026-03-28', ShiftType.NUIT), ('2026-03-29', ShiftType.MATIN)])
+    second = app.create_scenario("B", [('28/03/2026', ShiftType.NUIT)], hourly_rate=15.0)
+    assert first.work_days[0] is second.work_days[0]
+
+    try:
+        first.work_days[0].shift_type = ShiftType.MATIN
+        assert False, "WorkDay devrait être immuable"
+    except AttributeError:
+        pass
+
+    # Même décomposition qu'un WorkDay neuf, retrouvée par identité ensuite
+    calculator = ShiftCalculator()
+    work_day = first.work_days[0]
+    breakdown = calculator.compute_breakdown(work_day)
+    assert calculator.compute_breakdown(work_day) is breakdown
+    fresh = calculator.decompose(WorkDay(datetime(2026, 3, 28), ShiftType.NUIT))
+    assert abs(fresh.get_total_hours() - breakdown.get_total_hours()) < 1e-9
+
+    # Sans LRU, une instance plus utilisée disparaît de la fabrique
+    pool = WorkDayPool(max_recent=0)
+    day = pool.get(datetime(2026, 1, 5), ShiftType.MATIN)
+    assert pool.get(datetime(2026, 1, 5), ShiftType.MATIN) is day and pool.hits == 1
+    del day
+    gc.collect()
+    assert len(pool) == 0
+    print("✓ Test réussi")
+
+
+if __name__ == "__main__":
+    test_shared_immutable_work_days()
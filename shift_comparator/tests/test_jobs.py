@@ -0,0 +1,103 @@
+"""
+Tests unitaires pour la file des travaux asynchrones.
+"""
+import threading
+import time
+import sys
+import os
+
+# Ajouter le dossier parent au path pour les imports
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '../..')))
+
+from shift_comparator.core import ShiftCalculator, ScheduleValidator
+from shift_comparator.web.jobs import Job, JobManager, JobRejected, QueueFull, build_job
+from shift_comparator.web.store import ScenarioStore
+
+
+def _wait(manager, job_id, timeout=5.0):
+    """Attend la fin d'un travail"""
+    deadline = time.time() + timeout
+    job = manager.get(job_id)
+    while job.status in ('queued', 'running') and time.time() < deadline:
+        time.sleep(0.01)
+    return job
+
+
+def test_compare_job_and_load_shedding():
+    """Test: résultat d'une comparaison, puis refus quand la file est pleine"""
+    print("\n--- Test: Travaux asynchrones ---")
+
+    manager = JobManager(workers=1, max_queued=1)
+    calculator = ShiftCalculator()
+    shifts = [{'date': '2026-01-17', 'type': 'NUIT'}, {'date': '2026-01-18', 'type': 'NUIT'}]
+    kind, func = build_job({'scenarios': [
+        {'name': 'Nuits', 'hourly_rate': 13.0, 'shifts': shifts},
+        {'name': 'Matin', 'hourly_rate': 13.0, 'shifts': [{'date': '2026-01-13', 'type': 'MATIN'}]},
+    ]}, calculator, ScenarioStore(calculator), ScheduleValidator())
+    assert kind == 'compare'
+
+    job = _wait(manager, manager.submit('compare', func).id)
+    print(f"Statut: {job.status}, avancement {job.done}/{job.total}")
+    assert job.status == 'done'
+    assert job.result['best']['name'] == 'Nuits'
+    assert [p['name'] for p in job.partial] == ['Nuits', 'Matin']
+
+    # Un travail bloqué occupe le thread, un second remplit la file: le troisième est refusé
+    release = threading.Event()
+    manager.submit('compare', lambda job: release.wait(5))
+    while manager.queued():
+        time.sleep(0.01)
+    manager.submit('compare', lambda job: None)
+    try:
+        manager.submit('compare', lambda job: None)
+        assert False, "La file pleine aurait dû refuser le travail"
+    except QueueFull:
+        print("File pleine: travail refusé")
+    finally:
+        release.set()
+
+    print("✓ Test réussi")
+
+
+def test_job_requests_are_validated():
+    """Test: repos vérifiés comme pour /api/calculate, corps mal formés refusés, partiels bornés"""
+    print("\n--- Test: Validation des travaux ---")
+
+    calculator = ShiftCalculator()
+    store, validator = ScenarioStore(calculator), ScheduleValidator()
+    tight = {'name': 'Enchaîné', 'hourly_rate': 13.0,
+             'shifts': [{'date': '2026-01-05', 'type': 'NUIT'}, {'date': '2026-01-06', 'type': 'MATIN'}]}
+    other = {'name': 'Matin', 'hourly_rate': 13.0, 'shifts': [{'date': '2026-01-13', 'type': 'MATIN'}]}
+
+    _, func = build_job({'scenarios': [tight, other]}, calculator, store, validator)
+    result = func(Job('compare', func))
+    print(result['violations'])
+    assert [v['name'] for v in result['violations']] == ['Enchaîné']
+    assert result['violations'][0]['violations'][0]['rule'] == 'overlap'
+
+    try:
+        build_job({'scenarios': [dict(tight, strict=True), other]}, calculator, store, validator)
+        assert False, "Planning invalide accepté en mode strict"
+    except JobRejected as e:
+        assert e.body['error'] == 'Planning invalide' and e.body['violations']
+
+    for bad in (["x"], {'kind': 'compare', 'scenarios': ["x"]}, {'scenario_ids': [[0], 1]},
+                {'kind': 'payroll', 'records': ["x"]}, {'kind': 'payroll', 'group_by': 'team', 'records': [
+                    {'employee_id': 'E', 'date': '2026-01-05', 'shift_type': 'NUIT', 'hourly_rate': 13.0}]}):
+        try:
+            build_job(bad, calculator, store, validator)
+            assert False, f"Demande acceptée: {bad}"
+        except ValueError as e:
+            print(f"Refusé: {e}")
+
+    job = Job('compare', None)
+    for i in range(Job.MAX_PARTIAL + 10):
+        job.report(i + 1, Job.MAX_PARTIAL + 10, {'step': i})
+    partial = job.to_dict()['partial']
+    assert len(partial) == Job.MAX_PARTIAL and partial[-1] == {'step': Job.MAX_PARTIAL + 9}
+    print("✓ Test réussi")
+
+
+if __name__ == "__main__":
+    test_compare_job_and_load_shedding()
+    test_job_requests_are_validated()
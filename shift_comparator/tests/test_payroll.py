@@ -0,0 +1,121 @@
+"""
+Tests unitaires pour l'agrégation de paie multi-salariés.
+"""
+from datetime import datetime, timedelta
+import sys
+import os
+
+# Ajouter le dossier parent au path pour les imports
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '../..')))
+
+from shift_comparator.models import ShiftType, WorkDay, Scenario, EmployeeRoster, RunScenario, RateSchedule, compress_runs
+from shift_comparator.core import ShiftCalculator, PayrollAggregator
+
+
+def _build_rosters():
+    """Six salariés répartis sur deux équipes, quatre semaines de cycle 2-2-2"""
+    cycle = [ShiftType.MATIN, ShiftType.MATIN, ShiftType.APRES_MIDI,
+             ShiftType.APRES_MIDI, ShiftType.NUIT, ShiftType.NUIT]
+    rosters = []
+    for i in range(6):
+        start = datetime(2026, 1, 12) + timedelta(days=i)
+        work_days = [WorkDay(start + timedelta(days=d), cycle[d % 6]) for d in range(28)]
+        rosters.append(EmployeeRoster(f"E{i}", "A" if i % 2 else "B",
+                                      Scenario(f"E{i}", work_days, 13.0 + i)))
+    return rosters
+
+
+def test_totals_match_scenario_results():
+    """Test: les totaux agrégés égalent la somme des calculs par scénario"""
+    print("\n--- Test: Agrégation cohérente avec calculate_scenario ---")
+
+    calculator = ShiftCalculator()
+    rosters = _build_rosters()
+
+    report = PayrollAggregator(calculator, groupings=[
+        ('employee',), ('team',), ('month',), ('team', 'week'), ('shift_type',)
+    ]).aggregate(rosters)
+
+    expected = {r.employee_id: calculator.calculate_scenario(r.scenario) for r in rosters}
+
+    for (employee_id,), totals in report.get('employee').items():
+        result = expected[employee_id]
+        assert abs(totals['total_pay'] - result.total_pay) < 1e-6, "Total par salarié"
+        assert abs(totals['night_hours'] - result.total_breakdown.night_hours) < 1e-9
+
+    grand_total = sum(r.total_pay for r in expected.values())
+    for dims in (('team',), ('month',), ('team', 'week'), ('shift_type',)):
+        total = sum(t['total_pay'] for t in report.get(*dims).values())
+        print(f"{'+'.join(dims)}: {total:.2f}€")
+        assert abs(total - grand_total) < 1e-6, f"Total {dims} cohérent"
+
+    print("✓ Test réussi")
+
+
+def test_records_match_rosters():
+    """Test: l'agrégation d'enregistrements à plat donne les mêmes totaux"""
+    print("\n--- Test: Enregistrements à plat vs plannings ---")
+
+    calculator = ShiftCalculator()
+    rosters = _build_rosters()
+    records = [
+        (r.employee_id, r.team, wd.date, wd.shift_type, r.scenario.hourly_rate)
+        for r in rosters for wd in r.scenario.work_days
+    ]
+
+    aggregator = PayrollAggregator(calculator, groupings=[('team', 'month')])
+    from_rosters = aggregator.aggregate(rosters).get('team', 'month')
+    from_records = aggregator.aggregate_records(records).get('team', 'month')
+
+    assert from_rosters.keys() == from_records.keys()
+    for key, totals in from_rosters.items():
+        assert abs(totals['sunday_premium'] - from_records[key]['sunday_premium']) < 1e-6
+
+    print("✓ Test réussi")
+
+
+def test_runs_match_expanded_records():
+    """Test: les séquences donnent les totaux des jours développés, sans développer les jours"""
+    print("\n--- Test: Séquences vs jours développés ---")
+
+    groupings = [('employee',), ('team', 'week'), ('month',), ('shift_type',), ('employee', 'month')]
+    runs = [
+        ("E1", "A", datetime(2026, 3, 23), ShiftType.NUIT, 13.0, 12),      # Changement d'heure, fin de mois
+        ("E1", "A", datetime(2026, 4, 6), ShiftType.MATIN, 14.5, 9),
+        ("E2", "B", datetime(2026, 4, 27), ShiftType.APRES_MIDI, 15.0, 10),  # Mois à cheval sur une semaine
+        ("E2", "B", datetime(2026, 5, 1), ShiftType.NUIT, 15.0, 3),         # Chevauche la séquence précédente
+        ("E3", "B", datetime(2026, 1, 5), ShiftType.MATIN, 12.0, 120),
+    ]
+    records = [(employee_id, team, start + timedelta(days=d), shift_type, rate)
+               for employee_id, team, start, shift_type, rate, length in runs for d in range(length)]
+
+    for weekly_overtime in (True, False):
+        calculator = ShiftCalculator(weekly_overtime)
+        aggregator = PayrollAggregator(calculator, groupings=groupings)
+        from_runs = aggregator.aggregate_runs(runs)
+        assert len(aggregator._profiles) < len(records) / 3, "Séquences non développées"
+        from_records = PayrollAggregator(calculator, groupings=groupings).aggregate_records(records)
+
+        for dims in groupings:
+            expected, actual = from_records.get(*dims), from_runs.get(*dims)
+            assert expected.keys() == actual.keys(), f"Clés {dims}"
+            for key, totals in expected.items():
+                for metric, value in totals.items():
+                    assert abs(actual[key][metric] - value) < 1e-6, f"{dims} {key} {metric}"
+    print(f"{len(records)} jours, {len(aggregator._profiles)} morceaux tarifés")
+
+    # Roster en séquences avec historique de taux: même paie que calculate_scenario
+    rates = RateSchedule.from_changes([(datetime(2026, 1, 1), 13.0), (datetime(2026, 3, 26), 16.0)])
+    work_days = [WorkDay(datetime(2026, 3, 16) + timedelta(days=d), ShiftType.NUIT) for d in range(21)]
+    scenario = RunScenario("R", compress_runs(work_days), 13.0, rates)
+    calculator = ShiftCalculator()
+    totals = PayrollAggregator(calculator, groupings=[('employee',)]).aggregate(
+        [EmployeeRoster("R", "A", scenario)]).get('employee')[("R",)]
+    assert abs(totals['total_pay'] - calculator.calculate_scenario(Scenario("R", work_days, 13.0, rates)).total_pay) < 1e-6
+    print("✓ Test réussi")
+
+
+if __name__ == "__main__":
+    test_totals_match_scenario_results()
+    test_records_match_rosters()
+    test_runs_match_expanded_records()
@@ -0,0 +1,82 @@
+"""
+Tests unitaires pour le profilage optionnel des requêtes WSGI.
+"""
+import glob
+import sys
+import os
+import tempfile
+
+# Ajouter le dossier parent au path pour les imports
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '../..')))
+
+from shift_comparator.web import profiling
+from shift_comparator.web.profiling import ProfilingMiddleware, summarize_profiles
+
+
+def hello_app(environ, start_response):
+    start_response('200 OK', [('Content-Type', 'text/plain')])
+    return [b'ok']
+
+
+def request(app, path='/api/calculate', method='POST', headers=None):
+    environ = {'REQUEST_METHOD': method, 'PATH_INFO': path}
+    environ.update(headers or {})
+    statuses = []
+    body = b''.join(app(environ, lambda status, headers: statuses.append(status)))
+    return statuses[0], body
+
+
+def test_opt_in_sampling_and_rotation():
+    """Test: désactivé par défaut, en-tête et échantillonnage, rotation SHIFT_PROFILE_KEEP"""
+    print("\n--- Test: Profilage des requêtes ---")
+
+    assert ProfilingMiddleware.from_env(hello_app, {}) is hello_app
+
+    with tempfile.TemporaryDirectory() as directory:
+        app = ProfilingMiddleware.from_env(hello_app, {'SHIFT_PROFILE': '1', 'SHIFT_PROFILE_DIR': directory,
+                                                       'SHIFT_PROFILE_KEEP': '3'})
+        assert request(app) == ('200 OK', b'ok')
+        assert glob.glob(os.path.join(directory, '*.pstats')) == []  # Ni en-tête ni échantillon
+
+        for _ in range(5):
+            assert request(app, headers={'HTTP_X_SHIFT_PROFILE': '1'}) == ('200 OK', b'ok')
+        files = glob.glob(os.path.join(directory, '*.pstats'))
+        print(f"{len(files)} profil(s) conservé(s)")
+        assert len(files) == 3
+
+        # Échantillonnage: tirage sous le taux -> profilé
+        app.sample_rate = 0.5
+        draws = iter([0.9, 0.1])
+        original = profiling.random.random
+        profiling.random.random = lambda: next(draws)
+        try:
+            assert not app.should_profile({})
+            assert app.should_profile({})
+        finally:
+            profiling.random.random = original
+    print("✓ Test réussi")
+
+
+def test_dump_errors_and_route_filter():
+    """Test: un dossier non inscriptible ne fait pas échouer la requête; filtre sur la route exacte"""
+    print("\n--- Test: Erreurs d'écriture et filtre de route ---")
+
+    with tempfile.TemporaryDirectory() as directory:
+        not_a_dir = os.path.join(directory, 'fichier')
+        open(not_a_dir, 'w').close()
+        app = ProfilingMiddleware(hello_app, profile_dir=not_a_dir)
+        assert request(app, headers={'HTTP_X_SHIFT_PROFILE': '1'}) == ('200 OK', b'ok')
+
+        app = ProfilingMiddleware(hello_app, profile_dir=directory)
+        for path in ('/compare', '/api/compare', '/api/compare'):
+            request(app, path, headers={'HTTP_X_SHIFT_PROFILE': '1'})
+        report = summarize_profiles(directory, route='/compare')
+        print(report.splitlines()[0])
+        assert report.startswith('1 profil(s)')
+        assert summarize_profiles(directory, route='/api/compare').startswith('2 profil(s)')
+    print("✓ Test réussi")
+
+
+if __name__ == "__main__":
+    test_opt_in_sampling_and_rotation()
+    test_dump_errors_and_route_filter()
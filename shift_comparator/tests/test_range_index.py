@@ -0,0 +1,72 @@
+"""
+Tests unitaires pour les totaux par plage de dates (RangeIndex).
+"""
+from datetime import datetime, timedelta
+import random
+import sys
+import os
+
+# Ajouter le dossier parent au path pour les imports
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '../..')))
+
+from shift_comparator.models import ShiftType, WorkDay, Scenario
+from shift_comparator.core import ShiftCalculator, RangeIndex
+from shift_comparator.web.store import ScenarioStore, parse_range_query
+
+
+def test_range_totals_and_edits():
+    """Test: totaux d'une plage identiques au calcul direct, avant et après modification"""
+    print("\n--- Test: Totaux par plage de dates ---")
+
+    rng = random.Random(5)
+    shift_types = list(ShiftType)
+    start = datetime(2026, 1, 1)
+    work_days = [WorkDay(start + timedelta(days=d), rng.choice(shift_types))
+                 for d in range(180) if rng.random() < 0.8]
+    scenario = Scenario("Semestre", work_days, 13.7)
+    calculator = ShiftCalculator()
+    index = RangeIndex.from_scenario(scenario, calculator)
+    print(index)
+
+    # Plage quelconque: mêmes jours et mêmes heures que le filtrage des résultats du jour
+    result = calculator.calculate_scenario(scenario)
+    for _ in range(50):
+        date_from = start + timedelta(days=rng.randrange(180))
+        date_to = date_from + timedelta(days=rng.randrange(45))
+        days = [r for r in result.day_results if date_from <= r.work_day.date <= date_to]
+        totals = index.totals(date_from, date_to)
+        assert totals['shifts'] == len(days)
+        assert abs(totals['total_hours'] - sum(r.breakdown.get_total_hours() for r in days)) < 1e-6
+        assert abs(totals['bonus_pay'] - sum(r.bonus_pay for r in days)) < 1e-6
+
+    # Modifications ponctuelles: les totaux suivent le recalcul complet (heures supplémentaires comprises)
+    for _ in range(40):
+        old = rng.choice(scenario.work_days)
+        new = WorkDay(old.date, rng.choice(shift_types))
+        index.replace(old, new)
+        scenario.work_days[scenario.work_days.index(old)] = new
+    result = calculator.calculate_scenario(scenario)
+    totals = index.totals()
+    print(f"Total: {totals['total_pay']:.2f}€ (calcul complet: {result.total_pay:.2f}€)")
+    assert abs(totals['total_pay'] - result.total_pay) < 1e-6
+    assert abs(totals['overtime_pay'] - result.total_overtime_pay) < 1e-6
+    print("✓ Test réussi")
+
+
+def test_store_range_query():
+    """Test: totaux d'un scénario sauvegardé depuis la chaîne de requête de /api/range"""
+    print("\n--- Test: /api/range ---")
+
+    store = ScenarioStore(ShiftCalculator())
+    entry = store.add(Scenario("Nuits", [WorkDay(datetime(2026, 1, 5) + timedelta(days=d), ShiftType.NUIT)
+                                         for d in range(10)], 14.0))
+    totals = store.range_totals(**parse_range_query(f"id={entry.id}&from=2026-01-07&to=2026-01-08"))
+    assert totals['shifts'] == 2 and totals['total_hours'] == 18.0
+    assert abs(store.range_totals(entry.id)['total_pay'] - entry.result.total_pay) < 1e-6
+    assert store.range_totals(entry.id + 1) is None
+    print("✓ Test réussi")
+
+
+if __name__ == "__main__":
+    test_range_totals_and_edits()
+    test_store_range_query()
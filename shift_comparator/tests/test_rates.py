@@ -0,0 +1,75 @@
+"""
+Tests unitaires pour les taux et majorations datés (RateSchedule).
+"""
+from datetime import datetime, timedelta
+import io
+import sys
+import os
+
+# Ajouter le dossier parent au path pour les imports
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '../..')))
+
+from shift_comparator.models import ShiftType, WorkDay, Scenario, RunScenario, EmployeeRoster, RatePeriod, RateSchedule
+from shift_comparator.core import ShiftCalculator, PayrollAggregator
+from shift_comparator.batch import read_rosters
+
+
+def test_multi_year_schedule():
+    """Test: chaque jour tarifé avec sa période, jours, séquences et paie agrégée identiques"""
+    print("\n--- Test: Historique de taux ---")
+
+    # Dernier changement un mercredi: heures supplémentaires de la semaine au taux moyen
+    rates = RateSchedule([
+        RatePeriod(datetime(2024, 1, 1), 13.0),
+        RatePeriod(datetime(2025, 1, 6), 13.6, night_bonus=0.20),
+        RatePeriod(datetime(2026, 3, 4), 14.1, night_bonus=0.20, sunday_bonus=0.30),
+    ])
+    assert rates.at(datetime(2025, 1, 5)).hourly_rate == 13.0
+    assert rates.at(datetime(2025, 1, 6)).hourly_rate == 13.6
+    assert rates.at(datetime(2023, 6, 1)).hourly_rate == 13.0  # Avant la première date d'effet
+
+    shift_types = list(ShiftType)
+    work_days = [WorkDay(datetime(2024, 6, 3) + timedelta(days=d), shift_types[d // 7 % 3])
+                 for d in range(800) if d % 7 < 6]
+    calculator = ShiftCalculator()
+    result = calculator.calculate_scenario(Scenario("Trois ans", work_days, 13.0, rates))
+
+    expected = result.total_overtime_pay
+    for day_result in result.day_results:
+        period = rates.at(day_result.work_day.date)
+        expected += calculator.price_breakdown(day_result.breakdown, period.hourly_rate,
+                                               period.night_bonus, period.sunday_bonus)[2]
+    print(f"{len(work_days)} jours, {len(rates)} périodes: {result.total_pay:.2f}€")
+    assert abs(result.total_pay - expected) < 1e-6
+
+    runs = calculator.calculate_scenario(RunScenario.from_work_days("Séquences", work_days, 13.0, rates))
+    assert abs(runs.total_pay - result.total_pay) < 1e-6
+
+    roster = EmployeeRoster("E1", "A", Scenario("E1", work_days, 13.0), rates=rates)
+    report = PayrollAggregator(calculator, groupings=[('employee',)]).aggregate([roster])
+    assert abs(report.get('employee')[('E1',)]['total_pay'] - result.total_pay) < 1e-6
+    print("✓ Test réussi")
+
+
+def test_batch_rate_changes():
+    """Test: un taux qui change dans le planning CSV devient un historique de taux"""
+    print("\n--- Test: Changements de taux importés ---")
+
+    planning = io.StringIO(
+        "employee_id,team,date,shift_type,hourly_rate\n"
+        "E1,A,2026-01-12,MATIN,13.0\n"
+        "E1,A,2026-01-13,MATIN,13.0\n"
+        "E1,A,2026-01-14,MATIN,13.5\n"
+        "E2,A,2026-01-12,NUIT,12.0\n"
+    )
+    first, second = read_rosters(planning)
+    print(first.scenario.rates)
+    assert [p.hourly_rate for p in first.scenario.rates.periods] == [13.0, 13.5]
+    assert first.scenario.rates.at(datetime(2026, 1, 14)).effective_from == datetime(2026, 1, 14)
+    assert second.scenario.rates is None
+    print("✓ Test réussi")
+
+
+if __name__ == "__main__":
+    test_multi_year_schedule()
+    test_batch_rate_changes()
@@ -0,0 +1,69 @@
+"""
+Tests unitaires pour les motifs de rotation et leur tarification par cycles.
+"""
+from datetime import datetime
+import sys
+import os
+
+# Ajouter le dossier parent au path pour les imports
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '../..')))
+
+from shift_comparator.models import ShiftType, PATTERNS, iter_rotation_scenarios
+from shift_comparator.core import ShiftCalculator, RotationPricer
+
+
+def test_cached_cycles_match_day_by_day():
+    """Test: la tarification par cycles égale le calcul jour par jour"""
+    print("\n--- Test: Rotations par cycles vs calculate_scenario ---")
+
+    calculator = ShiftCalculator()
+    pricer = RotationPricer(calculator)
+
+    # Janvier, puis deux périodes qui croisent un changement d'heure
+    start_dates = [datetime(2026, 1, 5), datetime(2026, 3, 20), datetime(2026, 10, 21)]
+    scenarios = iter_rotation_scenarios(PATTERNS.values(), start_dates, [10, 100], 13.0, [0, 5])
+
+    count = 0
+    for pattern in PATTERNS.values():
+        for start in start_dates:
+            for horizon_days in (10, 100):
+                for phase in (0, 5):
+                    expected = calculator.calculate_scenario(next(scenarios))
+                    result = pricer.price(pattern, start, horizon_days, 13.0, phase)
+                    assert result.scenario_name == expected.scenario_name
+                    assert abs(result.total_pay - expected.total_pay) < 1e-6, expected.scenario_name
+                    assert abs(result.get_total_hours() - expected.get_total_hours()) < 1e-9
+                    count += 1
+
+    print(f"{count} rotations comparées, cache: {pricer.hits} réutilisations, {pricer.misses} cycles")
+    assert pricer.hits > pricer.misses, "Les cycles doivent être réutilisés"
+    assert PATTERNS['2-2-2-4'].shift_at(6) is None and PATTERNS['2-2-2-4'].shift_at(10) == ShiftType.MATIN
+
+    print("✓ Test réussi")
+
+
+def test_projection_over_several_years():
+    """Test: la projection par semaines types égale le calcul jour par jour sur 3 ans"""
+    print("\n--- Test: Projection pluriannuelle ---")
+
+    calculator = ShiftCalculator()
+    pricer = RotationPricer(calculator)
+
+    for pattern in PATTERNS.values():
+        # Départ un jeudi: semaines incomplètes aux deux bords, 6 changements d'heure
+        scenario = pattern.to_scenario(datetime(2026, 1, 8), 3 * 365, 13.0, phase=2)
+        expected = calculator.calculate_scenario(scenario)
+        result = pricer.project(pattern, datetime(2026, 1, 8), 3 * 365, 13.0, phase=2)
+
+        print(f"{pattern.name}: {result.total_pay:.2f}€ (attendu {expected.total_pay:.2f}€)")
+        assert abs(result.total_pay - expected.total_pay) < 1e-6
+        assert abs(result.total_overtime_pay - expected.total_overtime_pay) < 1e-6
+        assert abs(result.total_breakdown.night_sunday_hours -
+                   expected.total_breakdown.night_sunday_hours) < 1e-9
+
+    print("✓ Test réussi")
+
+
+if __name__ == "__main__":
+    test_cached_cycles_match_day_by_day()
+    test_projection_over_several_years()
@@ -0,0 +1,162 @@
+"""
+Tests unitaires pour les règles de majoration déclaratives.
+"""
+from datetime import datetime, time, timedelta
+import json
+import random
+import sys
+import os
+import tempfile
+
+# Ajouter le dossier parent au path pour les imports
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '../..')))
+
+from shift_comparator.models import (ShiftType, ShiftDefinition, WorkDay, Scenario, RunScenario, EmployeeRoster,
+                                     compress_runs)
+from shift_comparator.models.dst import transitions_between
+from shift_comparator.core import (ShiftCalculator, PayrollAggregator, PremiumRules, RulesFile,
+                                   RulesValidationError, ScheduleValidator, ScheduleValidationError,
+                                   CoverageTimeline)
+from shift_comparator.core.singleflight import scenario_key
+from shift_comparator.main import ShiftComparatorApp
+from shift_comparator.web.rules_bundle import RulesBundle
+from shift_comparator.web.store import ScenarioStore
+
+
+RULES = {
+    'version': '2026-10',
+    'stacking': 'max',
+    'night_bonus': 0.30,
+    'sunday_bonus': 0.20,
+    'premium_weekdays': [5, 6],
+    'holidays': ['2026-11-01', '2026-11-11', '2026-12-25'],
+    'night_windows': [['20:30', '05:00']],
+    'shifts': {'MATIN': ['05:30', '13:30'], 'APRES_MIDI': ['13:00', '21:15'], 'NUIT': ['21:00', '06:00']},
+}
+
+
+def test_compiled_rules_match_minute_by_minute():
+    """Test: tables compilées = décompte minute par minute; mêmes totaux par jour, séquence et paie"""
+    print("\n--- Test: Règles compilées ---")
+
+    # Borne de nuit à 02:30: l'heure sautée du 29/03/2026 est à moitié de nuit
+    split = PremiumRules.from_dict({'version': 'dst', 'night_windows': [['06:00', '02:30']],
+                                    'premium_weekdays': []})
+    bd = ShiftCalculator(rules=split).decompose(WorkDay(datetime(2026, 3, 28), ShiftType.NUIT))
+    assert (bd.normal_hours, bd.night_hours) == (3.0, 5.0), bd
+
+    rules = PremiumRules.from_dict(RULES)
+    calculator = ShiftCalculator(rules=rules)
+
+    day = datetime(2026, 10, 20)  # Couvre le changement d'heure du 25/10 et les jours fériés
+    for _ in range(80):
+        for shift_type in ShiftType:
+            work_day = WorkDay(day, shift_type)  # Horaires par défaut: ceux des règles font foi
+            start, end = rules.work_day_span(work_day)
+            expected = [0.0] * 4
+            t = start
+            while t < end:
+                expected[rules.category(t)] += 1 / 60
+                t += timedelta(minutes=1)
+            for transition in transitions_between(start, end):
+                t = max(transition.start, start)
+                while t < min(transition.end, end):
+                    expected[rules.category(t)] += -1 / 60 if transition.delta_hours > 0 else 1 / 60
+                    t += timedelta(minutes=1)
+            bd = calculator.decompose(work_day)
+            got = [bd.normal_hours, bd.night_hours, bd.sunday_hours, bd.night_sunday_hours]
+            assert all(abs(a - b) < 1e-6 for a, b in zip(got, expected)), (work_day, got, expected)
+        day += timedelta(days=1)
+    assert ShiftDefinition.SHIFT_HOURS[ShiftType.MATIN] == (time(6, 0), time(15, 0))  # Aucun état global
+
+    rng = random.Random(5)
+    days = sorted({datetime(2026, 10, 15) + timedelta(days=rng.randrange(90)) for _ in range(50)})
+    work_days = [WorkDay(d, rng.choice(list(ShiftType))) for d in days]
+    by_day = calculator.calculate_scenario(Scenario("A", work_days, 14.0))
+    by_run = calculator.calculate_scenario(RunScenario("A", compress_runs(work_days), 14.0))
+    report = PayrollAggregator(calculator, groupings=(('employee',),)).aggregate(
+        [EmployeeRoster("A", "T", Scenario("A", work_days, 14.0))])
+    payroll = report.get('employee')[("A",)]
+    print(f"Total: {by_day.total_pay:.2f}€ (séquences {by_run.total_pay:.2f}€, paie {payroll['total_pay']:.2f}€)")
+    assert abs(by_day.total_pay - by_run.total_pay) < 1e-6
+    assert abs(by_day.total_pay - payroll['total_pay']) < 1e-6
+
+    # Repos et effectifs avec les horaires des règles: APRES_MIDI jusqu'à 21:15, MATIN dès 05:30
+    evening, morning = WorkDay(datetime(2026, 10, 20), ShiftType.APRES_MIDI), WorkDay(datetime(2026, 10, 21),
+                                                                                      ShiftType.MATIN)
+    rest = ScheduleValidator(rules=rules).validate([evening, morning])[0].message
+    assert 'Repos de 8.2h' in rest, rest
+    app = ShiftComparatorApp()
+    app.calculator = calculator
+    try:
+        app.create_scenario("A", [('2026-10-20', ShiftType.APRES_MIDI), ('2026-10-21', ShiftType.MATIN)],
+                            validate=True)
+        assert False, "Planning accepté"
+    except ScheduleValidationError as e:
+        assert 'Repos de 8.2h' in str(e), e
+    timeline = CoverageTimeline.from_scenarios([Scenario("A", [morning], 14.0)], step_minutes=30, rules=rules)
+    assert timeline.at(datetime(2026, 10, 21, 5, 30)) == 1
+    print("✓ Test réussi")
+
+
+def test_rules_validation_reload_and_cache_keys():
+    """Test: fichier invalide refusé, rechargement par date de modification, version dans les clés"""
+    print("\n--- Test: Rechargement des règles ---")
+
+    for bad in ({'night_bonus': 0.1}, {'version': 'x', 'stacking': 'mult'},
+                {'version': 'x', 'shifts': {'SOIR': ['18:00', '23:00']}}, {'version': 'x', 'nigth_bonus': 0.2},
+                {'version': 'x', 'shifts': [['06:00', '15:00']]}, {'version': 'x', 'premium_weekdays': 6},
+                {'version': 'x', 'holidays': '2026-11-01'}, {'version': 'x', 'night_windows': ['21:00', '06:00']},
+                {'version': 'x', 'shifts': {'NUIT': '22:00-07:00'}}, {'version': 'x', 'night_windows': [['22:00', '22:00']]}):
+        try:
+            PremiumRules.from_dict(bad)
+            assert False, f"Règles acceptées: {bad}"
+        except RulesValidationError as e:
+            print(f"Refusé: {e}")
+
+    with tempfile.TemporaryDirectory() as directory:
+        path = os.path.join(directory, 'rules.toml')
+        with open(path, 'w') as f:
+            f.write('version = "v1"\n')
+        rules_file = RulesFile(path, check_interval=0)
+        first = rules_file.load()
+        assert rules_file.poll(1.0) is None  # Inchangé
+
+        with open(path, 'w') as f:
+            f.write('version = "v2"\nholidays = ["2026-11-11"]\n')
+        os.utime(path, ns=(0, os.stat(path).st_mtime_ns + 1))
+        second = rules_file.poll(2.0)
+        assert second is not None and second.version == 'v2'
+
+        with open(path, 'w') as f:
+            f.write('version = "v3"\nstacking = "mult"\n')
+        os.utime(path, ns=(0, os.stat(path).st_mtime_ns + 2))
+        assert rules_file.poll(3.0) is None and 'stacking' in rules_file.error
+
+        with open(path, 'w') as f:
+            f.write('version = "v4"\npremium_weekdays = 6\n')
+        os.utime(path, ns=(0, os.stat(path).st_mtime_ns + 3))
+        assert rules_file.poll(4.0) is None and 'premium_weekdays' in rules_file.error
+        assert PremiumRules.from_dict(json.loads(json.dumps(second.to_dict()))).key() == second.key()
+
+    # Mercredi 11/11/2026 férié en v2: le scénario sauvegardé est recalculé au changement de règles
+    scenario = Scenario("A", [WorkDay(datetime(2026, 11, 11), ShiftType.MATIN)], 15.0)
+    assert scenario_key(scenario, first) != scenario_key(scenario, second)
+    store = ScenarioStore(ShiftCalculator(rules=first))
+    entry = store.add(scenario)
+    before = entry.result.total_pay
+    store.rebase(ShiftCalculator(rules=second))
+    print(f"v1: {before:.2f}€, v2: {entry.result.total_pay:.2f}€")
+    assert abs(entry.result.total_pay - before * 1.25) < 1e-9
+    assert [e.id for e in store.ranking()] == [entry.id]
+
+    # Bundle: calculateur et validateur des mêmes règles, réglages conservés au changement
+    bundle = RulesBundle.build(False, first).with_rules(second)
+    assert bundle.rules is second and bundle.calculator.rules is second and bundle.validator.span.__self__ is second
+    assert bundle.calculator.weekly_overtime is False and bundle.comparator.calculator is bundle.calculator
+    print("✓ Test réussi")
+
+
+if __name__ == "__main__":
+    test_compiled_rules_match_minute_by_minute()
+    test_rules_validation_reload_and_cache_keys()
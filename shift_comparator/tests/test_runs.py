@@ -0,0 +1,64 @@
+"""
+Tests unitaires pour les scénarios en séquences (ShiftRun, RunScenario).
+"""
+from datetime import datetime, timedelta
+import io
+import sys
+import os
+
+# Ajouter le dossier parent au path pour les imports
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '../..')))
+
+from shift_comparator.models import ShiftType, WorkDay, Scenario, ShiftRun, RunScenario, compress_runs
+from shift_comparator.core import ShiftCalculator
+from shift_comparator.batch import read_rosters
+
+
+def test_run_pricing_matches_daily_pricing():
+    """Test: une séquence donne les mêmes totaux que ses jours, changements d'heure compris"""
+    print("\n--- Test: Tarification par séquence ---")
+
+    calculator = ShiftCalculator()
+    runs = []
+    day = datetime(2026, 3, 2)
+    for i in range(24):  # Mars à octobre 2026: les deux changements d'heure
+        shift_type = list(ShiftType)[i % 3]
+        length = 3 + (i * 5) % 9
+        runs.append(ShiftRun(day, shift_type, length))
+        day += timedelta(days=length + i % 3)
+
+    run_scenario = RunScenario("Séquences", runs, 13.5)
+    daily = calculator.calculate_scenario(Scenario("Jours", run_scenario.work_days, 13.5))
+    result = calculator.calculate_scenario(run_scenario)
+
+    print(f"{len(runs)} séquences, {run_scenario.day_count} jours: "
+          f"{result.total_pay:.2f}€ (jour par jour: {daily.total_pay:.2f}€)")
+    assert not result.day_results and len(result.run_results) == len(runs)
+    assert abs(result.total_pay - daily.total_pay) < 1e-6
+    assert abs(result.total_overtime_pay - daily.total_overtime_pay) < 1e-6
+    assert abs(result.total_breakdown.night_sunday_hours - daily.total_breakdown.night_sunday_hours) < 1e-9
+    assert compress_runs(reversed(run_scenario.work_days)) == compress_runs(run_scenario.work_days)
+    print("✓ Test réussi")
+
+
+def test_batch_length_column():
+    """Test: la colonne length du planning CSV donne un scénario en séquences"""
+    print("\n--- Test: Import de séquences ---")
+
+    planning = io.StringIO(
+        "employee_id,team,date,shift_type,hourly_rate,length\n"
+        "E1,A,2026-01-12,NUIT,13.0,5\n"
+        "E1,A,2026-01-17,NUIT,13.0,\n"
+        "E1,A,2026-01-20,MATIN,13.0,2\n"
+    )
+    roster, = read_rosters(planning)
+    print(roster.scenario)
+    assert roster.scenario.runs == [ShiftRun(datetime(2026, 1, 12), ShiftType.NUIT, 6),
+                                    ShiftRun(datetime(2026, 1, 20), ShiftType.MATIN, 2)]
+    assert roster.scenario.day_count == 8
+    print("✓ Test réussi")
+
+
+if __name__ == "__main__":
+    test_run_pricing_matches_daily_pricing()
+    test_batch_length_column()
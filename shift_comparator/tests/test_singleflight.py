@@ -0,0 +1,92 @@
+"""
+Tests unitaires pour le regroupement des calculs identiques simultanés.
+"""
+import threading
+import time
+import sys
+import os
+
+# Ajouter le dossier parent au path pour les imports
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '../..')))
+
+from shift_comparator.core import SingleFlight, SingleFlightTimeout
+
+
+def _run_concurrently(count, target):
+    """Lance count threads sur target et attend leur fin"""
+    threads = [threading.Thread(target=target) for _ in range(count)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+
+def test_identical_requests_share_one_computation():
+    """Test: 10 requêtes identiques, un seul calcul; erreurs et timeouts propagés"""
+    print("\n--- Test: Single-flight ---")
+
+    flights = SingleFlight(timeout=5.0)
+    started = threading.Event()
+    release = threading.Event()
+    calls = []
+    results = []
+
+    def compute():
+        calls.append(1)
+        started.set()
+        release.wait(5)
+        return 42
+
+    # Le premier thread démarre le calcul; les autres arrivent pendant qu'il tourne
+    leader = threading.Thread(target=lambda: results.append(flights.do('clé', compute)))
+    leader.start()
+    started.wait(5)
+
+    def follower():
+        results.append(flights.do('clé', compute))
+
+    followers = [threading.Thread(target=follower) for _ in range(9)]
+    for thread in followers:
+        thread.start()
+    while flights.shared < 9:
+        time.sleep(0.01)
+    release.set()
+    for thread in [leader] + followers:
+        thread.join()
+
+    print(f"Compteurs: {flights.stats()}")
+    assert results == [42] * 10 and len(calls) == 1
+    assert flights.computed == 1 and flights.shared == 9
+
+    # Erreur propagée à toutes les requêtes en attente
+    errors = []
+
+    def failing():
+        time.sleep(0.05)
+        raise ValueError("échec du calcul")
+
+    def request():
+        try:
+            flights.do('erreur', failing)
+        except ValueError as e:
+            errors.append(str(e))
+
+    _run_concurrently(4, request)
+    assert errors == ["échec du calcul"] * 4
+
+    # Timeout côté requête en attente
+    slow = threading.Thread(target=lambda: flights.do('lent', lambda: time.sleep(0.3)))
+    slow.start()
+    time.sleep(0.05)
+    try:
+        flights.do('lent', lambda: None, timeout=0.01)
+        assert False, "Le délai aurait dû expirer"
+    except SingleFlightTimeout:
+        assert flights.timeouts == 1
+    slow.join()
+
+    print("✓ Test réussi")
+
+
+if __name__ == "__main__":
+    test_identical_requests_share_one_computation()
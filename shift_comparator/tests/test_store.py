@@ -0,0 +1,127 @@
+"""
+Tests unitaires pour le stockage des scénarios sauvegardés.
+"""
+from datetime import datetime, timedelta
+import sys
+import os
+
+# Ajouter le dossier parent au path pour les imports
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '../..')))
+
+from shift_comparator.models import ShiftType, WorkDay, Scenario
+from shift_comparator.core import ShiftCalculator, ScenarioComparator
+from shift_comparator.web.store import ScenarioStore, parse_listing_query, parse_scenario_ids, encode_cursor
+
+
+def test_subset_comparison_without_recalculation():
+    """Test: comparaisons depuis les totaux conservés, cohérentes après suppression"""
+    print("\n--- Test: Classement incrémental des scénarios sauvegardés ---")
+
+    calculator = ShiftCalculator()
+    store = ScenarioStore(calculator)
+    shift_types = list(ShiftType)
+    scenarios = [
+        Scenario(f"S{i}", [WorkDay(datetime(2026, 1, 12) + timedelta(days=d), shift_types[(i + d) % 3])
+                           for d in range(i % 7 + 1)], 13.0)
+        for i in range(40)
+    ]
+    ids = [store.add(s).id for s in scenarios]
+
+    # Ne plus jamais recalculer: toute comparaison passe par les résultats stockés
+    calculator.calculate_scenario = None
+
+    for subset in ([0, 5, 9], ids[::2], ids):
+        comparison = store.compare(subset)
+        expected = ScenarioComparator(ShiftCalculator()).compare_scenarios([scenarios[i] for i in subset])
+        assert ([r.total_pay for r in comparison.scenario_results] ==
+                [r.total_pay for r in expected.scenario_results])
+        assert comparison.best_scenario.total_pay == expected.best_scenario.total_pay
+
+    # Suppression: le meilleur disparaît du classement global
+    best = store.ranking()[0]
+    assert store.remove(best.id) and not store.remove(best.id)
+    ranking = store.ranking()
+    assert len(ranking) == 39 and best.id not in [entry.id for entry in ranking]
+    assert all(a.result.total_pay >= b.result.total_pay for a, b in zip(ranking, ranking[1:]))
+    assert store.get(best.id) is None and all(store.get(i) for i in ids if i != best.id)
+
+    print(f"Meilleur: {best.scenario.name} ({best.result.total_pay:.2f}€), retiré")
+
+    # Identifiants d'un corps /api/compare: entiers uniquement (400 sinon, au lieu d'une erreur interne)
+    assert parse_scenario_ids({'scenario_ids': [0, 1]}) == [0, 1] and parse_scenario_ids({}) == []
+    for body in ({'scenario_ids': [[0], 1]}, {'scenario_ids': [True]}, {'scenario_ids': '01'}, ['x']):
+        try:
+            parse_scenario_ids(body)
+            assert False, f"Corps accepté: {body}"
+        except ValueError:
+            pass
+    print("✓ Test réussi")
+
+
+def test_paginated_listing():
+    """Test: pages par curseur, filtres et tris identiques à un filtrage complet"""
+    print("\n--- Test: Liste paginée et filtrée ---")
+
+    store = ScenarioStore(ShiftCalculator())
+    shift_types = list(ShiftType)
+    for i in range(60):
+        start = datetime(2026, 1, 5) + timedelta(days=i % 20)
+        store.add(Scenario(f"{'Nuit' if i % 3 else 'Jour'} {i}",
+                           [WorkDay(start + timedelta(days=d), shift_types[i % 3]) for d in range(i % 5 + 1)],
+                           12.0 + i % 4))
+    # Les identifiants restent stables après suppression
+    for i in range(0, 60, 7):
+        store.remove(i)
+    entries = list(store)
+
+    def pages(**kwargs):
+        kwargs.update(limit=7, cursor=None)
+        items, cursor = store.query(**kwargs)
+        while cursor:
+            page, cursor = store.query(**dict(kwargs, cursor=cursor))
+            items += page
+        return [entry.id for entry in items]
+
+    expected = sorted((e for e in entries if e.scenario.name.startswith('Nuit')
+                       and 13.0 <= e.scenario.hourly_rate <= 14.0),
+                      key=lambda e: (-e.result.total_pay, -e.id))
+    assert pages(**parse_listing_query('sort=pay&order=desc&name=nuit&min_rate=13&max_rate=14')) == \
+        [e.id for e in expected]
+
+    # Filtre sélectif sur un autre champ que le tri: candidats lus dans son index
+    for query, keep in (('sort=name&min_rate=15&max_rate=15', lambda e: e.scenario.hourly_rate == 15.0),
+                        ('sort=id&order=desc&name=jour 1', lambda e: e.scenario.name.startswith('Jour 1'))):
+        kwargs = parse_listing_query(query)
+        expected = sorted((e for e in entries if keep(e)),
+                          key=lambda e: (e.index_values()[kwargs['sort']], e.id), reverse=kwargs['descending'])
+        assert pages(**kwargs) == [e.id for e in expected], query
+
+    date_from, date_to = datetime(2026, 1, 10), datetime(2026, 1, 20)
+    expected = sorted((e for e in entries if e.first_ordinal >= date_from.toordinal()
+                       and e.last_ordinal <= date_to.toordinal()),
+                      key=lambda e: (e.first_ordinal, e.id))
+    assert pages(sort='start', date_from=date_from, date_to=date_to) == [e.id for e in expected]
+    assert pages() == sorted(e.id for e in entries)
+
+    expected = sorted((e for e in entries if e.last_ordinal <= date_to.toordinal()),
+                      key=lambda e: (e.first_ordinal, e.id), reverse=True)
+    assert pages(sort='start', descending=True, date_to=date_to) == [e.id for e in expected]
+
+    # Curseur illisible, d'un autre tri ou dont la valeur n'a pas le type du champ: ValueError (400)
+    for kwargs in ({'cursor': 'pas-un-curseur'}, {'sort': 'pay', 'cursor': encode_cursor('name', 'a', 1)},
+                   {'sort': 'pay', 'cursor': encode_cursor('pay', 'abc', 1)},
+                   {'sort': 'name', 'cursor': encode_cursor('name', 3.5, 1)},
+                   {'cursor': encode_cursor('id', 1, [2])}):
+        try:
+            store.query(**kwargs)
+            assert False, f"Curseur invalide accepté: {kwargs}"
+        except ValueError as e:
+            print(f"Refusé: {e}")
+
+    print(f"{len(entries)} scénarios parcourus par pages de 7")
+    print("✓ Test réussi")
+
+
+if __name__ == "__main__":
+    test_subset_comparison_without_recalculation()
+    test_paginated_listing()
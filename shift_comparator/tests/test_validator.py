@@ -0,0 +1,74 @@
+"""
+Tests unitaires pour la validation des repos et chevauchements.
+"""
+from datetime import datetime, timedelta
+import sys
+import os
+
+# Ajouter le dossier parent au path pour les imports
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '../..')))
+
+from shift_comparator.models import ShiftType, WorkDay, Scenario
+from shift_comparator.core import ScheduleValidator, ScheduleValidationError
+from shift_comparator.main import ShiftComparatorApp
+
+
+def test_rest_and_overlap_violations():
+    """Test: repos insuffisant et chevauchement détectés et localisés"""
+    print("\n--- Test: Repos quotidien et chevauchement ---")
+
+    # Ordre volontairement non chronologique: les positions renvoient à la liste d'origine
+    work_days = [
+        WorkDay(datetime(2026, 1, 14), ShiftType.MATIN),       # 0: 7h après l'après-midi
+        WorkDay(datetime(2026, 1, 13), ShiftType.APRES_MIDI),  # 1
+        WorkDay(datetime(2026, 1, 16), ShiftType.MATIN),       # 2
+        WorkDay(datetime(2026, 1, 16), ShiftType.APRES_MIDI),  # 3: chevauche 14h-15h
+    ]
+    violations = ScheduleValidator().validate(Scenario("Test", work_days, 13.0))
+
+    for v in violations:
+        print(f"{v.rule}: {v.message}")
+
+    rules = {v.rule: v for v in violations}
+    assert len(violations) == 2, "Deux violations attendues"
+    assert rules['daily_rest'].positions == [1, 0]
+    assert rules['overlap'].positions == [2, 3]
+
+    try:
+        ShiftComparatorApp().create_scenario("Test", [
+            ('2026-01-13', ShiftType.APRES_MIDI), ('2026-01-14', ShiftType.MATIN)
+        ], validate=True)
+        assert False, "create_scenario aurait dû refuser le planning"
+    except ScheduleValidationError as e:
+        assert e.violations[0].rule == 'daily_rest'
+
+    print("✓ Test réussi")
+
+
+def test_weekly_rest_and_consecutive_days():
+    """Test: trois semaines sans jour de repos"""
+    print("\n--- Test: Repos hebdomadaire et jours consécutifs ---")
+
+    start = datetime(2026, 1, 12)  # Lundi
+    work_days = [WorkDay(start + timedelta(days=d), ShiftType.MATIN) for d in range(21)]
+    violations = ScheduleValidator().validate(work_days)
+
+    for v in violations:
+        print(f"{v.rule}: {v.message}")
+
+    weekly = [v for v in violations if v.rule == 'weekly_rest']
+    consecutive = [v for v in violations if v.rule == 'consecutive_days']
+    # Les semaines de bord ne sont pas jugées: le repos hors planning est inconnu
+    assert len(weekly) == 1 and weekly[0].dates[0] == datetime(2026, 1, 19)
+    assert len(consecutive) == 1 and len(consecutive[0].positions) == 21
+
+    # Un jour de repos par semaine en plus des nuits: planning valide
+    work_days = [wd for wd in work_days if wd.date.weekday() not in (5, 6)]
+    assert ScheduleValidator().validate(work_days) == []
+
+    print("✓ Test réussi")
+
+
+if __name__ == "__main__":
+    test_rest_and_overlap_violations()
+    test_weekly_rest_and_consecutive_days()
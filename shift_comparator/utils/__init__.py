@@ -1,4 +1,5 @@
 """Utilitaires"""
 from .formatter import ResultFormatter
+from .export import ColumnarExporter
 
-__all__ = ['ResultFormatter']
+__all__ = ['ResultFormatter', 'ColumnarExporter']
@@ -0,0 +1,317 @@
+"""
+Export colonnaire des résultats jour par jour (CSV, NumPy .npz, colonnes Arrow).
+
+Une colonne par champ: scénario, date, nombre de jours, type de shift, taux
+horaire appliqué, chaque catégorie d'heures, heures supplémentaires,
+rémunération de base, majorations, majoration des heures supplémentaires et
+total. Un scénario en
+séquences (RunScenario) donne une ligne par séquence, datée de son premier
+jour, sans développer les jours. Les lignes sont produites sous forme de tuples
+et les colonnes dans des array.array typés, sans dictionnaire par ligne.
+
+Les heures supplémentaires d'une semaine sont attribuées à ses dernières
+heures travaillées, dans l'ordre chronologique, et payées au taux moyen de la
+semaine (comme RangeIndex): la colonne total_pay les inclut, et la somme des
+lignes d'un scénario redonne son total_pay.
+
+Disposition compatible Arrow:
+    - date: int32, jours depuis le 1970-01-01 (type date32)
+    - days: int32, 1 pour un jour, la longueur pour une séquence
+    - scenario, shift_type: indices int32 / int8 + dictionnaire de libellés
+    - heures et montants: float64
+"""
+import csv
+from array import array
+from datetime import date
+from typing import Dict, Iterator, List, TextIO
+from ..core import ScenarioResult, ComparisonResult, DayResult
+from ..core.overtime import WeeklyOvertime, week_key
+
+
+EPOCH_ORDINAL = date(1970, 1, 1).toordinal()
+
+COLUMNS = ['scenario', 'date', 'days', 'shift_type', 'hourly_rate', 'normal_hours', 'night_hours',
+           'sunday_hours', 'night_sunday_hours', 'overtime_25_hours', 'overtime_50_hours',
+           'base_pay', 'bonus_pay', 'overtime_pay', 'total_pay']
+
+# Schéma Arrow équivalent: (colonne, type)
+ARROW_SCHEMA = [
+    ('scenario', 'dictionary<values=string, indices=int32>'),
+    ('date', 'date32[day]'),
+    ('days', 'int32'),
+    ('shift_type', 'dictionary<values=string, indices=int8>'),
+    ('hourly_rate', 'double'),
+    ('normal_hours', 'double'),
+    ('night_hours', 'double'),
+    ('sunday_hours', 'double'),
+    ('night_sunday_hours', 'double'),
+    ('overtime_25_hours', 'double'),
+    ('overtime_50_hours', 'double'),
+    ('base_pay', 'double'),
+    ('bonus_pay', 'double'),
+    ('overtime_pay', 'double'),
+    ('total_pay', 'double'),
+]
+
+_FLOAT_COLUMNS = COLUMNS[4:]
+
+
+def _new_batch(scenario_dictionary: List[str], shift_type_dictionary: List[str]) -> Dict:
+    """Crée un lot de colonnes vide"""
+    batch = {
+        'scenario': array('i'),
+        'date': array('i'),
+        'days': array('i'),
+        'shift_type': array('b'),
+        'scenario_dictionary': scenario_dictionary,
+        'shift_type_dictionary': shift_type_dictionary,
+    }
+    for column in _FLOAT_COLUMNS:
+        batch[column] = array('d')
+    return batch
+
+
+def _as_results(results) -> List[ScenarioResult]:
+    """Accepte un ScenarioResult, un ComparisonResult ou un itérable de résultats"""
+    if isinstance(results, ScenarioResult):
+        return [results]
+    if isinstance(results, ComparisonResult):
+        return results.scenario_results
+    return results
+
+
+def _iter_items(result: ScenarioResult) -> Iterator[tuple]:
+    """
+    Jours (ou séquences) d'un résultat et leurs heures supplémentaires.
+
+    Yields:
+        Tuples (ordinal du premier jour, nombre de jours, type de shift, taux appliqué,
+        DayResult ou RunResult, heures à +25%, heures à +50%, majoration des heures sup.)
+    """
+    items = []
+    for dr in result.day_results:
+        wd = dr.work_day
+        items.append((wd.date.toordinal(), 1, wd.shift_type, dr.hourly_rate or result.hourly_rate, dr))
+    for rr in result.run_results:
+        run = rr.run
+        items.append((run.start.toordinal(), run.length, run.shift_type, rr.hourly_rate or result.hourly_rate, rr))
+
+    overtime = [[0.0, 0.0, 0.0] for _ in items]
+    if result.overtime is not None:
+        # Semaine -> morceaux (début, ligne, heures, taux); une séquence a un morceau par semaine touchée
+        weeks: Dict[tuple, list] = {}
+        for i, (_, _, _, rate, item) in enumerate(items):
+            if isinstance(item, DayResult):
+                pieces = ((item.work_day.start_datetime, item.breakdown.get_total_hours()),)
+            else:
+                pieces = item.week_hours
+            for start, hours in pieces:
+                weeks.setdefault(week_key(start), []).append((start, i, hours, rate))
+
+        for pieces in weeks.values():
+            pieces.sort(key=lambda piece: piece[:2])
+            week_hours = sum(hours for _, _, hours, _ in pieces)
+            if week_hours <= WeeklyOvertime.FIRST_THRESHOLD:
+                continue
+            week_rate = sum(hours * rate for _, _, hours, rate in pieces) / week_hours
+            allocation = WeeklyOvertime.allocate(hours for _, _, hours, _ in pieces)
+            for (_, i, _, _), (h25, h50) in zip(pieces, allocation):
+                totals = overtime[i]
+                totals[0] += h25
+                totals[1] += h50
+                totals[2] += week_rate * (h25 * WeeklyOvertime.FIRST_BONUS + h50 * WeeklyOvertime.SECOND_BONUS)
+
+    for item, (h25, h50, overtime_pay) in zip(items, overtime):
+        yield item + (h25, h50, overtime_pay)
+
+
+class ColumnarExporter:
+    """Exporte les résultats jour par jour (ou séquence par séquence) sous forme de colonnes"""
+
+    @staticmethod
+    def iter_rows(results) -> Iterator[tuple]:
+        """
+        Produit une ligne (tuple) par jour calculé (par séquence pour un RunScenario).
+
+        Args:
+            results: ScenarioResult, ComparisonResult ou itérable de ScenarioResult
+
+        Yields:
+            Tuples dans l'ordre de COLUMNS (date au format ISO)
+        """
+        date_labels = {}
+
+        for result in _as_results(results):
+            name = result.scenario_name
+            for ordinal, days, shift_type, rate, item, h25, h50, overtime_pay in _iter_items(result):
+                bd = item.breakdown
+
+                label = date_labels.get(ordinal)
+                if label is None:
+                    label = date_labels[ordinal] = date.fromordinal(ordinal).isoformat()
+
+                yield (name, label, days, shift_type.value, rate,
+                       bd.normal_hours, bd.night_hours, bd.sunday_hours, bd.night_sunday_hours, h25, h50,
+                       item.base_pay, item.bonus_pay, overtime_pay, item.total_pay + overtime_pay)
+
+    @staticmethod
+    def write_csv(results, stream: TextIO, header: bool = True):
+        """
+        Écrit les résultats au format CSV, au fil de l'eau.
+
+        Args:
+            results: ScenarioResult, ComparisonResult ou itérable de ScenarioResult
+            stream: Fichier texte ouvert avec newline=''
+            header: Si True, écrit la ligne d'en-tête
+        """
+        writer = csv.writer(stream)
+        if header:
+            writer.writerow(COLUMNS)
+        writer.writerows(ColumnarExporter.iter_rows(results))
+
+    @staticmethod
+    def iter_batches(results, batch_size: int = 65536) -> Iterator[Dict]:
+        """
+        Produit des lots de colonnes typées (équivalent des record batches Arrow).
+
+        Les dictionnaires de libellés (scenario_dictionary, shift_type_dictionary)
+        sont cumulatifs: les indices d'un lot restent valides dans les suivants.
+
+        Args:
+            results: ScenarioResult, ComparisonResult ou itérable de ScenarioResult
+            batch_size: Nombre maximum de lignes par lot
+
+        Yields:
+            Dictionnaire colonne -> array.array, plus les dictionnaires de libellés
+        """
+        scenario_dictionary: List[str] = []
+        shift_type_dictionary: List[str] = []
+        shift_codes = {}
+
+        batch = _new_batch(scenario_dictionary, shift_type_dictionary)
+        size = 0
+
+        for result in _as_results(results):
+            scenario_code = len(scenario_dictionary)
+            scenario_dictionary.append(result.scenario_name)
+
+            for ordinal, days, shift_type, rate, item, h25, h50, overtime_pay in _iter_items(result):
+                bd = item.breakdown
+
+                shift_code = shift_codes.get(shift_type)
+                if shift_code is None:
+                    shift_code = shift_codes[shift_type] = len(shift_type_dictionary)
+                    shift_type_dictionary.append(shift_type.value)
+
+                batch['scenario'].append(scenario_code)
+                batch['date'].append(ordinal - EPOCH_ORDINAL)
+                batch['days'].append(days)
+                batch['shift_type'].append(shift_code)
+                batch['hourly_rate'].append(rate)
+                batch['normal_hours'].append(bd.normal_hours)
+                batch['night_hours'].append(bd.night_hours)
+                batch['sunday_hours'].append(bd.sunday_hours)
+                batch['night_sunday_hours'].append(bd.night_sunday_hours)
+                batch['overtime_25_hours'].append(h25)
+                batch['overtime_50_hours'].append(h50)
+                batch['base_pay'].append(item.base_pay)
+                batch['bonus_pay'].append(item.bonus_pay)
+                batch['overtime_pay'].append(overtime_pay)
+                batch['total_pay'].append(item.total_pay + overtime_pay)
+                size += 1
+
+                if size >= batch_size:
+                    yield batch
+                    batch = _new_batch(scenario_dictionary, shift_type_dictionary)
+                    size = 0
+
+        if size:
+            yield batch
+
+    @staticmethod
+    def to_columns(results) -> Dict:
+        """
+        Construit toutes les colonnes en un seul lot.
+
+        Args:
+            results: ScenarioResult, ComparisonResult ou itérable de ScenarioResult
+
+        Returns:
+            Dictionnaire colonne -> array.array (voir iter_batches)
+        """
+        for batch in ColumnarExporter.iter_batches(results, batch_size=1 << 62):
+            return batch
+        return _new_batch([], [])
+
+    @staticmethod
+    def write_npz(results, path: str, compressed: bool = False):
+        """
+        Écrit les colonnes dans un fichier NumPy .npz.
+
+        Nécessite numpy (dépendance optionnelle). Les colonnes sont converties
+        sans copie depuis les array.array; la date est stockée en datetime64[D].
+
+        Args:
+            results: ScenarioResult, ComparisonResult ou itérable de ScenarioResult
+            path: Chemin du fichier .npz
+            compressed: Si True, utilise numpy.savez_compressed
+        """
+        try:
+            import numpy as np
+        except ImportError:
+            raise ImportError("L'export .npz nécessite numpy: pip install numpy")
+
+        columns = ColumnarExporter.to_columns(results)
+
+        arrays = {
+            'scenario': np.frombuffer(columns['scenario'], dtype=np.int32),
+            'scenario_dictionary': np.array(columns['scenario_dictionary'], dtype=str),
+            'date': np.frombuffer(columns['date'], dtype=np.int32).astype('datetime64[D]'),
+            'days': np.frombuffer(columns['days'], dtype=np.int32),
+            'shift_type': np.frombuffer(columns['shift_type'], dtype=np.int8),
+            'shift_type_dictionary': np.array(columns['shift_type_dictionary'], dtype=str),
+        }
+        for column in _FLOAT_COLUMNS:
+            arrays[column] = np.frombuffer(columns[column], dtype=np.float64)
+
+        save = np.savez_compressed if compressed else np.savez
+        save(path, **arrays)
+
+    @staticmethod
+    def to_arrow(results):
+        """
+        Construit une table pyarrow à partir des colonnes, sans copie des tampons.
+
+        Nécessite pyarrow (dépendance optionnelle).
+
+        Args:
+            results: ScenarioResult, ComparisonResult ou itérable de ScenarioResult
+
+        Returns:
+            pyarrow.Table
+        """
+        try:
+            import pyarrow as pa
+        except ImportError:
+            raise ImportError("L'export Arrow nécessite pyarrow: pip install pyarrow")
+
+        columns = ColumnarExporter.to_columns(results)
+        length = len(columns['date'])
+
+        def from_array(arrow_type, values):
+            return pa.Array.from_buffers(arrow_type, length, [None, pa.py_buffer(values)])
+
+        arrays = {
+            'scenario': pa.DictionaryArray.from_arrays(
+                from_array(pa.int32(), columns['scenario']),
+                pa.array(columns['scenario_dictionary'], type=pa.string())),
+            'date': from_array(pa.date32(), columns['date']),
+            'days': from_array(pa.int32(), columns['days']),
+            'shift_type': pa.DictionaryArray.from_arrays(
+                from_array(pa.int8(), columns['shift_type']),
+                pa.array(columns['shift_type_dictionary'], type=pa.string())),
+        }
+        for column in _FLOAT_COLUMNS:
+            arrays[column] = from_array(pa.float64(), columns[column])
+
+        return pa.table([arrays[column] for column in COLUMNS], names=COLUMNS)
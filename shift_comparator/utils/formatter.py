@@ -1,135 +1,262 @@
 """
 Formateurs pour l'affichage des résultats.
+
+Les rapports sont produits ligne par ligne par des générateurs (iter_*),
+ce qui permet de les écrire au fil de l'eau dans n'importe quel flux (write_*)
+sans construire la chaîne complète en mémoire. Les méthodes format_*
+conservent l'ancien comportement et retournent une chaîne.
 """
-from typing import List
+from functools import lru_cache
+from typing import Iterable, Iterator, List, TextIO
 from ..core import ScenarioResult, ComparisonResult
+from ..core.overtime import WeeklyOvertime
+
+
+SEPARATOR = "=" * 80
+RULE = "-" * 80
+
+# Gabarits précalculés pour le détail par jour. Les majorations de nuit et du
+# dimanche dépendent des règles et de l'historique de taux: pas de pourcentage.
+_DAY_HEADER = "\n{} - {}".format
+_DAY_NORMAL = "  Heures normales:        {:6.2f}h".format
+_DAY_NIGHT = "  Heures de nuit:         {:6.2f}h".format
+_DAY_SUNDAY = "  Heures dimanche:        {:6.2f}h".format
+_DAY_NIGHT_SUNDAY = "  Heures nuit+dim:        {:6.2f}h".format
+_DAY_BASE_PAY = "  Rémunération de base:   {:8.2f}€".format
+_DAY_BONUS = "  Majorations:            {:8.2f}€".format
+_DAY_TOTAL = "  TOTAL DU JOUR:          {:8.2f}€".format
+_RUN_HEADER = "\n{} → {} - {} ({} jours)".format
+_RUN_TOTAL = "  TOTAL DE LA SÉQUENCE:   {:8.2f}€".format
+
+# Gabarit d'une ligne du classement
+_RANKING_ROW = "{:<6} {:<30} {:>6.2f}h   {:>10.2f}€    {} ({:.1f}%)".format
+
+
+@lru_cache(maxsize=4096)
+def _day_label(date) -> str:
+    """Libellé du jour ('Monday 13/01/2026'), mis en cache par date"""
+    return date.strftime('%A %d/%m/%Y')
+
+
+@lru_cache(maxsize=4096)
+def _schedule_label(start, end) -> str:
+    """Ligne d'horaire d'un shift, mise en cache par couple (début, fin)"""
+    return f"  Horaire: {start.strftime('%H:%M')} → {end.strftime('%H:%M le %d/%m')}"
+
+
+def _iter_pay_lines(item, total_line) -> Iterator[str]:
+    """Heures par catégorie et rémunération d'un jour ou d'une séquence"""
+    bd = item.breakdown
+    yield _DAY_NORMAL(bd.normal_hours)
+    if bd.night_hours > 0:
+        yield _DAY_NIGHT(bd.night_hours)
+    if bd.sunday_hours > 0:
+        yield _DAY_SUNDAY(bd.sunday_hours)
+    if bd.night_sunday_hours > 0:
+        yield _DAY_NIGHT_SUNDAY(bd.night_sunday_hours)
+
+    yield _DAY_BASE_PAY(item.base_pay)
+    yield _DAY_BONUS(item.bonus_pay)
+    yield total_line(item.total_pay)
 
 
 class ResultFormatter:
     """Formate les résultats pour un affichage clair"""
 
     @staticmethod
-    def format_scenario_result(result: ScenarioResult, detailed: bool = True) -> str:
+    def iter_scenario_result(result: ScenarioResult, detailed: bool = True) -> Iterator[str]:
         """
-        Formate le résultat d'un scénario.
+        Produit les lignes du rapport d'un scénario.
 
         Args:
             result: Résultat du scénario
-            detailed: Si True, affiche le détail par jour
+            detailed: Si True, inclut le détail par jour (par séquence pour un RunScenario)
 
-        Returns:
-            Chaîne formatée
+        Yields:
+            Lignes du rapport (sans retour à la ligne final)
         """
-        lines = []
-        lines.append("=" * 80)
-        lines.append(f"SCÉNARIO: {result.scenario_name}")
-        lines.append(f"Taux horaire de base: {result.hourly_rate:.2f}€/h")
-        lines.append("=" * 80)
+        yield SEPARATOR
+        yield f"SCÉNARIO: {result.scenario_name}"
+        yield f"Taux horaire de base: {result.hourly_rate:.2f}€/h"
+        yield SEPARATOR
 
-        if detailed:
-            lines.append("\nDÉTAIL PAR JOUR:")
-            lines.append("-" * 80)
+        if detailed and result.run_results:
+            # Scénario en séquences: une section par séquence, sans développer les jours
+            yield "\nDÉTAIL PAR SÉQUENCE:"
+            yield RULE
+
+            for run_result in result.run_results:
+                run = run_result.run
+                yield _RUN_HEADER(_day_label(run.start), _day_label(run.end), run.shift_type.value, run.length)
+                yield from _iter_pay_lines(run_result, _RUN_TOTAL)
+
+        elif detailed:
+            yield "\nDÉTAIL PAR JOUR:"
+            yield RULE
 
             for day_result in result.day_results:
                 wd = day_result.work_day
-                date_str = wd.date.strftime('%A %d/%m/%Y')
-                shift_str = wd.shift_type.value
-
-                lines.append(f"\n{date_str} - {shift_str}")
-                lines.append(f"  Horaire: {wd.start_datetime.strftime('%H:%M')} → "
-                           f"{wd.end_datetime.strftime('%H:%M le %d/%m')}")
-
-                bd = day_result.breakdown
-                lines.append(f"  Heures normales:        {bd.normal_hours:6.2f}h")
-                if bd.night_hours > 0:
-                    lines.append(f"  Heures de nuit (+15%):  {bd.night_hours:6.2f}h")
-                if bd.sunday_hours > 0:
-                    lines.append(f"  Heures dimanche (+25%): {bd.sunday_hours:6.2f}h")
-                if bd.night_sunday_hours > 0:
-                    lines.append(f"  Heures nuit+dim (+40%): {bd.night_sunday_hours:6.2f}h")
-
-                lines.append(f"  Rémunération de base:   {day_result.base_pay:8.2f}€")
-                lines.append(f"  Majorations:            {day_result.bonus_pay:8.2f}€")
-                lines.append(f"  TOTAL DU JOUR:          {day_result.total_pay:8.2f}€")
+
+                yield _DAY_HEADER(_day_label(wd.date), wd.shift_type.value)
+                yield _schedule_label(wd.start_datetime, wd.end_datetime)
+                yield from _iter_pay_lines(day_result, _DAY_TOTAL)
 
         # Résumé global
-        lines.append("\n" + "=" * 80)
-        lines.append("RÉSUMÉ GLOBAL")
-        lines.append("=" * 80)
+        yield "\n" + SEPARATOR
+        yield "RÉSUMÉ GLOBAL"
+        yield SEPARATOR
 
         bd = result.total_breakdown
-        lines.append(f"Total heures normales:        {bd.normal_hours:6.2f}h")
+        yield f"Total heures normales:        {bd.normal_hours:6.2f}h"
         if bd.night_hours > 0:
-            lines.append(f"Total heures de nuit (+15%):  {bd.night_hours:6.2f}h")
+            yield f"Total heures de nuit:         {bd.night_hours:6.2f}h"
         if bd.sunday_hours > 0:
-            lines.append(f"Total heures dimanche (+25%): {bd.sunday_hours:6.2f}h")
+            yield f"Total heures dimanche:        {bd.sunday_hours:6.2f}h"
         if bd.night_sunday_hours > 0:
-            lines.append(f"Total heures nuit+dim (+40%): {bd.night_sunday_hours:6.2f}h")
-
-        lines.append(f"\nTotal heures travaillées:     {result.get_total_hours():6.2f}h")
-        lines.append(f"Total majorations:            {result.total_bonus:8.2f}€")
-        lines.append(f"\nRÉMUNÉRATION TOTALE:          {result.total_pay:8.2f}€")
-        lines.append("=" * 80)
+            yield f"Total heures nuit+dim:        {bd.night_sunday_hours:6.2f}h"
+        if bd.overtime_25_hours > 0:
+            yield f"Dont heures sup. (+{WeeklyOvertime.FIRST_BONUS:.0%}):      {bd.overtime_25_hours:6.2f}h"
+        if bd.overtime_50_hours > 0:
+            yield f"Dont heures sup. (+{WeeklyOvertime.SECOND_BONUS:.0%}):      {bd.overtime_50_hours:6.2f}h"
 
-        return "\n".join(lines)
+        yield f"\nTotal heures travaillées:     {result.get_total_hours():6.2f}h"
+        yield f"Total majorations:            {result.total_bonus:8.2f}€"
+        yield f"\nRÉMUNÉRATION TOTALE:          {result.total_pay:8.2f}€"
+        yield SEPARATOR
 
     @staticmethod
-    def format_comparison(comparison: ComparisonResult, detailed: bool = False) -> str:
+    def iter_comparison(comparison: ComparisonResult, detailed: bool = False) -> Iterator[str]:
         """
-        Formate la comparaison de plusieurs scénarios.
+        Produit les lignes du rapport de comparaison.
 
         Args:
             comparison: Résultat de la comparaison
-            detailed: Si True, affiche le détail de chaque scénario
+            detailed: Si True, inclut le rapport détaillé de chaque scénario
 
-        Returns:
-            Chaîne formatée
+        Yields:
+            Lignes du rapport (sans retour à la ligne final)
         """
-        lines = []
-
         if detailed:
             # Afficher chaque scénario en détail
             for result in comparison.scenario_results:
-                lines.append(ResultFormatter.format_scenario_result(result, detailed=True))
-                lines.append("\n\n")
+                yield from ResultFormatter.iter_scenario_result(result, detailed=True)
+                yield "\n\n"
 
         # Classement
-        lines.append("=" * 80)
-        lines.append("CLASSEMENT DES SCÉNARIOS")
-        lines.append("=" * 80)
-        lines.append(f"\n{'Rang':<6} {'Scénario':<30} {'Heures':<10} {'Rémunération':<15} {'Écart'}")
-        lines.append("-" * 80)
+        yield SEPARATOR
+        yield "CLASSEMENT DES SCÉNARIOS"
+        yield SEPARATOR
+        yield f"\n{'Rang':<6} {'Scénario':<30} {'Heures':<10} {'Rémunération':<15} {'Écart'}"
+        yield RULE
 
         for rank, result in comparison.get_ranking():
             diff = comparison.get_difference_from_best(result)
             pct = comparison.get_percentage_from_best(result)
 
             diff_str = f"-{diff:.2f}€" if diff > 0 else "MEILLEUR"
-            pct_str = f"({pct:.1f}%)"
 
-            lines.append(
-                f"{rank:<6} {result.scenario_name:<30} "
-                f"{result.get_total_hours():>6.2f}h   "
-                f"{result.total_pay:>10.2f}€    "
-                f"{diff_str} {pct_str}"
-            )
+            yield _RANKING_ROW(rank, result.scenario_name, result.get_total_hours(),
+                               result.total_pay, diff_str, pct)
 
         # Conclusion
-        lines.append("\n" + "=" * 80)
-        lines.append("CONCLUSION")
-        lines.append("=" * 80)
+        yield "\n" + SEPARATOR
+        yield "CONCLUSION"
+        yield SEPARATOR
 
         best = comparison.best_scenario
         worst = comparison.worst_scenario
 
-        lines.append(f"\nMEILLEUR SCÉNARIO: {best.scenario_name}")
-        lines.append(f"  → {best.total_pay:.2f}€ pour {best.get_total_hours():.2f}h")
-        lines.append(f"  → Majorations: {best.total_bonus:.2f}€")
+        yield f"\nMEILLEUR SCÉNARIO: {best.scenario_name}"
+        yield f"  → {best.total_pay:.2f}€ pour {best.get_total_hours():.2f}h"
+        yield f"  → Majorations: {best.total_bonus:.2f}€"
 
         if len(comparison.scenario_results) > 1:
             diff_total = best.total_pay - worst.total_pay
-            lines.append(f"\nGain par rapport au pire scénario: {diff_total:.2f}€")
+            yield f"\nGain par rapport au pire scénario: {diff_total:.2f}€"
+
+        yield SEPARATOR
+
+    @staticmethod
+    def iter_chunks(lines: Iterable[str], max_lines: int = 256) -> Iterator[str]:
+        """
+        Regroupe des lignes en blocs de texte terminés par un retour à la ligne.
+
+        Args:
+            lines: Lignes produites par iter_scenario_result ou iter_comparison
+            max_lines: Nombre maximum de lignes par bloc
+
+        Yields:
+            Blocs de texte prêts à être écrits
+        """
+        batch: List[str] = []
+        for line in lines:
+            batch.append(line)
+            if len(batch) >= max_lines:
+                batch.append('')
+                yield "\n".join(batch)
+                batch = []
+        if batch:
+            batch.append('')
+            yield "\n".join(batch)
+
+    @staticmethod
+    def write_scenario_result(result: ScenarioResult, stream: TextIO,
+                              detailed: bool = True):
+        """
+        Écrit le rapport d'un scénario dans un flux au fil de l'eau.
+
+        Le texte écrit est identique à print(format_scenario_result(...)).
+
+        Args:
+            result: Résultat du scénario
+            stream: Objet fichier texte (sys.stdout, fichier ouvert, StringIO...)
+            detailed: Si True, inclut le détail par jour
+        """
+        for chunk in ResultFormatter.iter_chunks(
+                ResultFormatter.iter_scenario_result(result, detailed=detailed)):
+            stream.write(chunk)
+
+    @staticmethod
+    def write_comparison(comparison: ComparisonResult, stream: TextIO,
+                         detailed: bool = False):
+        """
+        Écrit le rapport de comparaison dans un flux au fil de l'eau.
+
+        Le texte écrit est identique à print(format_comparison(...)).
+
+        Args:
+            comparison: Résultat de la comparaison
+            stream: Objet fichier texte (sys.stdout, fichier ouvert, StringIO...)
+            detailed: Si True, inclut le rapport détaillé de chaque scénario
+        """
+        for chunk in ResultFormatter.iter_chunks(
+                ResultFormatter.iter_comparison(comparison, detailed=detailed)):
+            stream.write(chunk)
+
+    @staticmethod
+    def format_scenario_result(result: ScenarioResult, detailed: bool = True) -> str:
+        """
+        Formate le résultat d'un scénario.
 
-        lines.append("=" * 80)
+        Args:
+            result: Résultat du scénario
+            detailed: Si True, affiche le détail par jour
+
+        Returns:
+            Chaîne formatée
+        """
+        return "\n".join(ResultFormatter.iter_scenario_result(result, detailed=detailed))
 
-        return "\n".join(lines)
+    @staticmethod
+    def format_comparison(comparison: ComparisonResult, detailed: bool = False) -> str:
+        """
+        Formate la comparaison de plusieurs scénarios.
+
+        Args:
+            comparison: Résultat de la comparaison
+            detailed: Si True, affiche le détail de chaque scénario
+
+        Returns:
+            Chaîne formatée
+        """
+        return "\n".join(ResultFormatter.iter_comparison(comparison, detailed=detailed))
@@ -1,4 +1,9 @@
 """Interface web du comparateur de shifts"""
-from .server import run_server
+from .._lazy import lazy_exports
 
-__all__ = ['run_server']
+# Importé à la demande: http.server n'est chargé que si run_server est utilisé
+_SUBMODULES = {
+    '.server': ['run_server'],
+}
+
+__all__, __getattr__, __dir__ = lazy_exports(__name__, globals(), _SUBMODULES)
@@ -0,0 +1,24 @@
+"""
+Configuration gunicorn avec préchargement de l'application.
+
+Usage:
+    gunicorn shift_comparator.web.wsgi_app:application \\
+        --config python:shift_comparator.web.gunicorn_conf --bind 0.0.0.0:$PORT
+
+L'application est importée et préparée une seule fois dans le processus
+maître (preload_app), puis partagée en copy-on-write par les workers.
+"""
+import os
+
+preload_app = True
+workers = int(os.environ.get('WEB_CONCURRENCY', 2))
+timeout = 60
+loglevel = 'info'
+
+
+def when_ready(server):
+    """Appelé dans le maître, après le chargement de l'application et avant le premier fork"""
+    from shift_comparator.web.wsgi_app import preload
+
+    preload()
+    server.log.info("Application préchargée, gc gelé avant le fork des workers")
@@ -0,0 +1,386 @@
+"""
+Travaux asynchrones pour les calculs longs (comparaisons, paie par lots).
+
+Une requête POST /api/jobs place le travail dans une file bornée et répond
+immédiatement avec un identifiant; GET /api/jobs/<id> donne l'avancement,
+les résultats partiels puis le résultat final. Les travaux sont exécutés par
+un petit pool de threads du processus, démarré à la première soumission
+(donc dans chaque worker gunicorn, après le fork). Quand la file est pleine,
+la soumission est refusée (503) au lieu d'accumuler les requêtes.
+
+Les résultats sont conservés ttl secondes après la fin du travail, et au
+plus max_jobs travaux sont gardés en mémoire.
+
+Configuration par variables d'environnement:
+    SHIFT_JOB_WORKERS   Threads d'exécution (défaut: 2)
+    SHIFT_JOB_QUEUE     Travaux en attente au maximum (défaut: 32)
+    SHIFT_JOB_TTL       Durée de conservation des résultats en secondes (défaut: 600)
+    SHIFT_JOB_MAX       Travaux conservés au maximum (défaut: 256)
+"""
+import os
+import queue
+import threading
+import time
+import uuid
+from collections import OrderedDict, deque
+from datetime import datetime
+from typing import Callable, Dict, List, Optional
+
+from ..models import ShiftType, Scenario
+from ..core import ComparisonResult, PayrollAggregator
+from ..core.payroll import DEFAULT_GROUPINGS
+from .store import parse_scenario_request
+
+
+class QueueFull(Exception):
+    """La file des travaux est pleine"""
+
+
+class JobRejected(ValueError):
+    """Demande de travail refusée, avec le corps de la réponse 400 (ex: planning invalide en mode strict)"""
+
+    def __init__(self, body: Dict):
+        super().__init__(body['error'])
+        self.body = body
+
+
+class Job:
+    """Travail soumis, avec son avancement et son résultat"""
+
+    MAX_PARTIAL = 50  # Résultats partiels conservés (les plus récents)
+
+    def __init__(self, kind: str, func: Callable):
+        """
+        Args:
+            kind: Type de travail ('compare', 'payroll')
+            func: Fonction func(job) qui exécute le travail et retourne le résultat
+        """
+        self.id = uuid.uuid4().hex
+        self.kind = kind
+        self.func = func
+        self.status = 'queued'  # queued, running, done, failed
+        self.done = 0
+        self.total = 0
+        self.partial: 'deque[Dict]' = deque(maxlen=self.MAX_PARTIAL)
+        self.result = None
+        self.error = None
+        self.created_at = time.time()
+        self.finished_at = None
+
+    def report(self, done: int, total: int, partial: Dict = None):
+        """
+        Met à jour l'avancement (appelé depuis la fonction du travail).
+
+        Args:
+            done: Étapes terminées
+            total: Nombre total d'étapes
+            partial: Résultat partiel de l'étape terminée (seuls les MAX_PARTIAL derniers sont gardés)
+        """
+        self.done = done
+        self.total = total
+        if partial is not None:
+            self.partial.append(partial)
+
+    def to_dict(self) -> Dict:
+        """Sérialise l'état du travail (ex: pour JSON)"""
+        data = {
+            'id': self.id,
+            'kind': self.kind,
+            'status': self.status,
+            'progress': {'done': self.done, 'total': self.total},
+            'partial': list(self.partial),
+        }
+        if self.status == 'done':
+            data['result'] = self.result
+        elif self.status == 'failed':
+            data['error'] = self.error
+        return data
+
+
+class JobManager:
+    """File bornée de travaux exécutés par un pool de threads"""
+
+    def __init__(self, workers: int = 2, max_queued: int = 32, ttl: float = 600.0,
+                 max_jobs: int = 256):
+        """
+        Args:
+            workers: Nombre de threads d'exécution
+            max_queued: Travaux en attente au maximum (au-delà: QueueFull)
+            ttl: Durée de conservation d'un travail terminé, en secondes
+            max_jobs: Nombre maximum de travaux conservés
+        """
+        self.workers = workers
+        self.ttl = ttl
+        self.max_jobs = max_jobs
+        self._queue: queue.Queue = queue.Queue(maxsize=max_queued)
+        self._jobs: 'OrderedDict[str, Job]' = OrderedDict()
+        self._lock = threading.Lock()
+        self._threads: List[threading.Thread] = []
+        self._pid = None
+
+    @classmethod
+    def from_env(cls, environ=None) -> 'JobManager':
+        """
+        Crée le gestionnaire selon les variables d'environnement SHIFT_JOB_*.
+
+        Args:
+            environ: Dictionnaire d'environnement (os.environ par défaut)
+
+        Returns:
+            JobManager
+        """
+        environ = os.environ if environ is None else environ
+        return cls(
+            workers=int(environ.get('SHIFT_JOB_WORKERS', 2)),
+            max_queued=int(environ.get('SHIFT_JOB_QUEUE', 32)),
+            ttl=float(environ.get('SHIFT_JOB_TTL', 600)),
+            max_jobs=int(environ.get('SHIFT_JOB_MAX', 256)),
+        )
+
+    def _ensure_workers(self):
+        """Démarre les threads dans le processus courant (ils ne survivent pas à un fork)"""
+        if self._pid == os.getpid():
+            return
+        self._pid = os.getpid()
+        self._threads = []
+        for i in range(self.workers):
+            thread = threading.Thread(target=self._work, name=f"shift-job-{i}", daemon=True)
+            thread.start()
+            self._threads.append(thread)
+
+    def _work(self):
+        """Boucle d'un thread d'exécution"""
+        while True:
+            job = self._queue.get()
+            job.status = 'running'
+            try:
+                job.result = job.func(job)
+                job.status = 'done'
+            except Exception as e:
+                job.error = str(e)
+                job.status = 'failed'
+            finally:
+                job.func = None  # Libère les données d'entrée
+                job.finished_at = time.time()
+                self._queue.task_done()
+
+    def submit(self, kind: str, func: Callable) -> Job:
+        """
+        Place un travail dans la file.
+
+        Args:
+            kind: Type de travail
+            func: Fonction func(job) retournant un résultat sérialisable en JSON
+
+        Returns:
+            Job en attente
+
+        Raises:
+            QueueFull: Si la file est pleine
+        """
+        with self._lock:
+            self._ensure_workers()
+            self._purge()
+            job = Job(kind, func)
+            try:
+                self._queue.put_nowait(job)
+            except queue.Full:
+                raise QueueFull("File des travaux pleine, réessayez plus tard")
+            self._jobs[job.id] = job
+        return job
+
+    def get(self, job_id: str) -> Optional[Job]:
+        """
+        Retourne un travail s'il est encore conservé.
+
+        Args:
+            job_id: Identifiant retourné par submit
+
+        Returns:
+            Job, ou None s'il est inconnu ou expiré
+        """
+        with self._lock:
+            self._purge()
+            return self._jobs.get(job_id)
+
+    def _purge(self):
+        """Retire les travaux expirés, puis les plus anciens terminés au-delà de max_jobs"""
+        now = time.time()
+        expired = [job_id for job_id, job in self._jobs.items()
+                   if job.finished_at is not None and now - job.finished_at > self.ttl]
+        for job_id in expired:
+            del self._jobs[job_id]
+
+        if len(self._jobs) > self.max_jobs:
+            finished = [job_id for job_id, job in self._jobs.items() if job.finished_at is not None]
+            for job_id in finished[:len(self._jobs) - self.max_jobs]:
+                del self._jobs[job_id]
+
+    def queued(self) -> int:
+        """Nombre de travaux en attente"""
+        return self._queue.qsize()
+
+
+def parse_scenarios(data: Dict, store, validator) -> tuple:
+    """
+    Construit les scénarios d'un travail de comparaison.
+
+    Les scénarios fournis passent par parse_scenario_request, comme ceux de
+    /api/calculate: mêmes violations des repos, même refus en mode strict.
+
+    Args:
+        data: Corps JSON: 'scenario_ids' (identifiants des scénarios sauvegardés) et/ou
+              'scenarios' (liste de corps au format de /api/calculate)
+        store: ScenarioStore des scénarios sauvegardés de l'application
+        validator: ScheduleValidator
+
+    Returns:
+        Tuple (liste de Scenario, violations [{name, violations}] des scénarios fournis)
+
+    Raises:
+        JobRejected: Si un scénario fourni est refusé (aucun shift, planning invalide en mode strict)
+        ValueError: Si la demande est mal formée ou si moins de 2 scénarios valides sont fournis
+    """
+    scenario_ids = data.get('scenario_ids', [])
+    items = data.get('scenarios', [])
+    if not isinstance(scenario_ids, list) or not all(type(i) is int for i in scenario_ids):
+        raise ValueError('scenario_ids: liste d\'entiers attendue')
+    if not isinstance(items, list):
+        raise ValueError('scenarios: liste attendue')
+
+    saved = [store.scenario(i) for i in scenario_ids]
+    scenarios = [scenario for scenario in saved if scenario is not None]
+    violations = []
+    for item in items:
+        scenario, item_violations, error = parse_scenario_request(item, validator)
+        if error is not None:
+            raise JobRejected(error)
+        scenarios.append(scenario)
+        if item_violations:
+            violations.append({'name': scenario.name, 'violations': item_violations})
+
+    if len(scenarios) < 2:
+        raise ValueError('Au moins 2 scénarios sont nécessaires')
+    return scenarios, violations
+
+
+def compare_job(calculator, scenarios: List[Scenario], violations: List[Dict] = ()) -> Callable:
+    """
+    Prépare un travail de comparaison (résultat au format de /api/compare).
+
+    Args:
+        calculator: ShiftCalculator
+        scenarios: Scénarios à comparer
+        violations: Violations des repos à reprendre dans le résultat
+
+    Returns:
+        Fonction func(job) à soumettre
+    """
+    def run(job: Job) -> Dict:
+        results = []
+        for i, scenario in enumerate(scenarios):
+            result = calculator.calculate_scenario(scenario)
+            results.append(result)
+            job.report(i + 1, len(scenarios), {
+                'name': result.scenario_name,
+                'hours': result.get_total_hours(),
+                'pay': result.total_pay,
+            })
+
+        comparison = ComparisonResult(results)
+        return {
+            'best': {
+                'name': comparison.best_scenario.scenario_name,
+                'total_pay': comparison.best_scenario.total_pay,
+                'total_hours': comparison.best_scenario.get_total_hours(),
+                'total_bonus': comparison.best_scenario.total_bonus
+            },
+            'ranking': [
+                {
+                    'rank': rank,
+                    'name': result.scenario_name,
+                    'hours': result.get_total_hours(),
+                    'pay': result.total_pay,
+                    'bonus': result.total_bonus,
+                    'difference': comparison.get_difference_from_best(result),
+                    'percentage': comparison.get_percentage_from_best(result)
+                }
+                for rank, result in comparison.get_ranking()
+            ],
+            'violations': list(violations),
+        }
+
+    return run
+
+
+def payroll_job(calculator, data: Dict) -> Callable:
+    """
+    Prépare un travail de paie agrégée (résultat: PayrollReport.to_dict()).
+
+    Args:
+        calculator: ShiftCalculator
+        data: Corps JSON: 'records' (liste de {employee_id, team, date, shift_type,
+              hourly_rate, length optionnel pour une séquence de jours}) et
+              'group_by' optionnel (ex: ['team', 'team,month'])
+
+    Returns:
+        Fonction func(job) à soumettre
+
+    Raises:
+        ValueError: Si les enregistrements sont absents ou invalides
+    """
+    items = data.get('records', [])
+    if not isinstance(items, list) or not all(isinstance(r, dict) for r in items):
+        raise ValueError('records: liste d\'objets attendue')
+    records = [
+        (str(r['employee_id']), str(r.get('team', '')), datetime.strptime(r['date'], '%Y-%m-%d'),
+         ShiftType[r['shift_type']], float(r['hourly_rate']), int(r.get('length', 1)))
+        for r in items
+    ]
+    if not records:
+        raise ValueError('Aucun enregistrement fourni')
+    for record in records:
+        if record[5] < 1:
+            raise ValueError(f"Longueur de séquence invalide: {record[5]}")
+
+    group_by = data.get('group_by')
+    if group_by is not None and (not isinstance(group_by, list) or
+                                 not all(isinstance(g, str) for g in group_by)):
+        raise ValueError('group_by: liste de chaînes attendue')
+    groupings = [tuple(g.split(',')) for g in group_by] if group_by else DEFAULT_GROUPINGS
+
+    def run(job: Job) -> Dict:
+        job.report(0, 1)
+        aggregator = PayrollAggregator(calculator, groupings=groupings)
+        report = aggregator.aggregate_runs(records).to_dict()
+        job.report(1, 1)
+        return report
+
+    return run
+
+
+def build_job(data: Dict, calculator, store, validator) -> tuple:
+    """
+    Valide une demande de travail et prépare sa fonction.
+
+    Args:
+        data: Corps JSON de la requête ('kind': 'compare' par défaut, ou 'payroll')
+        calculator: ShiftCalculator
+        store: ScenarioStore des scénarios sauvegardés de l'application
+        validator: ScheduleValidator (repos des scénarios fournis)
+
+    Returns:
+        Tuple (type de travail, fonction func(job) à soumettre)
+
+    Raises:
+        JobRejected: Si la demande est refusée avec un corps de réponse détaillé
+        ValueError, KeyError: Si la demande est invalide
+    """
+    if not isinstance(data, dict):
+        raise ValueError('Corps JSON: objet attendu')
+    kind = data.get('kind', 'compare')
+    if kind == 'compare':
+        return kind, compare_job(calculator, *parse_scenarios(data, store, validator))
+    if kind == 'payroll':
+        return kind, payroll_job(calculator, data)
+    raise ValueError(f"Type de travail inconnu: {kind}")
@@ -0,0 +1,200 @@
+"""
+Profilage optionnel des requêtes WSGI avec cProfile.
+
+Le profilage est désactivé par défaut. Il s'active avec la variable
+d'environnement SHIFT_PROFILE=1, puis s'applique:
+    - aux requêtes portant l'en-tête "X-Shift-Profile: 1"
+    - à une fraction aléatoire des requêtes (SHIFT_PROFILE_SAMPLE, entre 0 et 1)
+
+Chaque requête profilée produit un fichier .pstats nommé d'après l'horodatage,
+la méthode et la route, dans SHIFT_PROFILE_DIR (par défaut ./profiles).
+Seuls les SHIFT_PROFILE_KEEP fichiers les plus récents sont conservés.
+
+Résumé des profils capturés:
+    python -m shift_comparator.web.profiling profiles/ --top 20
+"""
+import argparse
+import cProfile
+import glob
+import io
+import logging
+import os
+import pstats
+import random
+import re
+import sys
+import threading
+from datetime import datetime
+
+
+PROFILE_HEADER = 'HTTP_X_SHIFT_PROFILE'
+
+logger = logging.getLogger(__name__)
+
+
+def route_slug(route: str) -> str:
+    """Partie du nom de fichier qui identifie la route (ex: '/api/compare' -> 'api_compare')"""
+    return re.sub(r'[^A-Za-z0-9]+', '_', route).strip('_') or 'root'
+
+
+def profile_route_slug(path: str) -> str:
+    """Route d'un fichier de profil (horodatage_méthode_route.pstats)"""
+    name = os.path.basename(path)[:-len('.pstats')]
+    parts = name.split('_', 2)
+    return parts[2] if len(parts) == 3 else ''
+
+
+class ProfilingMiddleware:
+    """Middleware WSGI qui profile les requêtes sélectionnées"""
+
+    def __init__(self, app, profile_dir: str = 'profiles', sample_rate: float = 0.0,
+                 keep: int = 200):
+        """
+        Args:
+            app: Application WSGI à profiler
+            profile_dir: Dossier de destination des fichiers .pstats
+            sample_rate: Fraction des requêtes profilées sans en-tête (0 à 1)
+            keep: Nombre maximum de fichiers conservés (rotation)
+        """
+        self.app = app
+        self.profile_dir = profile_dir
+        self.sample_rate = sample_rate
+        self.keep = keep
+        self._lock = threading.Lock()
+
+    @classmethod
+    def from_env(cls, app, environ=None):
+        """
+        Enveloppe l'application si SHIFT_PROFILE est activé.
+
+        Args:
+            app: Application WSGI
+            environ: Variables d'environnement (os.environ par défaut)
+
+        Returns:
+            Le middleware, ou l'application inchangée si le profilage est désactivé
+        """
+        environ = os.environ if environ is None else environ
+
+        if environ.get('SHIFT_PROFILE', '') not in ('1', 'true', 'yes'):
+            return app
+
+        return cls(
+            app,
+            profile_dir=environ.get('SHIFT_PROFILE_DIR', 'profiles'),
+            sample_rate=float(environ.get('SHIFT_PROFILE_SAMPLE', 0.0)),
+            keep=int(environ.get('SHIFT_PROFILE_KEEP', 200)),
+        )
+
+    def __getattr__(self, name):
+        # Expose les attributs de l'application enveloppée (scenarios, calculator...)
+        return getattr(self.app, name)
+
+    def __call__(self, environ, start_response):
+        """Point d'entrée WSGI"""
+        if not self.should_profile(environ):
+            return self.app(environ, start_response)
+
+        profiler = cProfile.Profile()
+        body = profiler.runcall(self._run, environ, start_response)
+        self.dump(profiler, environ)
+        return body
+
+    def should_profile(self, environ) -> bool:
+        """Détermine si la requête doit être profilée"""
+        if environ.get(PROFILE_HEADER, '') in ('1', 'true', 'yes'):
+            return True
+        return self.sample_rate > 0 and random.random() < self.sample_rate
+
+    def _run(self, environ, start_response):
+        """Exécute l'application et consomme la réponse pendant le profilage"""
+        iterable = self.app(environ, start_response)
+        try:
+            return [chunk for chunk in iterable]
+        finally:
+            if hasattr(iterable, 'close'):
+                iterable.close()
+
+    def dump(self, profiler, environ):
+        """
+        Écrit le profil de la requête puis applique la rotation.
+
+        Une erreur d'écriture (dossier non accessible, disque plein...) est
+        journalisée sans faire échouer la requête profilée.
+        """
+        method = re.sub(r'[^A-Za-z]+', '', environ.get('REQUEST_METHOD', 'GET')) or 'GET'
+        route = environ.get('PATH_INFO', '/')
+        timestamp = datetime.now().strftime('%Y%m%dT%H%M%S%f')
+
+        filename = f"{timestamp}_{method}_{route_slug(route)}.pstats"
+
+        try:
+            with self._lock:
+                os.makedirs(self.profile_dir, exist_ok=True)
+                profiler.dump_stats(os.path.join(self.profile_dir, filename))
+                self._rotate()
+        except OSError as e:
+            logger.warning("Profil de %s %s non enregistré dans %s: %s", method, route, self.profile_dir, e)
+
+    def _rotate(self):
+        """Supprime les profils les plus anciens au-delà de la limite"""
+        # Les noms commencent par l'horodatage: l'ordre alphabétique est chronologique
+        files = sorted(glob.glob(os.path.join(self.profile_dir, '*.pstats')))
+        for path in files[:max(0, len(files) - self.keep)]:
+            try:
+                os.remove(path)
+            except OSError:
+                pass
+
+
+def summarize_profiles(profile_dir: str, top: int = 20, sort: str = 'cumulative',
+                       route: str = None) -> str:
+    """
+    Agrège les profils capturés et retourne les fonctions les plus coûteuses.
+
+    Args:
+        profile_dir: Dossier contenant les fichiers .pstats
+        top: Nombre de fonctions à afficher
+        sort: Clé de tri pstats ('cumulative', 'tottime', 'ncalls'...)
+        route: Filtre optionnel sur la route (ex: '/api/compare')
+
+    Returns:
+        Rapport texte
+    """
+    files = sorted(glob.glob(os.path.join(profile_dir, '*.pstats')))
+
+    if route:
+        slug = route_slug(route)
+        files = [f for f in files if profile_route_slug(f) == slug]
+
+    if not files:
+        return f"Aucun profil trouvé dans {profile_dir}"
+
+    output = io.StringIO()
+    stats = pstats.Stats(files[0], stream=output)
+    for path in files[1:]:
+        stats.add(path)
+
+    output.write(f"{len(files)} profil(s) agrégé(s) depuis {profile_dir}\n")
+    stats.strip_dirs().sort_stats(sort).print_stats(top)
+    return output.getvalue()
+
+
+def main(argv=None):
+    """Commande de résumé des profils"""
+    parser = argparse.ArgumentParser(
+        description="Résume les profils .pstats capturés par le serveur"
+    )
+    parser.add_argument('profile_dir', nargs='?',
+                        default=os.environ.get('SHIFT_PROFILE_DIR', 'profiles'))
+    parser.add_argument('--top', type=int, default=20)
+    parser.add_argument('--sort', default='cumulative')
+    parser.add_argument('--route', default=None)
+    args = parser.parse_args(argv)
+
+    print(summarize_profiles(args.profile_dir, top=args.top, sort=args.sort,
+                             route=args.route))
+
+
+if __name__ == "__main__":
+    sys.exit(main())
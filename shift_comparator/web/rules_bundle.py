@@ -0,0 +1,47 @@
+"""
+Règles de majoration en vigueur et objets construits pour elles.
+
+Un RulesBundle réunit les règles, le calculateur, le comparateur et le
+validateur de plannings qui en dépendent. Il est immuable: un changement de
+règles en construit un nouveau, publié par une seule affectation. Un
+gestionnaire de requête lit le bundle une fois et n'utilise que lui: il ne
+peut pas associer le calculateur des nouvelles règles au validateur des
+anciennes.
+"""
+from typing import NamedTuple
+
+from ..core import (ShiftCalculator, ScenarioComparator, ScheduleValidator, PremiumProfileTable,
+                    PremiumRules)
+
+
+class RulesBundle(NamedTuple):
+    """Règles et calculateur, comparateur et validateur construits pour elles"""
+
+    rules: PremiumRules
+    calculator: ShiftCalculator
+    comparator: ScenarioComparator
+    validator: ScheduleValidator
+
+    @classmethod
+    def build(cls, weekly_overtime: bool = None, rules: PremiumRules = None,
+              profile_table: bool = False) -> 'RulesBundle':
+        """
+        Construit un bundle complet.
+
+        Args:
+            weekly_overtime: Heures supplémentaires hebdomadaires incluses dans les totaux
+            rules: PremiumRules (règles intégrées si None)
+            profile_table: Précalculer une table de profils (PremiumProfileTable.from_env)
+
+        Returns:
+            RulesBundle
+        """
+        calculator = ShiftCalculator(weekly_overtime, rules=rules)
+        if profile_table:
+            calculator.profile_table = PremiumProfileTable.from_env(calculator)
+        return cls(calculator.rules, calculator, ScenarioComparator(calculator),
+                   ScheduleValidator(rules=calculator.rules))
+
+    def with_rules(self, rules: PremiumRules) -> 'RulesBundle':
+        """Nouveau bundle pour d'autres règles, avec les mêmes réglages (heures sup., table de profils)"""
+        return self.build(self.calculator.weekly_overtime, rules, self.calculator.profile_table is not None)
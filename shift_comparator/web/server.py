@@ -4,24 +4,60 @@ Utilise uniquement la bibliothèque standard Python (pas de dépendance externe)
 """
 import json
 import os
+import threading
+import time
 from http.server import HTTPServer, BaseHTTPRequestHandler
 from urllib.parse import parse_qs, urlparse
-from datetime import datetime
 
-from ..models import ShiftType, WorkDay, Scenario
-from ..core import ShiftCalculator, ScenarioComparator
+from ..core import PremiumProfileTable, SingleFlight, SingleFlightTimeout, RulesFile, RulesValidationError
+from ..core.singleflight import scenario_key
 from ..utils import ResultFormatter
+from .jobs import JobManager, JobRejected, QueueFull, build_job
+from .rules_bundle import RulesBundle
+from .store import (ScenarioStore, parse_listing_query, parse_range_query, parse_scenario_ids,
+                    parse_scenario_request)
 
 
 class ShiftComparatorHandler(BaseHTTPRequestHandler):
     """Gestionnaire de requêtes HTTP pour l'API"""
 
-    calculator = ShiftCalculator()
-    comparator = ScenarioComparator(calculator)
-    scenarios = []  # Liste des scénarios sauvegardés
+    # Heures supplémentaires hebdomadaires incluses dans les totaux (SHIFT_WEEKLY_OVERTIME=0 pour les exclure)
+    # Règles, calculateur, comparateur et validateur: remplacés ensemble, lus une fois par requête
+    bundle = RulesBundle.build(os.environ.get('SHIFT_WEEKLY_OVERTIME', '1') not in ('0', 'false', 'no'))
+    store = ScenarioStore(bundle.calculator)  # Scénarios sauvegardés et leurs totaux
+    jobs = JobManager.from_env()  # Travaux longs (POST /api/jobs)
+    flights = SingleFlight(float(os.environ.get('SHIFT_FLIGHT_TIMEOUT', 30)))
+    rules_file = RulesFile.from_env()  # Règles de majoration (SHIFT_RULES_FILE), rechargées à chaud
+    _rules_lock = threading.Lock()
+
+    @classmethod
+    def install_rules(cls, rules):
+        """
+        Remplace les règles de majoration d'un bloc.
+
+        Un nouveau bundle est préparé (table de profils comprise) puis publié
+        par une seule affectation; les scénarios sauvegardés sont ensuite
+        recalculés. Aucun état global n'est modifié.
+
+        Args:
+            rules: PremiumRules validées
+        """
+        with cls._rules_lock:
+            bundle = cls.bundle.with_rules(rules)
+            cls.bundle = bundle
+            cls.store.rebase(bundle.calculator)
+
+    def poll_rules(self):
+        """Installe les règles du fichier s'il a changé, dans un thread à part (la requête n'attend pas)"""
+        if self.rules_file is not None:
+            rules = self.rules_file.poll(time.monotonic())
+            if rules is not None:
+                threading.Thread(target=self.install_rules, args=(rules,), name='shift-rules-install',
+                                 daemon=True).start()
 
     def do_GET(self):
         """Gère les requêtes GET"""
+        self.poll_rules()
         parsed_path = urlparse(self.path)
 
         # Page principale
@@ -38,23 +74,40 @@ class ShiftComparatorHandler(BaseHTTPRequestHandler):
 
         # API: Liste des scénarios
         elif parsed_path.path == '/api/scenarios':
+            self.handle_list_scenarios(parsed_path.query)
+
+        # API: Totaux d'un scénario sauvegardé sur une plage de dates
+        elif parsed_path.path == '/api/range':
+            self.handle_range(parsed_path.query)
+
+        # API: Compteurs des calculs partagés et de la file des travaux
+        elif parsed_path.path == '/api/stats':
             self.send_json_response({
-                'scenarios': [
-                    {
-                        'id': i,
-                        'name': s.name,
-                        'days': len(s.work_days),
-                        'hourly_rate': s.hourly_rate
-                    }
-                    for i, s in enumerate(self.scenarios)
-                ]
+                'singleflight': self.flights.stats(),
+                'jobs': {'queued': self.jobs.queued()}
             })
 
+        # API: Règles de majoration en vigueur
+        elif parsed_path.path == '/api/rules':
+            rules = self.bundle.rules
+            self.send_json_response({
+                'version': rules.version,
+                'fingerprint': rules.fingerprint,
+                'file': self.rules_file.path if self.rules_file else None,
+                'error': self.rules_file.error if self.rules_file else None,
+                'rules': rules.to_dict()
+            })
+
+        # API: Avancement d'un travail
+        elif parsed_path.path.startswith('/api/jobs/'):
+            self.handle_get_job(parsed_path.path[len('/api/jobs/'):])
+
         else:
             self.send_error(404, "File not found")
 
     def do_POST(self):
         """Gère les requêtes POST"""
+        self.poll_rules()
         parsed_path = urlparse(self.path)
         content_length = int(self.headers.get('Content-Length', 0))
         body = self.rfile.read(content_length).decode('utf-8')
@@ -81,30 +134,71 @@ class ShiftComparatorHandler(BaseHTTPRequestHandler):
         elif parsed_path.path == '/api/delete':
             self.handle_delete(data)
 
+        # API: Soumettre un travail long
+        elif parsed_path.path == '/api/jobs':
+            self.handle_submit_job(data)
+
+        # API: Recharger le fichier de règles
+        elif parsed_path.path == '/api/rules/reload':
+            self.handle_reload_rules()
+
         else:
             self.send_error(404, "Endpoint not found")
 
+    def handle_list_scenarios(self, query_string):
+        """Page de scénarios sauvegardés (filtres, tri et curseur dans la chaîne de requête)"""
+        try:
+            entries, next_cursor = self.store.query(**parse_listing_query(query_string))
+        except ValueError as e:
+            self.send_json_response({'error': str(e)}, status=400)
+            return
+
+        self.send_json_response({
+            'scenarios': [entry.to_dict() for entry in entries],
+            'next_cursor': next_cursor,
+            'total': len(self.store)
+        })
+
+    def handle_range(self, query_string):
+        """Totaux d'un scénario sauvegardé entre deux dates (id, from, to dans la chaîne de requête)"""
+        try:
+            kwargs = parse_range_query(query_string)
+        except ValueError as e:
+            self.send_json_response({'error': str(e)}, status=400)
+            return
+
+        totals = self.store.range_totals(**kwargs)
+        if totals is None:
+            self.send_json_response({'error': 'Scénario inconnu ou vide'}, status=404)
+            return
+
+        self.send_json_response({
+            'id': kwargs['scenario_id'],
+            'from': kwargs['date_from'].strftime('%Y-%m-%d') if 'date_from' in kwargs else None,
+            'to': kwargs['date_to'].strftime('%Y-%m-%d') if 'date_to' in kwargs else None,
+            'totals': totals
+        })
+
     def handle_calculate(self, data):
         """Calcule un scénario"""
         try:
-            name = data.get('name', 'Scénario')
-            hourly_rate = float(data.get('hourly_rate', 20.0))
-            shifts = data.get('shifts', [])
-
-            if not shifts:
-                self.send_json_response({'error': 'Aucun shift fourni'}, status=400)
+            weekly_overtime = data.get('weekly_overtime')  # None: réglage du serveur
+            if weekly_overtime is not None and not isinstance(weekly_overtime, bool):
+                self.send_json_response({'error': 'weekly_overtime: booléen attendu'}, status=400)
                 return
 
-            # Créer les WorkDay
-            work_days = []
-            for shift in shifts:
-                date = datetime.strptime(shift['date'], '%Y-%m-%d')
-                shift_type = ShiftType[shift['type']]
-                work_days.append(WorkDay(date, shift_type))
+            bundle = self.bundle
+            scenario, violations, error = parse_scenario_request(data, bundle.validator)
+            if error is not None:
+                self.send_json_response(error, status=400)
+                return
 
-            # Créer et calculer le scénario
-            scenario = Scenario(name, work_days, hourly_rate)
-            result = self.calculator.calculate_scenario(scenario)
+            # Requêtes identiques simultanées: un seul calcul partagé (avec les mêmes règles)
+            calculator = bundle.calculator
+            if weekly_overtime is None:
+                weekly_overtime = calculator.weekly_overtime
+            result = self.flights.do(('calculate', weekly_overtime, scenario_key(scenario, calculator.rules)),
+                                     lambda: calculator.calculate_scenario(scenario, weekly_overtime=weekly_overtime))
 
             # Formater pour JSON
             response = {
@@ -117,8 +211,13 @@ class ShiftComparatorHandler(BaseHTTPRequestHandler):
                     'normal': result.total_breakdown.normal_hours,
                     'night': result.total_breakdown.night_hours,
                     'sunday': result.total_breakdown.sunday_hours,
-                    'night_sunday': result.total_breakdown.night_sunday_hours
+                    'night_sunday': result.total_breakdown.night_sunday_hours,
+                    'overtime_25': result.total_breakdown.overtime_25_hours,
+                    'overtime_50': result.total_breakdown.overtime_50_hours
                 },
+                'total_overtime_pay': result.total_overtime_pay,
+                'weekly_overtime': weekly_overtime,
+                'rules_version': calculator.rules.version,
                 'days': [
                     {
                         'date': dr.work_day.date.strftime('%Y-%m-%d'),
@@ -129,40 +228,45 @@ class ShiftComparatorHandler(BaseHTTPRequestHandler):
                         'bonus': dr.bonus_pay
                     }
                     for dr in result.day_results
-                ]
+                ],
+                'runs': [
+                    {
+                        'start': rr.run.start.strftime('%Y-%m-%d'),
+                        'end': rr.run.end.strftime('%Y-%m-%d'),
+                        'shift_type': rr.run.shift_type.value,
+                        'length': rr.run.length,
+                        'hours': rr.breakdown.get_total_hours(),
+                        'pay': rr.total_pay,
+                        'bonus': rr.bonus_pay
+                    }
+                    for rr in result.run_results
+                ],
+                'violations': violations
             }
 
             self.send_json_response(response)
 
+        except SingleFlightTimeout as e:
+            self.send_json_response({'error': str(e)}, status=503, headers={'Retry-After': '5'})
         except Exception as e:
             self.send_json_response({'error': str(e)}, status=500)
 
     def handle_save(self, data):
         """Sauvegarde un scénario"""
         try:
-            name = data.get('name', 'Scénario')
-            hourly_rate = float(data.get('hourly_rate', 20.0))
-            shifts = data.get('shifts', [])
-
-            if not shifts:
-                self.send_json_response({'error': 'Aucun shift fourni'}, status=400)
+            scenario, violations, error = parse_scenario_request(data, self.bundle.validator)
+            if error is not None:
+                self.send_json_response(error, status=400)
                 return
 
-            # Créer les WorkDay
-            work_days = []
-            for shift in shifts:
-                date = datetime.strptime(shift['date'], '%Y-%m-%d')
-                shift_type = ShiftType[shift['type']]
-                work_days.append(WorkDay(date, shift_type))
-
-            # Créer et sauvegarder le scénario
-            scenario = Scenario(name, work_days, hourly_rate)
-            self.scenarios.append(scenario)
+            # Calculé une seule fois ici: les comparaisons réutilisent ses totaux
+            entry = self.store.add(scenario)
 
             self.send_json_response({
                 'success': True,
-                'message': f"Scénario '{name}' sauvegardé",
-                'id': len(self.scenarios) - 1
+                'message': f"Scénario '{scenario.name}' sauvegardé",
+                'id': entry.id,
+                'violations': violations
             })
 
         except Exception as e:
@@ -171,8 +275,12 @@ class ShiftComparatorHandler(BaseHTTPRequestHandler):
     def handle_compare(self, data):
         """Compare des scénarios"""
         try:
-            scenario_ids = data.get('scenario_ids', [])
+            scenario_ids = parse_scenario_ids(data)
+        except ValueError as e:
+            self.send_json_response({'error': str(e)}, status=400)
+            return
 
+        try:
             if len(scenario_ids) < 2:
                 self.send_json_response(
                     {'error': 'Au moins 2 scénarios sont nécessaires'},
@@ -180,15 +288,15 @@ class ShiftComparatorHandler(BaseHTTPRequestHandler):
                 )
                 return
 
-            # Récupérer les scénarios
-            scenarios = [self.scenarios[i] for i in scenario_ids if i < len(self.scenarios)]
+            # Récupérer les scénarios (identifiants stables)
+            store_ids = {i for i in scenario_ids if self.store.get(i) is not None}
 
-            if len(scenarios) < 2:
+            if len(store_ids) < 2:
                 self.send_json_response({'error': 'Scénarios invalides'}, status=400)
                 return
 
-            # Comparer
-            comparison = self.comparator.compare_scenarios(scenarios)
+            # Comparer à partir des totaux calculés à la sauvegarde
+            comparison = self.store.compare(store_ids)
 
             # Formater pour JSON
             response = {
@@ -209,7 +317,8 @@ class ShiftComparatorHandler(BaseHTTPRequestHandler):
                         'percentage': comparison.get_percentage_from_best(result)
                     }
                     for rank, result in comparison.get_ranking()
-                ]
+                ],
+                'weekly_overtime': self.store.calculator.weekly_overtime
             }
 
             self.send_json_response(response)
@@ -220,11 +329,14 @@ class ShiftComparatorHandler(BaseHTTPRequestHandler):
     def handle_delete(self, data):
         """Supprime des scénarios"""
         try:
-            scenario_ids = sorted(data.get('scenario_ids', []), reverse=True)
+            scenario_ids = parse_scenario_ids(data)
+        except ValueError as e:
+            self.send_json_response({'error': str(e)}, status=400)
+            return
 
-            for i in scenario_ids:
-                if 0 <= i < len(self.scenarios):
-                    del self.scenarios[i]
+        try:
+            for scenario_id in scenario_ids:
+                self.store.remove(scenario_id)
 
             self.send_json_response({
                 'success': True,
@@ -234,6 +346,52 @@ class ShiftComparatorHandler(BaseHTTPRequestHandler):
         except Exception as e:
             self.send_json_response({'error': str(e)}, status=500)
 
+    def handle_submit_job(self, data):
+        """Place une comparaison ou une paie par lots dans la file des travaux"""
+        try:
+            bundle = self.bundle
+            kind, func = build_job(data, bundle.calculator, self.store, bundle.validator)
+        except JobRejected as e:
+            self.send_json_response(e.body, status=400)
+            return
+        except (ValueError, KeyError, TypeError) as e:
+            self.send_json_response({'error': str(e)}, status=400)
+            return
+
+        try:
+            job = self.jobs.submit(kind, func)
+        except QueueFull as e:
+            self.send_json_response({'error': str(e)}, status=503, headers={'Retry-After': '5'})
+            return
+
+        self.send_json_response({
+            'id': job.id,
+            'status': job.status,
+            'poll': f"/api/jobs/{job.id}"
+        }, status=202)
+
+    def handle_reload_rules(self):
+        """Recharge le fichier de règles sans attendre la vérification périodique"""
+        if self.rules_file is None:
+            self.send_json_response({'error': 'Aucun fichier de règles (SHIFT_RULES_FILE)'}, status=400)
+            return
+        try:
+            rules = self.rules_file.load()
+        except (OSError, RulesValidationError) as e:
+            # Fichier refusé: les règles en cours restent en place
+            self.send_json_response({'error': str(e), 'version': self.bundle.rules.version}, status=400)
+            return
+        self.install_rules(rules)
+        self.send_json_response({'version': rules.version, 'fingerprint': rules.fingerprint})
+
+    def handle_get_job(self, job_id):
+        """Avancement, résultats partiels et résultat final d'un travail"""
+        job = self.jobs.get(job_id)
+        if job is None:
+            self.send_json_response({'error': 'Travail inconnu ou expiré'}, status=404)
+            return
+        self.send_json_response(job.to_dict())
+
     def serve_file(self, filename, content_type):
         """Sert un fichier statique"""
         web_dir = os.path.dirname(os.path.abspath(__file__))
@@ -250,12 +408,14 @@ class ShiftComparatorHandler(BaseHTTPRequestHandler):
         except FileNotFoundError:
             self.send_error(404, f"File not found: {filename}")
 
-    def send_json_response(self, data, status=200):
+    def send_json_response(self, data, status=200, headers=None):
         """Envoie une réponse JSON"""
         response = json.dumps(data, ensure_ascii=False, indent=2)
         self.send_response(status)
         self.send_header('Content-Type', 'application/json; charset=utf-8')
         self.send_header('Content-Length', len(response.encode('utf-8')))
+        for name, value in (headers or {}).items():
+            self.send_header(name, value)
         self.end_headers()
         self.wfile.write(response.encode('utf-8'))
 
@@ -266,6 +426,12 @@ class ShiftComparatorHandler(BaseHTTPRequestHandler):
 
 def run_server(port=8080, host='localhost'):
     """Lance le serveur web"""
+    handler = ShiftComparatorHandler
+    if handler.rules_file is not None:
+        handler.install_rules(handler.rules_file.load())
+    calculator = handler.bundle.calculator
+    calculator.profile_table = PremiumProfileTable.from_env(calculator)
+
     server = HTTPServer((host, port), ShiftComparatorHandler)
     print("=" * 80)
     print("COMPARATEUR DE REMPLACEMENTS 3x8 - Interface Web")
@@ -1,6 +1,7 @@
 // État de l'application
 let currentShifts = [];
 let scenarios = [];
+let nextCursor = null;  // Page suivante de la liste des scénarios
 
 // Initialisation
 document.addEventListener('DOMContentLoaded', () => {
@@ -176,16 +177,20 @@ async function saveScenario() {
 }
 
 // Charger les scénarios sauvegardés
-async function loadScenarios() {
+async function loadScenarios(more = false) {
     try {
-        const response = await fetch('/api/scenarios');
+        const url = more && nextCursor
+            ? '/api/scenarios?cursor=' + encodeURIComponent(nextCursor)
+            : '/api/scenarios';
+        const response = await fetch(url);
 
         if (!response.ok) {
             throw new Error('Erreur de chargement');
         }
 
         const data = await response.json();
-        scenarios = data.scenarios;
+        scenarios = more ? scenarios.concat(data.scenarios) : data.scenarios;
+        nextCursor = data.next_cursor;
         renderSavedScenarios();
 
     } catch (error) {
@@ -212,7 +217,9 @@ function renderSavedScenarios() {
                 </div>
             </div>
         </div>
-    `).join('');
+    `).join('') + (nextCursor
+        ? '<button class="btn btn-secondary" onclick="loadScenarios(true)">Charger plus</button>'
+        : '');
 }
 
 // Supprimer les scénarios sélectionnés
@@ -321,6 +328,12 @@ function displayResult(result) {
     if (breakdown.night_sunday > 0) {
         output += `Heures nuit+dim (+40%):  ${breakdown.night_sunday.toFixed(2)}h\n`;
     }
+    if (breakdown.overtime_25 > 0) {
+        output += `Dont heures sup. (+25%): ${breakdown.overtime_25.toFixed(2)}h\n`;
+    }
+    if (breakdown.overtime_50 > 0) {
+        output += `Dont heures sup. (+50%): ${breakdown.overtime_50.toFixed(2)}h\n`;
+    }
 
     output += `\nTotal heures travaillées: ${result.total_hours.toFixed(2)}h\n`;
     output += `Total majorations:        ${result.total_bonus.toFixed(2)}€\n`;
@@ -0,0 +1,573 @@
+"""
+Stockage des scénarios sauvegardés avec leurs totaux précalculés.
+
+Chaque scénario est calculé une seule fois, à la sauvegarde, et reçoit un
+identifiant stable (jamais réutilisé, inchangé par les suppressions). Un index
+trié par rémunération décroissante est tenu à jour à chaque ajout ou
+suppression (bisect). Une comparaison d'un sous-ensemble de k scénarios est
+répondue à partir des résultats conservés, sans recalcul: tri des k résultats
+en O(k log k), ou simple filtrage de l'index quand le sous-ensemble couvre une
+grande partie du stock.
+
+La liste paginée (query) s'appuie sur des index secondaires triés (nom, taux,
+rémunération, première date): le tri demandé choisit l'index parcouru, les
+bornes de filtre sur ce même champ et le curseur sont trouvés par bisect, et
+le parcours s'arrête dès que la page est pleine. date_to borne aussi l'index
+des premières dates (un scénario commence avant de finir). Quand un filtre sur
+un autre champ retient beaucoup moins de scénarios que le tri, ses candidats
+sont lus dans son propre index, filtrés puis triés: le parcours ne dépend plus
+de la taille du stock. Les autres filtres sont vérifiés scénario par scénario.
+
+Les totaux sur une plage de dates (range_totals) s'appuient sur un RangeIndex
+construit à la première question sur un scénario, puis réutilisé.
+
+Quand les règles de majoration changent (rechargement), rebase recalcule
+tous les scénarios avec le nouveau calculateur, sans bloquer les lectures
+pendant le calcul, puis reconstruit les index.
+"""
+import base64
+import json
+import threading
+from bisect import bisect_left, bisect_right, insort
+from datetime import datetime
+from math import inf, log2
+from typing import Dict, Iterable, Iterator, List, Optional, Tuple
+from urllib.parse import parse_qs
+
+from ..models import ShiftType, Scenario, ShiftRun, RunScenario, compress_runs, merge_runs, intern_work_day
+from ..core import ScenarioResult, ComparisonResult, RangeIndex
+
+
+# Tris disponibles pour la liste (chacun a son index)
+SORT_FIELDS = ('id', 'name', 'rate', 'pay', 'start')
+
+DEFAULT_PAGE_SIZE = 100
+MAX_PAGE_SIZE = 1000
+
+
+class StoredScenario:
+    """Scénario sauvegardé et son résultat"""
+
+    __slots__ = ('id', 'scenario', 'result', 'first_ordinal', 'last_ordinal', 'range_index')
+
+    def __init__(self, scenario_id: int, scenario: Scenario, result: ScenarioResult):
+        """
+        Args:
+            scenario_id: Identifiant stable (croissant, jamais réutilisé)
+            scenario: Scénario sauvegardé
+            result: Résultat calculé à la sauvegarde
+        """
+        self.id = scenario_id
+        self.scenario = scenario
+        self.result = result
+        if isinstance(scenario, RunScenario):
+            # Scénario en séquences: bornes lues sans développer les jours
+            ordinals = ([run.start.toordinal() for run in scenario.runs] +
+                        [run.end.toordinal() for run in scenario.runs])
+        else:
+            ordinals = [wd.date.toordinal() for wd in scenario.work_days]
+        self.first_ordinal = min(ordinals, default=0)
+        self.last_ordinal = max(ordinals, default=0)
+        self.range_index: Optional[RangeIndex] = None  # Construit à la première question
+
+    @property
+    def rank_key(self) -> Tuple[float, int]:
+        """Clé du classement: rémunération décroissante, puis ordre de sauvegarde"""
+        return -self.result.total_pay, self.id
+
+    def index_values(self) -> Dict[str, object]:
+        """Valeur de tri de chaque index secondaire"""
+        return {
+            'id': self.id,
+            'name': self.scenario.name.casefold(),
+            'rate': float(self.scenario.hourly_rate),
+            'pay': self.result.total_pay,
+            'start': self.first_ordinal,
+        }
+
+    def to_dict(self) -> Dict:
+        """Sérialise le scénario pour la liste de l'API"""
+        scenario = self.scenario
+        return {
+            'id': self.id,
+            'name': scenario.name,
+            'days': scenario.day_count if isinstance(scenario, RunScenario) else len(scenario.work_days),
+            'hourly_rate': scenario.hourly_rate,
+            'total_pay': self.result.total_pay,
+            'total_hours': self.result.get_total_hours(),
+            'start_date': datetime.fromordinal(self.first_ordinal).strftime('%Y-%m-%d')
+            if self.first_ordinal else None,
+            'end_date': datetime.fromordinal(self.last_ordinal).strftime('%Y-%m-%d')
+            if self.last_ordinal else None,
+        }
+
+
+# Champ de tri -> types acceptés pour la valeur d'un curseur
+_CURSOR_TYPES = {'id': (int,), 'name': (str,), 'rate': (int, float), 'pay': (int, float), 'start': (int,)}
+
+
+def encode_cursor(sort: str, value, scenario_id: int) -> str:
+    """Curseur opaque: position après (valeur de tri, identifiant) dans l'index d'un champ de tri"""
+    return base64.urlsafe_b64encode(json.dumps([sort, value, scenario_id]).encode('utf-8')).decode('ascii')
+
+
+def decode_cursor(cursor: str, sort: str) -> tuple:
+    """
+    Décode un curseur produit par encode_cursor.
+
+    Args:
+        cursor: Curseur reçu
+        sort: Champ de tri de la requête
+
+    Returns:
+        Tuple (valeur de tri, identifiant)
+
+    Raises:
+        ValueError: Si le curseur est invalide ou produit pour un autre tri
+    """
+    try:
+        field, value, scenario_id = json.loads(base64.urlsafe_b64decode(cursor.encode('ascii')))
+    except (ValueError, TypeError):
+        raise ValueError(f"Curseur invalide: {cursor}")
+    if field != sort:
+        raise ValueError(f"Curseur d'un autre tri ({field!r}, attendu {sort!r})")
+    if (isinstance(value, bool) or not isinstance(value, _CURSOR_TYPES[sort])
+            or isinstance(scenario_id, bool) or not isinstance(scenario_id, int)):
+        raise ValueError(f"Curseur invalide: {cursor}")
+    return value, scenario_id
+
+
+class ScenarioStore:
+    """Scénarios sauvegardés, totaux, classement et index tenus à jour incrémentalement"""
+
+    def __init__(self, calculator):
+        """
+        Args:
+            calculator: ShiftCalculator utilisé à la sauvegarde
+        """
+        self.calculator = calculator
+        self._entries: Dict[int, StoredScenario] = {}  # Ordre de sauvegarde
+        self._ranked: List[Tuple[float, int]] = []  # Clés rank_key triées
+        # Champ -> liste triée de (valeur, identifiant)
+        self._indexes: Dict[str, List[tuple]] = {field: [] for field in SORT_FIELDS}
+        self._next_id = 0
+        self._lock = threading.Lock()
+
+    def add(self, scenario: Scenario) -> StoredScenario:
+        """
+        Calcule et sauvegarde un scénario.
+
+        Args:
+            scenario: Scénario à sauvegarder
+
+        Returns:
+            StoredScenario créé
+        """
+        calculator = self.calculator
+        result = calculator.calculate_scenario(scenario)
+        with self._lock:
+            if calculator is not self.calculator:
+                # Règles changées pendant le calcul: recalculer avec les nouvelles
+                result = self.calculator.calculate_scenario(scenario)
+            entry = StoredScenario(self._next_id, scenario, result)
+            self._next_id += 1
+            self._entries[entry.id] = entry
+            insort(self._ranked, entry.rank_key)
+            for field, value in entry.index_values().items():
+                insort(self._indexes[field], (value, entry.id))
+        return entry
+
+    def rebase(self, calculator):
+        """
+        Recalcule tous les scénarios avec un autre calculateur (nouvelles règles).
+
+        Les identifiants sont conservés; classement et index sont reconstruits.
+        Le recalcul se fait hors du verrou: jusqu'à sa fin, les lectures voient
+        les anciens totaux, et les scénarios ajoutés entre-temps sont calculés
+        avec le nouveau calculateur.
+
+        Args:
+            calculator: ShiftCalculator à utiliser désormais
+        """
+        with self._lock:
+            self.calculator = calculator
+            entries = list(self._entries.values())
+        results = [calculator.calculate_scenario(entry.scenario) for entry in entries]
+        with self._lock:
+            if calculator is not self.calculator:
+                return  # Remplacé par un rebase plus récent
+            for entry, result in zip(entries, results):
+                entry.result = result
+                entry.range_index = None
+            self._ranked = sorted(entry.rank_key for entry in self._entries.values())
+            self._indexes = {field: [] for field in SORT_FIELDS}
+            for entry in self._entries.values():
+                for field, value in entry.index_values().items():
+                    self._indexes[field].append((value, entry.id))
+            for index in self._indexes.values():
+                index.sort()
+
+    def remove(self, scenario_id: int) -> bool:
+        """
+        Supprime un scénario.
+
+        Args:
+            scenario_id: Identifiant stable
+
+        Returns:
+            True si le scénario existait
+        """
+        with self._lock:
+            entry = self._entries.pop(scenario_id, None)
+            if entry is None:
+                return False
+            del self._ranked[bisect_left(self._ranked, entry.rank_key)]
+            for field, value in entry.index_values().items():
+                index = self._indexes[field]
+                del index[bisect_left(index, (value, entry.id))]
+        return True
+
+    def get(self, scenario_id: int) -> Optional[StoredScenario]:
+        """Retourne un scénario sauvegardé, ou None"""
+        return self._entries.get(scenario_id)
+
+    def scenario(self, scenario_id: int) -> Optional[Scenario]:
+        """Retourne le Scenario sauvegardé sous cet identifiant, ou None"""
+        entry = self._entries.get(scenario_id)
+        return entry.scenario if entry is not None else None
+
+    def ranking(self, scenario_ids: Iterable[int] = None) -> List[StoredScenario]:
+        """
+        Scénarios classés par rémunération décroissante.
+
+        Args:
+            scenario_ids: Sous-ensemble à classer (tous par défaut)
+
+        Returns:
+            Liste de StoredScenario, du meilleur au moins bon
+        """
+        with self._lock:
+            return self._ranking(scenario_ids)
+
+    def _ranking(self, scenario_ids: Optional[Iterable[int]]) -> List[StoredScenario]:
+        """Classement (verrou tenu par l'appelant)"""
+        entries = self._entries
+        if scenario_ids is None:
+            return [entries[i] for _, i in self._ranked]
+
+        selected = {i for i in scenario_ids if i in entries}
+        k = len(selected)
+        if k and k * log2(k + 1) > len(self._ranked):
+            # Grand sous-ensemble: parcourir l'index déjà trié
+            return [entries[i] for _, i in self._ranked if i in selected]
+        return sorted((entries[i] for i in selected), key=lambda entry: entry.rank_key)
+
+    def compare(self, scenario_ids: Iterable[int]) -> ComparisonResult:
+        """
+        Compare des scénarios sauvegardés sans les recalculer.
+
+        Args:
+            scenario_ids: Identifiants stables
+
+        Returns:
+            ComparisonResult (meilleur, classement, écarts, pourcentages)
+        """
+        with self._lock:  # Classement et résultats lus ensemble (rebase les remplace sous ce verrou)
+            results = [entry.result for entry in self._ranking(scenario_ids)]
+        return ComparisonResult(results)
+
+    def range_totals(self, scenario_id: int, date_from: datetime = None,
+                     date_to: datetime = None) -> Optional[Dict[str, float]]:
+        """
+        Totaux d'un scénario sauvegardé sur une plage de dates, en O(log n).
+
+        Args:
+            scenario_id: Identifiant stable
+            date_from: Premier jour (inclus, début du scénario par défaut)
+            date_to: Dernier jour (inclus, fin du scénario par défaut)
+
+        Returns:
+            Dictionnaire colonne -> total (voir range_index.COLUMNS), ou None si le
+            scénario n'existe pas
+        """
+        with self._lock:
+            entry = self._entries.get(scenario_id)
+            if entry is None:
+                return None
+            if entry.range_index is None:
+                if not entry.first_ordinal:
+                    return None
+                entry.range_index = RangeIndex.from_scenario(entry.scenario, self.calculator)
+            return entry.range_index.totals(date_from, date_to)
+
+    def query(self, sort: str = 'id', descending: bool = False, cursor: str = None,
+              limit: int = DEFAULT_PAGE_SIZE, name_prefix: str = None,
+              min_rate: float = None, max_rate: float = None,
+              date_from: datetime = None, date_to: datetime = None,
+              min_pay: float = None, max_pay: float = None) -> Tuple[List[StoredScenario], Optional[str]]:
+        """
+        Retourne une page de scénarios filtrés et triés.
+
+        Args:
+            sort: Champ de tri ('id', 'name', 'rate', 'pay', 'start')
+            descending: Tri décroissant
+            cursor: Curseur retourné par la page précédente
+            limit: Taille de la page
+            name_prefix: Début du nom (sans tenir compte de la casse)
+            min_rate, max_rate: Bornes du taux horaire (incluses)
+            date_from: Le scénario commence ce jour ou après
+            date_to: Le scénario se termine ce jour ou avant
+            min_pay, max_pay: Bornes de la rémunération totale (incluses)
+
+        Returns:
+            Tuple (scénarios de la page, curseur de la page suivante ou None)
+
+        Raises:
+            ValueError: Si le tri ou le curseur est invalide
+        """
+        if sort not in SORT_FIELDS:
+            raise ValueError(f"Tri inconnu: {sort} (possibles: {', '.join(SORT_FIELDS)})")
+        limit = max(1, min(limit, MAX_PAGE_SIZE))
+
+        prefix = name_prefix.casefold() if name_prefix else None
+        first_ordinal = date_from.toordinal() if date_from else None
+        last_ordinal = date_to.toordinal() if date_to else None
+
+        # Bornes de chaque index selon les filtres (une date de début précède la date de fin)
+        bounds = {
+            'name': (prefix, prefix + '\U0010ffff' if prefix else None),
+            'rate': (min_rate, max_rate),
+            'pay': (min_pay, max_pay),
+            'start': (first_ordinal, last_ordinal),
+        }
+
+        def matches(entry: StoredScenario) -> bool:
+            if prefix and not entry.scenario.name.casefold().startswith(prefix):
+                return False
+            rate = entry.scenario.hourly_rate
+            if (min_rate is not None and rate < min_rate) or (max_rate is not None and rate > max_rate):
+                return False
+            pay = entry.result.total_pay
+            if (min_pay is not None and pay < min_pay) or (max_pay is not None and pay > max_pay):
+                return False
+            if first_ordinal is not None and entry.first_ordinal < first_ordinal:
+                return False
+            if last_ordinal is not None and entry.last_ordinal > last_ordinal:
+                return False
+            return True
+
+        def span(field: str) -> Tuple[int, int]:
+            """Positions de l'index d'un champ retenues par ses bornes"""
+            index = self._indexes[field]
+            lo, hi = 0, len(index)
+            low_value, high_value = bounds.get(field, (None, None))
+            if low_value is not None:
+                lo = bisect_left(index, (low_value,))
+            if high_value is not None:
+                hi = bisect_right(index, (high_value, inf))
+            return lo, max(lo, hi)
+
+        position = decode_cursor(cursor, sort) if cursor else None
+
+        with self._lock:
+            index = self._indexes[sort]
+            lo, hi = span(sort)
+
+            # Filtre d'un autre champ bien plus sélectif que le tri: lire ses candidats puis les trier
+            spans = {field: span(field) for field, (low, high) in bounds.items()
+                     if field != sort and (low is not None or high is not None)}
+            if spans:
+                field, (field_lo, field_hi) = min(spans.items(), key=lambda item: item[1][1] - item[1][0])
+                k = field_hi - field_lo
+                if k * log2(k + 2) < hi - lo:
+                    return self._query_candidates(self._indexes[field][field_lo:field_hi], sort, descending,
+                                                  position, limit, matches)
+
+            if position is not None:
+                if descending:
+                    hi = min(hi, bisect_left(index, position))
+                else:
+                    lo = max(lo, bisect_right(index, position))
+
+            positions = range(hi - 1, lo - 1, -1) if descending else range(lo, hi)
+            page = []
+            last_position = None
+            for i in positions:
+                entry = self._entries[index[i][1]]
+                if matches(entry):
+                    page.append(entry)
+                    if len(page) == limit:
+                        last_position = i
+                        break
+
+            next_cursor = None
+            if last_position is not None and last_position != positions[-1]:
+                next_cursor = encode_cursor(sort, *index[last_position])
+
+        return page, next_cursor
+
+    def _query_candidates(self, candidates: List[tuple], sort: str, descending: bool, position: Optional[tuple],
+                          limit: int, matches) -> Tuple[List[StoredScenario], Optional[str]]:
+        """
+        Page de query() à partir des candidats d'un index plus sélectif que celui du tri.
+
+        Args:
+            candidates: Tranche (valeur, identifiant) de l'index du filtre
+            sort: Champ de tri
+            descending: Tri décroissant
+            position: (valeur de tri, identifiant) du curseur, ou None
+            limit: Taille de la page
+            matches: Vérification de tous les filtres
+
+        Returns:
+            Tuple (scénarios de la page, curseur de la page suivante ou None)
+        """
+        keyed = []
+        for _, scenario_id in candidates:
+            entry = self._entries[scenario_id]
+            if matches(entry):
+                key = (entry.index_values()[sort], scenario_id)
+                if position is None or (key < position if descending else key > position):
+                    keyed.append((key, entry))
+        keyed.sort(key=lambda item: item[0], reverse=descending)
+
+        page = [entry for _, entry in keyed[:limit]]
+        next_cursor = encode_cursor(sort, *keyed[limit - 1][0]) if len(keyed) > limit else None
+        return page, next_cursor
+
+    def __len__(self):
+        return len(self._entries)
+
+    def __iter__(self) -> Iterator[StoredScenario]:
+        """Scénarios sauvegardés dans l'ordre de sauvegarde"""
+        return iter(list(self._entries.values()))
+
+
+def parse_scenario_request(data: Dict, validator) -> Tuple[Optional[object], List[Dict], Optional[Dict]]:
+    """
+    Construit le scénario d'un corps POST /api/calculate ou /api/save et vérifie ses repos.
+
+    Champs: name, hourly_rate, shifts [{date, type}], runs [{start, type, length}]
+    et strict (planning refusé s'il enfreint les repos). Avec des séquences, le
+    scénario est un RunScenario tarifé sans développer les jours.
+
+    Args:
+        data: Corps JSON de la requête
+        validator: ScheduleValidator
+
+    Returns:
+        Tuple (scénario, violations sérialisées, erreur); erreur est le corps
+        d'une réponse 400 (aucun shift, planning refusé en mode strict), None sinon
+
+    Raises:
+        KeyError, ValueError: Si le corps, un shift ou une séquence est mal formé
+    """
+    if not isinstance(data, dict):
+        raise ValueError('Scénario: objet JSON attendu')
+    name = data.get('name', 'Scénario')
+    hourly_rate = float(data.get('hourly_rate', 20.0))
+    shifts = data.get('shifts', [])
+    runs = data.get('runs', [])  # Séquences {start, type, length}
+    for field, items in (('shifts', shifts), ('runs', runs)):
+        if not isinstance(items, list) or not all(isinstance(item, dict) for item in items):
+            raise ValueError(f"{field}: liste d'objets attendue")
+
+    if not shifts and not runs:
+        return None, [], {'error': 'Aucun shift fourni'}
+
+    # Créer les WorkDay (instances partagées entre requêtes)
+    work_days = [intern_work_day(datetime.strptime(shift['date'], '%Y-%m-%d'), ShiftType[shift['type']])
+                 for shift in shifts]
+
+    if runs:
+        scenario = RunScenario(name, merge_runs(
+            [ShiftRun(datetime.strptime(run['start'], '%Y-%m-%d'), ShiftType[run['type']],
+                      int(run.get('length', 1))) for run in runs] + compress_runs(work_days)
+        ), hourly_rate)
+    else:
+        scenario = Scenario(name, work_days, hourly_rate)
+
+    # Vérifier les repos (refus en mode strict)
+    violations = [v.to_dict() for v in validator.validate(scenario)]
+    if violations and data.get('strict'):
+        return scenario, violations, {'error': 'Planning invalide', 'violations': violations}
+    return scenario, violations, None
+
+
+def parse_scenario_ids(data) -> List[int]:
+    """
+    Identifiants de scénarios sauvegardés d'un corps POST /api/compare ou /api/delete.
+
+    Args:
+        data: Corps JSON décodé
+
+    Returns:
+        Liste d'identifiants ('scenario_ids', vide par défaut)
+
+    Raises:
+        ValueError: Si le corps n'est pas un objet ou si un identifiant n'est pas un entier
+    """
+    if not isinstance(data, dict):
+        raise ValueError('Corps JSON: objet attendu')
+    scenario_ids = data.get('scenario_ids', [])
+    if not isinstance(scenario_ids, list) or not all(type(i) is int for i in scenario_ids):
+        raise ValueError("scenario_ids: liste d'entiers attendue")
+    return scenario_ids
+
+
+def parse_listing_query(query_string: str) -> Dict:
+    """
+    Convertit la chaîne de requête de GET /api/scenarios en arguments de query().
+
+    Paramètres: limit, cursor, sort, order (asc/desc), name, min_rate, max_rate,
+    date_from, date_to (AAAA-MM-JJ), min_pay, max_pay.
+
+    Args:
+        query_string: Chaîne de requête (sans '?')
+
+    Returns:
+        Dictionnaire d'arguments pour ScenarioStore.query
+
+    Raises:
+        ValueError: Si un paramètre est invalide
+    """
+    params = {key: values[-1] for key, values in parse_qs(query_string).items()}
+    kwargs = {
+        'sort': params.get('sort', 'id'),
+        'descending': params.get('order', 'asc') == 'desc',
+        'cursor': params.get('cursor') or None,
+        'limit': int(params.get('limit', DEFAULT_PAGE_SIZE)),
+        'name_prefix': params.get('name') or None,
+    }
+    for key in ('min_rate', 'max_rate', 'min_pay', 'max_pay'):
+        if params.get(key):
+            kwargs[key] = float(params[key])
+    for key in ('date_from', 'date_to'):
+        if params.get(key):
+            kwargs[key] = datetime.strptime(params[key], '%Y-%m-%d')
+    return kwargs
+
+
+def parse_range_query(query_string: str) -> Dict:
+    """
+    Convertit la chaîne de requête de GET /api/range en arguments de range_totals().
+
+    Paramètres: id (obligatoire), from, to (AAAA-MM-JJ, inclus).
+
+    Args:
+        query_string: Chaîne de requête (sans '?')
+
+    Returns:
+        Dictionnaire d'arguments pour ScenarioStore.range_totals
+
+    Raises:
+        ValueError: Si un paramètre est absent ou invalide
+    """
+    params = {key: values[-1] for key, values in parse_qs(query_string).items()}
+    if not params.get('id'):
+        raise ValueError("Paramètre id manquant")
+    kwargs = {'scenario_id': int(params['id'])}
+    for key, argument in (('from', 'date_from'), ('to', 'date_to')):
+        if params.get(key):
+            kwargs[argument] = datetime.strptime(params[key], '%Y-%m-%d')
+    return kwargs
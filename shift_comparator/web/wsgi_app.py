@@ -2,31 +2,114 @@
 Application WSGI pour déploiement sur Render, Heroku, etc.
 Compatible avec Gunicorn.
 """
+import gc
 import json
 import os
+import threading
+import time
 from datetime import datetime
 from urllib.parse import parse_qs, urlparse
 
-from ..models import ShiftType, WorkDay, Scenario
-from ..core import ShiftCalculator, ScenarioComparator
+from ..models import ShiftType, WorkDay
+from ..core import PremiumProfileTable, SingleFlight, SingleFlightTimeout, RulesFile, RulesValidationError
+from ..core.singleflight import scenario_key
+from .jobs import JobManager, JobRejected, QueueFull, build_job
+from .profiling import ProfilingMiddleware
+from .rules_bundle import RulesBundle
+from .store import (ScenarioStore, parse_listing_query, parse_range_query, parse_scenario_ids,
+                    parse_scenario_request)
 
 
 class WSGIApplication:
     """Application WSGI pour le comparateur de shifts"""
 
     def __init__(self):
-        self.calculator = ShiftCalculator()
-        self.comparator = ScenarioComparator(self.calculator)
-        self.scenarios = []
+        # Règles de majoration (SHIFT_RULES_FILE), rechargées à chaud quand le fichier change
+        self.rules_file = RulesFile.from_env()
+        rules = None
+        if self.rules_file is not None:
+            rules = self.rules_file.load()
+        self._rules_lock = threading.Lock()
+
+        # Heures supplémentaires hebdomadaires incluses dans les totaux (SHIFT_WEEKLY_OVERTIME=0 pour les exclure)
+        weekly_overtime = os.environ.get('SHIFT_WEEKLY_OVERTIME', '1') not in ('0', 'false', 'no')
+        # Règles, calculateur, comparateur et validateur: remplacés ensemble, lus une fois par requête
+        self.bundle = RulesBundle.build(weekly_overtime, rules)
+        self.store = ScenarioStore(self.bundle.calculator)  # Scénarios sauvegardés et leurs totaux
+        self.jobs = JobManager.from_env()  # Travaux longs (POST /api/jobs)
+        self.flights = SingleFlight(float(os.environ.get('SHIFT_FLIGHT_TIMEOUT', 30)))
 
         # Chemin vers les fichiers statiques
         self.static_dir = os.path.join(os.path.dirname(__file__), 'static')
+        self._static_cache = {}  # Contenu des fichiers statiques déjà lus
+
+    def warm_up(self):
+        """
+        Construit à l'avance les données partagées entre requêtes.
+
+        Appelé dans le processus maître de gunicorn (--preload) pour que les
+        workers héritent de ces données en copy-on-write au lieu de les
+        reconstruire chacun.
+        """
+        for filename in os.listdir(self.static_dir):
+            self._read_static(filename)
+
+        # Heures par (date, shift) précalculées: les calculs deviennent des lectures de table
+        calculator = self.bundle.calculator
+        if calculator.profile_table is None:
+            calculator.profile_table = PremiumProfileTable.from_env(calculator)
+
+        # Premier calcul: initialise les caches du calculateur et du formatage des dates
+        for shift_type in ShiftType:
+            calculator.calculate_work_day(WorkDay(datetime(2026, 1, 18), shift_type), 1.0)
+
+    def install_rules(self, rules):
+        """
+        Remplace les règles de majoration d'un bloc.
+
+        Un nouveau bundle est préparé (table de profils comprise) puis publié
+        par une seule affectation: une requête en cours termine avec celui
+        qu'elle a lu. Les scénarios sauvegardés sont ensuite recalculés.
+        Aucun état global n'est modifié.
+
+        Args:
+            rules: PremiumRules validées
+        """
+        with self._rules_lock:
+            bundle = self.bundle.with_rules(rules)
+            self.bundle = bundle
+            self.store.rebase(bundle.calculator)
+
+    def poll_rules(self):
+        """
+        Installe les règles du fichier s'il a changé, dans un thread à part.
+
+        La requête qui déclenche la vérification n'attend ni la construction
+        du nouveau bundle ni le recalcul des scénarios sauvegardés.
+        """
+        rules = self.rules_file.poll(time.monotonic())
+        if rules is not None:
+            threading.Thread(target=self.install_rules, args=(rules,), name='shift-rules-install',
+                             daemon=True).start()
+
+    def _read_static(self, filename):
+        """Lit un fichier statique une seule fois"""
+        content = self._static_cache.get(filename)
+        if content is None:
+            with open(os.path.join(self.static_dir, filename), 'rb') as f:
+                content = f.read()
+            self._static_cache[filename] = content
+        return content
 
     def __call__(self, environ, start_response):
         """Point d'entrée WSGI"""
         path = environ.get('PATH_INFO', '/')
         method = environ.get('REQUEST_METHOD', 'GET')
 
+        # Fichier de règles modifié: nouvelles règles installées en arrière-plan
+        if self.rules_file is not None:
+            self.poll_rules()
+
         # Router les requêtes
         if method == 'GET':
             if path == '/' or path == '/index.html':
@@ -37,6 +120,14 @@ class WSGIApplication:
                 return self.serve_file('app.js', start_response, 'application/javascript')
             elif path == '/api/scenarios':
                 return self.get_scenarios(environ, start_response)
+            elif path == '/api/range':
+                return self.get_range(environ, start_response)
+            elif path == '/api/stats':
+                return self.get_stats(start_response)
+            elif path == '/api/rules':
+                return self.get_rules(start_response)
+            elif path.startswith('/api/jobs/'):
+                return self.get_job(path[len('/api/jobs/'):], start_response)
             else:
                 return self.not_found(start_response)
 
@@ -49,6 +140,10 @@ class WSGIApplication:
                 return self.compare(environ, start_response)
             elif path == '/api/delete':
                 return self.delete(environ, start_response)
+            elif path == '/api/jobs':
+                return self.submit_job(environ, start_response)
+            elif path == '/api/rules/reload':
+                return self.reload_rules(start_response)
             else:
                 return self.not_found(start_response)
 
@@ -56,11 +151,8 @@ class WSGIApplication:
 
     def serve_file(self, filename, start_response, content_type='text/html'):
         """Sert un fichier statique"""
-        filepath = os.path.join(self.static_dir, filename)
-
         try:
-            with open(filepath, 'rb') as f:
-                content = f.read()
+            content = self._read_static(filename)
 
             start_response('200 OK', [
                 ('Content-Type', f'{content_type}; charset=utf-8'),
@@ -72,16 +164,35 @@ class WSGIApplication:
 
     def get_scenarios(self, environ, start_response):
         """GET /api/scenarios"""
+        try:
+            entries, next_cursor = self.store.query(**parse_listing_query(environ.get('QUERY_STRING', '')))
+        except ValueError as e:
+            return self.json_response({'error': str(e)}, start_response, '400 Bad Request')
+
+        response = {
+            'scenarios': [entry.to_dict() for entry in entries],
+            'next_cursor': next_cursor,
+            'total': len(self.store)
+        }
+        return self.json_response(response, start_response)
+
+    def get_range(self, environ, start_response):
+        """GET /api/range"""
+        try:
+            kwargs = parse_range_query(environ.get('QUERY_STRING', ''))
+        except ValueError as e:
+            return self.json_response({'error': str(e)}, start_response, '400 Bad Request')
+
+        totals = self.store.range_totals(**kwargs)
+        if totals is None:
+            return self.json_response({'error': 'Scénario inconnu ou vide'}, start_response,
+                                      '404 Not Found')
+
         response = {
-            'scenarios': [
-                {
-                    'id': i,
-                    'name': s.name,
-                    'days': len(s.work_days),
-                    'hourly_rate': s.hourly_rate
-                }
-                for i, s in enumerate(self.scenarios)
-            ]
+            'id': kwargs['scenario_id'],
+            'from': kwargs['date_from'].strftime('%Y-%m-%d') if 'date_from' in kwargs else None,
+            'to': kwargs['date_to'].strftime('%Y-%m-%d') if 'date_to' in kwargs else None,
+            'totals': totals
         }
         return self.json_response(response, start_response)
 
@@ -90,23 +201,22 @@ class WSGIApplication:
         try:
             data = self.get_json_body(environ)
 
-            name = data.get('name', 'Scénario')
-            hourly_rate = float(data.get('hourly_rate', 20.0))
-            shifts = data.get('shifts', [])
-
-            if not shifts:
-                return self.json_response({'error': 'Aucun shift fourni'}, start_response, '400 Bad Request')
+            weekly_overtime = data.get('weekly_overtime')  # None: réglage du serveur
+            if weekly_overtime is not None and not isinstance(weekly_overtime, bool):
+                return self.json_response({'error': 'weekly_overtime: booléen attendu'}, start_response,
+                                          '400 Bad Request')
 
-            # Créer les WorkDay
-            work_days = []
-            for shift in shifts:
-                date = datetime.strptime(shift['date'], '%Y-%m-%d')
-                shift_type = ShiftType[shift['type']]
-                work_days.append(WorkDay(date, shift_type))
+            bundle = self.bundle
+            scenario, violations, error = parse_scenario_request(data, bundle.validator)
+            if error is not None:
+                return self.json_response(error, start_response, '400 Bad Request')
 
-            # Calculer
-            scenario = Scenario(name, work_days, hourly_rate)
-            result = self.calculator.calculate_scenario(scenario)
+            # Requêtes identiques simultanées: un seul calcul partagé (avec les mêmes règles)
+            calculator = bundle.calculator
+            if weekly_overtime is None:
+                weekly_overtime = calculator.weekly_overtime
+            result = self.flights.do(('calculate', weekly_overtime, scenario_key(scenario, calculator.rules)),
+                                     lambda: calculator.calculate_scenario(scenario, weekly_overtime=weekly_overtime))
 
             # Formater pour JSON
             response = {
@@ -119,8 +229,13 @@ class WSGIApplication:
                     'normal': result.total_breakdown.normal_hours,
                     'night': result.total_breakdown.night_hours,
                     'sunday': result.total_breakdown.sunday_hours,
-                    'night_sunday': result.total_breakdown.night_sunday_hours
+                    'night_sunday': result.total_breakdown.night_sunday_hours,
+                    'overtime_25': result.total_breakdown.overtime_25_hours,
+                    'overtime_50': result.total_breakdown.overtime_50_hours
                 },
+                'total_overtime_pay': result.total_overtime_pay,
+                'weekly_overtime': weekly_overtime,
+                'rules_version': calculator.rules.version,
                 'days': [
                     {
                         'date': dr.work_day.date.strftime('%Y-%m-%d'),
@@ -131,11 +246,27 @@ class WSGIApplication:
                         'bonus': dr.bonus_pay
                     }
                     for dr in result.day_results
-                ]
+                ],
+                'runs': [
+                    {
+                        'start': rr.run.start.strftime('%Y-%m-%d'),
+                        'end': rr.run.end.strftime('%Y-%m-%d'),
+                        'shift_type': rr.run.shift_type.value,
+                        'length': rr.run.length,
+                        'hours': rr.breakdown.get_total_hours(),
+                        'pay': rr.total_pay,
+                        'bonus': rr.bonus_pay
+                    }
+                    for rr in result.run_results
+                ],
+                'violations': violations
             }
 
             return self.json_response(response, start_response)
 
+        except SingleFlightTimeout as e:
+            return self.json_response({'error': str(e)}, start_response, '503 Service Unavailable',
+                                      headers=[('Retry-After', '5')])
         except Exception as e:
             return self.json_response({'error': str(e)}, start_response, '500 Internal Server Error')
 
@@ -144,28 +275,18 @@ class WSGIApplication:
         try:
             data = self.get_json_body(environ)
 
-            name = data.get('name', 'Scénario')
-            hourly_rate = float(data.get('hourly_rate', 20.0))
-            shifts = data.get('shifts', [])
+            scenario, violations, error = parse_scenario_request(data, self.bundle.validator)
+            if error is not None:
+                return self.json_response(error, start_response, '400 Bad Request')
 
-            if not shifts:
-                return self.json_response({'error': 'Aucun shift fourni'}, start_response, '400 Bad Request')
-
-            # Créer les WorkDay
-            work_days = []
-            for shift in shifts:
-                date = datetime.strptime(shift['date'], '%Y-%m-%d')
-                shift_type = ShiftType[shift['type']]
-                work_days.append(WorkDay(date, shift_type))
-
-            # Sauvegarder
-            scenario = Scenario(name, work_days, hourly_rate)
-            self.scenarios.append(scenario)
+            # Calculé une seule fois ici: les comparaisons réutilisent ses totaux
+            entry = self.store.add(scenario)
 
             return self.json_response({
                 'success': True,
-                'message': f"Scénario '{name}' sauvegardé",
-                'id': len(self.scenarios) - 1
+                'message': f"Scénario '{scenario.name}' sauvegardé",
+                'id': entry.id,
+                'violations': violations
             }, start_response)
 
         except Exception as e:
@@ -174,9 +295,11 @@ class WSGIApplication:
     def compare(self, environ, start_response):
         """POST /api/compare"""
         try:
-            data = self.get_json_body(environ)
-            scenario_ids = data.get('scenario_ids', [])
+            scenario_ids = parse_scenario_ids(self.get_json_body(environ))
+        except ValueError as e:
+            return self.json_response({'error': str(e)}, start_response, '400 Bad Request')
 
+        try:
             if len(scenario_ids) < 2:
                 return self.json_response(
                     {'error': 'Au moins 2 scénarios sont nécessaires'},
@@ -184,14 +307,14 @@ class WSGIApplication:
                     '400 Bad Request'
                 )
 
-            # Récupérer les scénarios
-            scenarios = [self.scenarios[i] for i in scenario_ids if i < len(self.scenarios)]
+            # Récupérer les scénarios (identifiants stables)
+            store_ids = {i for i in scenario_ids if self.store.get(i) is not None}
 
-            if len(scenarios) < 2:
+            if len(store_ids) < 2:
                 return self.json_response({'error': 'Scénarios invalides'}, start_response, '400 Bad Request')
 
-            # Comparer
-            comparison = self.comparator.compare_scenarios(scenarios)
+            # Comparer à partir des totaux calculés à la sauvegarde
+            comparison = self.store.compare(store_ids)
 
             # Formater pour JSON
             response = {
@@ -212,7 +335,8 @@ class WSGIApplication:
                         'percentage': comparison.get_percentage_from_best(result)
                     }
                     for rank, result in comparison.get_ranking()
-                ]
+                ],
+                'weekly_overtime': self.store.calculator.weekly_overtime
             }
 
             return self.json_response(response, start_response)
@@ -223,12 +347,13 @@ class WSGIApplication:
     def delete(self, environ, start_response):
         """POST /api/delete"""
         try:
-            data = self.get_json_body(environ)
-            scenario_ids = sorted(data.get('scenario_ids', []), reverse=True)
+            scenario_ids = parse_scenario_ids(self.get_json_body(environ))
+        except ValueError as e:
+            return self.json_response({'error': str(e)}, start_response, '400 Bad Request')
 
-            for i in scenario_ids:
-                if 0 <= i < len(self.scenarios):
-                    del self.scenarios[i]
+        try:
+            for scenario_id in scenario_ids:
+                self.store.remove(scenario_id)
 
             return self.json_response({
                 'success': True,
@@ -238,6 +363,70 @@ class WSGIApplication:
         except Exception as e:
             return self.json_response({'error': str(e)}, start_response, '500 Internal Server Error')
 
+    def submit_job(self, environ, start_response):
+        """POST /api/jobs: place une comparaison ou une paie par lots dans la file"""
+        try:
+            data = self.get_json_body(environ)
+            bundle = self.bundle
+            kind, func = build_job(data, bundle.calculator, self.store, bundle.validator)
+        except JobRejected as e:
+            return self.json_response(e.body, start_response, '400 Bad Request')
+        except (ValueError, KeyError, TypeError) as e:
+            return self.json_response({'error': str(e)}, start_response, '400 Bad Request')
+
+        try:
+            job = self.jobs.submit(kind, func)
+        except QueueFull as e:
+            return self.json_response({'error': str(e)}, start_response, '503 Service Unavailable',
+                                      headers=[('Retry-After', '5')])
+
+        return self.json_response({
+            'id': job.id,
+            'status': job.status,
+            'poll': f"/api/jobs/{job.id}"
+        }, start_response, '202 Accepted')
+
+    def get_job(self, job_id, start_response):
+        """GET /api/jobs/<id>: avancement, résultats partiels et résultat final"""
+        job = self.jobs.get(job_id)
+        if job is None:
+            return self.json_response({'error': 'Travail inconnu ou expiré'}, start_response,
+                                      '404 Not Found')
+        return self.json_response(job.to_dict(), start_response)
+
+    def get_stats(self, start_response):
+        """GET /api/stats: compteurs des calculs partagés et de la file des travaux"""
+        return self.json_response({
+            'singleflight': self.flights.stats(),
+            'jobs': {'queued': self.jobs.queued()}
+        }, start_response)
+
+    def get_rules(self, start_response):
+        """GET /api/rules: règles de majoration en vigueur"""
+        rules = self.bundle.rules
+        return self.json_response({
+            'version': rules.version,
+            'fingerprint': rules.fingerprint,
+            'file': self.rules_file.path if self.rules_file else None,
+            'error': self.rules_file.error if self.rules_file else None,
+            'rules': rules.to_dict()
+        }, start_response)
+
+    def reload_rules(self, start_response):
+        """POST /api/rules/reload: recharge le fichier de règles sans attendre la vérification périodique"""
+        if self.rules_file is None:
+            return self.json_response({'error': 'Aucun fichier de règles (SHIFT_RULES_FILE)'}, start_response,
+                                      '400 Bad Request')
+        try:
+            rules = self.rules_file.load()
+        except (OSError, RulesValidationError) as e:
+            # Fichier refusé: les règles en cours restent en place
+            return self.json_response({'error': str(e), 'version': self.bundle.rules.version},
+                                      start_response, '400 Bad Request')
+        self.install_rules(rules)
+        return self.json_response({'version': rules.version, 'fingerprint': rules.fingerprint},
+                                  start_response)
+
     def get_json_body(self, environ):
         """Récupère et parse le body JSON"""
         try:
@@ -250,13 +439,13 @@ class WSGIApplication:
             return json.loads(body)
         return {}
 
-    def json_response(self, data, start_response, status='200 OK'):
+    def json_response(self, data, start_response, status='200 OK', headers=None):
         """Envoie une réponse JSON"""
         response = json.dumps(data, ensure_ascii=False, indent=2).encode('utf-8')
         start_response(status, [
             ('Content-Type', 'application/json; charset=utf-8'),
             ('Content-Length', str(len(response)))
-        ])
+        ] + (headers or []))
         return [response]
 
     def not_found(self, start_response):
@@ -269,8 +458,22 @@ class WSGIApplication:
         return [response]
 
 
-# Instance globale pour WSGI
-application = WSGIApplication()
+# Instance globale pour WSGI (profilée si SHIFT_PROFILE=1)
+application = ProfilingMiddleware.from_env(WSGIApplication())
 
 # Alias pour compatibilité
 app = application
+
+
+def preload():
+    """
+    Prépare l'application avant le fork des workers gunicorn.
+
+    Construit les données précalculées une seule fois dans le maître, puis
+    gèle le ramasse-miettes (gc.freeze) pour que les objets existants ne
+    soient plus parcourus ni modifiés par les collectes des workers: leurs
+    pages mémoire restent partagées en copy-on-write.
+    """
+    application.warm_up()
+    gc.collect()
+    gc.freeze()